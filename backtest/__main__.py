@@ -0,0 +1,86 @@
+"""
+Replay tick rekaman (core.tick_recorder) dengan ekonomi deteksi bot dan saldo tiruan.
+
+    python -m backtest                                   # semua tick terekam, parameter dari settings
+    python -m backtest --start 2026-10-18T00:00 --end 2026-10-18T06:00 --symbols BTC,XRP
+    python -m backtest --min-profit-usd 0.5 --min-profit-percent 0.2 --trading-fee 0.00075
+
+Waktu dalam UTC (ISO) atau epoch detik. Harga Indodax dikonversi dengan kurs terakhir
+yang tersimpan kecuali --usd-to-idr diberikan.
+"""
+import os
+import sys
+import time
+import argparse
+
+os.environ.setdefault("METRICS_ENABLED", "False")
+
+from backtest.data import add_data_arguments, load_grid
+from backtest.engine import Backtester
+from utils.logger import setup_logger
+from config.settings import (
+    BACKTEST_CAPITAL_USD, BACKTEST_TRANSFER_DELAY, BACKTEST_LATENCY,
+    MIN_PROFIT_THRESHOLD_USD, MIN_PROFIT_THRESHOLD_PERCENT, TRADING_FEE
+)
+
+
+def format_result(result):
+    lines = [
+        f"Tick: {result['ticks']:,} | langkah grid: {result['steps']:,} | "
+        f"deteksi {result['detect_seconds']:.2f}s, total {result['elapsed_seconds']:.2f}s",
+        f"P&L: ${result['pnl_usd']:.2f} ({result['pnl_percent']:.3f}% modal) | "
+        f"drawdown maks ${result['max_drawdown_usd']:.2f}",
+        f"Sinyal: {result['signals']:,} | trade: {result['trades']:,} | dilewati: {result['skipped']:,} | "
+        f"hit rate: {result['hit_rate'] * 100:.1f}%",
+        f"Utilisasi modal: {result['utilization'] * 100:.2f}% | turnover: {result['turnover']:.2f}x",
+    ]
+    ranked = sorted(result['per_symbol'].items(), key=lambda item: -item[1])
+    for symbol, pnl in ranked[:10]:
+        lines.append(f"  {symbol:<10} ${pnl:.2f}")
+    if len(ranked) > 10:
+        lines.append(f"  ... {len(ranked) - 10} simbol lain")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m backtest", description="Backtest arbitrase dari tick terekam")
+    add_data_arguments(parser)
+    parser.add_argument("--min-profit-usd", type=float, default=MIN_PROFIT_THRESHOLD_USD)
+    parser.add_argument("--min-profit-percent", type=float, default=MIN_PROFIT_THRESHOLD_PERCENT)
+    parser.add_argument("--trading-fee", type=float, default=TRADING_FEE)
+    parser.add_argument("--capital", type=float, default=BACKTEST_CAPITAL_USD, help="modal awal per exchange (USD)")
+    parser.add_argument("--max-trade-usd", type=float, help="batas nilai per trade")
+    parser.add_argument("--transfer-delay", type=float, default=BACKTEST_TRANSFER_DELAY)
+    parser.add_argument("--latency", type=float, default=BACKTEST_LATENCY, help="detik antara keputusan dan fill")
+    args = parser.parse_args(argv)
+    setup_logger(os.getenv("LOG_FILE", "data/logs/backtest.jsonl"))
+
+    start = time.perf_counter()
+    try:
+        grid = load_grid(args)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    load_seconds = time.perf_counter() - start
+
+    result = Backtester(
+        grid,
+        min_profit_usd=args.min_profit_usd,
+        min_profit_percent=args.min_profit_percent,
+        trading_fee=args.trading_fee,
+        capital_usd=args.capital,
+        max_trade_usd=args.max_trade_usd,
+        transfer_delay=args.transfer_delay,
+        latency=args.latency,
+    ).run()
+
+    print(f"Exchange: {', '.join(grid.exchange_names)} | simbol: {len(grid.symbols)} | "
+          f"muat grid {load_seconds:.2f}s")
+    print(format_result(result))
+    elapsed = load_seconds + result['elapsed_seconds']
+    print(f"Throughput: {result['ticks'] / elapsed * 60 / 1e6:.2f} juta tick/menit")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+from datetime import datetime, timezone
+import numpy as np
+from core.tick_recorder import TickRecorder
+from utils.helpers import load_last_usd_to_idr_rate
+from config.settings import TICK_DIR, BACKTEST_STEP, PRICE_BOARD_MAX_AGE
+
+
+class PriceGrid:
+    """
+    Harga historis pada grid waktu tetap: prices[t, exchange, simbol] dalam USD,
+    nilai 0 berarti belum ada harga atau harga terakhir lebih tua dari max_age (sama seperti PriceBoard).
+    usd_to_idr adalah kurs yang dipakai mengonversi harga Indodax (None jika tidak diketahui).
+    """
+
+    def __init__(self, times, exchange_names, symbols, prices, ticks=0, usd_to_idr=None):
+        self.times = times
+        self.exchange_names = list(exchange_names)
+        self.symbols = list(symbols)
+        self.prices = prices
+        self.ticks = ticks
+        self.usd_to_idr = usd_to_idr
+
+    @property
+    def step(self):
+        return float(self.times[1] - self.times[0]) if len(self.times) > 1 else BACKTEST_STEP
+
+    def subset(self, exchange_names=None, symbols=None):
+        """Grid dengan sebagian exchange/simbol (salinan kecil, dipakai sweep)"""
+        exchange_names = self.exchange_names if exchange_names is None else list(exchange_names)
+        symbols = self.symbols if symbols is None else list(symbols)
+        if exchange_names == self.exchange_names and symbols == self.symbols:
+            return self
+        rows = [self.exchange_names.index(name) for name in exchange_names]
+        cols = [self.symbols.index(symbol) for symbol in symbols]
+        prices = self.prices[:, rows][:, :, cols]
+        return PriceGrid(self.times, exchange_names, symbols, prices, self.ticks, self.usd_to_idr)
+
+
+def _lookup(names, selected):
+    """Array indeks kamus recorder -> indeks grid (-1 jika tidak dipilih)"""
+    position = {name: i for i, name in enumerate(selected)}
+    return np.array([position.get(name, -1) for name in names] or [-1], dtype=np.int64)
+
+
+def load_price_grid(recorder=None, start=None, end=None, step=BACKTEST_STEP, exchanges=None, symbols=None,
+                    usd_to_idr=None, max_age=PRICE_BOARD_MAX_AGE):
+    """
+    Bangun PriceGrid dari rekaman tick dalam [start, end) epoch detik.
+    Setiap sel grid berisi tick terakhir sebelum akhir sel, diteruskan (forward fill) sampai max_age.
+    Semua langkah divektorisasi per segment; tidak ada loop Python per tick.
+    """
+    recorder = recorder or TickRecorder()
+    usd_to_idr = usd_to_idr or load_last_usd_to_idr_rate()
+    exchange_names = list(recorder.exchanges if exchanges is None else exchanges)
+    symbols = list(recorder.symbols if symbols is None else symbols)
+
+    segments = list(recorder.iter_segments(start, end))
+    if start is None or end is None:
+        if not segments:
+            raise ValueError("Tidak ada tick terekam dalam rentang waktu ini")
+        start = segments[0][0] + float(segments[0][1]['ts'].min()) / 1e6 if start is None else start
+        end = segments[-1][0] + float(segments[-1][1]['ts'].max()) / 1e6 + step if end is None else end
+
+    n_steps = max(1, int(np.ceil((end - start) / step)))
+    n_exchanges, n_symbols = len(exchange_names), len(symbols)
+    latest = np.full(n_steps * n_exchanges * n_symbols, np.nan)
+    exchange_lookup = _lookup(recorder.exchanges, exchange_names)
+    symbol_lookup = _lookup(recorder.symbols, symbols)
+    ticks = 0
+
+    for base, columns in segments:
+        times = base + columns['ts'].astype(np.float64) / 1e6
+        ex = exchange_lookup[columns['exchange'].astype(np.int64)]
+        sym = symbol_lookup[columns['symbol'].astype(np.int64)]
+        price = np.asarray(columns['last'], dtype=np.float64)
+        keep = (ex >= 0) & (sym >= 0) & (price > 0) & (times >= start) & (times < end)
+        ticks += int(keep.sum())
+
+        times, ex, sym, price = times[keep], ex[keep], sym[keep], price[keep]
+        if times.size > 1 and np.any(np.diff(times) < 0):
+            order = np.argsort(times, kind='stable')
+            times, ex, sym, price = times[order], ex[order], sym[order], price[order]
+
+        # Tick terakhir per sel: unique pada urutan terbalik memberi kemunculan terakhir
+        cell = ((times - start) // step).astype(np.int64) * (n_exchanges * n_symbols) + ex * n_symbols + sym
+        cells, first_from_end = np.unique(cell[::-1], return_index=True)
+        latest[cells] = price[::-1][first_from_end]
+
+    latest = latest.reshape(n_steps, n_exchanges, n_symbols)
+
+    # Forward fill sepanjang waktu dengan batas umur harga
+    has_tick = ~np.isnan(latest)
+    steps = np.arange(n_steps)[:, None, None]
+    last_step = np.maximum.accumulate(np.where(has_tick, steps, -1), axis=0)
+    filled = np.take_along_axis(np.nan_to_num(latest), np.maximum(last_step, 0), axis=0)
+    fresh = (last_step >= 0) & ((steps - last_step) * step <= max_age)
+    prices = np.where(fresh, filled, 0.0)
+
+    # Indodax bertransaksi dalam IDR, semua harga grid dalam USD
+    for i, name in enumerate(exchange_names):
+        if name == 'indodax':
+            prices[:, i, :] /= usd_to_idr
+
+    times = start + step * (np.arange(n_steps) + 1)
+    return PriceGrid(times, exchange_names, symbols, prices, ticks, usd_to_idr)
+
+
+def parse_time(value):
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).replace(tzinfo=timezone.utc).timestamp()
+
+
+def split(value):
+    return [item.strip() for item in value.split(",")] if value else None
+
+
+def add_data_arguments(parser):
+    """Argumen pemilihan data untuk python -m backtest dan python -m backtest.sweep"""
+    parser.add_argument("--tick-dir", default=TICK_DIR)
+    parser.add_argument("--start", help="awal rentang (UTC ISO atau epoch)")
+    parser.add_argument("--end", help="akhir rentang (UTC ISO atau epoch)")
+    parser.add_argument("--step", type=float, default=BACKTEST_STEP, help="resolusi grid waktu (detik)")
+    parser.add_argument("--exchanges", help="daftar exchange dipisah koma (default semua yang terekam)")
+    parser.add_argument("--symbols", help="daftar simbol dipisah koma (default semua yang terekam)")
+    parser.add_argument("--usd-to-idr", type=float, help="kurs untuk harga Indodax")
+
+
+def load_grid(args):
+    recorder = TickRecorder(directory=args.tick_dir)
+    return load_price_grid(recorder, parse_time(args.start), parse_time(args.end), args.step,
+                           split(args.exchanges), split(args.symbols), args.usd_to_idr)
@@ -0,0 +1,195 @@
+import time
+import heapq
+import numpy as np
+from strategies.spread_matrix import fee_vectors, spread_economics
+from utils.helpers import load_last_usd_to_idr_rate
+from config.settings import (
+    MIN_PROFIT_THRESHOLD_USD,
+    MIN_PROFIT_THRESHOLD_PERCENT,
+    TRADING_FEE,
+    TRANSFER_FEE,
+    TRANSFER_FEE_IDR_TO_USDT,
+    MIN_TRADE_AMOUNTS,
+    BACKTEST_WINDOW,
+    BACKTEST_CAPITAL_USD,
+    BACKTEST_TRANSFER_DELAY,
+    BACKTEST_LATENCY
+)
+
+
+class Backtester:
+    """
+    Replay PriceGrid dengan ekonomi yang sama seperti calculate_net_profit/SpreadMatrix.
+
+    Tahap 1 (vektor): per batch `window` langkah waktu, hitung net profit semua pasangan
+    (waktu x beli x jual x simbol) sekaligus dan ambil pasangan terbaik per simbol yang lolos threshold.
+    Tahap 2 (sparse): hanya sinyal yang lolos diproses berurutan dengan saldo tiruan per exchange.
+    Ukuran trade mengikuti calculate_trade_amount, fill memakai harga `latency` detik setelah keputusan,
+    dan koin yang dibeli baru kembali ke exchange penjual setelah `transfer_delay` detik.
+    Biaya transfer dihitung sekali per trade dalam USD lewat transfer_fee_usd, sama seperti calculate_net_profit,
+    dengan kurs USD/IDR yang sama dengan saat grid dibangun.
+    """
+
+    def __init__(self, grid, min_profit_usd=MIN_PROFIT_THRESHOLD_USD, min_profit_percent=MIN_PROFIT_THRESHOLD_PERCENT,
+                 trading_fee=TRADING_FEE, transfer_fee=None, fiat_transfer_fee=TRANSFER_FEE_IDR_TO_USDT,
+                 min_trade_amounts=None, capital_usd=BACKTEST_CAPITAL_USD, max_trade_usd=None,
+                 transfer_delay=BACKTEST_TRANSFER_DELAY, latency=BACKTEST_LATENCY, window=BACKTEST_WINDOW,
+                 usd_to_idr=None):
+        self.grid = grid
+        self.min_profit_usd = min_profit_usd
+        self.min_profit_percent = min_profit_percent
+        self.trading_fee = trading_fee
+        self.min_trade_amounts = MIN_TRADE_AMOUNTS if min_trade_amounts is None else min_trade_amounts
+        self.capital_usd = capital_usd
+        self.max_trade_usd = max_trade_usd
+        self.transfer_delay = transfer_delay
+        self.latency = latency
+        self.window = window
+        self.coin_fee, self.fiat_fee = fee_vectors(
+            grid.exchange_names, grid.symbols, usd_to_idr or grid.usd_to_idr or load_last_usd_to_idr_rate(),
+            TRANSFER_FEE if transfer_fee is None else transfer_fee,
+            fiat_transfer_fee
+        )
+
+    def best_pairs(self):
+        """
+        Pasangan terbaik per (langkah, simbol) dihitung per batch `window` langkah waktu.
+        Returns:
+            tuple: (pasangan, net, net%) berbentuk (waktu, simbol); pasangan = indeks_beli * n_exchange + indeks_jual.
+        """
+        prices = self.grid.prices
+        n_steps, n_exchanges, n_symbols = prices.shape
+        pairs = np.zeros((n_steps, n_symbols), dtype=np.int64)
+        best_net = np.full((n_steps, n_symbols), -np.inf)
+        best_percent = np.zeros((n_steps, n_symbols))
+        for w0 in range(0, n_steps, self.window):
+            _, net, net_percent = spread_economics(
+                prices[w0:w0 + self.window], self.coin_fee, self.fiat_fee, self.trading_fee)
+            net = net.reshape(-1, n_exchanges * n_exchanges, n_symbols)
+            best = np.argmax(net, axis=1)
+            pairs[w0:w0 + self.window] = best
+            best_net[w0:w0 + self.window] = np.take_along_axis(net, best[:, None, :], axis=1)[:, 0]
+            best_percent[w0:w0 + self.window] = np.take_along_axis(
+                net_percent.reshape(net.shape), best[:, None, :], axis=1)[:, 0]
+        return pairs, best_net, best_percent
+
+    def signals(self, best_pairs=None):
+        """
+        Sinyal (langkah, simbol, pasangan) terurut waktu: pasangan terbaik per simbol dengan
+        net > 0 dan net% >= min_profit_percent. best_pairs bisa dipakai ulang antar threshold (sweep).
+        """
+        pairs, best_net, best_percent = self.best_pairs() if best_pairs is None else best_pairs
+        ok = np.isfinite(best_net) & (best_net > 0) & (best_percent >= self.min_profit_percent)
+        steps, cols = np.nonzero(ok)
+        return np.column_stack([steps, cols, pairs[steps, cols]])
+
+    def _initial_balances(self):
+        """Setiap exchange: separuh modal sebagai saldo dasar, separuh dibagi rata ke koin"""
+        prices = self.grid.prices
+        n_exchanges, n_symbols = prices.shape[1:]
+        base = np.full(n_exchanges, self.capital_usd / 2)
+        coins = np.zeros((n_exchanges, n_symbols))
+        per_coin = self.capital_usd / 2 / max(n_symbols, 1)
+        for i in range(n_exchanges):
+            for s in range(n_symbols):
+                seen = np.flatnonzero(prices[:, i, s] > 0)
+                if seen.size:
+                    coins[i, s] = per_coin / prices[seen[0], i, s]
+                else:
+                    base[i] += per_coin
+        return base, coins
+
+    def run(self, best_pairs=None):
+        start = time.perf_counter()
+        grid = self.grid
+        prices = grid.prices
+        n_steps, n_exchanges, _ = prices.shape
+        step = grid.step
+        latency_steps = int(round(self.latency / step))
+        delay_steps = max(1, int(round(self.transfer_delay / step)))
+        capital = self.capital_usd * n_exchanges
+
+        signals = self.signals(best_pairs)
+        detect_seconds = time.perf_counter() - start
+        n_signals = len(signals)
+
+        # Semua yang tidak bergantung saldo diambil sekaligus (vektor), loop hanya mengelola saldo
+        t, s, pair = signals[:, 0], signals[:, 1], signals[:, 2]
+        buy_i, sell_j = np.divmod(pair, n_exchanges)
+        fill = np.minimum(t + latency_steps, n_steps - 1)
+        buy_price, sell_price = prices[t, buy_i, s], prices[t, sell_j, s]
+        fill_buy, fill_sell = prices[fill, buy_i, s], prices[fill, sell_j, s]
+        min_amount = np.array([self.min_trade_amounts.get(symbol, 0.001) for symbol in grid.symbols])[s]
+        min_for_profit = np.maximum(self.min_profit_usd / (sell_price - buy_price), min_amount)
+        max_amount = np.full(n_signals, np.inf) if self.max_trade_usd is None else self.max_trade_usd / buy_price
+        transfer_cost = self.coin_fee[s] * buy_price + self.fiat_fee[buy_i, sell_j]
+
+        # Sinyal yang tidak mungkin dieksekusi berapapun saldonya tidak perlu masuk loop
+        possible = (max_amount >= min_for_profit) & (fill_buy > 0) & (fill_sell > 0)
+        skipped = int(n_signals - possible.sum())
+        rows = zip(*(column[possible].tolist() for column in (
+            t, s, buy_i, sell_j, buy_price, sell_price, fill_buy, fill_sell, min_for_profit, max_amount, transfer_cost)))
+
+        base, coins = self._initial_balances()
+        base, coins = base.tolist(), coins.tolist()
+        buy_factor, sell_factor = 1 + self.trading_fee, 1 - self.trading_fee
+        in_transit = []
+        trades = []
+        locked = 0.0  # USD x detik koin dalam perjalanan rebalancing
+        turnover = 0.0
+
+        for t, s, buy_i, sell_j, buy_price, sell_price, fill_buy, fill_sell, min_for_profit, max_amount, fee in rows:
+            while in_transit and in_transit[0][0] <= t:
+                _, exchange, symbol, amount = heapq.heappop(in_transit)
+                coins[exchange][symbol] += amount
+
+            # Ukuran trade seperti calculate_trade_amount, dengan batas opsional per trade
+            amount = min(coins[sell_j][s], base[buy_i] / buy_price, max_amount)
+            if amount < min_for_profit:
+                skipped += 1
+                continue
+            amount = min(amount, base[buy_i] / (fill_buy * buy_factor))
+
+            cost = amount * fill_buy * buy_factor
+            proceeds = amount * fill_sell * sell_factor
+            pnl = proceeds - cost - fee
+
+            base[buy_i] -= cost
+            base[sell_j] += proceeds - fee
+            coins[sell_j][s] -= amount
+            heapq.heappush(in_transit, (t + delay_steps, sell_j, s, amount))
+            locked += amount * fill_buy * min(delay_steps, n_steps - t) * step
+            turnover += amount * fill_buy
+
+            expected = amount * (sell_price - buy_price - self.trading_fee * (buy_price + sell_price)) - fee
+            trades.append((float(grid.times[t]), grid.symbols[s], grid.exchange_names[buy_i],
+                           grid.exchange_names[sell_j], amount, pnl, expected))
+
+        pnl = np.array([trade[5] for trade in trades])
+        equity = np.concatenate([[0.0], np.cumsum(pnl)])
+        duration = n_steps * step
+        per_symbol = {}
+        for trade in trades:
+            per_symbol[trade[1]] = per_symbol.get(trade[1], 0.0) + trade[5]
+
+        return {
+            'pnl_usd': float(pnl.sum()),
+            'pnl_percent': float(pnl.sum() / capital * 100) if capital else 0.0,
+            'trades': len(trades),
+            'signals': n_signals,
+            'skipped': skipped,
+            'hit_rate': float((pnl > 0).mean()) if pnl.size else 0.0,
+            'max_drawdown_usd': float(np.max(np.maximum.accumulate(equity) - equity)),
+            'utilization': locked / (duration * capital) if duration and capital else 0.0,
+            'turnover': turnover / capital if capital else 0.0,
+            'per_symbol': per_symbol,
+            'trade_log': trades,
+            'steps': n_steps,
+            'ticks': grid.ticks,
+            'detect_seconds': detect_seconds,
+            'elapsed_seconds': time.perf_counter() - start,
+        }
+
+
+def run_backtest(grid, **params):
+    return Backtester(grid, **params).run()
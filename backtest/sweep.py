@@ -0,0 +1,229 @@
+"""
+Sweep parameter backtest di semua core CPU: grid atau random search atas threshold profit,
+ukuran trade, set simbol dan subset exchange. Hasil diurutkan dan konfigurasi terbaik
+dicetak sebagai baris .env untuk config/settings.py.
+
+    python -m backtest.sweep --min-profit-usd 0.1,0.2,0.5 --min-profit-percent 0.05,0.1,0.2
+    python -m backtest.sweep --max-trade-usd none,100,500 --exchange-sets auto --symbol-sets each
+    python -m backtest.sweep --random 200 --seed 7 --workers 8
+
+Harga historis dimuat sekali ke shared memory; worker hanya memetakan buffer yang sama (read-only),
+sehingga array harga tidak pernah di-pickle per konfigurasi.
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from backtest.data import PriceGrid, add_data_arguments, load_grid, split
+from backtest.engine import Backtester
+from utils.logger import setup_logger
+from config.settings import (
+    MIN_PROFIT_THRESHOLD_USD, MIN_PROFIT_THRESHOLD_PERCENT, BACKTEST_CAPITAL_USD,
+    BACKTEST_TRANSFER_DELAY, BACKTEST_LATENCY
+)
+
+RANK_KEYS = ("pnl_usd", "hit_rate", "utilization")
+
+# Grid milik worker, dipetakan dari shared memory oleh _attach
+_grid = None
+_shm = None
+# Pasangan terbaik per (exchange, simbol): tidak bergantung threshold, dihitung sekali per worker
+_best_pairs = {}
+
+
+def share_grid(grid):
+    """Salin harga grid ke shared memory; kembalikan (shm, argumen untuk _attach)"""
+    shm = shared_memory.SharedMemory(create=True, size=max(grid.prices.nbytes, 1))
+    shared = np.ndarray(grid.prices.shape, dtype=grid.prices.dtype, buffer=shm.buf)
+    shared[:] = grid.prices
+    return shm, (shm.name, grid.prices.shape, grid.prices.dtype.str, grid.times,
+                 grid.exchange_names, grid.symbols, grid.ticks, grid.usd_to_idr)
+
+
+def _attach(name, shape, dtype, times, exchange_names, symbols, ticks, usd_to_idr):
+    global _grid, _shm
+    _shm = shared_memory.SharedMemory(name=name)
+    prices = np.ndarray(shape, dtype=np.dtype(dtype), buffer=_shm.buf)
+    prices.flags.writeable = False
+    _grid = PriceGrid(times, exchange_names, symbols, prices, ticks, usd_to_idr)
+
+
+def evaluate(config, fixed):
+    """Jalankan satu konfigurasi di grid worker; kembalikan (config, ringkasan tanpa trade_log)"""
+    key = (config.get('exchanges'), config.get('symbols'))
+    grid = _grid.subset(*key)
+    params = {name: value for name, value in config.items() if name not in ('exchanges', 'symbols')}
+    backtester = Backtester(grid, **params, **fixed)
+    if key not in _best_pairs:
+        _best_pairs.clear()
+        _best_pairs[key] = backtester.best_pairs()
+    result = backtester.run(_best_pairs[key])
+    result.pop('trade_log')
+    return config, result
+
+
+def build_space(args, grid):
+    """{parameter: [nilai]} dari argumen CLI; set exchange/simbol berupa tuple nama"""
+    def floats(value, default):
+        if value is None:
+            return [default]
+        return [None if item.lower() == "none" else float(item) for item in split(value)]
+
+    if args.exchange_sets == "auto":
+        exchange_sets = [
+            combo for size in range(2, len(grid.exchange_names) + 1)
+            for combo in itertools.combinations(grid.exchange_names, size)
+        ]
+    elif args.exchange_sets:
+        exchange_sets = [tuple(split(group)) for group in args.exchange_sets.split(";")]
+    else:
+        exchange_sets = [tuple(grid.exchange_names)]
+
+    if args.symbol_sets == "each":
+        symbol_sets = [tuple(grid.symbols)] + [(symbol,) for symbol in grid.symbols]
+    elif args.symbol_sets:
+        symbol_sets = [tuple(split(group)) for group in args.symbol_sets.split(";")]
+    else:
+        symbol_sets = [tuple(grid.symbols)]
+
+    for group, known in ((exchange_sets, grid.exchange_names), (symbol_sets, grid.symbols)):
+        unknown = {name for names in group for name in names} - set(known)
+        if unknown:
+            raise ValueError(f"tidak ada di data: {', '.join(sorted(unknown))}")
+
+    return {
+        'min_profit_usd': floats(args.min_profit_usd, MIN_PROFIT_THRESHOLD_USD),
+        'min_profit_percent': floats(args.min_profit_percent, MIN_PROFIT_THRESHOLD_PERCENT),
+        'max_trade_usd': floats(args.max_trade_usd, None),
+        'exchanges': exchange_sets,
+        'symbols': symbol_sets,
+    }
+
+
+def generate_configs(space, samples=None, seed=None):
+    """Semua kombinasi (grid search), atau `samples` kombinasi acak tanpa duplikat (random search)"""
+    # Set exchange/simbol di urutan luar agar konfigurasi dengan data yang sama berdekatan (cache worker)
+    names = ['exchanges', 'symbols'] + [name for name in space if name not in ('exchanges', 'symbols')]
+    total = int(np.prod([len(space[name]) for name in names]))
+    if samples is None or samples >= total:
+        return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+    rng = random.Random(seed)
+    configs = []
+    for index in rng.sample(range(total), samples):
+        values = {}
+        for name in reversed(names):
+            index, position = divmod(index, len(space[name]))
+            values[name] = space[name][position]
+        configs.append({name: values[name] for name in names})
+    return configs
+
+
+def run_sweep(grid, configs, workers=None, **fixed):
+    """Evaluasi semua konfigurasi di process pool; kembalikan [(config, hasil)] sesuai urutan input"""
+    shm, init_args = share_grid(grid)
+    try:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                                 initializer=_attach, initargs=init_args) as pool:
+            chunksize = max(1, len(configs) // (4 * (workers or os.cpu_count())))
+            return list(pool.map(evaluate, configs, itertools.repeat(fixed), chunksize=chunksize))
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def rank(results, key="pnl_usd"):
+    return sorted(results, key=lambda item: item[1][key], reverse=True)
+
+
+def describe(values, everything):
+    return "semua" if tuple(values) == tuple(everything) else ",".join(values)
+
+
+def format_table(ranked, grid, top=20):
+    header = ("#", "min $", "min %", "maks trade", "exchange", "simbol", "P&L $", "trade", "hit %", "util %")
+    rows = []
+    for position, (config, result) in enumerate(ranked[:top], 1):
+        max_trade = config['max_trade_usd']
+        rows.append((
+            str(position),
+            f"{config['min_profit_usd']:g}",
+            f"{config['min_profit_percent']:g}",
+            "-" if max_trade is None else f"{max_trade:g}",
+            describe(config['exchanges'], grid.exchange_names),
+            describe(config['symbols'], grid.symbols),
+            f"{result['pnl_usd']:.2f}",
+            str(result['trades']),
+            f"{result['hit_rate'] * 100:.1f}",
+            f"{result['utilization'] * 100:.2f}",
+        ))
+    widths = [max(len(row[i]) for row in [header] + rows) for i in range(len(header))]
+    lines = ["  ".join(cell.rjust(width) for cell, width in zip(row, widths)) for row in [header] + rows]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    return "\n".join(lines)
+
+
+def env_lines(config):
+    """Konfigurasi sebagai baris .env (nama variabel sesuai config/settings.py)"""
+    lines = [
+        f"MIN_PROFIT_THRESHOLD_USD={config['min_profit_usd']:g}",
+        f"MIN_PROFIT_THRESHOLD_PERCENT={config['min_profit_percent']:g}",
+        f"ACTIVE_EXCHANGES={','.join(config['exchanges'])}",
+        f"SUPPORTED_SYMBOLS={','.join(config['symbols'])}",
+    ]
+    if config['max_trade_usd'] is not None:
+        lines.append(f"# ukuran trade maks ${config['max_trade_usd']:g} (belum ada setting bot untuk ini)")
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m backtest.sweep", description="Sweep parameter backtest")
+    add_data_arguments(parser)
+    parser.add_argument("--min-profit-usd", help="daftar nilai dipisah koma")
+    parser.add_argument("--min-profit-percent", help="daftar nilai dipisah koma")
+    parser.add_argument("--max-trade-usd", help="daftar nilai dipisah koma, 'none' untuk tanpa batas")
+    parser.add_argument("--exchange-sets", help="grup dipisah ';' (mis. 'binance,kucoin;binance,indodax') atau 'auto'")
+    parser.add_argument("--symbol-sets", help="grup dipisah ';' atau 'each' (semua + tiap simbol sendiri)")
+    parser.add_argument("--random", type=int, help="random search: jumlah konfigurasi acak dari ruang parameter")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--workers", type=int, help="jumlah proses (default semua core)")
+    parser.add_argument("--rank", choices=RANK_KEYS, default="pnl_usd")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--capital", type=float, default=BACKTEST_CAPITAL_USD, help="modal awal per exchange (USD)")
+    parser.add_argument("--transfer-delay", type=float, default=BACKTEST_TRANSFER_DELAY)
+    parser.add_argument("--latency", type=float, default=BACKTEST_LATENCY)
+    args = parser.parse_args(argv)
+    setup_logger(os.getenv("LOG_FILE", "data/logs/backtest.jsonl"))
+
+    try:
+        grid = load_grid(args)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+
+    try:
+        configs = generate_configs(build_space(args, grid), args.random, args.seed)
+    except ValueError as e:
+        parser.error(str(e))
+
+    start = time.perf_counter()
+    results = run_sweep(grid, configs, args.workers, capital_usd=args.capital,
+                        transfer_delay=args.transfer_delay, latency=args.latency)
+    elapsed = time.perf_counter() - start
+
+    ranked = rank(results, args.rank)
+    print(f"{len(configs)} konfigurasi, {grid.ticks:,} tick, {elapsed:.1f}s "
+          f"({args.workers or os.cpu_count()} worker)")
+    print(format_table(ranked, grid, args.top))
+    print("\n# Konfigurasi terbaik untuk .env")
+    print("\n".join(env_lines(ranked[0][0])))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+import numpy as np
+from core.tick_recorder import TickRecorder
+from backtest.data import PriceGrid, load_price_grid
+from backtest.engine import Backtester
+from backtest.sweep import generate_configs, run_sweep, rank
+from utils.helpers import calculate_net_profit
+
+
+def test_grid_keeps_last_tick_per_cell_and_expires_stale_prices(tmp_path):
+    recorder = TickRecorder(directory=str(tmp_path))
+    start = 1_700_000_000.0
+    recorder.record("binance", "BTC", 100.0, timestamp=start + 0.2)
+    recorder.record("binance", "BTC", 101.0, timestamp=start + 0.7)
+    recorder.record("indodax", "BTC", 1_616_000.0, timestamp=start + 1.5)
+    recorder.flush()
+
+    grid = load_price_grid(recorder, start, start + 10, step=1.0, usd_to_idr=16000, max_age=3)
+    binance, indodax = grid.exchange_names.index("binance"), grid.exchange_names.index("indodax")
+
+    assert grid.ticks == 3
+    assert grid.prices[:, binance, 0].tolist() == [101.0, 101.0, 101.0, 101.0, 0, 0, 0, 0, 0, 0]
+    assert grid.prices[0, indodax, 0] == 0
+    assert grid.prices[1, indodax, 0] == 101.0
+
+
+def test_backtest_trades_dislocation_until_inventory_runs_out():
+    steps = 50
+    prices = np.zeros((steps, 2, 1))
+    prices[:, 0, 0] = 100.0
+    prices[:, 1, 0] = 102.0  # kucoin selalu lebih mahal: beli di binance, jual di kucoin
+    grid = PriceGrid(np.arange(steps, dtype=float), ["binance", "kucoin"], ["BNB"], prices)
+
+    backtester = Backtester(grid, min_profit_usd=0.2, min_profit_percent=0.1, trading_fee=0.001,
+                            transfer_fee={"BNB": 0.001}, capital_usd=2000, max_trade_usd=100,
+                            transfer_delay=20, latency=0, window=7)
+    signals = backtester.signals()
+    assert len(signals) == steps
+    assert np.all(signals[:, 2] == 1)  # beli binance (0) * 2 + jual kucoin (1)
+
+    result = backtester.run()
+    expected = calculate_net_profit("BNB", 100.0, 102.0, "binance", "kucoin")
+    first = result['trade_log'][0]
+
+    # 1000 USD koin di kucoin habis setelah 10 trade, baru terisi lagi saat transfer pertama tiba di t=20
+    times = [trade[0] for trade in result['trade_log']]
+    assert len([t for t in times if t < 20]) == 10
+    assert 20.0 in times
+    assert result['skipped'] == steps - result['trades']
+    assert first[4] == 1.0
+    assert np.isclose(first[5], expected['net_profit'])
+    assert result['hit_rate'] == 1.0
+    assert 0 < result['utilization'] < 1
+
+
+def test_indodax_pair_trades_with_fiat_fee_in_usd(tmp_path):
+    recorder = TickRecorder(directory=str(tmp_path))
+    start = 1_700_000_000.0
+    for i in range(10):
+        recorder.record("indodax", "BNB", 100.0 * 16000, timestamp=start + i + 0.5)
+        recorder.record("binance", "BNB", 102.0, timestamp=start + i + 0.5)
+    recorder.flush()
+    grid = load_price_grid(recorder, start, start + 10, step=1.0, usd_to_idr=16000, max_age=3)
+    assert grid.usd_to_idr == 16000
+
+    backtester = Backtester(grid, min_profit_usd=0.2, min_profit_percent=0.1, trading_fee=0.001,
+                            transfer_fee={"BNB": 0.001}, capital_usd=2000, max_trade_usd=100,
+                            transfer_delay=1, latency=0)
+    result = backtester.run()
+
+    # Beli di indodax, jual di binance; fee fiat 10000 IDR = $0.625 per trade, bukan $10000
+    expected = calculate_net_profit("BNB", 100.0, 102.0, "indodax", "binance", usd_to_idr=16000)
+    first = result['trade_log'][0]
+    assert result['trades'] > 0 and result['pnl_usd'] > 0
+    assert (first[2], first[3], first[4]) == ("indodax", "binance", 1.0)
+    assert np.isclose(first[5], expected['net_profit'])
+
+
+def test_sweep_workers_read_shared_grid_and_match_direct_run():
+    rng = np.random.default_rng(3)
+    prices = 100.0 * (1 + rng.normal(0, 0.01, (200, 3, 2)))
+    grid = PriceGrid(np.arange(200, dtype=float), ["binance", "kucoin", "poloniex"], ["BNB", "XRP"], prices)
+    space = {
+        'min_profit_usd': [0.1, 1.0],
+        'min_profit_percent': [0.0, 0.5],
+        'max_trade_usd': [None, 200.0],
+        'exchanges': [("binance", "kucoin"), ("binance", "kucoin", "poloniex")],
+        'symbols': [("BNB",), ("BNB", "XRP")],
+    }
+    configs = generate_configs(space)
+    assert len(configs) == 32
+    assert len(generate_configs(space, samples=5, seed=1)) == 5
+
+    results = run_sweep(grid, configs, workers=2, capital_usd=5000, transfer_delay=10, latency=0)
+    config, result = rank(results)[0]
+    direct = Backtester(grid.subset(config['exchanges'], config['symbols']), capital_usd=5000,
+                        transfer_delay=10, latency=0, min_profit_usd=config['min_profit_usd'],
+                        min_profit_percent=config['min_profit_percent'],
+                        max_trade_usd=config['max_trade_usd']).run()
+    assert result['pnl_usd'] == direct['pnl_usd'] and result['trades'] == direct['trades'] > 0
+    assert [r['pnl_usd'] for _, r in rank(results)] == sorted((r['pnl_usd'] for _, r in results), reverse=True)
@@ -0,0 +1,64 @@
+"""
+Benchmark jalur panas bot: pengumpulan harga, deteksi peluang, latensi tick->keputusan,
+memori per simbol dan waktu startup.
+
+    python -m benchmarks                       # jalankan semua, bandingkan dengan baseline
+    python -m benchmarks --only detection --quick
+    python -m benchmarks --save-baseline       # perbarui benchmarks/baselines.json
+
+Keluar dengan kode 1 jika ada metrik yang lebih lambat/besar dari baseline melebihi --threshold.
+Baseline bergantung mesin; simpan ulang saat berpindah mesin, dengan mode yang sama seperti
+pengecekannya (--quick --save-baseline untuk gate --quick): metrik diambil dari waktu terbaik
+beberapa ulangan, jadi baseline mode penuh selalu lebih cepat dari hasil --quick.
+"""
+import os
+import sys
+import argparse
+
+# Benchmark tidak boleh menyentuh jaringan atau membuka endpoint metrics
+os.environ.setdefault("USD_TO_IDR_RATE", "16000")
+os.environ.setdefault("METRICS_ENABLED", "False")
+
+from benchmarks.cases import CASES
+from utils.logger import setup_logger
+from benchmarks.runner import BASELINE_FILE, run_cases, load_baseline, save_baseline, compare, format_report, machine_info
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark jalur panas bot arbitrase")
+    parser.add_argument("--only", help=f"daftar case dipisah koma: {', '.join(CASES)}")
+    parser.add_argument("--quick", action="store_true", help="ulangan lebih sedikit, untuk cek cepat")
+    parser.add_argument("--threshold", type=float, default=0.25, help="regresi relatif yang ditoleransi (0.25 = 25%%)")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true", help="simpan hasil sebagai baseline baru")
+    args = parser.parse_args(argv)
+    setup_logger(os.getenv("LOG_FILE", "data/logs/benchmarks.jsonl"))
+
+    names = [n.strip() for n in args.only.split(",")] if args.only else None
+    unknown = set(names or []) - set(CASES)
+    if unknown:
+        parser.error(f"case tidak dikenal: {', '.join(sorted(unknown))}")
+
+    metrics = run_cases(names, quick=args.quick)
+    baseline = load_baseline(args.baseline)
+
+    if args.save_baseline:
+        save_baseline(metrics, args.baseline)
+        print(f"Baseline disimpan ke {args.baseline} ({len(metrics)} metrik)")
+        return 0
+
+    if baseline is None:
+        print(f"Belum ada baseline di {args.baseline}, jalankan dengan --save-baseline")
+        rows = compare(metrics, {}, args.threshold)
+        print(format_report(rows, args.threshold))
+        return 0
+
+    if baseline.get("machine") != machine_info():
+        print(f"⚠️ Baseline diambil di mesin lain: {baseline.get('machine')}")
+    rows = compare(metrics, baseline.get("metrics", {}), args.threshold)
+    print(format_report(rows, args.threshold))
+    return 1 if any(row[4] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,189 @@
+import os
+import sys
+import time
+import random
+import asyncio
+import itertools
+import statistics
+import subprocess
+import tracemalloc
+from core.price_collector import PriceCollector
+from core.price_board import PriceBoard
+from core.order_book import OrderBookStore
+from core.arbitrage_engine import ArbitrageEngine
+from core.event_detector import EventDrivenDetector
+from strategies.cross_exchange import find_arbitrage_opportunities
+from strategies.spread_matrix import find_arbitrage_opportunities_matrix
+from utils.helpers import calculate_net_profit, get_usd_to_idr_rate
+from utils.balance_cache import balance_cache
+from benchmarks.mocks import make_exchanges, make_symbols
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+EXCHANGE_GRID = (3, 6, 12)
+SYMBOL_GRID = (10, 100, 1000)
+
+
+def best_of(func, repeat, number=1):
+    """Waktu per panggilan (detik), minimum dari beberapa ulangan agar noise scheduler tersaring"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return min(timings)
+
+
+def prices_in_usd(market, exchanges):
+    return {ex.name: {symbol: market.usd_price(ex.name, symbol) for symbol in market.symbols} for ex in exchanges}
+
+
+def bench_collect_prices(quick):
+    """PriceCollector.collect_prices end-to-end: 3 exchange x 100 simbol, 1ms per request"""
+    symbols = make_symbols(100)
+    repeat = 2 if quick else 5
+    results = {}
+    for label, mode, bulk in (
+        ("sequential", "sequential", False),
+        ("concurrent", "concurrent", False),
+        ("concurrent_bulk", "concurrent", True),
+    ):
+        _, exchanges = make_exchanges(3, symbols, latency=0.001, bulk=bulk)
+        collector = PriceCollector(exchanges, mode=mode, bulk=bulk, deadline=60)
+        collector.symbols = symbols
+        results[f"collect_prices.{label}_ms"] = best_of(collector.collect_prices, repeat) * 1000
+    return results
+
+
+def _grid():
+    for exchange_count, symbol_count in itertools.product(EXCHANGE_GRID, SYMBOL_GRID):
+        symbols = make_symbols(symbol_count)
+        market, exchanges = make_exchanges(exchange_count, symbols)
+        for ex in exchanges:
+            balance_cache.get(ex)
+        yield f"{exchange_count}x{symbol_count}", symbols, market, exchanges
+
+
+def bench_detection(quick):
+    """find_arbitrage_opportunities (loop dan matrix) per panggilan di grid exchange x simbol"""
+    results = {}
+    for label, symbols, market, exchanges in _grid():
+        prices = prices_in_usd(market, exchanges)
+        repeat = 3 if quick or len(symbols) >= 1000 else 5
+        results[f"detection.loop.{label}_ms"] = best_of(
+            lambda: find_arbitrage_opportunities(prices, exchanges, symbols), repeat) * 1000
+        results[f"detection.matrix.{label}_ms"] = best_of(
+            lambda: find_arbitrage_opportunities_matrix(prices, exchanges, symbols), repeat) * 1000
+    return results
+
+
+def bench_net_profit(quick):
+    """calculate_net_profit untuk semua pasangan berarah: mikrodetik per pasangan (kurs dibaca sekali per siklus)"""
+    results = {}
+    usd_to_idr = get_usd_to_idr_rate()
+    for label, symbols, market, exchanges in _grid():
+        prices = prices_in_usd(market, exchanges)
+        pairs = [
+            (symbol, prices[buy][symbol], prices[sell][symbol], buy, sell)
+            for buy, sell in itertools.permutations(prices, 2)
+            for symbol in symbols
+        ]
+
+        def run():
+            for pair in pairs:
+                calculate_net_profit(*pair, usd_to_idr=usd_to_idr)
+
+        elapsed = best_of(run, 3)
+        results[f"net_profit.{label}_us_per_pair"] = elapsed / len(pairs) * 1e6
+    return results
+
+
+def bench_tick_to_decision(quick):
+    """
+    Latensi tick -> keputusan mode event-driven: tick acak masuk ke PriceBoard,
+    EventDrivenDetector mengevaluasi lewat ArbitrageEngine (termasuk debounce yang dikonfigurasi).
+    """
+    symbols = make_symbols(100)
+    market, exchanges = make_exchanges(3, symbols)
+    for ex in exchanges:
+        balance_cache.get(ex)
+    board = PriceBoard()
+    collector = PriceCollector(exchanges, price_board=board)
+    collector.symbols = symbols
+    engine = ArbitrageEngine(collector, exchanges)
+    ticks = 100 if quick else 400
+
+    async def scenario():
+        async def on_opportunities(opportunities):
+            pass
+
+        detector = EventDrivenDetector(collector, engine, on_opportunities)
+        for ex in exchanges:
+            for symbol in symbols:
+                board.update(ex.name, symbol, market.mid(ex.name, symbol))
+        detector.start()
+        rng = random.Random(7)
+        for _ in range(ticks):
+            ex = rng.choice(exchanges)
+            symbol = rng.choice(symbols)
+            board.update(ex.name, symbol, market.mid(ex.name, symbol) * rng.uniform(0.999, 1.001))
+            await asyncio.sleep(0.005)
+        await asyncio.sleep(detector.debounce + 0.5)
+        await detector.stop()
+        return detector.latency.summary()
+
+    summary = asyncio.run(scenario())
+    return {
+        "tick_to_decision.p50_ms": summary['p50_ms'],
+        "tick_to_decision.p99_ms": summary['p99_ms'],
+    }
+
+
+def bench_memory(quick):
+    """Byte per (exchange, simbol) yang dilacak: PriceBoard dan order book lokal kedalaman 20"""
+    symbols = make_symbols(200 if quick else 1000)
+    market, exchanges = make_exchanges(3, symbols)
+    tracked = len(symbols) * len(exchanges)
+    results = {}
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        board = PriceBoard()
+        for ex in exchanges:
+            for symbol in symbols:
+                board.update(ex.name, symbol, market.mid(ex.name, symbol))
+        results["memory.price_board_bytes_per_symbol"] = (tracemalloc.get_traced_memory()[0] - before) / tracked
+
+        snapshots = [(ex.name, symbol, ex.fetch_order_book(symbol, 20)) for ex in exchanges for symbol in symbols]
+        before = tracemalloc.get_traced_memory()[0]
+        store = OrderBookStore()
+        for name, symbol, book in snapshots:
+            store.apply_snapshot(name, symbol, book['bids'], book['asks'], book['sequence'])
+        results["memory.order_book_bytes_per_symbol"] = (tracemalloc.get_traced_memory()[0] - before) / tracked
+    finally:
+        tracemalloc.stop()
+    return results
+
+
+def bench_startup(quick):
+    """Waktu impor main.py di proses baru (semua modul, logger, settings) tanpa koneksi jaringan"""
+    env = {**os.environ, "USD_TO_IDR_RATE": "16000", "METRICS_ENABLED": "False"}
+    timings = []
+    for _ in range(3 if quick else 5):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "import main"], cwd=ROOT, env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return {"startup.import_main_ms": statistics.median(timings) * 1000}
+
+
+CASES = {
+    "collect": bench_collect_prices,
+    "detection": bench_detection,
+    "net_profit": bench_net_profit,
+    "tick_to_decision": bench_tick_to_decision,
+    "memory": bench_memory,
+    "startup": bench_startup,
+}
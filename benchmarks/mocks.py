@@ -0,0 +1,64 @@
+import time
+from simulator.market import SimulatedMarket
+
+# Nama exchange untuk grid 3/6/12; indodax ber-quote IDR seperti adapter sungguhan
+EXCHANGE_NAMES = [
+    "binance", "indodax", "kucoin", "poloniex", "bybit", "okx",
+    "gate", "mexc", "bitget", "htx", "kraken", "bitstamp",
+]
+KNOWN_SYMBOLS = ["BTC", "XRP", "SHIB", "BNB", "ETH", "SOL", "DOGE"]
+
+
+def make_symbols(count):
+    symbols = KNOWN_SYMBOLS[:count]
+    symbols.extend(f"SYM{i:04d}" for i in range(len(symbols), count))
+    return symbols
+
+
+class MockExchange:
+    """
+    Adapter tiruan in-process dengan harga dari SimulatedMarket, tanpa HTTP.
+    latency: detik per request untuk meniru round-trip jaringan.
+    """
+
+    def __init__(self, market, latency=0.0):
+        self.name = self.__class__.__name__.lower()
+        self.market = market
+        self.latency = latency
+
+    def get_base_currency(self):
+        return "IDR" if self.name == "indodax" else "USDT"
+
+    def _symbol(self, raw):
+        return raw.upper().replace("-USDT", "").removesuffix("USDT")
+
+    def fetch_ticker(self, symbol):
+        if self.latency:
+            time.sleep(self.latency)
+        return self.market.mid(self.name, self._symbol(symbol))
+
+    def fetch_balance(self):
+        balances = {symbol: {'free': 1e12} for symbol in self.market.symbols}
+        balances[self.get_base_currency()] = {'free': 1e15}
+        return balances
+
+    def fetch_order_book(self, symbol, depth=20):
+        sequence, bids, asks = self.market.book(self.name, self._symbol(symbol)).snapshot(depth)
+        return {'bids': bids, 'asks': asks, 'sequence': sequence}
+
+
+class MockBulkExchange(MockExchange):
+    """Adapter tiruan dengan fetch_tickers: satu request untuk semua simbol"""
+
+    def fetch_tickers(self, symbols):
+        if self.latency:
+            time.sleep(self.latency)
+        return {symbol: self.market.mid(self.name, self._symbol(symbol)) for symbol in symbols}
+
+
+def make_exchanges(exchange_count, symbols, latency=0.0, bulk=False, seed=42):
+    """Buat exchange tiruan dengan nama kelas berbeda (dipakai sebagai nama exchange oleh bot)"""
+    names = EXCHANGE_NAMES[:exchange_count]
+    market = SimulatedMarket(symbols, names, seed=seed)
+    base = MockBulkExchange if bulk else MockExchange
+    return market, [type(name.capitalize(), (base,), {})(market, latency) for name in names]
@@ -0,0 +1,82 @@
+import sys
+import json
+import logging
+import platform
+from benchmarks.cases import CASES
+
+BASELINE_FILE = "benchmarks/baselines.json"
+
+
+def run_cases(names=None, quick=False):
+    """Jalankan benchmark terpilih, kembalikan {metrik: nilai}. Semua metrik: makin kecil makin baik."""
+    # Log per peluang ikut diukur jika aktif; benchmark mengukur komputasinya saja
+    levels = {name: logging.getLogger(name).level for name in ("", "bitbot")}
+    for name in levels:
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    metrics = {}
+    try:
+        for name, case in CASES.items():
+            if names and name not in names:
+                continue
+            print(f"⏱️ Benchmark {name}...", file=sys.stderr, flush=True)
+            metrics.update(case(quick))
+    finally:
+        for name, level in levels.items():
+            logging.getLogger(name).setLevel(level)
+    return metrics
+
+
+def machine_info():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+    }
+
+
+def load_baseline(path=BASELINE_FILE):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_baseline(metrics, path=BASELINE_FILE, merge=True):
+    """Simpan metrik sebagai baseline; metrik lama yang tidak diukur ulang tetap disimpan"""
+    baseline = (load_baseline(path) if merge else None) or {"metrics": {}}
+    baseline["machine"] = machine_info()
+    baseline["metrics"].update({name: round(value, 6) for name, value in metrics.items()})
+    baseline["metrics"] = dict(sorted(baseline["metrics"].items()))
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2)
+        f.write("\n")
+
+
+def compare(metrics, baseline_metrics, threshold):
+    """
+    Bandingkan dengan baseline. Returns:
+        list: [(metrik, baseline, sekarang, perubahan relatif, regresi?)] urut sesuai nama
+    """
+    rows = []
+    for name, value in sorted(metrics.items()):
+        base = baseline_metrics.get(name)
+        if base is None or base <= 0:
+            rows.append((name, base, value, None, False))
+            continue
+        change = (value - base) / base
+        rows.append((name, base, value, change, change > threshold))
+    return rows
+
+
+def format_report(rows, threshold):
+    lines = [f"{'metrik':<45} {'baseline':>12} {'sekarang':>12} {'perubahan':>10}"]
+    for name, base, value, change, regressed in rows:
+        base_text = f"{base:.3f}" if base is not None else "-"
+        change_text = f"{change * 100:+.1f}%" if change is not None else "baru"
+        flag = "  ❌ REGRESI" if regressed else ""
+        lines.append(f"{name:<45} {base_text:>12} {value:>12.3f} {change_text:>10}{flag}")
+    regressions = sum(1 for row in rows if row[4])
+    lines.append(f"{regressions} regresi di atas ambang {threshold * 100:.0f}%")
+    return "\n".join(lines)
@@ -0,0 +1,15 @@
+from benchmarks.runner import compare
+from benchmarks.cases import bench_collect_prices
+
+
+def test_compare_flags_only_regressions_past_threshold():
+    rows = compare({"a_ms": 12.0, "b_ms": 13.0, "c_ms": 5.0, "new_ms": 1.0},
+                   {"a_ms": 10.0, "b_ms": 10.0, "c_ms": 10.0}, threshold=0.25)
+    flagged = {name: regressed for name, _, _, _, regressed in rows}
+    assert flagged == {"a_ms": False, "b_ms": True, "c_ms": False, "new_ms": False}
+
+
+def test_collect_case_runs_against_mocks(monkeypatch):
+    monkeypatch.setenv("USD_TO_IDR_RATE", "16000")
+    metrics = bench_collect_prices(quick=True)
+    assert metrics["collect_prices.concurrent_bulk_ms"] < metrics["collect_prices.sequential_ms"]
@@ -19,6 +19,9 @@ TRANSFER_FEE = {
     'BNB': float(os.getenv("TRANSFER_FEE_BNB", "0.001"))
 }
 
+# Biaya trading per sisi (0.1%)
+TRADING_FEE = float(os.getenv("TRADING_FEE", "0.001"))
+
 # Biaya Transfer Fiat
 TRANSFER_FEE_IDR_TO_USDT = float(os.getenv("TRANSFER_FEE_IDR_TO_USDT", "10000"))
 
@@ -32,4 +35,120 @@ MIN_TRADE_AMOUNTS = {
 }
 
 SUPPORTED_SYMBOLS = os.getenv('SUPPORTED_SYMBOLS', 'BTC,XRP,SHIB,BNB').split(',')
-ACTIVE_EXCHANGES = os.getenv('ACTIVE_EXCHANGES', 'Binance,Indodax,KuCoin').split(',')
\ No newline at end of file
+ACTIVE_EXCHANGES = os.getenv('ACTIVE_EXCHANGES', 'Binance,Indodax,KuCoin').split(',')
+
+# Pengumpulan harga
+PRICE_COLLECTION_MODE = os.getenv("PRICE_COLLECTION_MODE", "concurrent")  # concurrent | sequential
+PRICE_COLLECTOR_MAX_WORKERS = int(os.getenv("PRICE_COLLECTOR_MAX_WORKERS", "8"))
+PRICE_COLLECTOR_DEADLINE = float(os.getenv("PRICE_COLLECTOR_DEADLINE", "5"))  # detik per siklus
+PRICE_COLLECTION_BULK = os.getenv("PRICE_COLLECTION_BULK", "True") == "True"  # satu request per exchange via fetch_tickers
+
+# Sumber harga: rest (polling) atau stream (WebSocket + fallback REST)
+PRICE_SOURCE = os.getenv("PRICE_SOURCE", "rest")
+PRICE_BOARD_MAX_AGE = float(os.getenv("PRICE_BOARD_MAX_AGE", "30"))  # detik sebelum harga stream dianggap basi
+STREAM_RECONNECT_DELAY = float(os.getenv("STREAM_RECONNECT_DELAY", "1"))
+STREAM_MAX_RECONNECT_DELAY = float(os.getenv("STREAM_MAX_RECONNECT_DELAY", "60"))
+STREAM_STALE_TIMEOUT = float(os.getenv("STREAM_STALE_TIMEOUT", "60"))
+
+# Cache saldo: satu snapshot per exchange per siklus
+BALANCE_CACHE_TTL = float(os.getenv("BALANCE_CACHE_TTL", "30"))  # detik
+
+# Kurs USD/IDR
+FX_RATE_SOURCE = os.getenv("FX_RATE_SOURCE", "indodax")  # indodax (USDT/IDR implisit) | ecb
+FX_REFRESH_INTERVAL = float(os.getenv("FX_REFRESH_INTERVAL", "60"))  # detik
+FX_MAX_JUMP_PERCENT = float(os.getenv("FX_MAX_JUMP_PERCENT", "5"))
+FX_MAX_AGE = float(os.getenv("FX_MAX_AGE", "3600"))  # detik; kurs lebih tua di-refresh langsung jika service tidak berjalan
+FX_CACHE_FILE = os.getenv("FX_CACHE_FILE", "data/last_rate.json")  # kurs terakhir untuk warm start
+
+# Deteksi peluang: polling (siklus tetap) atau event (dipicu tick harga)
+DETECTION_MODE = os.getenv("DETECTION_MODE", "polling")
+POLL_INTERVAL = float(os.getenv("POLL_INTERVAL", "60"))  # detik antar siklus
+EVENT_DEBOUNCE_MS = float(os.getenv("EVENT_DEBOUNCE_MS", "50"))
+EVENT_LATENCY_BUDGET_MS = float(os.getenv("EVENT_LATENCY_BUDGET_MS", "250"))
+
+# Mesin deteksi: scan (min/max per simbol) atau matrix (semua pasangan, vektorisasi NumPy)
+DETECTION_ENGINE = os.getenv("DETECTION_ENGINE", "scan")
+DETECTION_TOP_K = int(os.getenv("DETECTION_TOP_K", "5"))  # alternatif per simbol jika pasangan terbaik tidak executable
+
+# Arbitrase siklus multi-leg (graf log-harga), saat ini hanya dideteksi dan dicatat
+GRAPH_ARBITRAGE = os.getenv("GRAPH_ARBITRAGE", "False") == "True"
+GRAPH_MAX_LEGS = int(os.getenv("GRAPH_MAX_LEGS", "4"))
+GRAPH_MIN_PROFIT_PERCENT = float(os.getenv("GRAPH_MIN_PROFIT_PERCENT", "0.1"))
+GRAPH_REFERENCE_USD = float(os.getenv("GRAPH_REFERENCE_USD", "1000"))  # ukuran acuan untuk biaya transfer tetap
+GRAPH_CROSS_PAIRS = [p for p in os.getenv("GRAPH_CROSS_PAIRS", "").split(",") if p]  # mis. binance:XRP/BTC
+
+# Auto scanner seluruh universe (python -m strategies.auto_scanner)
+SCANNER_MIN_VOLUME_USD = float(os.getenv("SCANNER_MIN_VOLUME_USD", "100000"))  # volume 24 jam minimum per pair
+SCANNER_TOP_K = int(os.getenv("SCANNER_TOP_K", "20"))
+SCANNER_INTERVAL = float(os.getenv("SCANNER_INTERVAL", "5"))  # detik antar scan
+
+# Eksekusi peluang
+EXECUTION_MODE = os.getenv("EXECUTION_MODE", "transfer")  # transfer (alur lama) | concurrent (order IOC sungguhan di dua leg sekaligus, opt-in)
+EXECUTION_SLIPPAGE = float(os.getenv("EXECUTION_SLIPPAGE", "0.001"))  # toleransi harga limit IOC terhadap harga keputusan
+CAPITAL_ALLOCATION = os.getenv("CAPITAL_ALLOCATION", "True") == "True"  # bagi saldo antar peluang sebelum eksekusi
+
+# Sizing berbasis kedalaman order book
+DEPTH_SIZING = os.getenv("DEPTH_SIZING", "False") == "True"
+ORDER_BOOK_DEPTH = int(os.getenv("ORDER_BOOK_DEPTH", "20"))
+ORDER_BOOK_SOURCE = os.getenv("ORDER_BOOK_SOURCE", "rest")  # rest (snapshot per peluang) | stream (order book lokal)
+ORDER_BOOK_SNAPSHOT_DEPTH = int(os.getenv("ORDER_BOOK_SNAPSHOT_DEPTH", "100"))
+ORDER_BOOK_MAX_AGE = float(os.getenv("ORDER_BOOK_MAX_AGE", "30"))  # detik tanpa update sebelum order book lokal diabaikan
+
+# Pool koneksi HTTP adapter exchange
+HTTP_POOL_MAX_CONNECTIONS = int(os.getenv("HTTP_POOL_MAX_CONNECTIONS", "20"))  # per host
+HTTP_POOL_MAX_KEEPALIVE = int(os.getenv("HTTP_POOL_MAX_KEEPALIVE", "10"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))  # detik
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "True") == "True"
+HTTP_WARMUP_INTERVAL = float(os.getenv("HTTP_WARMUP_INTERVAL", "15"))  # detik antar request penjaga koneksi, 0 = mati
+
+# Metadata market (daftar instrumen, tick/lot/min notional) per exchange
+MARKET_CACHE_DIR = os.getenv("MARKET_CACHE_DIR", "data/markets")
+MARKET_CACHE_TTL = float(os.getenv("MARKET_CACHE_TTL", "86400"))  # detik sebelum daftar market diambil ulang
+
+# Rate limit per exchange
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "True") == "True"
+RATE_LIMIT_RESERVE = float(os.getenv("RATE_LIMIT_RESERVE", "0.2"))  # fraksi bobot yang dicadangkan untuk order/withdrawal
+RATE_LIMIT_SAFETY = float(os.getenv("RATE_LIMIT_SAFETY", "0.9"))  # pakai 90% dari batas resmi exchange
+
+# Kalibrasi jam terhadap server exchange untuk request bertanda tangan
+CLOCK_SYNC_INTERVAL = float(os.getenv("CLOCK_SYNC_INTERVAL", "300"))  # detik
+CLOCK_SYNC_SAMPLES = int(os.getenv("CLOCK_SYNC_SAMPLES", "5"))
+CLOCK_MAX_OFFSET_MS = float(os.getenv("CLOCK_MAX_OFFSET_MS", "1000"))
+BINANCE_RECV_WINDOW = int(os.getenv("BINANCE_RECV_WINDOW", "5000"))
+
+# Logging
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FILE = os.getenv("LOG_FILE", "data/logs/bot.jsonl")
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(20 * 1024 * 1024)))
+LOG_ROTATE_SECONDS = float(os.getenv("LOG_ROTATE_SECONDS", "86400"))  # rotasi harian walau ukuran belum penuh
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "14"))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))  # record di bawah WARNING dibuang jika antrian penuh
+LOG_DEDUP_WINDOW = float(os.getenv("LOG_DEDUP_WINDOW", "60"))  # detik
+LOG_DEDUP_BURST = int(os.getenv("LOG_DEDUP_BURST", "3"))  # warning/error identik yang lolos per jendela
+
+# Metrics (format Prometheus)
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "True") == "True"
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))
+
+# Rekaman tick harga ke disk (segment kolom per jam, dibaca backtest)
+TICK_RECORDER_ENABLED = os.getenv("TICK_RECORDER_ENABLED", "False") == "True"
+TICK_DIR = os.getenv("TICK_DIR", "data/ticks")
+TICK_FLUSH_INTERVAL = float(os.getenv("TICK_FLUSH_INTERVAL", "1.0"))  # detik antar tulis batch
+TICK_BUFFER_SIZE = int(os.getenv("TICK_BUFFER_SIZE", "100000"))  # tick tertua dibuang jika antrian penuh
+
+# Backtest (python -m backtest)
+BACKTEST_STEP = float(os.getenv("BACKTEST_STEP", "1.0"))  # resolusi grid waktu, detik
+BACKTEST_WINDOW = int(os.getenv("BACKTEST_WINDOW", "512"))  # langkah waktu per batch vektorisasi
+BACKTEST_CAPITAL_USD = float(os.getenv("BACKTEST_CAPITAL_USD", "1000"))  # modal awal per exchange
+BACKTEST_TRANSFER_DELAY = float(os.getenv("BACKTEST_TRANSFER_DELAY", "900"))  # detik sampai koin rebalancing tiba
+BACKTEST_LATENCY = float(os.getenv("BACKTEST_LATENCY", "1.0"))  # detik antara keputusan dan fill
+
+# Endpoint exchange (bisa diarahkan ke simulator lokal, lihat python -m simulator)
+BINANCE_REST_URL = os.getenv("BINANCE_REST_URL", "https://api.binance.com")
+BINANCE_WS_URL = os.getenv("BINANCE_WS_URL", "wss://stream.binance.com:9443/stream")
+KUCOIN_REST_URL = os.getenv("KUCOIN_REST_URL", "https://api.kucoin.com")
+INDODAX_REST_URL = os.getenv("INDODAX_REST_URL", "https://indodax.com")
+INDODAX_WS_URL = os.getenv("INDODAX_WS_URL", "wss://ws3.indodax.com/ws/")
+POLONIEX_REST_URL = os.getenv("POLONIEX_REST_URL", "https://api.poloniex.com")
+POLONIEX_WS_URL = os.getenv("POLONIEX_WS_URL", "wss://ws.poloniex.com/ws/public")
@@ -1,20 +1,55 @@
+import time
+import logging
 from strategies.cross_exchange import find_arbitrage_opportunities
+from strategies.spread_matrix import find_arbitrage_opportunities_matrix
+from strategies.depth_sizing import apply_depth_sizing
+from config.settings import DETECTION_ENGINE, DETECTION_TOP_K, DEPTH_SIZING, ORDER_BOOK_DEPTH
 from utils.logger import logger
+from utils.metrics import DETECTION_SECONDS, OPPORTUNITIES
 from utils.helpers import calculate_net_profit, get_usd_to_idr_rate
 
 class ArbitrageEngine:
-    def __init__(self, price_collector, exchanges):
+    def __init__(self, price_collector, exchanges, order_books=None, graph_strategy=None):
         self.price_collector = price_collector
         self.exchanges = exchanges
+        self.order_books = order_books
+        self.graph_strategy = graph_strategy
 
     def run(self):
         try:
             prices = self.price_collector.collect_prices()
-            opportunities = find_arbitrage_opportunities(prices, self.exchanges)
+            if self.graph_strategy is not None:
+                self.graph_strategy.refresh_cross_pairs(self.exchanges)
+            return self.evaluate(prices, self.price_collector.symbols)
+        except Exception as e:
+            logger.error(f"🚨 Error di ArbitrageEngine: {e}")
+            return []
 
-            # Tambahkan logging selisih dan profit
+    def evaluate(self, prices, symbols=None):
+        """
+        Cari peluang dari harga yang sudah ada (dipakai mode polling dan event-driven).
+        symbols default PriceCollector.symbols, yang ikut berubah saat SUPPORTED_SYMBOLS di .env diubah.
+        """
+        start = time.perf_counter()
+        if symbols is None:
+            symbols = self.price_collector.symbols
+        try:
+            # Kurs dibaca sekali per siklus deteksi dan dipakai semua pasangan
             usd_to_idr = get_usd_to_idr_rate()
-            for opp in opportunities:
+            if DETECTION_ENGINE == "matrix":
+                opportunities = find_arbitrage_opportunities_matrix(prices, self.exchanges, symbols, DETECTION_TOP_K,
+                                                                    usd_to_idr)
+            else:
+                opportunities = find_arbitrage_opportunities(prices, self.exchanges, symbols, usd_to_idr)
+
+            # Batasi ukuran trade sesuai kedalaman order book (hanya untuk peluang yang profit di harga last)
+            if DEPTH_SIZING:
+                for opp in opportunities:
+                    if opp['net_profit'] > 0:
+                        apply_depth_sizing(opp, self.exchanges, usd_to_idr, ORDER_BOOK_DEPTH, self.order_books)
+
+            # Tambahkan logging selisih dan profit (dilewati seluruhnya jika INFO tidak aktif)
+            for opp in opportunities if logger.isEnabledFor(logging.INFO) else ():
                 symbol = opp['symbol']
                 buy_ex = opp['buy_exchange']
                 sell_ex = opp['sell_exchange']
@@ -22,15 +57,23 @@ class ArbitrageEngine:
                 sell_price = opp['sell_price']
                 
                 spread = sell_price - buy_price
-                net = calculate_net_profit(symbol, buy_price, sell_price, buy_ex, sell_ex)['net_profit']
+                net = calculate_net_profit(symbol, buy_price, sell_price, buy_ex, sell_ex, usd_to_idr)['net_profit']
                 
                 feetotal = spread - net + spread  # perkiraan total fee (perkiraan sederhana)
                 profit_label = "Layak" if net > 0 else "Tidak Layak"
 
-                logger.info(f"{symbol} | {buy_ex.upper()} ${buy_price:.2f} | "
-                            f"{sell_ex.upper()} ${sell_price:.2f} | FeeTotal±: ${abs(feetotal):.2f} | "
-                            f"Profit±: ${net:.2f} | {profit_label}")
+                logger.info("%s | %s $%.2f | %s $%.2f | FeeTotal±: $%.2f | Profit±: $%.2f | %s", symbol,
+                            buy_ex.upper(), buy_price, sell_ex.upper(), sell_price, abs(feetotal), net, profit_label)
+
+            DETECTION_SECONDS.labels(DETECTION_ENGINE).observe(time.perf_counter() - start)
 
+            # Siklus multi-leg hanya dicatat; eksekusi saat ini masih dua leg
+            if self.graph_strategy is not None:
+                graph_start = time.perf_counter()
+                self.graph_strategy.find_opportunities(prices)
+                DETECTION_SECONDS.labels("graph").observe(time.perf_counter() - graph_start)
+            OPPORTUNITIES.labels("found").inc(len(opportunities))
+            OPPORTUNITIES.labels("profitable").inc(sum(1 for opp in opportunities if opp['net_profit'] > 0))
             return opportunities
         except Exception as e:
             logger.error(f"🚨 Error di ArbitrageEngine: {e}")
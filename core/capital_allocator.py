@@ -0,0 +1,96 @@
+import time
+import asyncio
+from utils.logger import logger
+from utils.balance_cache import balance_cache
+from utils.helpers import get_usd_to_idr_rate, transfer_fee_usd
+from config.settings import TRADING_FEE, TRANSFER_FEE, TRANSFER_FEE_IDR_TO_USDT
+
+
+class CapitalAllocator:
+    """
+    Membagi saldo antar semua peluang dalam satu keputusan, bukan per peluang terhadap saldo penuh.
+    Sumber daya: mata uang dasar di exchange beli dan koin di exchange jual, masing-masing
+    dipakai bersama oleh peluang yang menyentuhnya.
+
+    Relaksasi LP-nya adalah fractional knapsack: peluang diurutkan menurut margin bersih per
+    dolar modal beli, lalu masing-masing diberi jumlah terbesar yang masih muat di sisa saldo
+    (dan batas depth/saldo dari required_amount). Biaya transfer (koin dan fiat untuk Indodax)
+    dibayar sekali per peluang, sehingga peluang yang jatahnya tidak menutup biaya itu atau di
+    bawah jumlah minimum dilewati dan saldonya tetap tersedia untuk peluang berikutnya.
+    """
+
+    def __init__(self, exchanges, trading_fee=TRADING_FEE, transfer_fee=TRANSFER_FEE,
+                 fiat_transfer_fee=TRANSFER_FEE_IDR_TO_USDT):
+        self.exchanges = {ex.__class__.__name__.lower(): ex for ex in exchanges}
+        self.trading_fee = trading_fee
+        self.transfer_fee = transfer_fee
+        self.fiat_transfer_fee = fiat_transfer_fee
+
+    async def snapshot_async(self, opportunities):
+        """{exchange: saldo} untuk exchange yang disentuh peluang, dari balance cache siklus ini"""
+        names = sorted({name for opp in opportunities for name in (opp['buy_exchange'], opp['sell_exchange'])})
+        balances = await asyncio.gather(*(balance_cache.get_async(self.exchanges[name]) for name in names))
+        return dict(zip(names, balances))
+
+    async def allocate_async(self, opportunities):
+        balances = await self.snapshot_async(opportunities)
+        return self.allocate(opportunities, balances, get_usd_to_idr_rate())
+
+    def allocate(self, opportunities, balances, usd_to_idr):
+        """
+        Isi 'required_amount', 'executable' dan 'expected_profit' setiap peluang sesuai jatahnya.
+        Harga peluang dalam USD, saldo dalam mata uang venue ({exchange: {aset: {'free': x}}}).
+        Kembalikan peluang yang mendapat modal, urut menurut prioritas alokasi.
+        """
+        start = time.perf_counter()
+        fee = self.trading_fee
+        remaining = {}
+        ranked = []
+        for opp in opportunities:
+            buy_cost = opp['buy_price'] * (1 + fee)
+            margin = opp['sell_price'] * (1 - fee) - buy_cost
+            opp['executable'] = False
+            opp['expected_profit'] = 0.0
+            if margin > 0 and buy_cost > 0:
+                ranked.append((margin / buy_cost, margin, buy_cost, opp))
+
+        allocated = []
+        total_profit = 0.0
+        for _, margin, buy_cost, opp in sorted(ranked, key=lambda item: item[0], reverse=True):
+            symbol = opp['symbol']
+            buy_name, sell_name = opp['buy_exchange'], opp['sell_exchange']
+            quote_key = (buy_name, self._base_currency(buy_name))
+            coin_key = (sell_name, symbol)
+            for key in (quote_key, coin_key):
+                if key not in remaining:
+                    remaining[key] = self._free(balances, key, usd_to_idr)
+
+            amount = min(opp.get('required_amount', float('inf')), remaining[quote_key] / buy_cost, remaining[coin_key])
+            profit = amount * margin - self._fixed_cost(opp, usd_to_idr)
+            if amount <= 0 or amount < opp.get('min_balance_required', 0) or profit <= 0:
+                continue
+
+            remaining[quote_key] -= amount * buy_cost
+            remaining[coin_key] -= amount
+            opp.update(required_amount=amount, executable=True, expected_profit=profit)
+            allocated.append(opp)
+            total_profit += profit
+
+        logger.info("💰 Alokasi modal: %d/%d peluang, perkiraan profit $%.2f (%.0fµs)", len(allocated),
+                    len(opportunities), total_profit, (time.perf_counter() - start) * 1e6)
+        return allocated
+
+    def _base_currency(self, name):
+        exchange = self.exchanges.get(name)
+        return exchange.get_base_currency() if exchange is not None else "USDT"
+
+    def _free(self, balances, key, usd_to_idr):
+        """Saldo bebas; mata uang dasar dikonversi ke USD, koin tetap dalam unit koin"""
+        name, asset = key
+        free = float(balances.get(name, {}).get(asset, {}).get('free', 0) or 0)
+        return free / usd_to_idr if asset == "IDR" else free
+
+    def _fixed_cost(self, opp, usd_to_idr):
+        """Biaya transfer untuk mengembalikan posisi setelah trade, dalam USD"""
+        return transfer_fee_usd(opp['symbol'], opp['buy_price'], opp['buy_exchange'], opp['sell_exchange'],
+                                usd_to_idr, self.transfer_fee, self.fiat_transfer_fee)
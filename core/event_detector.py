@@ -0,0 +1,134 @@
+import time
+import asyncio
+from collections import deque
+from utils.logger import logger
+from utils.metrics import TICK_TO_DECISION_SECONDS
+from config.settings import EVENT_DEBOUNCE_MS, EVENT_LATENCY_BUDGET_MS
+
+
+class LatencyStats:
+    """Statistik latensi tick → keputusan (ms) untuk N sampel terakhir"""
+
+    def __init__(self, budget_ms=EVENT_LATENCY_BUDGET_MS, size=1000):
+        self.budget_ms = budget_ms
+        self.samples = deque(maxlen=size)
+        self.count = 0
+        self.over_budget = 0
+
+    def record(self, latency_ms):
+        TICK_TO_DECISION_SECONDS.observe(latency_ms / 1000)
+        self.samples.append(latency_ms)
+        self.count += 1
+        if latency_ms > self.budget_ms:
+            self.over_budget += 1
+
+    def percentile(self, percent):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(len(ordered) * percent / 100))
+        return ordered[index]
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'last_ms': self.samples[-1] if self.samples else 0.0,
+            'p50_ms': self.percentile(50),
+            'p99_ms': self.percentile(99),
+            'over_budget': self.over_budget,
+            'budget_ms': self.budget_ms,
+        }
+
+
+class EventDrivenDetector:
+    """
+    Evaluasi ulang simbol yang harganya berubah, dipicu oleh tick di PriceBoard.
+    Tick dalam jendela debounce digabung sehingga satu simbol hanya dievaluasi sekali per batch.
+    Eksekusi peluang berjalan sebagai task terpisah agar tick berikutnya tetap dievaluasi
+    selama order masih berjalan; TransferManager yang menyerialkan saldo yang sama.
+    """
+
+    def __init__(self, price_collector, arbitrage_engine, on_opportunities, debounce_ms=EVENT_DEBOUNCE_MS):
+        self.price_collector = price_collector
+        self.arbitrage_engine = arbitrage_engine
+        self.on_opportunities = on_opportunities
+        self.debounce = debounce_ms / 1000
+        self.latency = LatencyStats()
+        self._dirty = {}
+        self._wakeup = None
+        self._loop = None
+        self._task = None
+        self._executions = set()
+
+    def start(self):
+        """
+        Mulai evaluasi per tick. Tanpa PriceBoard (PRICE_SOURCE=rest) tidak ada tick yang bisa
+        didengar: kembalikan None agar pemanggil memakai deteksi polling.
+        """
+        if self.price_collector.price_board is None:
+            logger.warning("⚠️ DETECTION_MODE=event membutuhkan PRICE_SOURCE=stream, kembali ke deteksi polling")
+            return None
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self.price_collector.price_board.add_listener(self._on_tick)
+        self._task = asyncio.create_task(self._run(), name="event-detector")
+        logger.info(f"⚡ Deteksi event-driven aktif (debounce {self.debounce * 1000:.0f}ms)")
+        return self._task
+
+    async def stop(self):
+        """Hentikan deteksi; eksekusi yang sedang berjalan ditunggu sampai selesai, bukan dibatalkan"""
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        await asyncio.gather(*self._executions, return_exceptions=True)
+
+    def _on_tick(self, exchange_name, symbol, price, received_at, bid=None, ask=None, size=None):
+        # Listener bisa dipanggil dari thread collector, jadwalkan ke event loop
+        self._loop.call_soon_threadsafe(self._mark_dirty, symbol, received_at)
+
+    def _mark_dirty(self, symbol, received_at):
+        # Simpan tick paling awal agar latensi diukur dari tick pertama yang belum diproses
+        if symbol not in self._dirty:
+            self._dirty[symbol] = received_at
+        self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            await self._wakeup.wait()
+            await asyncio.sleep(self.debounce)
+            batch, self._dirty = self._dirty, {}
+            self._wakeup.clear()
+
+            symbols = [s for s in batch if s in self.price_collector.symbols]
+            if not symbols:
+                continue
+
+            try:
+                opportunities = await asyncio.to_thread(self._evaluate, symbols)
+            except Exception as e:
+                logger.error(f"🚨 Error deteksi event-driven: {e}")
+                continue
+
+            decided_at = time.time()
+            for symbol in symbols:
+                latency_ms = (decided_at - batch[symbol]) * 1000
+                self.latency.record(latency_ms)
+                if latency_ms > self.latency.budget_ms:
+                    logger.warning("⏱️ Latensi tick→keputusan %s: %.0fms > budget %.0fms", symbol, latency_ms,
+                                   self.latency.budget_ms)
+
+            if opportunities:
+                for opportunity in opportunities:
+                    opportunity['decided_at'] = decided_at
+                execution = asyncio.create_task(self.on_opportunities(opportunities), name="event-execution")
+                self._executions.add(execution)
+                execution.add_done_callback(self._execution_done)
+
+    def _execution_done(self, task):
+        self._executions.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"🚨 Error eksekusi peluang event-driven: {task.exception()}")
+
+    def _evaluate(self, symbols):
+        prices = self.price_collector.board_prices(symbols)
+        return self.arbitrage_engine.evaluate(prices, symbols)
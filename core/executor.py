@@ -1,7 +1,9 @@
 # core/executor.py
 from utils.helpers import calculate_net_profit
 from config.settings import MIN_PROFIT_THRESHOLD_USD
-from utils.logger import logger
+import logging
+from utils.logger import logger, log_event
+from utils.balance_cache import balance_cache
 
 class RealTradeExecutor:
     def __init__(self, *exchanges):
@@ -35,8 +37,8 @@ class RealTradeExecutor:
 
         # Dapatkan saldo aktual
         try:
-            buy_balance_data = buy_exchange.fetch_balance()
-            sell_balance_data = sell_exchange.fetch_balance()
+            buy_balance_data = balance_cache.get(buy_exchange)
+            sell_balance_data = balance_cache.get(sell_exchange)
         except Exception as e:
             logger.error(f"🚨 Gagal fetch balance: {e}")
             return False
@@ -66,16 +68,16 @@ class RealTradeExecutor:
             usd_to_idr=usd_to_idr
         )
 
-        # Tampilkan log detail
-        logger.info(f"""
-        ┌────────────────────────────────────────────────────┐
-        │ 📊 Rincian Peluang Arbitrase: {symbol}          │
-        ├────────────────────────────────────────────────────┤
-        │ Volume Minimum: {required_amount:.6f} {symbol}     │
-        │ Saldo Penjual: {sell_balance:.6f} {symbol}        │
-        │ Saldo Pembeli: {buy_fiat_balance:.6f} {buy_exchange.get_base_currency()} (≈${buy_fiat_balance_usd:.6f} USD) │
-        └────────────────────────────────────────────────────┘
-        """)
+        log_event(
+            logger, logging.INFO, "execution_check",
+            f"📊 {symbol} | volume min {required_amount:.6f} | saldo jual {sell_balance:.6f} {symbol} | "
+            f"saldo beli {buy_fiat_balance:.2f} {buy_exchange.get_base_currency()} (≈${buy_fiat_balance_usd:.2f})",
+            symbol=symbol,
+            required_amount=required_amount,
+            sell_balance=sell_balance,
+            buy_fiat_balance=buy_fiat_balance,
+            buy_fiat_balance_usd=buy_fiat_balance_usd,
+        )
 
         # Cek apakah layak secara volume dan profit
         if trade_amount < min_amount:
@@ -102,6 +104,8 @@ class RealTradeExecutor:
                 network=wallet_info.get('network')
             )
             if success:
+                balance_cache.invalidate(buy_exchange)
+                balance_cache.invalidate(sell_exchange)
                 logger.info(f"✅ Transfer {symbol} berhasil")
                 return True
             else:
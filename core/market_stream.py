@@ -0,0 +1,487 @@
+import os
+import json
+import uuid
+import asyncio
+import websockets
+from utils.logger import logger
+from exchanges.http_client import http_pool
+from config.settings import (
+    STREAM_RECONNECT_DELAY,
+    STREAM_MAX_RECONNECT_DELAY,
+    STREAM_STALE_TIMEOUT,
+    ORDER_BOOK_SNAPSHOT_DEPTH,
+    BINANCE_WS_URL,
+    KUCOIN_REST_URL,
+    INDODAX_WS_URL,
+    POLONIEX_WS_URL
+)
+
+
+def _optional_float(value):
+    return float(value) if value not in (None, "") else None
+
+
+class StreamManager:
+    """
+    Satu koneksi WebSocket per exchange yang mengisi PriceBoard.
+    Subclass cukup mengisi URL, format pesan subscribe/unsubscribe, heartbeat dan parser pesan.
+    """
+    name = None
+    heartbeat_interval = None
+
+    def __init__(self, board, symbols):
+        self.board = board
+        self.symbols = {s.strip().upper() for s in symbols if s.strip()}
+        self.subscribed = set()
+        self._ws = None
+        self._running = False
+        self._request_id = 0
+
+    async def run(self):
+        """Loop utama: connect, subscribe ulang, baca pesan, reconnect dengan backoff"""
+        self._running = True
+        attempt = 0
+        while self._running:
+            try:
+                self._ws = await self._connect()
+                self.subscribed = set()
+                logger.info(f"🟢 WebSocket {self.name} terhubung")
+                await self._subscribe(self.symbols)
+
+                heartbeat = asyncio.create_task(self._heartbeat()) if self.heartbeat_interval else None
+                try:
+                    while self._running:
+                        message = await asyncio.wait_for(self._ws.recv(), timeout=STREAM_STALE_TIMEOUT)
+                        self._handle_message(json.loads(message))
+                        attempt = 0
+                finally:
+                    if heartbeat:
+                        heartbeat.cancel()
+                        await asyncio.gather(heartbeat, return_exceptions=True)
+            except asyncio.CancelledError:
+                raise
+            except asyncio.TimeoutError:
+                logger.warning(f"⏳ WebSocket {self.name} tidak menerima data selama {STREAM_STALE_TIMEOUT}s, reconnect...")
+            except Exception as e:
+                logger.error(f"🔴 WebSocket {self.name} terputus: {e}")
+            finally:
+                await self._close()
+
+            if self._running:
+                delay = min(STREAM_RECONNECT_DELAY * (2 ** attempt), STREAM_MAX_RECONNECT_DELAY)
+                attempt += 1
+                logger.info(f"🔁 Reconnect WebSocket {self.name} dalam {delay:.0f}s")
+                await asyncio.sleep(delay)
+
+    async def stop(self):
+        self._running = False
+        await self._close()
+
+    async def set_symbols(self, symbols):
+        """Sesuaikan langganan dengan daftar simbol baru tanpa memutus koneksi"""
+        symbols = {s.strip().upper() for s in symbols if s.strip()}
+        added = symbols - self.symbols
+        removed = self.symbols - symbols
+        self.symbols = symbols
+
+        if self._ws is None:
+            return
+        if removed:
+            await self._unsubscribe(removed)
+            for symbol in removed:
+                self.board.remove(self.name, symbol)
+        if added:
+            await self._subscribe(added)
+
+    async def _subscribe(self, symbols):
+        if not symbols:
+            return
+        message = self._subscribe_message(sorted(symbols))
+        if message is not None:
+            await self._send(message)
+        self.subscribed |= set(symbols)
+        logger.info(f"📡 {self.name} subscribe: {', '.join(sorted(symbols))}")
+
+    async def _unsubscribe(self, symbols):
+        message = self._unsubscribe_message(sorted(symbols))
+        if message is not None:
+            await self._send(message)
+        self.subscribed -= set(symbols)
+        logger.info(f"📴 {self.name} unsubscribe: {', '.join(sorted(symbols))}")
+
+    async def _heartbeat(self):
+        try:
+            while True:
+                await asyncio.sleep(self.heartbeat_interval)
+                await self._send(self._heartbeat_message())
+        except Exception as e:
+            # Heartbeat mati: tutup socket agar loop baca ikut gagal dan reconnect, bukan menunggu stale timeout
+            logger.error(f"🔴 Heartbeat WebSocket {self.name} gagal: {e}")
+            ws = self._ws
+            if ws is not None:
+                try:
+                    await ws.close()
+                except Exception:
+                    pass
+
+    async def _send(self, message):
+        await self._ws.send(json.dumps(message))
+
+    async def _close(self):
+        ws, self._ws = self._ws, None
+        if ws is not None:
+            try:
+                await ws.close()
+            except Exception:
+                pass
+
+    def _next_id(self):
+        self._request_id += 1
+        return self._request_id
+
+    async def _connect(self):
+        raise NotImplementedError
+
+    def _subscribe_message(self, symbols):
+        raise NotImplementedError
+
+    def _unsubscribe_message(self, symbols):
+        raise NotImplementedError
+
+    def _heartbeat_message(self):
+        return None
+
+    def _handle_message(self, data):
+        raise NotImplementedError
+
+
+class BinanceStream(StreamManager):
+    """Combined stream Binance, ping/pong ditangani oleh library websockets"""
+    name = "binance"
+    URL = BINANCE_WS_URL
+
+    async def _connect(self):
+        return await websockets.connect(self.URL, ping_interval=20, ping_timeout=20)
+
+    def _streams(self, symbols):
+        return [f"{symbol.lower()}usdt@trade" for symbol in symbols]
+
+    def _subscribe_message(self, symbols):
+        return {"method": "SUBSCRIBE", "params": self._streams(symbols), "id": self._next_id()}
+
+    def _unsubscribe_message(self, symbols):
+        return {"method": "UNSUBSCRIBE", "params": self._streams(symbols), "id": self._next_id()}
+
+    def _handle_message(self, data):
+        trade = data.get("data")
+        if not trade or trade.get("e") != "trade":
+            return
+        symbol = trade["s"][:-len("USDT")]
+        if symbol in self.symbols:
+            self.board.update(self.name, symbol, float(trade["p"]), size=_optional_float(trade.get("q")))
+
+
+class KuCoinStream(StreamManager):
+    """Stream ticker KuCoin dengan token publik dari endpoint bullet-public"""
+    name = "kucoin"
+    REST_URL = KUCOIN_REST_URL
+
+    async def _connect(self):
+        response = await http_pool.request(self.REST_URL, "POST", "/api/v1/bullet-public", timeout=10)
+        response.raise_for_status()
+        data = response.json()["data"]
+        server = data["instanceServers"][0]
+        self.heartbeat_interval = server["pingInterval"] / 1000
+
+        ws = await websockets.connect(
+            f"{server['endpoint']}?token={data['token']}&connectId={uuid.uuid4().hex}",
+            ping_interval=None
+        )
+        welcome = json.loads(await asyncio.wait_for(ws.recv(), timeout=10))
+        if welcome.get("type") != "welcome":
+            await ws.close()
+            raise ConnectionError(f"Respons awal KuCoin tidak valid: {welcome}")
+        return ws
+
+    def _topic(self, symbols):
+        return "/market/ticker:" + ",".join(f"{symbol}-USDT" for symbol in symbols)
+
+    def _subscribe_message(self, symbols):
+        return {"id": self._next_id(), "type": "subscribe", "topic": self._topic(symbols),
+                "privateChannel": False, "response": True}
+
+    def _unsubscribe_message(self, symbols):
+        return {"id": self._next_id(), "type": "unsubscribe", "topic": self._topic(symbols),
+                "privateChannel": False, "response": True}
+
+    def _heartbeat_message(self):
+        return {"id": self._next_id(), "type": "ping"}
+
+    def _handle_message(self, data):
+        if data.get("type") != "message" or not data.get("topic", "").startswith("/market/ticker:"):
+            return
+        symbol = data["topic"].split(":", 1)[1].split("-")[0]
+        ticker = data.get("data", {})
+        price = ticker.get("price")
+        if symbol in self.symbols and price is not None:
+            self.board.update(self.name, symbol, float(price), bid=_optional_float(ticker.get("bestBid")),
+                              ask=_optional_float(ticker.get("bestAsk")), size=_optional_float(ticker.get("size")))
+
+
+class IndodaxStream(StreamManager):
+    """
+    Stream Indodax (Centrifugo). Channel market:summary-24h berisi semua pair,
+    sehingga subscribe/unsubscribe simbol cukup dilakukan dengan filter lokal.
+    """
+    name = "indodax"
+    URL = INDODAX_WS_URL
+    CHANNEL = "market:summary-24h"
+    heartbeat_interval = 25
+
+    def __init__(self, board, symbols):
+        super().__init__(board, symbols)
+        self.token = os.getenv("INDODAX_WS_TOKEN")
+
+    async def _connect(self):
+        if not self.token:
+            raise ValueError("INDODAX_WS_TOKEN wajib di-set untuk stream Indodax")
+        ws = await websockets.connect(self.URL, ping_interval=None)
+        await ws.send(json.dumps({"params": {"token": self.token}, "id": self._next_id()}))
+        await ws.send(json.dumps({"method": 1, "params": {"channel": self.CHANNEL}, "id": self._next_id()}))
+        return ws
+
+    def _subscribe_message(self, symbols):
+        return None
+
+    def _unsubscribe_message(self, symbols):
+        return None
+
+    def _heartbeat_message(self):
+        return {"method": 7, "id": self._next_id()}
+
+    def _handle_message(self, data):
+        result = data.get("result", {})
+        if result.get("channel") != self.CHANNEL:
+            return
+        # Format baris: [pair, timestamp, last, low, high, open, volume_idr, volume_koin]
+        for row in result.get("data", {}).get("data", []):
+            pair = row[0]
+            if not pair.endswith("idr"):
+                continue
+            symbol = pair[:-len("idr")].upper()
+            if symbol in self.symbols:
+                self.board.update(self.name, symbol, float(row[2]))
+
+
+class PoloniexStream(StreamManager):
+    name = "poloniex"
+    URL = POLONIEX_WS_URL
+    heartbeat_interval = 20
+
+    async def _connect(self):
+        return await websockets.connect(self.URL, ping_interval=None)
+
+    def _subscribe_message(self, symbols):
+        return {"event": "subscribe", "channel": ["ticker"], "symbols": [f"{s}_USDT" for s in symbols]}
+
+    def _unsubscribe_message(self, symbols):
+        return {"event": "unsubscribe", "channel": ["ticker"], "symbols": [f"{s}_USDT" for s in symbols]}
+
+    def _heartbeat_message(self):
+        return {"event": "ping"}
+
+    def _handle_message(self, data):
+        if data.get("channel") != "ticker":
+            return
+        for ticker in data.get("data", []):
+            symbol = ticker["symbol"].split("_")[0]
+            if symbol in self.symbols:
+                self.board.update(self.name, symbol, float(ticker["close"]))
+
+
+class StreamHub:
+    """Jalankan satu StreamManager per exchange aktif dan kelola daftar simbolnya"""
+    MANAGERS = {
+        "binance": BinanceStream,
+        "kucoin": KuCoinStream,
+        "indodax": IndodaxStream,
+        "poloniex": PoloniexStream,
+    }
+
+    def __init__(self, exchange_names, symbols, board):
+        self.board = board
+        self.managers = {}
+        self._tasks = []
+        for name in exchange_names:
+            name = name.strip().lower()
+            manager_class = self.MANAGERS.get(name)
+            if manager_class is None:
+                logger.warning(f"⚠️ Stream market data untuk {name} belum didukung, tetap pakai REST")
+                continue
+            self.managers[name] = manager_class(board, symbols)
+
+    def start(self):
+        self._tasks = [
+            asyncio.create_task(manager.run(), name=f"stream-{name}")
+            for name, manager in self.managers.items()
+        ]
+        return self._tasks
+
+    async def set_symbols(self, symbols):
+        for manager in self.managers.values():
+            await manager.set_symbols(symbols)
+
+    async def stop(self):
+        for manager in self.managers.values():
+            await manager.stop()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+class DepthStreamMixin:
+    """
+    Order book lokal dari diff-depth stream: snapshot REST sebagai awal, lalu diff diterapkan
+    selama nomor urutnya bersambung. Diff yang datang sebelum snapshot selesai dibuffer,
+    dan gap urutan memicu snapshot ulang secara otomatis.
+    """
+    MAX_BUFFERED_DIFFS = 1000
+
+    def __init__(self, store, symbols, exchange):
+        super().__init__(store, symbols)
+        self.exchange = exchange
+        self._buffers = {}
+        self._resyncing = set()
+        self._resync_tasks = set()
+
+    async def _subscribe(self, symbols):
+        await super()._subscribe(symbols)
+        # Koneksi baru berarti urutan diff terputus, semua book harus dibangun ulang
+        for symbol in symbols:
+            self._buffers.pop(symbol, None)
+            if self.board.get(self.name, symbol) is not None:
+                self.board.invalidate(self.name, symbol)
+
+    def _on_diff(self, symbol, first, last, bids, asks):
+        """first/last: rentang nomor urut diff, bids/asks: [(harga, qty, seq atau None)]"""
+        if symbol not in self.symbols:
+            return
+        diff = (first, last, bids, asks)
+        book = self.board.book(self.name, symbol)
+        if not book.synced:
+            self._buffer(symbol, diff)
+            return
+        if not self._apply(book.sequence, symbol, diff):
+            self.board.invalidate(self.name, symbol)
+            self._buffer(symbol, diff)
+
+    def _apply(self, sequence, symbol, diff):
+        """Terapkan diff jika bersambung dengan sequence book. False jika ada gap."""
+        first, last, bids, asks = diff
+        if last <= sequence:
+            return True
+        if first > sequence + 1:
+            return False
+        self.board.apply_changes(
+            self.name,
+            symbol,
+            [(price, qty) for price, qty, seq in bids if seq is None or seq > sequence],
+            [(price, qty) for price, qty, seq in asks if seq is None or seq > sequence],
+            last
+        )
+        return True
+
+    def _buffer(self, symbol, diff):
+        buffer = self._buffers.setdefault(symbol, [])
+        buffer.append(diff)
+        if len(buffer) > self.MAX_BUFFERED_DIFFS:
+            del buffer[0]
+        if symbol not in self._resyncing:
+            self._resyncing.add(symbol)
+            task = asyncio.get_running_loop().create_task(self._resync(symbol))
+            self._resync_tasks.add(task)
+            task.add_done_callback(self._resync_tasks.discard)
+
+    async def _resync(self, symbol):
+        try:
+            snapshot = await asyncio.to_thread(self.exchange.fetch_order_book, symbol, ORDER_BOOK_SNAPSHOT_DEPTH)
+            if snapshot.get('sequence') is None or not (snapshot['bids'] or snapshot['asks']):
+                logger.error(f"❌ Snapshot order book {self.name} {symbol} tidak valid, dicoba lagi pada diff berikutnya")
+                return
+
+            sequence = snapshot['sequence']
+            self.board.apply_snapshot(self.name, symbol, snapshot['bids'], snapshot['asks'], sequence)
+
+            # Putar ulang diff yang dibuffer selama snapshot diambil
+            buffered = self._buffers.pop(symbol, [])
+            for diff in buffered:
+                if not self._apply(sequence, symbol, diff):
+                    logger.warning(f"⚠️ Gap urutan {self.name} {symbol} setelah snapshot, sinkron ulang")
+                    self.board.invalidate(self.name, symbol)
+                    return
+                sequence = max(sequence, diff[1])
+            logger.info(f"📚 Order book {self.name} {symbol} tersinkron (seq {sequence})")
+        except Exception as e:
+            logger.error(f"❌ Gagal sinkron order book {self.name} {symbol}: {e}")
+        finally:
+            self._resyncing.discard(symbol)
+
+
+class BinanceDepthStream(DepthStreamMixin, BinanceStream):
+    """Diff depth Binance: event pertama setelah snapshot harus memenuhi U <= lastUpdateId+1 <= u"""
+
+    def _streams(self, symbols):
+        return [f"{symbol.lower()}usdt@depth@100ms" for symbol in symbols]
+
+    def _handle_message(self, data):
+        event = data.get("data")
+        if not event or event.get("e") != "depthUpdate":
+            return
+        self._on_diff(
+            event["s"][:-len("USDT")],
+            event["U"],
+            event["u"],
+            [(float(p), float(q), None) for p, q in event["b"]],
+            [(float(p), float(q), None) for p, q in event["a"]]
+        )
+
+
+class KuCoinDepthStream(DepthStreamMixin, KuCoinStream):
+    """Level2 KuCoin: setiap perubahan membawa sequence sendiri dalam rentang sequenceStart..sequenceEnd"""
+
+    def _topic(self, symbols):
+        return "/market/level2:" + ",".join(f"{symbol}-USDT" for symbol in symbols)
+
+    def _handle_message(self, data):
+        if data.get("type") != "message" or not data.get("topic", "").startswith("/market/level2:"):
+            return
+        update = data["data"]
+        changes = update.get("changes", {})
+        self._on_diff(
+            update["symbol"].split("-")[0],
+            int(update["sequenceStart"]),
+            int(update["sequenceEnd"]),
+            [(float(p), float(q), int(seq)) for p, q, seq in changes.get("bids", [])],
+            [(float(p), float(q), int(seq)) for p, q, seq in changes.get("asks", [])]
+        )
+
+
+class OrderBookHub(StreamHub):
+    """Jalankan stream depth untuk exchange yang mendukung diff order book"""
+    MANAGERS = {
+        "binance": BinanceDepthStream,
+        "kucoin": KuCoinDepthStream,
+    }
+
+    def __init__(self, exchanges, symbols, store):
+        self.board = store
+        self.managers = {}
+        self._tasks = []
+        for exchange in exchanges:
+            name = exchange.__class__.__name__.lower()
+            manager_class = self.MANAGERS.get(name)
+            if manager_class is None:
+                logger.warning(f"⚠️ Order book lokal untuk {name} belum didukung, tetap pakai snapshot REST")
+                continue
+            self.managers[name] = manager_class(store, symbols, exchange)
@@ -0,0 +1,198 @@
+import time
+import threading
+from bisect import bisect_left, bisect_right, insort
+from utils.logger import logger
+
+
+class BookSide:
+    """
+    Satu sisi order book: harga terurut dalam blok-blok kecil (bisect) + dict harga -> qty.
+    Bid disimpan dengan kunci negatif sehingga level terbaik selalu di indeks 0.
+
+    Setiap blok menyimpan total qty-nya, sehingga set() hanya menggeser isi satu blok dan
+    volume_to_price() menjumlah total blok lalu satu blok parsial: O(n/B + B), bukan O(n).
+    """
+    chunk_size = 64
+
+    def __init__(self, descending=False):
+        self.descending = descending
+        self.clear()
+
+    def _key(self, price):
+        return -price if self.descending else price
+
+    def set(self, price, qty):
+        """Set qty satu level, qty 0 berarti level dihapus"""
+        key = self._key(price)
+        if qty <= 0:
+            if self._qty.pop(key, None) is None:
+                return
+            i = bisect_left(self._maxes, key)
+            chunk = self._chunks[i]
+            del chunk[bisect_left(chunk, key)]
+            if not chunk:
+                del self._chunks[i], self._maxes[i], self._totals[i]
+                return
+            self._maxes[i] = chunk[-1]
+            self._totals[i] = self._chunk_total(chunk)
+            return
+
+        exists = key in self._qty
+        self._qty[key] = qty
+        if not self._chunks:
+            self._chunks, self._maxes, self._totals = [[key]], [key], [qty]
+            return
+        i = min(bisect_left(self._maxes, key), len(self._chunks) - 1)
+        chunk = self._chunks[i]
+        if not exists:
+            insort(chunk, key)
+            self._maxes[i] = chunk[-1]
+            if len(chunk) > 2 * self.chunk_size:
+                self._split(i)
+                return
+        # Total dihitung ulang dari dict (bukan +=) agar tidak ada galat float yang menumpuk
+        self._totals[i] = self._chunk_total(chunk)
+
+    def _chunk_total(self, chunk):
+        return sum(self._qty[key] for key in chunk)
+
+    def _split(self, i):
+        chunk = self._chunks[i]
+        left, right = chunk[:self.chunk_size], chunk[self.chunk_size:]
+        self._chunks[i:i + 1] = [left, right]
+        self._maxes[i:i + 1] = [left[-1], right[-1]]
+        self._totals[i:i + 1] = [self._chunk_total(left), self._chunk_total(right)]
+
+    def clear(self):
+        self._chunks = []
+        self._maxes = []
+        self._totals = []
+        self._qty = {}
+
+    def best(self):
+        """(harga, qty) terbaik dalam O(1), None jika kosong"""
+        if not self._chunks:
+            return None
+        key = self._chunks[0][0]
+        return (abs(key), self._qty[key])
+
+    def levels(self, depth=None):
+        result = []
+        for chunk in self._chunks:
+            for key in chunk:
+                if depth is not None and len(result) >= depth:
+                    return result
+                result.append((abs(key), self._qty[key]))
+        return result
+
+    def volume_to_price(self, price):
+        """Total qty dari level terbaik sampai harga batas (inklusif)"""
+        key = self._key(price)
+        full = bisect_right(self._maxes, key)
+        total = sum(self._totals[:full])
+        if full < len(self._chunks):
+            chunk = self._chunks[full]
+            total += sum(self._qty[k] for k in chunk[:bisect_right(chunk, key)])
+        return total
+
+    def __len__(self):
+        return len(self._qty)
+
+
+class LocalOrderBook:
+    """Order book satu simbol di satu exchange, dibangun dari snapshot REST lalu diff stream"""
+
+    def __init__(self, exchange_name, symbol):
+        self.exchange_name = exchange_name
+        self.symbol = symbol
+        self.bids = BookSide(descending=True)
+        self.asks = BookSide()
+        self.sequence = None
+        self.synced = False
+        self.updated_at = 0.0
+
+    def apply_snapshot(self, bids, asks, sequence):
+        self.bids.clear()
+        self.asks.clear()
+        for price, qty in bids:
+            self.bids.set(price, qty)
+        for price, qty in asks:
+            self.asks.set(price, qty)
+        self.sequence = sequence
+        self.synced = True
+        self.updated_at = time.time()
+
+    def apply_changes(self, bids, asks, sequence):
+        for price, qty in bids:
+            self.bids.set(price, qty)
+        for price, qty in asks:
+            self.asks.set(price, qty)
+        self.sequence = sequence
+        self.updated_at = time.time()
+
+    def invalidate(self):
+        self.synced = False
+        self.sequence = None
+
+    def best_bid(self):
+        return self.bids.best()
+
+    def best_ask(self):
+        return self.asks.best()
+
+    def to_dict(self, depth=20):
+        """Format yang sama dengan Exchange.fetch_order_book"""
+        return {
+            'bids': self.bids.levels(depth),
+            'asks': self.asks.levels(depth),
+            'sequence': self.sequence,
+        }
+
+
+class OrderBookStore:
+    """
+    Kumpulan LocalOrderBook yang dibaca strategi tanpa I/O jaringan.
+    Diisi oleh stream depth di core/market_stream.py.
+    """
+
+    def __init__(self):
+        self._books = {}
+        self._lock = threading.Lock()
+
+    def book(self, exchange_name, symbol):
+        """Ambil atau buat LocalOrderBook (dipakai oleh penulis stream)"""
+        key = (exchange_name, symbol)
+        book = self._books.get(key)
+        if book is None:
+            book = self._books.setdefault(key, LocalOrderBook(exchange_name, symbol))
+        return book
+
+    def get(self, exchange_name, symbol, depth=20, max_age=None):
+        """
+        Salinan order book dalam format fetch_order_book.
+        None jika belum tersinkron atau tidak ada update dalam max_age detik.
+        """
+        book = self._books.get((exchange_name, symbol))
+        if book is None or not book.synced:
+            return None
+        if max_age is not None and time.time() - book.updated_at > max_age:
+            return None
+        with self._lock:
+            return book.to_dict(depth)
+
+    def apply_snapshot(self, exchange_name, symbol, bids, asks, sequence):
+        with self._lock:
+            self.book(exchange_name, symbol).apply_snapshot(bids, asks, sequence)
+
+    def apply_changes(self, exchange_name, symbol, bids, asks, sequence):
+        with self._lock:
+            self.book(exchange_name, symbol).apply_changes(bids, asks, sequence)
+
+    def invalidate(self, exchange_name, symbol):
+        with self._lock:
+            self.book(exchange_name, symbol).invalidate()
+        logger.warning(f"⚠️ Order book {exchange_name} {symbol} tidak sinkron, menunggu snapshot ulang")
+
+    def remove(self, exchange_name, symbol):
+        with self._lock:
+            self._books.pop((exchange_name, symbol), None)
@@ -0,0 +1,58 @@
+import time
+import threading
+
+
+class PriceBoard:
+    """
+    Papan harga bersama yang diisi oleh stream market data.
+    Harga disimpan dalam mata uang dasar exchange: {exchange: {symbol: (harga, waktu_terima)}}
+    """
+
+    def __init__(self):
+        self._prices = {}
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    def add_listener(self, callback):
+        """
+        Daftarkan callback(exchange_name, symbol, price, received_at, bid, ask, size) yang dipanggil
+        setiap ada tick; bid/ask/size None jika sumbernya tidak mengirim data tersebut
+        """
+        self._listeners.append(callback)
+
+    def update(self, exchange_name, symbol, price, timestamp=None, bid=None, ask=None, size=None):
+        if price is None or price <= 0:
+            return
+        received_at = timestamp if timestamp is not None else time.time()
+        with self._lock:
+            self._prices.setdefault(exchange_name, {})[symbol] = (price, received_at)
+        for callback in self._listeners:
+            callback(exchange_name, symbol, price, received_at, bid, ask, size)
+
+    def get(self, exchange_name, symbol, max_age=None):
+        """Ambil harga terakhir, None jika belum ada atau lebih tua dari max_age detik"""
+        with self._lock:
+            entry = self._prices.get(exchange_name, {}).get(symbol)
+        if entry is None:
+            return None
+        price, received_at = entry
+        if max_age is not None and time.time() - received_at > max_age:
+            return None
+        return price
+
+    def snapshot(self, max_age=None):
+        """Salin semua harga yang masih segar dalam format {exchange: {symbol: harga}}"""
+        now = time.time()
+        with self._lock:
+            return {
+                exchange_name: {
+                    symbol: price
+                    for symbol, (price, received_at) in symbols.items()
+                    if max_age is None or now - received_at <= max_age
+                }
+                for exchange_name, symbols in self._prices.items()
+            }
+
+    def remove(self, exchange_name, symbol):
+        with self._lock:
+            self._prices.get(exchange_name, {}).pop(symbol, None)
@@ -1,18 +1,58 @@
 import os
+import time
 import logging
+from concurrent.futures import ThreadPoolExecutor, wait
 from utils.helpers import get_usd_to_idr_rate
+from exchanges.markets import market_metadata
+from exchanges.exchange_interface import Exchange
+from utils.metrics import PRICE_COLLECTION_SECONDS, PRICE_MISSING
+from config.settings import (
+    PRICE_COLLECTION_MODE,
+    PRICE_COLLECTOR_MAX_WORKERS,
+    PRICE_COLLECTOR_DEADLINE,
+    PRICE_COLLECTION_BULK,
+    PRICE_BOARD_MAX_AGE
+)
 
 logger = logging.getLogger(__name__)
 
 class PriceCollector:
-    def __init__(self, exchanges):
+    def __init__(self, exchanges, mode=PRICE_COLLECTION_MODE, max_workers=PRICE_COLLECTOR_MAX_WORKERS,
+                 deadline=PRICE_COLLECTOR_DEADLINE, bulk=PRICE_COLLECTION_BULK, price_board=None, recorder=None):
         self.exchanges = exchanges
+        self.price_board = price_board
+        # Tanpa papan harga, tick REST direkam langsung; dengan papan, recorder menjadi listener-nya
+        self.recorder = recorder
+        if recorder is not None and price_board is not None:
+            price_board.add_listener(recorder.on_tick)
         self.symbols = self.get_supported_symbols()
+        self.mode = mode
+        self.max_workers = max_workers
+        self.deadline = deadline
+        self.bulk = bulk
+        self.last_timings = {}
+        self._executor = None
+        # (exchange, simbol) -> future yang masih berjalan setelah deadline siklus sebelumnya
+        self._inflight = {}
+        # (exchange, simbol) -> simbol venue dari metadata market, diisi sekali per pasangan
+        self._venue_symbols = {}
 
     def get_supported_symbols(self):
         return os.getenv('SUPPORTED_SYMBOLS', 'BTC,XRP,SHIB,BNB').split(',')
 
     def get_symbol_for_exchange(self, exchange_name, symbol):
+        """Simbol venue untuk aset kanonik: lookup O(1) ke metadata market, format lama jika belum dimuat"""
+        venue_symbol = self._venue_symbols.get((exchange_name, symbol))
+        if venue_symbol is not None:
+            return venue_symbol
+        index = market_metadata.index(exchange_name)
+        venue_symbol = index.venue_symbol(symbol.strip().upper()) if index else None
+        if venue_symbol is None:
+            return self._legacy_symbol(exchange_name, symbol)
+        self._venue_symbols[(exchange_name, symbol)] = venue_symbol
+        return venue_symbol
+
+    def _legacy_symbol(self, exchange_name, symbol):
         symbol = symbol.strip()
         if exchange_name == 'indodax':
             return symbol.lower()
@@ -28,33 +68,161 @@ class PriceCollector:
             return symbol
 
     def collect_prices(self):
-        prices = {}
+        start = time.perf_counter()
+        if self.mode == "concurrent":
+            prices, self.last_timings = self.collect_prices_concurrent()
+            PRICE_COLLECTION_SECONDS.labels(self.mode).observe(time.perf_counter() - start)
+            return prices
+
+        timings = {}
+        usd_to_idr = get_usd_to_idr_rate()
+        prices = self._prices_from_board(usd_to_idr)
+
+        for exchange, exchange_name, symbols in self._build_jobs(prices):
+            job_prices, elapsed = self._fetch_prices(exchange, exchange_name, symbols, usd_to_idr)
+            for symbol, price in job_prices.items():
+                prices[exchange_name][symbol] = price
+                timings[(exchange_name, symbol)] = elapsed
+
+        self.last_timings = timings
+        PRICE_COLLECTION_SECONDS.labels(self.mode).observe(time.perf_counter() - start)
+        return prices
+
+    def collect_prices_concurrent(self, deadline=None):
+        """
+        Jalankan semua request harga sekaligus lewat thread pool.
+        Returns:
+            tuple: (prices, timings) dengan timings {(exchange, simbol): detik}.
+            Request yang belum selesai saat deadline habis bernilai 0.0 dan tidak punya timing.
+        """
+        deadline = self.deadline if deadline is None else deadline
         usd_to_idr = get_usd_to_idr_rate()
-        
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="price-collector"
+            )
+
+        prices = self._prices_from_board(usd_to_idr)
+        # future.cancel() tidak menghentikan request yang sudah berjalan: selama request lama belum
+        # selesai, job yang sama tidak dikirim ulang agar exchange yang macet tidak memenuhi pool
+        self._inflight = {key: future for key, future in self._inflight.items() if not future.done()}
+        futures = {}
+        busy = []
+        for exchange, exchange_name, symbols in self._build_jobs(prices):
+            for symbol in symbols:
+                prices[exchange_name][symbol] = 0.0
+            key = (exchange_name, tuple(symbols))
+            if key in self._inflight:
+                busy.append(key)
+                continue
+            future = self._executor.submit(self._fetch_prices, exchange, exchange_name, symbols, usd_to_idr)
+            futures[future] = (exchange_name, symbols)
+
+        if busy:
+            for exchange_name, symbols in busy:
+                PRICE_MISSING.labels(exchange_name, "busy").inc(len(symbols))
+            logger.warning("⏳ %d request siklus sebelumnya belum selesai, tidak dikirim ulang: %s", len(busy),
+                           ', '.join(f"{exchange_name}:{','.join(symbols)}" for exchange_name, symbols in busy))
+
+        done, pending = wait(futures, timeout=deadline)
+
+        timings = {}
+        for future in done:
+            exchange_name, _ = futures[future]
+            job_prices, elapsed = future.result()
+            for symbol, price in job_prices.items():
+                prices[exchange_name][symbol] = price
+                timings[(exchange_name, symbol)] = elapsed
+
+        if pending:
+            for future in pending:
+                exchange_name, symbols = futures[future]
+                if not future.cancel():
+                    self._inflight[(exchange_name, tuple(symbols))] = future
+                PRICE_MISSING.labels(exchange_name, "deadline").inc(len(symbols))
+            late = ', '.join(sorted(
+                f"{exchange_name}:{symbol}"
+                for exchange_name, symbols in (futures[f] for f in pending)
+                for symbol in symbols
+            ))
+            logger.warning(f"⏱️ Deadline {deadline:.1f}s terlewati, {len(pending)} request belum selesai: {late}")
+
+        return prices, timings
+
+    def board_prices(self, symbols=None):
+        """Harga segar dari stream dalam USD, tanpa request REST"""
+        return self._prices_from_board(get_usd_to_idr_rate(), symbols)
+
+    def _prices_from_board(self, usd_to_idr, symbols=None):
+        """Harga segar dari stream (dalam USD), sisanya diambil lewat REST"""
+        prices = {exchange.__class__.__name__.lower(): {} for exchange in self.exchanges}
+        if self.price_board is None:
+            return prices
+
         for exchange in self.exchanges:
             exchange_name = exchange.__class__.__name__.lower()
-            prices[exchange_name] = {}
+            is_idr = exchange.get_base_currency() == "IDR"
+            for symbol in (self.symbols if symbols is None else symbols):
+                price = self.price_board.get(exchange_name, symbol, max_age=PRICE_BOARD_MAX_AGE)
+                if price is not None:
+                    prices[exchange_name][symbol] = price / usd_to_idr if is_idr else price
+        return prices
 
-            for symbol in self.symbols:
-                try:
-                    symbol_for_ex = self.get_symbol_for_exchange(exchange_name, symbol)
-                    price = exchange.fetch_ticker(symbol_for_ex)
+    def _build_jobs(self, known_prices):
+        """Satu job per exchange jika bulk didukung, selain itu satu job per (exchange, simbol)"""
+        jobs = []
+        for exchange in self.exchanges:
+            exchange_name = exchange.__class__.__name__.lower()
+            missing = [s for s in self.symbols if s not in known_prices.get(exchange_name, {})]
+            if not missing:
+                continue
+            if self._supports_bulk(exchange):
+                jobs.append((exchange, exchange_name, missing))
+            else:
+                jobs.extend((exchange, exchange_name, [symbol]) for symbol in missing)
+        return jobs
 
-                    if price is None or price <= 0:
-                        logger.warning(f"⚠️ Harga {symbol} di {exchange_name} tidak valid: {price}")
-                        prices[exchange_name][symbol] = 0.0
-                        continue
+    def _supports_bulk(self, exchange):
+        # Exchange.fetch_tickers bawaan hanya mengulang fetch_ticker: bukan endpoint bulk sungguhan
+        fetch_tickers = getattr(type(exchange), 'fetch_tickers', None)
+        return self.bulk and fetch_tickers is not None and fetch_tickers is not Exchange.fetch_tickers
 
-                    base_currency = exchange.get_base_currency()
+    def _fetch_prices(self, exchange, exchange_name, symbols, usd_to_idr):
+        """Ambil harga beberapa simbol dalam USD, kembalikan ({simbol: harga}, durasi request dalam detik)"""
+        start = time.perf_counter()
+        prices = {symbol: 0.0 for symbol in symbols}
+        try:
+            symbols_for_ex = {symbol: self.get_symbol_for_exchange(exchange_name, symbol) for symbol in symbols}
+            if self._supports_bulk(exchange):
+                raw_prices = exchange.fetch_tickers(list(symbols_for_ex.values()))
+            else:
+                raw_prices = {s: exchange.fetch_ticker(s) for s in symbols_for_ex.values()}
 
-                    if base_currency == "IDR":
-                        price = price / usd_to_idr
+            base_currency = exchange.get_base_currency()
 
-                    prices[exchange_name][symbol] = price
-                    logger.info(f"📊 {exchange_name.upper()} {symbol}: ${price:.6f} USD")
+            for symbol, symbol_for_ex in symbols_for_ex.items():
+                price = raw_prices.get(symbol_for_ex)
 
-                except Exception as e:
-                    logger.error(f"❌ Gagal ambil harga {symbol} dari {exchange_name}: {e}")
-                    prices[exchange_name][symbol] = 0.0
-        
-        return prices
+                if price is None or price <= 0:
+                    logger.warning("⚠️ Harga %s di %s tidak valid: %s", symbol, exchange_name, price)
+                    PRICE_MISSING.labels(exchange_name, "invalid").inc()
+                    continue
+
+                # Tick REST juga masuk ke papan harga agar detektor event-driven ikut bereaksi
+                if self.price_board is not None:
+                    self.price_board.update(exchange_name, symbol, price)
+                elif self.recorder is not None:
+                    self.recorder.record(exchange_name, symbol, price)
+
+                if base_currency == "IDR":
+                    price = price / usd_to_idr
+
+                prices[symbol] = price
+                logger.info("📊 %s %s: $%.6f USD", exchange_name.upper(), symbol, price)
+
+        except Exception as e:
+            logger.error(f"❌ Gagal ambil harga {', '.join(symbols)} dari {exchange_name}: {e}")
+
+        return prices, time.perf_counter() - start
@@ -0,0 +1,111 @@
+import time
+import random
+import asyncio
+from core.capital_allocator import CapitalAllocator
+from exchanges.binance import Binance
+from exchanges.indodax import Indodax as IndodaxAdapter
+from utils.balance_cache import balance_cache
+from simulator.test_simulator import start_simulator, make_adapter
+
+
+class Venue:
+    def get_base_currency(self):
+        return "USDT"
+
+
+class Alpha(Venue):
+    pass
+
+
+class Beta(Venue):
+    pass
+
+
+class Indodax(Venue):
+    def get_base_currency(self):
+        return "IDR"
+
+
+def opportunity(symbol, buy, sell, buy_price, sell_price, amount=float('inf'), minimum=0.0):
+    return {'symbol': symbol, 'buy_exchange': buy, 'sell_exchange': sell, 'buy_price': buy_price,
+            'sell_price': sell_price, 'required_amount': amount, 'min_balance_required': minimum}
+
+
+def test_shared_balance_goes_to_best_return_first():
+    allocator = CapitalAllocator([Alpha(), Beta(), Indodax()], trading_fee=0.0, transfer_fee={'XRP': 1.0},
+                                 fiat_transfer_fee=16000)
+    balances = {
+        "alpha": {"USDT": {"free": 1000.0}},
+        "beta": {"XRP": {"free": 5000.0}, "BNB": {"free": 5000.0}, "SOL": {"free": 1.0}},
+        "indodax": {"IDR": {"free": 1.6e6}, "BNB": {"free": 10.0}},
+    }
+    opportunities = [
+        opportunity("BNB", "alpha", "beta", 1.0, 1.01),             # 1% tapi datang pertama
+        opportunity("XRP", "alpha", "beta", 1.0, 1.03),             # 3%, biaya transfer 1 XRP
+        opportunity("SOL", "alpha", "beta", 1.0, 1.05, minimum=2),  # saldo SOL di bawah minimum
+        opportunity("BNB", "indodax", "beta", 1.0, 1.0005),         # tidak menutup biaya fiat $1
+    ]
+    allocated = allocator.allocate(opportunities, balances, usd_to_idr=16000)
+
+    # USDT alpha habis untuk XRP; BNB di alpha dan indodax tidak mendapat modal
+    assert [opp['symbol'] for opp in allocated] == ["XRP"]
+    assert allocated[0]['required_amount'] == 1000.0
+    assert abs(allocated[0]['expected_profit'] - (1000 * 0.03 - 1.0)) < 1e-9
+    assert [opp['executable'] for opp in opportunities] == [False, True, False, False]
+
+    # Cap depth/saldo pada required_amount menyisakan modal untuk peluang berikutnya
+    opportunities[1]['required_amount'] = 400.0
+    allocated = allocator.allocate(opportunities, balances, usd_to_idr=16000)
+    assert [(opp['symbol'], opp['required_amount']) for opp in allocated] == [("XRP", 400.0), ("BNB", 600.0)]
+
+
+def test_allocates_dozens_of_opportunities_under_a_millisecond():
+    rng = random.Random(3)
+    names = ["alpha", "beta", "indodax"]
+    allocator = CapitalAllocator([Alpha(), Beta(), Indodax()])
+    symbols = [f"C{i}" for i in range(20)]
+    balances = {name: {asset: {"free": rng.uniform(0, 1e4)} for asset in symbols + ["USDT", "IDR"]} for name in names}
+    opportunities = []
+    for _ in range(50):
+        buy, sell = rng.sample(names, 2)
+        price = rng.uniform(0.5, 2)
+        opportunities.append(opportunity(rng.choice(symbols), buy, sell, price, price * rng.uniform(0.99, 1.03)))
+
+    best = float('inf')
+    for _ in range(5):
+        start = time.perf_counter()
+        allocated = allocator.allocate(opportunities, balances, usd_to_idr=16000)
+        best = min(best, time.perf_counter() - start)
+    assert best < 0.001
+
+    # Tidak ada saldo yang dipakai melebihi snapshot
+    used = {}
+    for opp in allocated:
+        quote = "IDR" if opp['buy_exchange'] == "indodax" else "USDT"
+        rate = 16000 if quote == "IDR" else 1.0
+        used[(opp['buy_exchange'], quote)] = used.get((opp['buy_exchange'], quote), 0) + \
+            opp['required_amount'] * opp['buy_price'] * (1 + allocator.trading_fee) * rate
+        used[(opp['sell_exchange'], opp['symbol'])] = used.get((opp['sell_exchange'], opp['symbol']), 0) + opp['required_amount']
+    assert all(amount <= balances[name][asset]["free"] * (1 + 1e-9) for (name, asset), amount in used.items())
+
+
+def test_indodax_balances_from_the_real_adapter_are_allocated(monkeypatch):
+    async def scenario():
+        simulator = await start_simulator()
+        try:
+            monkeypatch.setenv("USD_TO_IDR_RATE", str(simulator.market.usd_to_idr))
+            indodax, binance = make_adapter(IndodaxAdapter, simulator, monkeypatch), make_adapter(Binance, simulator, monkeypatch)
+            balance_cache.invalidate()
+            price = simulator.market.usd_price("binance", "XRP")
+            opportunities = [
+                opportunity("XRP", "indodax", "binance", price, price * 1.02),  # IDR di indodax
+                opportunity("XRP", "binance", "indodax", price, price * 1.02),  # XRP di indodax
+            ]
+            return await CapitalAllocator([indodax, binance], trading_fee=0.0).allocate_async(opportunities)
+        finally:
+            balance_cache.invalidate()
+            await simulator.stop()
+
+    allocated = asyncio.run(scenario())
+    # Modal awal tiap venue $100k dan koin $10k: koin XRP di venue jual yang membatasi
+    assert len(allocated) == 2 and all(opp['required_amount'] * opp['buy_price'] > 9000 for opp in allocated)
@@ -0,0 +1,132 @@
+import asyncio
+import logging
+from core.price_board import PriceBoard
+from core.price_collector import PriceCollector
+from core.arbitrage_engine import ArbitrageEngine
+from core.event_detector import EventDrivenDetector
+from utils.balance_cache import balance_cache
+
+
+class Venue:
+    def __init__(self, prices):
+        self.prices = prices
+
+    def get_base_currency(self):
+        return "USDT"
+
+    def fetch_ticker(self, symbol):
+        return self.prices.get(symbol, 0.0)
+
+    def fetch_balance(self):
+        return {"USDT": {"free": 10000.0}, "BTC": {"free": 1.0}, "XRP": {"free": 10000.0}}
+
+
+class Binance(Venue):
+    pass
+
+
+class Kucoin(Venue):
+    pass
+
+
+def setup(monkeypatch):
+    monkeypatch.setenv("USD_TO_IDR_RATE", "16000")
+    monkeypatch.setenv("SUPPORTED_SYMBOLS", "BTC,XRP")
+    balance_cache.invalidate()
+    exchanges = [Binance({"BTCUSDT": 30000.0, "XRPUSDT": 0.50}), Kucoin({"BTC-USDT": 30010.0, "XRP-USDT": 0.52})]
+    collector = PriceCollector(exchanges, mode="sequential", price_board=PriceBoard())
+    return exchanges, collector, ArbitrageEngine(collector, exchanges)
+
+
+def without_decision_time(opportunities):
+    return [{k: v for k, v in opp.items() if k != 'decided_at'} for opp in opportunities]
+
+
+def test_event_driven_matches_polling(monkeypatch):
+    exchanges, collector, engine = setup(monkeypatch)
+
+    async def scenario():
+        received, done = [], asyncio.Event()
+
+        async def on_opportunities(opportunities):
+            # Tick dari thread polling bisa terbagi ke beberapa batch
+            received.extend(opportunities)
+            if {opp['symbol'] for opp in received} == {"BTC", "XRP"}:
+                done.set()
+
+        detector = EventDrivenDetector(collector, engine, on_opportunities, debounce_ms=0)
+        detector.start()
+        try:
+            # Siklus polling mengisi PriceBoard; tick yang sama memicu evaluasi event-driven
+            polled = await asyncio.to_thread(engine.run)
+            await asyncio.wait_for(done.wait(), 5)
+        finally:
+            await detector.stop()
+        return polled, received, detector.latency.summary()
+
+    polled, received, latency = asyncio.run(scenario())
+    assert [opp['symbol'] for opp in polled] == ["BTC", "XRP"]
+    latest = {opp['symbol']: opp for opp in without_decision_time(received)}
+    assert [latest[opp['symbol']] for opp in polled] == polled
+    assert all('decided_at' in opp for opp in received) and latency['count'] >= 2
+
+
+def test_ticks_are_evaluated_while_execution_is_running(monkeypatch):
+    exchanges, collector, engine = setup(monkeypatch)
+    board = collector.price_board
+
+    async def scenario():
+        calls, release, second = [], asyncio.Event(), asyncio.Event()
+
+        async def on_opportunities(opportunities):
+            calls.append([opp['symbol'] for opp in opportunities])
+            if len(calls) == 2:
+                second.set()
+            await release.wait()
+
+        detector = EventDrivenDetector(collector, engine, on_opportunities, debounce_ms=0)
+        detector.start()
+        try:
+            board.update("binance", "XRP", 0.50)
+            board.update("kucoin", "XRP", 0.52)
+            while not calls:
+                await asyncio.sleep(0)
+            # Eksekusi pertama masih menunggu; tick baru tetap menghasilkan keputusan
+            board.update("kucoin", "XRP", 0.53)
+            await asyncio.wait_for(second.wait(), 5)
+            pending = len(detector._executions)
+            release.set()
+        finally:
+            await detector.stop()
+        return calls, pending, len(detector._executions)
+
+    calls, pending, remaining = asyncio.run(scenario())
+    assert calls == [["XRP"], ["XRP"]]
+    assert (pending, remaining) == (2, 0)
+
+
+def test_polling_follows_collector_symbols(monkeypatch):
+    exchanges, collector, engine = setup(monkeypatch)
+    exchanges[0].prices["DOGEUSDT"], exchanges[1].prices["DOGE-USDT"] = 0.10, 0.11
+
+    # SUPPORTED_SYMBOLS di .env berubah saat bot berjalan: DOGE ditambah, BTC dihapus
+    collector.symbols = ["XRP", "DOGE"]
+    assert [opp['symbol'] for opp in engine.run()] == ["XRP", "DOGE"]
+
+
+def test_event_mode_without_price_board_falls_back_to_polling(monkeypatch, caplog):
+    exchanges, _, _ = setup(monkeypatch)
+    collector = PriceCollector(exchanges, mode="sequential")
+    engine = ArbitrageEngine(collector, exchanges)
+
+    async def scenario():
+        detector = EventDrivenDetector(collector, engine, None)
+        started = detector.start()
+        await detector.stop()
+        return started
+
+    # PRICE_SOURCE=rest: detektor tidak berjalan, siklus polling tetap menemukan peluang
+    with caplog.at_level(logging.WARNING):
+        assert asyncio.run(scenario()) is None
+    assert "kembali ke deteksi polling" in caplog.text
+    assert [opp['symbol'] for opp in engine.run()] == ["BTC", "XRP"]
@@ -0,0 +1,81 @@
+import random
+import asyncio
+from core.order_book import BookSide, OrderBookStore
+from core.market_stream import BinanceDepthStream
+
+
+class FakeBinance:
+    def __init__(self, snapshots):
+        self.snapshots = list(snapshots)
+
+    def fetch_order_book(self, symbol, depth=20):
+        return self.snapshots.pop(0)
+
+
+def test_book_side_keeps_best_level_first():
+    bids = BookSide(descending=True)
+    for price, qty in [(100.0, 1.0), (102.0, 2.0), (101.0, 3.0)]:
+        bids.set(price, qty)
+    bids.set(102.0, 0)
+
+    assert bids.best() == (101.0, 3.0)
+    assert bids.levels() == [(101.0, 3.0), (100.0, 1.0)]
+    assert bids.volume_to_price(100.0) == 4.0
+
+
+def diff(first, last, bid):
+    return {"data": {"e": "depthUpdate", "s": "BTCUSDT", "U": first, "u": last,
+                     "b": [[str(bid), "1"]], "a": []}}
+
+
+def test_binance_diffs_buffer_until_snapshot_and_resync_on_gap():
+    async def scenario():
+        store = OrderBookStore()
+        exchange = FakeBinance([
+            {'bids': [(100.0, 1.0)], 'asks': [(101.0, 1.0)], 'sequence': 10},
+            {'bids': [(90.0, 1.0)], 'asks': [(91.0, 1.0)], 'sequence': 30},
+        ])
+        stream = BinanceDepthStream(store, ["BTC"], exchange)
+
+        # Diff sebelum snapshot dibuffer, yang sudah tercakup snapshot dibuang
+        stream._handle_message(diff(5, 9, 99.0))
+        stream._handle_message(diff(10, 12, 99.5))
+        await asyncio.sleep(0.05)
+        book = store.get("binance", "BTC")
+        assert book['sequence'] == 12
+        assert (99.5, 1.0) in book['bids'] and (99.0, 1.0) not in book['bids']
+
+        stream._handle_message(diff(13, 13, 99.6))
+        assert store.get("binance", "BTC")['sequence'] == 13
+
+        # Gap 14..19 hilang: book tidak dipakai sampai snapshot baru diterapkan
+        stream._handle_message(diff(20, 31, 89.0))
+        assert store.get("binance", "BTC") is None
+        await asyncio.sleep(0.05)
+        book = store.get("binance", "BTC")
+        assert book['sequence'] == 31
+        assert book['bids'][0] == (90.0, 1.0)
+
+    asyncio.run(scenario())
+
+
+def test_book_side_matches_a_plain_sorted_book_across_chunks():
+    rng = random.Random(7)
+    asks = BookSide()
+    asks.chunk_size = 4
+    reference = {}
+    for _ in range(2000):
+        price = rng.randrange(1, 200) / 10
+        qty = rng.choice([0, 0, rng.randrange(1, 50) / 4])
+        asks.set(price, qty)
+        if qty:
+            reference[price] = qty
+        else:
+            reference.pop(price, None)
+
+    expected = sorted(reference.items())
+    assert asks.levels() == expected and len(asks) == len(expected)
+    assert asks.levels(5) == expected[:5] and asks.best() == expected[0]
+    assert len(asks._chunks) > 1 and all(len(chunk) <= 8 for chunk in asks._chunks)
+    for limit in (0.05, 3.0, 10.0, 25.0):
+        assert asks.volume_to_price(limit) == sum(qty for price, qty in expected if price <= limit)
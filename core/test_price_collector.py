@@ -0,0 +1,134 @@
+import time
+import threading
+from core.price_collector import PriceCollector
+from exchanges.exchange_interface import Exchange
+
+
+class FakeExchange:
+    def __init__(self, base_currency="USDT", delay=0.0, prices=None):
+        self.base_currency = base_currency
+        self.delay = delay
+        self.prices = prices or {}
+
+    def get_base_currency(self):
+        return self.base_currency
+
+    def fetch_ticker(self, symbol):
+        time.sleep(self.delay)
+        return self.prices.get(symbol, 0.0)
+
+
+class Binance(FakeExchange):
+    pass
+
+
+class Indodax(FakeExchange):
+    pass
+
+
+def test_concurrent_collect_matches_sequential(monkeypatch):
+    monkeypatch.setenv("USD_TO_IDR_RATE", "16000")
+    monkeypatch.setenv("SUPPORTED_SYMBOLS", "BTC,XRP")
+    exchanges = [
+        Binance(prices={"BTCUSDT": 30000.0, "XRPUSDT": 0.5}),
+        Indodax(base_currency="IDR", prices={"btc": 480000000.0, "xrp": 8000.0}),
+    ]
+
+    sequential = PriceCollector(exchanges, mode="sequential").collect_prices()
+    collector = PriceCollector(exchanges, mode="concurrent")
+    concurrent = collector.collect_prices()
+
+    assert concurrent == sequential
+    assert concurrent["indodax"]["BTC"] == 30000.0
+    assert set(collector.last_timings) == {
+        ("binance", "BTC"), ("binance", "XRP"), ("indodax", "BTC"), ("indodax", "XRP")
+    }
+
+
+def test_concurrent_collect_returns_partial_results_after_deadline(monkeypatch):
+    monkeypatch.setenv("USD_TO_IDR_RATE", "16000")
+    monkeypatch.setenv("SUPPORTED_SYMBOLS", "BTC")
+    exchanges = [
+        Binance(prices={"BTCUSDT": 30000.0}),
+        Indodax(base_currency="IDR", delay=0.5, prices={"btc": 480000000.0}),
+    ]
+
+    collector = PriceCollector(exchanges, mode="concurrent", deadline=0.1)
+    prices, timings = collector.collect_prices_concurrent()
+
+    assert prices == {"binance": {"BTC": 30000.0}, "indodax": {"BTC": 0.0}}
+    assert list(timings) == [("binance", "BTC")]
+
+
+def test_bulk_collect_uses_one_request_per_exchange(monkeypatch):
+    monkeypatch.setenv("USD_TO_IDR_RATE", "16000")
+    monkeypatch.setenv("SUPPORTED_SYMBOLS", "BTC,XRP")
+
+    class KuCoin(FakeExchange):
+        requests = []
+
+        def fetch_tickers(self, symbols):
+            self.requests.append(list(symbols))
+            return {symbol: self.prices.get(symbol, 0.0) for symbol in symbols}
+
+    exchange = KuCoin(prices={"BTC-USDT": 30000.0, "XRP-USDT": 0.5})
+    prices = PriceCollector([exchange], mode="sequential", bulk=True).collect_prices()
+
+    assert prices == {"kucoin": {"BTC": 30000.0, "XRP": 0.5}}
+    assert exchange.requests == [["BTC-USDT", "XRP-USDT"]]
+
+
+def test_default_fetch_tickers_is_not_treated_as_bulk():
+    class Poloniex(Exchange):
+        def get_base_currency(self):
+            return "USDT"
+
+        def fetch_ticker(self, symbol):
+            return 1.0
+
+        def fetch_order_book(self, symbol, depth=20):
+            return {'bids': [], 'asks': [], 'sequence': None}
+
+        def fetch_balance(self):
+            return {}
+
+        def transfer_coin(self, symbol, amount, address, tag=None, network=None):
+            return False
+
+    class KuCoin(FakeExchange):
+        def fetch_tickers(self, symbols):
+            return {}
+
+    collector = PriceCollector([], mode="sequential", bulk=True)
+    assert not collector._supports_bulk(Poloniex())
+    assert collector._supports_bulk(KuCoin())
+    assert not collector._supports_bulk(FakeExchange())
+
+
+def test_stuck_exchange_is_not_resubmitted_while_its_request_runs(monkeypatch):
+    monkeypatch.setenv("USD_TO_IDR_RATE", "16000")
+    monkeypatch.setenv("SUPPORTED_SYMBOLS", "BTC")
+    release = threading.Event()
+
+    class Indodax(FakeExchange):
+        calls = 0
+
+        def fetch_ticker(self, symbol):
+            Indodax.calls += 1
+            release.wait(5)
+            return 480000000.0
+
+    exchanges = [Binance(prices={"BTCUSDT": 30000.0}), Indodax(base_currency="IDR")]
+    collector = PriceCollector(exchanges, mode="concurrent", max_workers=2, deadline=0.2)
+    try:
+        # Dua siklus: request indodax yang macet tetap satu, binance selalu dapat worker
+        for _ in range(2):
+            prices = collector.collect_prices()
+            assert prices == {"binance": {"BTC": 30000.0}, "indodax": {"BTC": 0.0}}
+        assert Indodax.calls == 1
+    finally:
+        release.set()
+
+    # Setelah request lama selesai, simbolnya dikirim lagi di siklus berikutnya
+    collector._inflight[("indodax", ("BTC",))].result(5)
+    assert collector.collect_prices()["indodax"]["BTC"] == 30000.0 and Indodax.calls == 2
@@ -0,0 +1,76 @@
+import threading
+import numpy as np
+from core.price_board import PriceBoard
+from core.market_stream import BinanceStream, KuCoinStream
+from core.tick_recorder import TickRecorder, SEGMENT_SECONDS
+
+
+def test_ticks_round_trip_across_hourly_segments(tmp_path):
+    recorder = TickRecorder(directory=str(tmp_path))
+    base = 1_700_000_000 // SEGMENT_SECONDS * SEGMENT_SECONDS
+    recorder.record("binance", "BTC", 100.5, bid=100.4, ask=100.6, size=0.25, timestamp=base + 10.000001)
+    recorder.record("indodax", "BTC", 1_600_000_000.0, timestamp=base + 20.5)
+    recorder.record("binance", "XRP", 0.5, timestamp=base + SEGMENT_SECONDS + 1.0)
+
+    assert recorder.flush() == 3
+    assert len(recorder.segments()) == 2
+
+    # Instance baru hanya membaca disk: kamus exchange/simbol ikut tersimpan
+    reader = TickRecorder(directory=str(tmp_path))
+    ticks = reader.read()
+    assert np.allclose(ticks['ts'], [base + 10.000001, base + 20.5, base + SEGMENT_SECONDS + 1.0], atol=1e-6)
+    assert ticks['last'].tolist() == [100.5, 1_600_000_000.0, 0.5]
+    assert ticks['bid'][0] == 100.4 and np.isnan(ticks['bid'][1])
+    assert ticks['size'][0] == np.float32(0.25)
+
+    btc = reader.read(symbol="BTC", exchange="binance")
+    assert btc['last'].tolist() == [100.5]
+
+
+def test_time_range_read_uses_memmap_slices(tmp_path):
+    recorder = TickRecorder(directory=str(tmp_path))
+    base = 1_700_000_000 // SEGMENT_SECONDS * SEGMENT_SECONDS
+    for i in range(100):
+        recorder.record("kucoin", "BTC", 100.0 + i, timestamp=base + i)
+    recorder.flush()
+
+    segments = list(recorder.iter_segments(base + 10, base + 20))
+    assert len(segments) == 1
+    _, columns = segments[0]
+    assert isinstance(columns['last'], np.memmap)
+    assert columns['last'].tolist() == [100.0 + i for i in range(10, 20)]
+    assert recorder.read(base + 95, base + 1000)['last'].tolist() == [195.0, 196.0, 197.0, 198.0, 199.0]
+
+
+def test_stream_quotes_reach_the_recorder_through_the_board(tmp_path):
+    board = PriceBoard()
+    recorder = TickRecorder(directory=str(tmp_path))
+    board.add_listener(recorder.on_tick)
+    BinanceStream(board, ["BTC"])._handle_message(
+        {"data": {"e": "trade", "s": "BTCUSDT", "p": "30000.5", "q": "0.125"}})
+    KuCoinStream(board, ["BTC"])._handle_message(
+        {"type": "message", "topic": "/market/ticker:BTC-USDT",
+         "data": {"price": "30001", "bestBid": "30000", "bestAsk": "30002", "size": "0.5"}})
+
+    assert recorder.flush() == 2
+    ticks = recorder.read()
+    assert ticks['last'].tolist() == [30000.5, 30001.0]
+    assert np.isnan(ticks['bid'][0]) and ticks['size'][0] == np.float32(0.125)
+    assert (ticks['bid'][1], ticks['ask'][1], ticks['size'][1]) == (30000.0, 30002.0, 0.5)
+
+
+def test_concurrent_records_are_all_counted(tmp_path):
+    recorder = TickRecorder(directory=str(tmp_path), buffer_size=1_000_000)
+
+    def produce(worker):
+        for i in range(5000):
+            recorder.record("binance", "BTC", 100.0 + worker, timestamp=1_700_000_000 + i)
+
+    threads = [threading.Thread(target=produce, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert recorder.flush() == 20000
+    assert (recorder._received, recorder._written) == (20000, 20000)
+    assert len(recorder.read()['last']) == 20000
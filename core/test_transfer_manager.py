@@ -0,0 +1,132 @@
+import asyncio
+from core.transfer_manager import TransferManager
+from exchanges.binance import Binance
+from exchanges.indodax import Indodax
+from utils.balance_cache import balance_cache
+from simulator.test_simulator import start_simulator, make_adapter
+
+
+class Venue:
+    def __init__(self, events=None, fill=1.0):
+        self.events = events if events is not None else []
+        self.fill = fill
+        self.orders = []
+
+    def get_base_currency(self):
+        return "USDT"
+
+    async def fetch_balance_async(self):
+        return {"USDT": {"free": 10000.0}, "XRP": {"free": 10000.0}, "BNB": {"free": 10000.0}}
+
+    async def create_order_async(self, symbol, side, amount, price=None, order_type="limit",
+                                 time_in_force=None, client_order_id=None):
+        leg = (self.__class__.__name__.lower(), symbol, side, client_order_id[:-2])
+        self.events.append(("start", leg))
+        # Dua kali yield: leg lain yang sedang berjalan sempat tercatat sebelum leg ini selesai
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        self.events.append(("end", leg))
+        self.orders.append((symbol, side, amount, price, order_type, time_in_force, client_order_id))
+        filled = amount * self.fill
+        return {'id': str(len(self.orders)), 'client_order_id': client_order_id,
+                'status': "filled" if filled == amount else "canceled", 'filled': filled, 'price': price}
+
+
+class Alpha(Venue):
+    pass
+
+
+class Beta(Venue):
+    pass
+
+
+class Gamma(Venue):
+    pass
+
+
+def opportunity(symbol, buy, sell):
+    return {'symbol': symbol, 'buy_exchange': buy, 'sell_exchange': sell, 'buy_price': 1.0,
+            'sell_price': 1.02, 'required_amount': 10.0, 'executable': True}
+
+
+def test_legs_run_together_and_shared_balances_are_serialized(monkeypatch):
+    monkeypatch.setenv("USD_TO_IDR_RATE", "16000")
+    events = []
+    alpha, beta, gamma = Alpha(events), Beta(events), Gamma(events)
+    manager = TransferManager([alpha, beta, gamma], mode="concurrent", slippage=0.0)
+
+    # Beli di alpha, jual di beta: leg kedua terkirim sebelum leg pertama selesai
+    assert asyncio.run(manager.execute_many([opportunity("XRP", "alpha", "beta")])) == [True]
+    assert [kind for kind, _ in events] == ["start", "start", "end", "end"]
+    buy, sell = alpha.orders[0], beta.orders[0]
+    assert (buy[1], sell[1], buy[5]) == ("buy", "sell", "IOC")
+    assert buy[6][:-1] == sell[6][:-1] and buy[6] != sell[6]
+
+    # Peluang 2 (XRP di beta) dan 3 (USDT di alpha) menunggu peluang 1, lalu keduanya berjalan paralel
+    events.clear()
+    results = asyncio.run(manager.execute_many([
+        opportunity("XRP", "alpha", "beta"), opportunity("XRP", "gamma", "beta"), opportunity("BNB", "alpha", "gamma"),
+    ]))
+    assert results == [True, True, True]
+    # Leg dikelompokkan per peluang lewat client order id bersama
+    first = next(leg[3] for _, leg in events if leg[:3] == ("alpha", "XRP", "buy"))
+    position = {event: index for index, event in enumerate(events)}
+    last_of_first = max(index for (kind, leg), index in position.items() if kind == "end" and leg[3] == first)
+    later = [leg for kind, leg in events if kind == "start" and leg[3] != first]
+    assert len(later) == 4 and all(position[("start", leg)] > last_of_first for leg in later)
+    # Keempat leg peluang 2 dan 3 sudah terkirim sebelum satu pun selesai
+    tail = [kind for kind, _ in events[last_of_first + 1:]]
+    assert tail == ["start"] * 4 + ["end"] * 4
+
+
+def test_unfunded_or_unfillable_opportunity_fails(monkeypatch):
+    monkeypatch.setenv("USD_TO_IDR_RATE", "16000")
+
+    class Empty(Venue):
+        async def create_order_async(self, *args, **kwargs):
+            return None
+
+    alpha, empty = Alpha(), Empty()
+    manager = TransferManager([alpha, empty], mode="concurrent", slippage=0.0)
+    too_big = dict(opportunity("XRP", "alpha", "empty"), required_amount=1e9)
+    assert asyncio.run(manager.execute_many([too_big, opportunity("XRP", "alpha", "empty")])) == [False, False]
+    # Hanya peluang kedua yang sampai ke order; beli yang terisi tanpa jual dibalik di alpha
+    assert [(order[1], order[2], order[4]) for order in alpha.orders] == [("buy", 10.0, "limit"), ("sell", 10.0, "market")]
+
+
+def test_partial_fill_is_unwound_and_not_a_success(monkeypatch):
+    monkeypatch.setenv("USD_TO_IDR_RATE", "16000")
+    alpha, beta = Alpha(), Beta(fill=0.4)
+    manager = TransferManager([alpha, beta], mode="concurrent", slippage=0.0)
+    assert asyncio.run(manager.execute_many([opportunity("XRP", "alpha", "beta")])) == [False]
+    # Beli 10 terisi, jual hanya 4: kelebihan 6 XRP dijual kembali di alpha
+    assert [(order[1], order[2]) for order in alpha.orders] == [("buy", 10.0), ("sell", 6.0)]
+    assert alpha.orders[1][6].endswith("-u")
+    assert len(beta.orders) == 1
+
+    # Jual lebih banyak dari beli: selisihnya dibeli kembali di exchange jual
+    alpha, beta = Alpha(fill=0.5), Beta()
+    manager = TransferManager([alpha, beta], mode="concurrent", slippage=0.0)
+    assert asyncio.run(manager.execute_many([opportunity("XRP", "alpha", "beta")])) == [False]
+    assert [(order[1], order[2]) for order in beta.orders] == [("sell", 10.0), ("buy", 5.0)]
+
+
+def test_indodax_buy_leg_passes_the_idr_balance_check(monkeypatch):
+    async def scenario():
+        simulator = await start_simulator()
+        try:
+            monkeypatch.setenv("USD_TO_IDR_RATE", str(simulator.market.usd_to_idr))
+            indodax, binance = make_adapter(Indodax, simulator, monkeypatch), make_adapter(Binance, simulator, monkeypatch)
+            balance_cache.invalidate()
+            manager = TransferManager([indodax, binance], mode="concurrent", slippage=0.05)
+            price = simulator.market.usd_price("indodax", "XRP")
+            opp = {'symbol': "XRP", 'buy_exchange': "indodax", 'sell_exchange': "binance", 'buy_price': price,
+                   'sell_price': simulator.market.usd_price("binance", "XRP"), 'required_amount': 100.0,
+                   'executable': True}
+            return await manager.execute_many([opp]), simulator.venues["indodax"].stats["orders"]
+        finally:
+            balance_cache.invalidate()
+            await simulator.stop()
+
+    results, indodax_orders = asyncio.run(scenario())
+    assert results == [True] and indodax_orders == 1
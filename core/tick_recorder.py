@@ -0,0 +1,261 @@
+import os
+import json
+import time
+import atexit
+import calendar
+import threading
+from collections import deque
+import numpy as np
+from utils.logger import logger
+from utils.metrics import TICKS_RECORDED, TICKS_DROPPED
+from config.settings import TICK_DIR, TICK_FLUSH_INTERVAL, TICK_BUFFER_SIZE
+
+SEGMENT_SECONDS = 3600
+
+# Kolom per segment: satu file biner per kolom, lebar tetap agar bisa di-memmap tanpa decode.
+# ts disimpan sebagai delta mikrodetik dari awal jam segment (muat di uint32),
+# exchange dan simbol sebagai indeks ke kamus global.
+COLUMNS = {
+    'ts': np.uint32,
+    'exchange': np.uint8,
+    'symbol': np.uint16,
+    'bid': np.float64,
+    'ask': np.float64,
+    'last': np.float64,
+    'size': np.float32,
+}
+
+
+def segment_name(segment):
+    return time.strftime("%Y%m%d-%H", time.gmtime(segment * SEGMENT_SECONDS))
+
+
+class TickRecorder:
+    """
+    Perekam tick harga append-only berkolom, satu direktori per jam (UTC).
+    record() hanya menaruh tuple ke antrian; thread writer meng-encode dan menulis per batch,
+    sehingga collector dan stream tidak pernah menunggu disk. Jika antrian penuh tick tertua dibuang.
+    """
+
+    def __init__(self, directory=TICK_DIR, flush_interval=TICK_FLUSH_INTERVAL, buffer_size=TICK_BUFFER_SIZE):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._buffer = deque(maxlen=buffer_size)
+        self._received = 0
+        self._written = 0
+        self._lock = threading.Lock()
+        # Lock terpisah untuk antrian dan penghitung: record() tidak pernah menunggu flush yang menulis ke disk
+        self._buffer_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._last_offsets = {}
+
+        os.makedirs(directory, exist_ok=True)
+        self._dictionary_file = os.path.join(directory, "dictionary.json")
+        self.exchanges, self.symbols = self._load_dictionary()
+        self._exchange_ids = {name: i for i, name in enumerate(self.exchanges)}
+        self._symbol_ids = {name: i for i, name in enumerate(self.symbols)}
+
+    # Sisi penulis
+
+    def record(self, exchange_name, symbol, last, bid=None, ask=None, size=None, timestamp=None):
+        """Catat satu tick (harga dalam mata uang dasar exchange). Aman dipanggil dari thread mana pun."""
+        tick = (
+            time.time() if timestamp is None else timestamp,
+            exchange_name, symbol,
+            np.nan if bid is None else bid,
+            np.nan if ask is None else ask,
+            last,
+            np.nan if size is None else size,
+        )
+        with self._buffer_lock:
+            self._buffer.append(tick)
+            self._received += 1
+
+    def on_tick(self, exchange_name, symbol, price, received_at, bid=None, ask=None, size=None):
+        """Listener PriceBoard: setiap tick stream dan REST ikut direkam, dengan bid/ask/size jika stream mengirimnya"""
+        self.record(exchange_name, symbol, price, bid=bid, ask=ask, size=size, timestamp=received_at)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="tick-recorder", daemon=True)
+        self._thread.start()
+        atexit.register(self.stop)
+        logger.info(f"🎞️ Tick recorder aktif di {self.directory}")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+        self.flush()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"❌ Gagal menulis tick: {e}")
+
+    def flush(self):
+        """Tulis semua tick di antrian ke segment per jam; dipanggil oleh thread writer"""
+        with self._lock:
+            with self._buffer_lock:
+                batch = list(self._buffer)
+                self._buffer.clear()
+                received = self._received
+            # Tick yang tergeser deque penuh tidak pernah sampai ke batch
+            dropped = received - self._written - len(batch)
+            if dropped > 0:
+                TICKS_DROPPED.inc(dropped)
+                self._written += dropped
+            if not batch:
+                return 0
+
+            batch.sort(key=lambda tick: tick[0])
+            timestamps = np.array([tick[0] for tick in batch], dtype=np.float64)
+            dictionary_changed = False
+            exchange_ids = np.empty(len(batch), dtype=np.uint8)
+            symbol_ids = np.empty(len(batch), dtype=np.uint16)
+            for i, tick in enumerate(batch):
+                exchange_ids[i], new_exchange = self._encode(tick[1], self._exchange_ids, self.exchanges)
+                symbol_ids[i], new_symbol = self._encode(tick[2], self._symbol_ids, self.symbols)
+                dictionary_changed |= new_exchange or new_symbol
+            if dictionary_changed:
+                self._save_dictionary()
+
+            values = np.array([tick[3:] for tick in batch], dtype=np.float64)
+            segments = (timestamps // SEGMENT_SECONDS).astype(np.int64)
+            for segment in np.unique(segments):
+                rows = segments == segment
+                offsets = np.rint((timestamps[rows] - segment * SEGMENT_SECONDS) * 1e6)
+                self._append(int(segment), {
+                    'ts': offsets,
+                    'exchange': exchange_ids[rows],
+                    'symbol': symbol_ids[rows],
+                    'bid': values[rows, 0],
+                    'ask': values[rows, 1],
+                    'last': values[rows, 2],
+                    'size': values[rows, 3],
+                })
+
+            self._written += len(batch)
+            TICKS_RECORDED.inc(len(batch))
+            return len(batch)
+
+    @staticmethod
+    def _encode(name, ids, names):
+        index = ids.get(name)
+        if index is not None:
+            return index, False
+        index = ids[name] = len(names)
+        names.append(name)
+        return index, True
+
+    def _append(self, segment, columns):
+        path = os.path.join(self.directory, segment_name(segment))
+        os.makedirs(path, exist_ok=True)
+        # Batch sudah urut, tapi tick terlambat bisa lebih tua dari batch sebelumnya;
+        # segment seperti itu ditandai agar pembaca memakai mask, bukan searchsorted
+        offsets = columns['ts']
+        last = self._last_offsets.get(segment)
+        if last is not None and offsets[0] < last:
+            open(os.path.join(path, "unsorted"), "a").close()
+        self._last_offsets[segment] = offsets[-1]
+        # Kolom ts ditulis terakhir: panjangnya menandai jumlah baris yang lengkap di semua kolom
+        for name in [c for c in COLUMNS if c != 'ts'] + ['ts']:
+            with open(os.path.join(path, f"{name}.bin"), "ab") as f:
+                f.write(np.asarray(columns[name]).astype(COLUMNS[name]).tobytes())
+
+    def _load_dictionary(self):
+        try:
+            with open(self._dictionary_file) as f:
+                data = json.load(f)
+            return data['exchanges'], data['symbols']
+        except FileNotFoundError:
+            return [], []
+
+    def _save_dictionary(self):
+        tmp = self._dictionary_file + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({'exchanges': self.exchanges, 'symbols': self.symbols}, f)
+        os.replace(tmp, self._dictionary_file)
+
+    # Sisi pembaca
+
+    def segments(self, start=None, end=None):
+        """Daftar (segment, path) yang beririsan dengan [start, end) dalam epoch detik"""
+        found = []
+        for name in sorted(os.listdir(self.directory)):
+            path = os.path.join(self.directory, name)
+            if not os.path.isdir(path):
+                continue
+            try:
+                segment = calendar.timegm(time.strptime(name, "%Y%m%d-%H")) // SEGMENT_SECONDS
+            except ValueError:
+                continue
+            segment_start = segment * SEGMENT_SECONDS
+            if (end is None or segment_start < end) and (start is None or segment_start + SEGMENT_SECONDS > start):
+                found.append((segment, path))
+        return found
+
+    def iter_segments(self, start=None, end=None):
+        """
+        Kolom per segment sebagai view np.memmap (tanpa salin) yang dipotong ke [start, end).
+        Segment bertanda "unsorted" disaring dengan mask sehingga hasilnya berupa salinan.
+        ts tetap delta mikrodetik; pakai 'base' (epoch detik awal segment) untuk waktu absolut.
+        """
+        for segment, path in self.segments(start, end):
+            rows = os.path.getsize(os.path.join(path, "ts.bin")) // np.dtype(COLUMNS['ts']).itemsize
+            if rows == 0:
+                continue
+            columns = {
+                name: np.memmap(os.path.join(path, f"{name}.bin"), dtype=dtype, mode="r", shape=(rows,))
+                for name, dtype in COLUMNS.items()
+            }
+            base = segment * SEGMENT_SECONDS
+            ts = columns['ts']
+            if os.path.exists(os.path.join(path, "unsorted")):
+                mask = np.ones(rows, dtype=bool)
+                if start is not None:
+                    mask &= ts >= (start - base) * 1e6
+                if end is not None:
+                    mask &= ts < (end - base) * 1e6
+                if mask.any():
+                    yield base, {name: column[mask] for name, column in columns.items()}
+                continue
+            lo = 0 if start is None else int(np.searchsorted(ts, max(0.0, (start - base) * 1e6), side="left"))
+            hi = rows if end is None else int(np.searchsorted(ts, (end - base) * 1e6, side="left"))
+            if hi > lo:
+                yield base, {name: column[lo:hi] for name, column in columns.items()}
+
+    def read(self, start=None, end=None, exchange=None, symbol=None):
+        """
+        Gabungan semua segment dalam [start, end) dengan kolom 'ts' dalam epoch detik (float64).
+        Filter exchange/simbol opsional. Hasil berupa salinan; untuk data besar pakai iter_segments.
+        """
+        parts = []
+        for base, columns in self.iter_segments(start, end):
+            mask = np.ones(len(columns['ts']), dtype=bool)
+            if exchange is not None:
+                mask &= columns['exchange'] == self._exchange_ids.get(exchange, -1)
+            if symbol is not None:
+                mask &= columns['symbol'] == self._symbol_ids.get(symbol, -1)
+            part = {name: column[mask] for name, column in columns.items()}
+            part['ts'] = base + part['ts'].astype(np.float64) / 1e6
+            parts.append(part)
+        if not parts:
+            return {name: np.empty(0, dtype=np.float64 if name == 'ts' else dtype) for name, dtype in COLUMNS.items()}
+        return {name: np.concatenate([part[name] for part in parts]) for name in COLUMNS}
+
+
+tick_recorder = None
+
+
+def get_tick_recorder():
+    """Recorder bersama untuk seluruh proses, dibuat saat pertama dipakai"""
+    global tick_recorder
+    if tick_recorder is None:
+        tick_recorder = TickRecorder()
+    return tick_recorder
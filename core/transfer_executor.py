@@ -1,7 +1,8 @@
 # core/transfer_executor.py
 from utils.helpers import get_wallet_address, calculate_net_profit, convert_to_usd, get_usd_to_idr_rate
 from config.settings import MIN_PROFIT_THRESHOLD_USD, MIN_PROFIT_THRESHOLD_PERCENT
-from utils.logger import logger
+import logging
+from utils.logger import logger, log_event
 
 class RealTradeExecutor:
     def __init__(self, *exchanges):
@@ -30,34 +31,26 @@ class RealTradeExecutor:
             'usd_to_idr': opportunity['usd_to_idr']
         })
         
-        # Tampilkan log detail meski tidak layak
-        logger.info(f"""
-        ┌────────────────────────────────────────────────────┐
-        │ 📈 Peluang Arbitrase: {symbol}                  │
-        ├────────────────────────────────────────────────────┤
-        │ Pembelian: {profit_data['buy_exchange']}       │
-        │ Harga Beli: ${profit_data['buy_price']:.6f}   │
-        ├────────────────────────────────────────────────────┤
-        │ Penjualan: {profit_data['sell_exchange']}      │
-        │ Harga Jual: ${profit_data['sell_price']:.6f} │
-        ├────────────────────────────────────────────────────┤
-        │ Biaya Transaksi:                               │
-        │   - Trading Buy: ${profit_data['fee_details']['trading_buy']:.6f}  │
-        │   - Trading Sell: ${profit_data['fee_details']['trading_sell']:.6f}│
-        │   - Transfer Koin: ${profit_data['fee_details']['coin_transfer']:.6f} │
-        │   - Transfer Fiat: ${profit_data['fee_details']['fiat_transfer']:.6f} │
-        ├────────────────────────────────────────────────────┤
-        │ Profit Kotor: ${profit_data['gross_profit']:.6f} │
-        │ Profit Bersih: ${profit_data['net_profit']:.6f}  │
-        │ Persentase Profit: {profit_data['net_profit_percent']:.2f}% │
-        │ Status: {"✅ Layak" if profit_data['is_executable'] else "❌ Tidak Layak"} │
-        ├────────────────────────────────────────────────────┤
-        │ Volume Minimum: {profit_data.get('required_amount', 0):.6f} {symbol} │
-        │ Saldo Penjual: {opportunity.get('sell_balance', 0):.6f} {symbol} (≈${opportunity.get('sell_balance', 0) * sell_price:.6f}) │
-        │ Saldo Pembeli: ${opportunity.get('buy_fiat_balance', 0):.6f} USD     │
-        └────────────────────────────────────────────────────┘
-        """)
-        
+        # Tampilkan log ringkas meski tidak layak
+        fees = profit_data['fee_details']
+        log_event(
+            logger, logging.INFO, "execution_check",
+            f"📈 {symbol} {profit_data['buy_exchange']} ${profit_data['buy_price']:.6f} → "
+            f"{profit_data['sell_exchange']} ${profit_data['sell_price']:.6f} | "
+            f"net ${profit_data['net_profit']:.6f} ({profit_data['net_profit_percent']:.2f}%) | "
+            f"{'✅ Layak' if profit_data['is_executable'] else '❌ Tidak Layak'}",
+            symbol=symbol,
+            gross_profit=profit_data['gross_profit'],
+            net_profit=profit_data['net_profit'],
+            fee_trading_buy=fees['trading_buy'],
+            fee_trading_sell=fees['trading_sell'],
+            fee_coin_transfer=fees['coin_transfer'],
+            fee_fiat_transfer=fees['fiat_transfer'],
+            required_amount=profit_data.get('required_amount', 0),
+            sell_balance=opportunity.get('sell_balance', 0),
+            buy_fiat_balance=opportunity.get('buy_fiat_balance', 0),
+        )
+
         # Hanya eksekusi jika layak
         if profit_data['is_executable']:
             logger.info(f"✅ Transaksi {symbol} berhasil: Profit: ${profit_data['net_profit']:.6f}")
@@ -1,42 +1,219 @@
-from utils.helpers import get_wallet_address
-from utils.logger import logger
+import time
+import uuid
+import asyncio
+import logging
+from contextlib import AsyncExitStack
+from exchanges.markets import market_metadata
+from utils.helpers import get_wallet_address, get_usd_to_idr_rate
+from utils.logger import logger, log_event
+from utils.balance_cache import balance_cache
+from utils.metrics import EXECUTION_SECONDS, OPPORTUNITIES, ORDER_LEG_SECONDS
 from strategies.balance_rotator import BalanceRotator
+from config.settings import EXECUTION_MODE, EXECUTION_SLIPPAGE
 
 class TransferManager:
-    def __init__(self, exchanges):
+    """
+    Eksekusi peluang. Mode "concurrent": leg beli dan jual dikirim bersamaan sebagai order IOC
+    di exchange yang saldonya sudah siap, peluang yang tidak berbagi saldo berjalan paralel.
+    Mode "transfer" (default): alur lama (putar saldo lalu withdraw koin), satu peluang per waktu.
+    Jika jumlah terisi kedua leg berbeda, selisihnya langsung dibalik dengan order market.
+    Setiap peluang memegang lock (exchange, aset) yang dipakainya, diambil berurutan agar tidak deadlock.
+    """
+
+    def __init__(self, exchanges, mode=EXECUTION_MODE, slippage=EXECUTION_SLIPPAGE):
         self.exchanges = {ex.__class__.__name__.lower(): ex for ex in exchanges}
         self.balance_rotator = BalanceRotator(exchanges)
+        self.mode = mode
+        self.slippage = slippage
+        self._locks = {}
+
+    async def execute_many(self, opportunities):
+        """Eksekusi banyak peluang; kembalikan [bool] sesuai urutan input"""
+        if self.mode != "concurrent":
+            return [await self.execute_arbitrage(opportunity) for opportunity in opportunities]
+        return await asyncio.gather(*(self.execute_arbitrage(opportunity) for opportunity in opportunities))
 
     async def execute_arbitrage(self, opportunity):
+        start = time.perf_counter()
+        async with AsyncExitStack() as stack:
+            for key in self._lock_keys(opportunity):
+                await stack.enter_async_context(self._locks.setdefault(key, asyncio.Lock()))
+            if self.mode == "concurrent":
+                success = await self._execute_legs(opportunity)
+            else:
+                success = await self._execute_arbitrage(opportunity)
+        result = "executed" if success else "failed"
+        EXECUTION_SECONDS.labels(result).observe(time.perf_counter() - start)
+        OPPORTUNITIES.labels(result).inc()
+        return success
+
+    def _lock_keys(self, opportunity):
+        """Saldo yang disentuh peluang: mata uang dasar di exchange beli dan koin di exchange jual"""
+        buy_name, sell_name = opportunity['buy_exchange'], opportunity['sell_exchange']
+        return sorted({
+            (buy_name, self.exchanges[buy_name].get_base_currency()),
+            (sell_name, opportunity['symbol']),
+        })
+
+    async def _execute_legs(self, opportunity):
+        symbol = opportunity['symbol']
+        buy_name, sell_name = opportunity['buy_exchange'], opportunity['sell_exchange']
+        buy_ex, sell_ex = self.exchanges[buy_name], self.exchanges[sell_name]
+        decided_at = opportunity.get('decided_at') or time.time()
+
+        if not opportunity.get('executable', True) or opportunity.get('required_amount', 0) <= 0:
+            logger.warning(f"⚠️ Peluang {symbol} tidak layak dieksekusi, dilewati")
+            return False
+
+        usd_to_idr = get_usd_to_idr_rate()
+        buy_price = self._venue_price(buy_ex, opportunity['buy_price'] * (1 + self.slippage), usd_to_idr)
+        sell_price = self._venue_price(sell_ex, opportunity['sell_price'] * (1 - self.slippage), usd_to_idr)
+        buy_market = market_metadata.market(buy_name, symbol)
+        sell_market = market_metadata.market(sell_name, symbol)
+        amount = opportunity['required_amount']
+        for market in (buy_market, sell_market):
+            if market is not None:
+                amount = market.round_qty(amount)
+        if buy_market is not None:
+            buy_price = buy_market.round_price(buy_price)
+        if sell_market is not None:
+            sell_price = sell_market.round_price(sell_price)
+
+        try:
+            quote_free, coin_free = await asyncio.gather(
+                balance_cache.get_free_async(buy_ex, buy_ex.get_base_currency()),
+                balance_cache.get_free_async(sell_ex, symbol),
+            )
+            if amount <= 0 or quote_free < amount * buy_price or coin_free < amount:
+                logger.warning(f"⚠️ Saldo belum siap untuk {amount} {symbol}: "
+                               f"{buy_name} {quote_free:.2f} {buy_ex.get_base_currency()}, {sell_name} {coin_free} {symbol}")
+                return False
+
+            # Kedua leg dikirim bersamaan; client order id sama untuk retry yang idempoten
+            order_id = uuid.uuid4().hex[:16]
+            buy_order, sell_order = await asyncio.gather(
+                self._place_leg(buy_ex, buy_market, symbol, "buy", amount, buy_price, f"arb-{order_id}-b", decided_at),
+                self._place_leg(sell_ex, sell_market, symbol, "sell", amount, sell_price, f"arb-{order_id}-s", decided_at),
+            )
+        except Exception as e:
+            logger.error(f"🚨 Error eksekusi arbitrase: {e}")
+            return False
+        finally:
+            balance_cache.invalidate(buy_ex)
+            balance_cache.invalidate(sell_ex)
+
+        bought = float((buy_order or {}).get('filled') or 0)
+        sold = float((sell_order or {}).get('filled') or 0)
+        tolerance = max((market.lot_size for market in (buy_market, sell_market) if market is not None), default=0)
+        if abs(bought - sold) > max(tolerance, amount * 1e-9):
+            logger.error(f"🚨 {symbol}: leg tidak seimbang (beli {buy_name} {bought}, jual {sell_name} {sold}), "
+                         f"selisih dibalik")
+            await self._unwind(opportunity, buy_ex, buy_market, sell_ex, sell_market, bought - sold,
+                               buy_price, sell_price, f"arb-{order_id}", decided_at)
+        if bought >= amount * (1 - 1e-9) and sold >= amount * (1 - 1e-9):
+            logger.info(f"✅ {symbol}: beli {buy_name} dan jual {sell_name} terisi penuh")
+            return True
+        if bought or sold:
+            logger.warning(f"⚠️ {symbol}: hanya terisi sebagian (beli {bought}, jual {sold} dari {amount})")
+        else:
+            logger.warning(f"⚠️ {symbol}: kedua leg tidak terisi")
+        return False
+
+    async def _unwind(self, opportunity, buy_ex, buy_market, sell_ex, sell_market, excess, buy_price, sell_price,
+                      client_order_id, decided_at):
+        """
+        Kembalikan posisi setelah leg tidak seimbang: kelebihan beli dijual lagi di exchange beli,
+        kelebihan jual dibeli kembali di exchange jual, sebagai order market.
+        """
+        symbol = opportunity['symbol']
+        if excess > 0:
+            exchange, market, side, price = buy_ex, buy_market, "sell", buy_price
+        else:
+            exchange, market, side, price = sell_ex, sell_market, "buy", sell_price
+        amount = market.round_qty(abs(excess)) if market is not None else abs(excess)
+        name = exchange.__class__.__name__.lower()
+        if amount <= 0:
+            logger.error(f"🚨 Selisih {abs(excess)} {symbol} di {name} di bawah lot minimum, perlu ditangani manual")
+            return None
+        venue_symbol = market.venue_symbol if market is not None else symbol
+        try:
+            order = await exchange.create_order_async(venue_symbol, side, amount, price, "market", None,
+                                                      f"{client_order_id}-u")
+        except Exception as e:
+            logger.error(f"❌ Order pembalik {side} {amount} {symbol} di {name} gagal: {e}")
+            order = None
+        finally:
+            balance_cache.invalidate(exchange)
+        if not order or not order.get('filled'):
+            logger.error(f"🚨 Posisi {symbol} di {name} belum seimbang ({side} {amount}), perlu ditangani manual")
+        log_event(
+            logger, logging.WARNING, "execution_unwind",
+            f"↩️ {side.upper()} {amount} {symbol} di {name} untuk menyeimbangkan leg: {(order or {}).get('status', 'gagal')}",
+            exchange=name, side=side, symbol=symbol, amount=amount, client_order_id=f"{client_order_id}-u",
+            latency_ms=(time.time() - decided_at) * 1000, status=(order or {}).get('status'),
+            filled=(order or {}).get('filled'),
+        )
+        return order
+
+    async def _place_leg(self, exchange, market, symbol, side, amount, price, client_order_id, decided_at):
+        name = exchange.__class__.__name__.lower()
+        venue_symbol = market.venue_symbol if market is not None else symbol
+        try:
+            order = await exchange.create_order_async(
+                venue_symbol, side, amount, price, "limit", "IOC", client_order_id
+            )
+        except Exception as e:
+            logger.error(f"❌ Order {side} {symbol} di {name} gagal: {e}")
+            order = None
+
+        latency = time.time() - decided_at
+        ORDER_LEG_SECONDS.labels(name, side).observe(latency)
+        log_event(
+            logger, logging.INFO, "execution_leg",
+            "🧾 %s %s %s @ %s di %s: %s (%.0fms sejak keputusan)", side.upper(), amount, symbol, price, name,
+            (order or {}).get('status', 'gagal'), latency * 1000,
+            exchange=name, side=side, symbol=symbol, amount=amount, price=price,
+            client_order_id=client_order_id, latency_ms=latency * 1000,
+            status=(order or {}).get('status'), filled=(order or {}).get('filled'),
+        )
+        return order
+
+    def _venue_price(self, exchange, usd_price, usd_to_idr):
+        return usd_price * usd_to_idr if exchange.get_base_currency() == "IDR" else usd_price
+
+    async def _execute_arbitrage(self, opportunity):
         symbol = opportunity['symbol']
         buy_ex = self.exchanges[opportunity['buy_exchange']]
         sell_ex = self.exchanges[opportunity['sell_exchange']]
         amount = opportunity['required_amount']
-        
+
         try:
             # 1. Putar saldo ke posisi yang diperlukan
             await self.balance_rotator.prepare_for_arbitrage(opportunity)
-            
+
             # 2. Transfer koin ke exchange pembeli
             wallet_info = get_wallet_address(buy_ex, symbol)
-            
+
             logger.info(f"🔁 Transfer {amount} {symbol} dari {sell_ex.__class__.__name__} ke {buy_ex.__class__.__name__}")
-            success = sell_ex.transfer_coin(
+            success = await sell_ex.transfer_coin_async(
                 symbol,
                 amount,
                 wallet_info['address'],
                 wallet_info.get('tag'),
                 wallet_info.get('network')
             )
-            
+
             if not success:
                 logger.error("❌ Transfer gagal")
                 return False
-            
+
+            balance_cache.invalidate(sell_ex)
+            balance_cache.invalidate(buy_ex)
+
             # 3. Eksekusi arbitrase
             # (Implementasi eksekusi trading akan ditambahkan di sini)
-            
+
             return True
         except Exception as e:
             logger.error(f"🚨 Error eksekusi arbitrase: {e}")
-            return False
\ No newline at end of file
+            return False
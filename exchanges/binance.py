@@ -1,66 +1,98 @@
 import os
 import hmac
 import hashlib
-import requests
-import time
 import logging
 from urllib.parse import urlencode
-from .exchange_interface import Exchange
+from .exchange_interface import Exchange, ORDER_OPEN, ORDER_FILLED, ORDER_CANCELED, ORDER_REJECTED
+from .markets import Market, format_decimal
+from config.settings import BINANCE_RECV_WINDOW, BINANCE_REST_URL
 
 logger = logging.getLogger(__name__)
 
 class Binance(Exchange):
-    BASE_URL = "https://api.binance.com"
+    BASE_URL = BINANCE_REST_URL
+    ORDER_STATUS = {
+        "NEW": ORDER_OPEN, "PARTIALLY_FILLED": ORDER_OPEN, "FILLED": ORDER_FILLED,
+        "CANCELED": ORDER_CANCELED, "PENDING_CANCEL": ORDER_CANCELED, "EXPIRED": ORDER_CANCELED,
+        "EXPIRED_IN_MATCH": ORDER_CANCELED, "REJECTED": ORDER_REJECTED,
+    }
 
     def __init__(self):
         self.api_key = os.getenv("BINANCE_API_KEY")
         self.api_secret = os.getenv("BINANCE_SECRET_KEY")
         if not self.api_key or not self.api_secret:
             raise ValueError("Binance API key dan secret wajib di-set")
-        self.session = requests.Session()
-        self.session.headers.update({"X-MBX-APIKEY": self.api_key})
+        self.default_headers = {"X-MBX-APIKEY": self.api_key}
+        # Objek HMAC yang sudah berisi key, di-copy untuk setiap tanda tangan
+        self._hmac = hmac.new(self.api_secret.encode('utf-8'), digestmod=hashlib.sha256)
         logger.info("✅ Binance client initialized")
 
     def get_base_currency(self):
         return "USDT"
 
-    def _signed_request(self, method, endpoint, params=None):
+    async def _signed_request(self, method, endpoint, params=None):
         if params is None:
             params = {}
 
-        params['timestamp'] = int(time.time() * 1000)
+        params['timestamp'] = self._timestamp_ms()
+        params.setdefault('recvWindow', BINANCE_RECV_WINDOW)
         query_string = urlencode(params, doseq=True)
 
-        signature = hmac.new(
-            self.api_secret.encode('utf-8'),
-            query_string.encode('utf-8'),
-            hashlib.sha256
-        ).hexdigest()
+        signature = self._hmac.copy()
+        signature.update(query_string.encode('utf-8'))
 
-        params['signature'] = signature
+        params['signature'] = signature.hexdigest()
 
-        url = f"{self.BASE_URL}{endpoint}"
         try:
-            if method.upper() == "GET":
-                response = self.session.get(url, params=params, timeout=10)
+            if method.upper() in ("GET", "DELETE"):
+                response = await self._request_async(method.upper(), endpoint, params=params, timeout=10)
             else:
-                response = self.session.post(url, data=params, timeout=10)
+                response = await self._request_async("POST", endpoint, data=params, timeout=10)
 
             response.raise_for_status()
             return response.json()
         except Exception as e:
-            logger.error(f"❌ Request gagal: {e}, URL: {url}, Params: {params}")
+            logger.error(f"❌ Request gagal: {e}, URL: {self.BASE_URL}{endpoint}, Params: {params}")
             return None
 
-    def fetch_ticker(self, symbol):
+    async def fetch_server_time_async(self):
+        try:
+            response = await self._request_async("GET", "/api/v3/time", timeout=5)
+            response.raise_for_status()
+            return int(response.json()["serverTime"])
+        except Exception as e:
+            logger.error(f"❌ Gagal ambil waktu server Binance: {e}")
+            return None
+
+    async def fetch_markets_async(self):
+        try:
+            response = await self._request_async("GET", "/api/v3/exchangeInfo", timeout=15)
+            response.raise_for_status()
+            markets = []
+            for item in response.json()['symbols']:
+                filters = {f['filterType']: f for f in item.get('filters', [])}
+                notional = filters.get('NOTIONAL') or filters.get('MIN_NOTIONAL') or {}
+                markets.append(Market(
+                    item['symbol'], item['baseAsset'], item['quoteAsset'],
+                    tick_size=filters.get('PRICE_FILTER', {}).get('tickSize'),
+                    lot_size=filters.get('LOT_SIZE', {}).get('stepSize'),
+                    min_qty=filters.get('LOT_SIZE', {}).get('minQty'),
+                    min_notional=notional.get('minNotional'),
+                    active=item.get('status') == "TRADING",
+                ))
+            return markets
+        except Exception as e:
+            logger.error(f"❌ Gagal fetch exchangeInfo Binance: {e}")
+            return []
+
+    async def fetch_ticker_async(self, symbol):
         try:
             # Pastikan symbol uppercase dan sudah lengkap (contoh: BTCUSDT)
             symbol = symbol.upper()
             if not symbol.endswith("USDT"):
                 symbol += "USDT"
 
-            url = f"{self.BASE_URL}/api/v3/ticker/price"
-            response = self.session.get(url, params={"symbol": symbol}, timeout=10)
+            response = await self._request_async("GET", "/api/v3/ticker/price", params={"symbol": symbol}, timeout=10)
             response.raise_for_status()
             data = response.json()
 
@@ -74,9 +106,121 @@ class Binance(Exchange):
             logger.error(f"❌ Gagal fetch ticker {symbol}: {e}")
             return 0.0
 
-    def fetch_balance(self):
+    async def fetch_tickers_async(self, symbols):
+        # Satu request /ticker/price tanpa parameter symbol untuk semua market
+        pairs = {}
+        for symbol in symbols:
+            pair = symbol.upper()
+            if "/" in pair:
+                # Pair lengkap BASE/QUOTE (mis. XRP/BTC) untuk market selain USDT
+                pair = pair.replace("/", "")
+            elif not pair.endswith("USDT"):
+                pair += "USDT"
+            pairs[symbol] = pair
+
         try:
-            data = self._signed_request("GET", "/api/v3/account")
+            response = await self._request_async("GET", "/api/v3/ticker/price", timeout=10)
+            response.raise_for_status()
+            data = response.json()
+
+            all_prices = {item['symbol']: float(item['price']) for item in data}
+            return {symbol: all_prices.get(pair, 0.0) for symbol, pair in pairs.items()}
+
+        except Exception as e:
+            logger.error(f"❌ Gagal fetch tickers Binance: {e}")
+            return {symbol: 0.0 for symbol in symbols}
+
+    async def fetch_tickers_24h_async(self):
+        try:
+            response = await self._request_async("GET", "/api/v3/ticker/24hr", timeout=15)
+            response.raise_for_status()
+            return {item['symbol']: (float(item['lastPrice']), float(item['quoteVolume'])) for item in response.json()}
+        except Exception as e:
+            logger.error(f"❌ Gagal fetch ticker 24 jam Binance: {e}")
+            return {}
+
+    async def fetch_order_book_async(self, symbol, depth=20):
+        symbol = symbol.upper()
+        if not symbol.endswith("USDT"):
+            symbol += "USDT"
+
+        try:
+            response = await self._request_async("GET", "/api/v3/depth", params={"symbol": symbol, "limit": depth}, timeout=10)
+            response.raise_for_status()
+            data = response.json()
+            return {
+                'bids': [(float(p), float(q)) for p, q in data['bids']],
+                'asks': [(float(p), float(q)) for p, q in data['asks']],
+                'sequence': data.get('lastUpdateId'),
+            }
+        except Exception as e:
+            logger.error(f"❌ Gagal fetch order book {symbol}: {e}")
+            return {'bids': [], 'asks': [], 'sequence': None}
+
+    def _pair(self, symbol):
+        pair = symbol.upper()
+        if "/" in pair:
+            return pair.replace("/", "")
+        return pair if pair.endswith("USDT") else pair + "USDT"
+
+    def _parse_order(self, data):
+        filled = float(data.get('executedQty', 0))
+        quote = float(data.get('cummulativeQuoteQty', 0))
+        return {
+            'id': str(data['orderId']),
+            'client_order_id': data.get('clientOrderId'),
+            'status': self.ORDER_STATUS.get(data.get('status'), ORDER_OPEN),
+            'filled': filled,
+            'price': quote / filled if filled else float(data.get('price', 0)),
+        }
+
+    async def create_order_async(self, symbol, side, amount, price=None, order_type="limit",
+                                 time_in_force=None, client_order_id=None):
+        # Binance spot tidak punya endpoint batch order; create_orders_async memakai default paralel
+        if order_type == "limit" and price is None:
+            logger.error(f"❌ Order {self._pair(symbol)} tidak dikirim: limit order butuh price")
+            return None
+        params = {
+            'symbol': self._pair(symbol),
+            'side': side.upper(),
+            'type': order_type.upper(),
+            'quantity': format_decimal(amount),
+            'newOrderRespType': "RESULT",
+        }
+        if order_type == "limit":
+            params['price'] = format_decimal(price)
+            params['timeInForce'] = (time_in_force or "GTC").upper()
+        if client_order_id:
+            params['newClientOrderId'] = client_order_id
+
+        data = await self._signed_request("POST", "/api/v3/order", params)
+        if data is None or 'orderId' not in data:
+            return await self._recover_order_async(symbol, client_order_id)
+        return self._parse_order(data)
+
+    async def cancel_order_async(self, symbol, order_id=None, client_order_id=None):
+        params = {'symbol': self._pair(symbol)}
+        if order_id is not None:
+            params['orderId'] = order_id
+        else:
+            params['origClientOrderId'] = client_order_id
+        data = await self._signed_request("DELETE", "/api/v3/order", params)
+        return data is not None and 'orderId' in data
+
+    async def fetch_order_async(self, symbol, order_id=None, client_order_id=None):
+        params = {'symbol': self._pair(symbol)}
+        if order_id is not None:
+            params['orderId'] = order_id
+        else:
+            params['origClientOrderId'] = client_order_id
+        data = await self._signed_request("GET", "/api/v3/order", params)
+        if data is None or 'orderId' not in data:
+            return None
+        return self._parse_order(data)
+
+    async def fetch_balance_async(self):
+        try:
+            data = await self._signed_request("GET", "/api/v3/account")
             if data is None:
                 return {}
             return {item['asset']: {'free': float(item['free'])} for item in data['balances']}
@@ -84,12 +228,11 @@ class Binance(Exchange):
             logger.error(f"❌ Gagal fetch balance: {e}")
             return {}
 
-    def transfer_coin(self, symbol, amount, address, tag=None, network=None):
+    async def transfer_coin_async(self, symbol, amount, address, tag=None, network=None):
         params = {
             'asset': symbol.upper(),
             'address': address,
-            'amount': amount,
-            'timestamp': int(time.time() * 1000)
+            'amount': amount
         }
 
         if tag:
@@ -98,8 +241,45 @@ class Binance(Exchange):
             params['network'] = network
 
         try:
-            data = self._signed_request("POST", "/sapi/v1/capital/withdraw/apply", params)
+            data = await self._signed_request("POST", "/sapi/v1/capital/withdraw/apply", params)
             return data is not None and 'id' in data
         except Exception as e:
             logger.error(f"❌ Gagal transfer: {e}")
             return False
+
+    # API sync: wrapper tipis di atas versi async
+
+    def fetch_markets(self):
+        return self._run_sync(self.fetch_markets_async())
+
+    def fetch_tickers_24h(self):
+        return self._run_sync(self.fetch_tickers_24h_async())
+
+    def fetch_ticker(self, symbol):
+        return self._run_sync(self.fetch_ticker_async(symbol))
+
+    def fetch_tickers(self, symbols):
+        return self._run_sync(self.fetch_tickers_async(symbols))
+
+    def fetch_order_book(self, symbol, depth=20):
+        return self._run_sync(self.fetch_order_book_async(symbol, depth))
+
+    def create_order(self, symbol, side, amount, price=None, order_type="limit", time_in_force=None,
+                     client_order_id=None):
+        return self._run_sync(self.create_order_async(symbol, side, amount, price, order_type, time_in_force,
+                                                      client_order_id))
+
+    def create_orders(self, orders):
+        return self._run_sync(self.create_orders_async(orders))
+
+    def cancel_order(self, symbol, order_id=None, client_order_id=None):
+        return self._run_sync(self.cancel_order_async(symbol, order_id, client_order_id))
+
+    def fetch_order(self, symbol, order_id=None, client_order_id=None):
+        return self._run_sync(self.fetch_order_async(symbol, order_id, client_order_id))
+
+    def fetch_balance(self):
+        return self._run_sync(self.fetch_balance_async())
+
+    def transfer_coin(self, symbol, amount, address, tag=None, network=None):
+        return self._run_sync(self.transfer_coin_async(symbol, amount, address, tag, network))
@@ -1,6 +1,6 @@
 import os
-import requests
 from utils.logger import logger
+from .http_client import http_pool
 
 class Bybit:
     def __init__(self):
@@ -14,7 +14,7 @@ class Bybit:
 
         logger.info("✅ Bybit client initialized successfully")
 
-    def fetch_ticker(self, symbol):
+    async def fetch_ticker_async(self, symbol):
         """
         Fetch harga terbaru untuk simbol tertentu.
         Mapping simbol standar ke pair Bybit.
@@ -24,8 +24,7 @@ class Bybit:
             # Mapping symbol ke pair Bybit
             pair = symbol.upper() + "USDT"  # contoh: BTC -> BTCUSDT
 
-            url = f"{self.base_url}/v2/public/tickers?symbol={pair}"
-            response = requests.get(url, timeout=10)
+            response = await http_pool.request(self.base_url, "GET", "/v2/public/tickers", params={"symbol": pair}, timeout=10)
             response.raise_for_status()
             data = response.json()
 
@@ -40,7 +39,7 @@ class Bybit:
             logger.error(f"🚨 Gagal fetch ticker Bybit {symbol}: {e}")
             return None
 
-    def fetch_balance(self):
+    async def fetch_balance_async(self):
         """
         Contoh dummy balance fetch, perlu diimplementasi sesuai API Bybit v2 atau v5.
         Biasanya perlu auth signature, contoh minimal:
@@ -54,3 +53,9 @@ class Bybit:
             'BNB': {'free': 0.0},
             'XRP': {'free': 0.0},
         }
+
+    def fetch_ticker(self, symbol):
+        return http_pool.run_sync(self.fetch_ticker_async(symbol))
+
+    def fetch_balance(self):
+        return http_pool.run_sync(self.fetch_balance_async())
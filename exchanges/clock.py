@@ -0,0 +1,76 @@
+import time
+import asyncio
+import threading
+from utils.logger import logger
+from config.settings import CLOCK_SYNC_INTERVAL, CLOCK_SYNC_SAMPLES, CLOCK_MAX_OFFSET_MS
+
+
+class ServerClock:
+    """
+    Offset jam lokal terhadap server tiap exchange, diestimasi dari endpoint server-time.
+    Dari beberapa sampel dipakai yang RTT-nya paling kecil:
+    offset = waktu_server - titik tengah (kirim, terima).
+    """
+
+    def __init__(self):
+        self._offsets = {}
+        self._lock = threading.Lock()
+        self._task = None
+
+    def now_ms(self, exchange_name):
+        """Timestamp milidetik menurut jam server exchange (jam lokal jika belum dikalibrasi)"""
+        with self._lock:
+            entry = self._offsets.get(exchange_name)
+        offset = entry[0] if entry else 0.0
+        return int(time.time() * 1000 + offset)
+
+    def offset(self, exchange_name):
+        """(offset_ms, rtt_ms) terakhir atau None"""
+        with self._lock:
+            entry = self._offsets.get(exchange_name)
+        return entry[:2] if entry else None
+
+    async def calibrate(self, exchange, samples=CLOCK_SYNC_SAMPLES):
+        name = exchange.__class__.__name__.lower()
+        best = None
+        for _ in range(samples):
+            sent = time.time() * 1000
+            server_ms = await exchange.fetch_server_time_async()
+            received = time.time() * 1000
+            if server_ms is None:
+                continue
+            rtt = received - sent
+            if best is None or rtt < best[1]:
+                best = (server_ms - (sent + received) / 2, rtt)
+
+        if best is None:
+            logger.warning(f"⚠️ Gagal kalibrasi jam {name}, pakai jam lokal")
+            return None
+
+        offset, rtt = best
+        with self._lock:
+            self._offsets[name] = (offset, rtt, time.time())
+        if abs(offset) > CLOCK_MAX_OFFSET_MS:
+            logger.warning(f"⚠️ Jam lokal selisih {offset:+.0f}ms dari server {name} (RTT {rtt:.0f}ms), offset diterapkan")
+        else:
+            logger.info(f"🕒 Jam {name}: offset {offset:+.0f}ms, RTT {rtt:.0f}ms")
+        return best
+
+    async def calibrate_all(self, exchanges):
+        await asyncio.gather(*(self.calibrate(exchange) for exchange in exchanges))
+
+    def start(self, exchanges):
+        """Kalibrasi ulang berkala di event loop yang sedang berjalan"""
+        async def loop():
+            while True:
+                await asyncio.sleep(CLOCK_SYNC_INTERVAL)
+                try:
+                    await self.calibrate_all(exchanges)
+                except Exception as e:
+                    logger.error(f"❌ Kalibrasi jam gagal: {e}")
+
+        self._task = asyncio.create_task(loop(), name="server-clock")
+        return self._task
+
+
+server_clock = ServerClock()
@@ -1,7 +1,29 @@
+import re
+import time
+import asyncio
+import httpx
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+from .http_client import http_pool
+from .rate_limiter import rate_limiter
+from .clock import server_clock
+from .markets import market_metadata
+from utils.metrics import EXCHANGE_REQUEST_SECONDS, EXCHANGE_REQUEST_ERRORS
+
+# Segmen pair/id order di path (contoh /api/ticker/btcidr, /orders/123) diganti agar label metrics tidak meledak
+_PAIR_SEGMENT = re.compile(r"(/(?:ticker|depth|markets|orders|client-order)/)[^/]+")
+
+# Status order ternormalisasi yang dikembalikan semua adapter
+ORDER_OPEN = "open"
+ORDER_FILLED = "filled"
+ORDER_CANCELED = "canceled"
+ORDER_REJECTED = "rejected"
 
 class Exchange(ABC):
+    BASE_URL = None
+    # Header yang dikirim di setiap request (contoh: API key Binance)
+    default_headers: Dict[str, str] = {}
+
     @abstractmethod
     def get_base_currency(self) -> str:
         """Dapatkan mata uang dasar exchange (contoh: 'USDT', 'IDR')"""
@@ -12,6 +34,18 @@ class Exchange(ABC):
         """Ambil harga koin dalam mata uang dasar exchange"""
         pass
 
+    def fetch_tickers(self, symbols: List[str]) -> Dict[str, float]:
+        """Ambil harga banyak koin sekaligus dalam format {symbol: harga}, harga 0.0 jika tidak ada"""
+        return {symbol: self.fetch_ticker(symbol) for symbol in symbols}
+
+    @abstractmethod
+    def fetch_order_book(self, symbol: str, depth: int = 20) -> Dict[str, Any]:
+        """
+        Ambil order book dalam mata uang dasar exchange:
+        {'bids': [(harga, qty), ...] menurun, 'asks': [(harga, qty), ...] menaik, 'sequence': int atau None}
+        """
+        pass
+
     @abstractmethod
     def fetch_balance(self) -> Dict[str, Dict[str, float]]:
         """Ambil seluruh saldo dalam format {asset: {'free': float, 'locked': float}}"""
@@ -19,12 +53,166 @@ class Exchange(ABC):
 
     @abstractmethod
     def transfer_coin(
-        self, 
-        symbol: str, 
-        amount: float, 
-        address: str, 
+        self,
+        symbol: str,
+        amount: float,
+        address: str,
         tag: Optional[str] = None,
         network: Optional[str] = None
     ) -> bool:
         """Transfer koin ke alamat tertentu"""
-        pass
\ No newline at end of file
+        pass
+
+    def create_order(
+        self,
+        symbol: str,
+        side: str,
+        amount: float,
+        price: Optional[float] = None,
+        order_type: str = "limit",
+        time_in_force: Optional[str] = None,
+        client_order_id: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Pasang order beli/jual dalam mata uang dasar exchange. order_type "limit" atau "market",
+        time_in_force "GTC", "IOC" atau "FOK" (limit saja). client_order_id membuat retry idempoten.
+        Returns:
+            {'id', 'client_order_id', 'status', 'filled', 'price'} dengan status open/filled/canceled/rejected,
+            filled jumlah koin terisi dan price harga rata-rata terisi (harga limit jika belum terisi);
+            None jika gagal atau belum didukung
+        """
+        return None
+
+    def create_orders(self, orders: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        """Banyak order sekaligus; setiap item berisi argumen create_order. Hasil sesuai urutan input"""
+        return [self.create_order(**order) for order in orders]
+
+    def cancel_order(self, symbol: str, order_id: Optional[str] = None, client_order_id: Optional[str] = None) -> bool:
+        """Batalkan order berdasarkan id exchange atau client_order_id"""
+        return False
+
+    def fetch_order(
+        self, symbol: str, order_id: Optional[str] = None, client_order_id: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Status order dalam format create_order, None jika tidak ditemukan"""
+        return None
+
+    def fetch_markets(self) -> List[Any]:
+        """Daftar instrumen spot exchange sebagai [Market], kosong jika tidak didukung"""
+        return []
+
+    def fetch_tickers_24h(self) -> Dict[str, tuple]:
+        """Semua market dalam satu request: {simbol venue: (harga terakhir, volume 24 jam dalam mata uang quote)}"""
+        return {}
+
+    def get_supported_symbols(self) -> List[str]:
+        """Aset yang diperdagangkan terhadap mata uang dasar exchange, dari metadata yang sudah dimuat"""
+        index = market_metadata.index(self.__class__.__name__.lower())
+        if index is None:
+            index = self._run_sync(market_metadata.load(self))
+        return index.assets() if index else []
+
+    # Versi async. Adapter dengan HTTP async meng-override method ini dan method sync di atas
+    # menjadi wrapper tipis; default-nya menjalankan method sync di thread agar event loop tidak macet.
+
+    async def fetch_ticker_async(self, symbol: str) -> float:
+        return await asyncio.to_thread(self.fetch_ticker, symbol)
+
+    async def fetch_tickers_async(self, symbols: List[str]) -> Dict[str, float]:
+        return await asyncio.to_thread(self.fetch_tickers, symbols)
+
+    async def fetch_order_book_async(self, symbol: str, depth: int = 20) -> Dict[str, Any]:
+        return await asyncio.to_thread(self.fetch_order_book, symbol, depth)
+
+    async def fetch_balance_async(self) -> Dict[str, Dict[str, float]]:
+        return await asyncio.to_thread(self.fetch_balance)
+
+    async def transfer_coin_async(
+        self,
+        symbol: str,
+        amount: float,
+        address: str,
+        tag: Optional[str] = None,
+        network: Optional[str] = None
+    ) -> bool:
+        return await asyncio.to_thread(self.transfer_coin, symbol, amount, address, tag, network)
+
+    async def create_order_async(
+        self,
+        symbol: str,
+        side: str,
+        amount: float,
+        price: Optional[float] = None,
+        order_type: str = "limit",
+        time_in_force: Optional[str] = None,
+        client_order_id: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(
+            self.create_order, symbol, side, amount, price, order_type, time_in_force, client_order_id
+        )
+
+    async def create_orders_async(self, orders: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+        # Default: order tunggal dikirim paralel; adapter dengan endpoint batch meng-override
+        return list(await asyncio.gather(*(self.create_order_async(**order) for order in orders)))
+
+    async def cancel_order_async(
+        self, symbol: str, order_id: Optional[str] = None, client_order_id: Optional[str] = None
+    ) -> bool:
+        return await asyncio.to_thread(self.cancel_order, symbol, order_id, client_order_id)
+
+    async def fetch_order_async(
+        self, symbol: str, order_id: Optional[str] = None, client_order_id: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self.fetch_order, symbol, order_id, client_order_id)
+
+    async def _recover_order_async(self, symbol: str, client_order_id: Optional[str]):
+        """Request order gagal atau timeout: cek lewat client_order_id apakah exchange sudah menerimanya"""
+        if not client_order_id:
+            return None
+        return await self.fetch_order_async(symbol, client_order_id=client_order_id)
+
+    async def warm_up_async(self) -> bool:
+        """Buka (atau jaga) koneksi pool ke exchange lewat request murah agar order tidak menunggu handshake"""
+        return await self.fetch_server_time_async() is not None
+
+    async def fetch_markets_async(self) -> List[Any]:
+        return await asyncio.to_thread(self.fetch_markets)
+
+    async def fetch_tickers_24h_async(self) -> Dict[str, tuple]:
+        return await asyncio.to_thread(self.fetch_tickers_24h)
+
+    async def fetch_server_time_async(self) -> Optional[int]:
+        """Waktu server exchange dalam milidetik, None jika tidak tersedia"""
+        return None
+
+    def _timestamp_ms(self) -> int:
+        """Timestamp untuk request bertanda tangan, dikoreksi dengan offset jam server"""
+        return server_clock.now_ms(self.__class__.__name__.lower())
+
+    async def _request_async(self, method: str, path: str, headers: Optional[Dict[str, str]] = None, **kwargs):
+        """
+        Satu pintu untuk semua request HTTP adapter: antre di rate limiter sesuai bobot dan
+        prioritas endpoint, lalu kirim lewat pool koneksi bersama per host.
+        """
+        name = self.__class__.__name__.lower()
+        weight, priority = rate_limiter.cost(name, method, path, kwargs.get("params"), kwargs.get("data"))
+        await rate_limiter.acquire(name, weight, priority)
+
+        if self.default_headers or headers:
+            headers = {**self.default_headers, **(headers or {})}
+        endpoint = _PAIR_SEGMENT.sub(r"\1{pair}", path)
+        start = time.perf_counter()
+        try:
+            response = await http_pool.request(self.BASE_URL, method, path, headers=headers, **kwargs)
+        except Exception as e:
+            kind = "timeout" if isinstance(e, httpx.TimeoutException) else "error"
+            EXCHANGE_REQUEST_ERRORS.labels(name, endpoint, kind).inc()
+            raise
+        EXCHANGE_REQUEST_SECONDS.labels(name, endpoint).observe(time.perf_counter() - start)
+        if response.status_code >= 400:
+            EXCHANGE_REQUEST_ERRORS.labels(name, endpoint, f"http_{response.status_code}").inc()
+        rate_limiter.observe(name, response)
+        return response
+
+    def _run_sync(self, coro):
+        return http_pool.run_sync(coro)
@@ -0,0 +1,88 @@
+import asyncio
+import threading
+import weakref
+import httpx
+from utils.logger import logger
+from config.settings import (
+    HTTP_POOL_MAX_CONNECTIONS,
+    HTTP_POOL_MAX_KEEPALIVE,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP2_ENABLED,
+    HTTP_WARMUP_INTERVAL
+)
+
+
+class HttpPool:
+    """
+    Satu httpx.AsyncClient (keep-alive, HTTP/2 jika server mendukung) per host per event loop.
+    Method sync adapter dijalankan di event loop background milik pool, sehingga koneksi
+    tetap dipakai ulang walau dipanggil dari thread PriceCollector.
+    """
+
+    def __init__(self):
+        self._clients = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self._loop = None
+        self._thread = None
+        self._warm_task = None
+
+    def client(self, base_url):
+        """AsyncClient untuk base_url di event loop yang sedang berjalan"""
+        loop = asyncio.get_running_loop()
+        clients = self._clients.get(loop)
+        if clients is None:
+            clients = self._clients.setdefault(loop, {})
+        client = clients.get(base_url)
+        if client is None:
+            client = httpx.AsyncClient(
+                base_url=base_url,
+                http2=HTTP2_ENABLED,
+                limits=httpx.Limits(
+                    max_connections=HTTP_POOL_MAX_CONNECTIONS,
+                    max_keepalive_connections=HTTP_POOL_MAX_KEEPALIVE,
+                    keepalive_expiry=HTTP_KEEPALIVE_EXPIRY
+                )
+            )
+            clients[base_url] = client
+            logger.debug(f"🔌 Pool koneksi baru untuk {base_url}")
+        return client
+
+    async def request(self, base_url, method, path, **kwargs):
+        return await self.client(base_url).request(method, path, **kwargs)
+
+    def run_sync(self, coro):
+        """Jalankan coroutine di event loop background dan tunggu hasilnya (untuk API sync)"""
+        return asyncio.run_coroutine_threadsafe(coro, self._background_loop()).result()
+
+    def _background_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="http-pool", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def keep_warm(self, exchanges, interval=HTTP_WARMUP_INTERVAL):
+        """
+        Hangatkan koneksi ke setiap exchange di event loop yang sedang berjalan lalu jaga tetap hidup
+        (interval di bawah keepalive expiry), sehingga request order memakai koneksi TLS yang sudah terbuka.
+        """
+        async def loop():
+            while True:
+                results = await asyncio.gather(*(ex.warm_up_async() for ex in exchanges), return_exceptions=True)
+                cold = [ex.__class__.__name__ for ex, ok in zip(exchanges, results) if ok is not True]
+                if cold:
+                    logger.warning(f"⚠️ Gagal menghangatkan koneksi: {', '.join(cold)}")
+                await asyncio.sleep(interval)
+
+        self._warm_task = asyncio.create_task(loop(), name="http-warmup")
+        return self._warm_task
+
+    async def aclose(self):
+        """Tutup semua koneksi milik event loop yang sedang berjalan"""
+        clients = self._clients.pop(asyncio.get_running_loop(), {})
+        for client in clients.values():
+            await client.aclose()
+
+
+http_pool = HttpPool()
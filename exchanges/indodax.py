@@ -1,47 +1,73 @@
 import os
-import time
 import hashlib
 import hmac
-import requests
 import logging
-from .exchange_interface import Exchange
+from urllib.parse import urlencode
+from .exchange_interface import Exchange, ORDER_OPEN, ORDER_FILLED, ORDER_CANCELED
+from .markets import Market, format_decimal
+from config.settings import INDODAX_REST_URL
 
 logger = logging.getLogger(__name__)
 
 class Indodax(Exchange):
-    BASE_URL = "https://indodax.com"
-    TAPI_URL = "https://indodax.com/tapi"
+    BASE_URL = INDODAX_REST_URL
+    TAPI_PATH = "/tapi"
 
     def __init__(self):
         self.api_key = os.getenv("INDODAX_API_KEY")
         self.secret_key = os.getenv("INDODAX_SECRET_KEY")
         if not self.api_key or not self.secret_key:
             raise ValueError("Indodax API key dan secret wajib di-set")
-        self.session = requests.Session()
+        self._hmac = hmac.new(self.secret_key.encode('utf-8'), digestmod=hashlib.sha512)
         logger.info("✅ Indodax client initialized")
 
     def get_base_currency(self):
         return "IDR"
 
+    def _pair(self, symbol):
+        # Terima aset ("btc") maupun simbol venue dari metadata ("btcidr"); format pair tanpa underscore
+        pair = symbol.lower().replace('_', '')
+        return pair if pair.endswith('idr') and len(pair) > 3 else f"{pair}idr"
+
     def _generate_signature(self, params):
-        query_string = '&'.join([f"{key}={params[key]}" for key in sorted(params)])
-        return hmac.new(
-            self.secret_key.encode('utf-8'),
-            query_string.encode('utf-8'),
-            hashlib.sha512
-        ).hexdigest()
+        # Indodax memverifikasi HMAC atas body POST mentah, jadi body harus dikirim dengan urutan yang sama
+        query_string = urlencode(params)
+        signature = self._hmac.copy()
+        signature.update(query_string.encode('utf-8'))
+        return signature.hexdigest()
 
-    def fetch_ticker(self, symbol):
-        # Format pair yang benar: symbol + "idr" (tanpa underscore)
-        pair = f"{symbol.lower()}idr"
+    async def fetch_server_time_async(self):
+        try:
+            response = await self._request_async("GET", "/api/server_time", timeout=5)
+            response.raise_for_status()
+            return int(response.json()["server_time"])
+        except Exception as e:
+            logger.error(f"❌ Gagal ambil waktu server Indodax: {e}")
+            return None
+
+    async def fetch_markets_async(self):
+        try:
+            response = await self._request_async("GET", "/api/pairs", timeout=15)
+            response.raise_for_status()
+            # Indodax tidak punya tick/lot yang jelas di endpoint publik, hanya batas minimum order
+            return [
+                Market(
+                    item['id'], item['traded_currency'], item['base_currency'],
+                    min_qty=item.get('trade_min_traded_currency'),
+                    min_notional=item.get('trade_min_base_currency'),
+                    active=not item.get('is_maintenance'),
+                )
+                for item in response.json()
+            ]
+        except Exception as e:
+            logger.error(f"❌ Gagal fetch daftar pair Indodax: {e}")
+            return []
+
+    async def fetch_ticker_async(self, symbol):
+        pair = self._pair(symbol)
         
         try:
-            response = self.session.get(f"{self.BASE_URL}/api/ticker/{pair}", timeout=10)
-            logger.debug(f"Indodax URL: {response.url}")
-            
-            # Debug: Tampilkan respons mentah
-            logger.debug(f"Indodax response: {response.status_code} {response.text}")
-            
+            response = await self._request_async("GET", f"/api/ticker/{pair}", timeout=10)
             response.raise_for_status()
             data = response.json()
             
@@ -54,23 +80,171 @@ class Indodax(Exchange):
             logger.error(f"❌ Gagal fetch ticker {pair}: {e}")
             return 0.0
 
-    def fetch_balance(self):
-        params = {'method': 'getInfo', 'timestamp': int(time.time() * 1000)}
+    async def fetch_tickers_async(self, symbols):
+        # /api/summaries berisi ticker semua pair dengan key seperti "btc_idr"
+        try:
+            response = await self._request_async("GET", "/api/summaries", timeout=10)
+            response.raise_for_status()
+            tickers = response.json().get('tickers', {})
+
+            prices = {}
+            for symbol in symbols:
+                ticker = tickers.get(f"{self._pair(symbol)[:-3]}_idr", {})
+                prices[symbol] = float(ticker['last']) if 'last' in ticker else 0.0
+            return prices
+        except Exception as e:
+            logger.error(f"❌ Gagal fetch summaries Indodax: {e}")
+            return {symbol: 0.0 for symbol in symbols}
+
+    async def fetch_tickers_24h_async(self):
+        try:
+            response = await self._request_async("GET", "/api/summaries", timeout=10)
+            response.raise_for_status()
+            # Key "btc_idr" -> simbol venue "btcidr"; volume 24 jam dalam IDR ada di vol_idr
+            return {
+                key.replace('_', ''): (float(ticker['last']), float(ticker.get('vol_idr') or 0.0))
+                for key, ticker in response.json().get('tickers', {}).items()
+                if 'last' in ticker
+            }
+        except Exception as e:
+            logger.error(f"❌ Gagal fetch summaries Indodax: {e}")
+            return {}
+
+    async def fetch_order_book_async(self, symbol, depth=20):
+        pair = self._pair(symbol)
+
+        try:
+            response = await self._request_async("GET", f"/api/depth/{pair}", timeout=10)
+            response.raise_for_status()
+            data = response.json()
+            # "buy" = bid, "sell" = ask; qty dalam koin
+            return {
+                'bids': [(float(p), float(q)) for p, q in data.get('buy', [])[:depth]],
+                'asks': [(float(p), float(q)) for p, q in data.get('sell', [])[:depth]],
+                'sequence': None,
+            }
+        except Exception as e:
+            logger.error(f"❌ Gagal fetch order book {pair}: {e}")
+            return {'bids': [], 'asks': [], 'sequence': None}
+
+    async def fetch_balance_async(self):
+        params = {'method': 'getInfo', 'timestamp': self._timestamp_ms()}
         headers = {'Key': self.api_key, 'Sign': self._generate_signature(params)}
         
         try:
-            response = self.session.post(self.TAPI_URL, data=params, headers=headers, timeout=10)
+            response = await self._request_async("POST", self.TAPI_PATH, data=params, headers=headers, timeout=10)
             response.raise_for_status()
             data = response.json()
-            return data.get('return', {}).get('balance', {})
+            # getInfo: {'idr': '123.4', 'xrp': '5'} -> format bersama {'IDR': {'free': 123.4}, ...}
+            balance = data.get('return', {}).get('balance', {})
+            return {asset.upper(): {'free': float(amount or 0)} for asset, amount in balance.items()}
         except Exception as e:
             logger.error(f"❌ Gagal fetch balance: {e}")
             return {}
 
-    def transfer_coin(self, symbol, amount, address, tag=None, network=None):
+    async def _tapi_async(self, params):
+        """Panggil private API; kembalikan isi 'return' atau raise jika success != 1"""
+        params = {**params, 'timestamp': self._timestamp_ms()}
+        headers = {'Key': self.api_key, 'Sign': self._generate_signature(params)}
+        response = await self._request_async("POST", self.TAPI_PATH, data=params, headers=headers, timeout=10)
+        response.raise_for_status()
+        data = response.json()
+        if data.get('success') != 1:
+            raise ValueError(data.get('error'))
+        return data.get('return', {})
+
+    def _parse_order(self, order, coin):
+        amount = float(order.get(f'order_{coin}') or 0)
+        remain = float(order.get(f'remain_{coin}') or 0)
+        status = order.get('status')
+        return {
+            'id': str(order['order_id']),
+            'client_order_id': order.get('client_order_id'),
+            'status': ORDER_FILLED if status == "filled" else ORDER_OPEN if status == "open" else ORDER_CANCELED,
+            'filled': amount - remain,
+            'price': float(order.get('price') or 0),
+        }
+
+    async def create_order_async(self, symbol, side, amount, price=None, order_type="limit",
+                                 time_in_force=None, client_order_id=None):
+        pair = self._pair(symbol)
+        coin = pair[:-3]
+        if order_type == "limit" and price is None:
+            logger.error(f"❌ Order {pair} tidak dikirim: limit order butuh price")
+            return None
+        params = {'method': 'trade', 'pair': f"{coin}_idr", 'type': side.lower(), 'order_type': order_type}
+        if price is not None:
+            params['price'] = format_decimal(price)
+        if client_order_id:
+            params['client_order_id'] = client_order_id
+
+        try:
+            # Market buy Indodax dalam IDR, selain itu dalam jumlah koin; tanpa harga dipakai harga terakhir
+            if side.lower() == "buy" and order_type == "market":
+                if price is None:
+                    price = await self.fetch_ticker_async(symbol)
+                if not price:
+                    raise ValueError("market buy butuh harga untuk menghitung jumlah IDR")
+                params['idr'] = format_decimal(amount * price)
+            else:
+                params[coin] = format_decimal(amount)
+            result = await self._tapi_async(params)
+        except Exception as e:
+            logger.error(f"❌ Gagal pasang order {pair}: {e}")
+            return await self._recover_order_async(symbol, client_order_id)
+
+        filled = float(result.get(f'receive_{coin}') or result.get(f'sold_{coin}') or 0)
+        order = {
+            'id': str(result['order_id']),
+            'client_order_id': result.get('client_order_id', client_order_id),
+            'status': ORDER_FILLED if filled >= amount * (1 - 1e-9) else ORDER_OPEN,
+            'filled': filled,
+            'price': float(price or 0),
+        }
+        # Indodax tidak punya IOC/FOK: sisa order langsung dibatalkan
+        if order['status'] == ORDER_OPEN and (time_in_force or "GTC").upper() in ("IOC", "FOK"):
+            if await self.cancel_order_async(symbol, order_id=order['id'], side=side):
+                order['status'] = ORDER_CANCELED
+        return order
+
+    async def cancel_order_async(self, symbol, order_id=None, client_order_id=None, side=None):
+        pair = self._pair(symbol)
+        try:
+            if order_id is None:
+                await self._tapi_async({'method': 'cancelByClientOrderId', 'client_order_id': client_order_id})
+                return True
+            if side is None:
+                order = await self.fetch_order_async(symbol, order_id=order_id)
+                side = order['side'] if order else "buy"
+            await self._tapi_async({'method': 'cancelOrder', 'pair': f"{pair[:-3]}_idr", 'order_id': order_id,
+                                    'type': side.lower()})
+            return True
+        except Exception as e:
+            logger.error(f"❌ Gagal batalkan order {pair} {order_id or client_order_id}: {e}")
+            return False
+
+    async def fetch_order_async(self, symbol, order_id=None, client_order_id=None):
+        pair = self._pair(symbol)
+        coin = pair[:-3]
+        try:
+            if order_id is not None:
+                result = await self._tapi_async({'method': 'getOrder', 'pair': f"{coin}_idr", 'order_id': order_id})
+            else:
+                result = await self._tapi_async({'method': 'getOrderByClientOrderId', 'client_order_id': client_order_id})
+            order = result.get('order')
+            if not order:
+                return None
+            parsed = self._parse_order(order, coin)
+            parsed['side'] = order.get('type')
+            return parsed
+        except Exception as e:
+            logger.error(f"❌ Gagal ambil order {pair} {order_id or client_order_id}: {e}")
+            return None
+
+    async def transfer_coin_async(self, symbol, amount, address, tag=None, network=None):
         params = {
             'method': 'withdrawCoin',
-            'timestamp': int(time.time() * 1000),
+            'timestamp': self._timestamp_ms(),
             'currency': symbol.upper(),
             'withdraw_address': address,
             'withdraw_amount': amount,
@@ -80,10 +254,47 @@ class Indodax(Exchange):
         headers = {'Key': self.api_key, 'Sign': self._generate_signature(params)}
         
         try:
-            response = self.session.post(self.TAPI_URL, data=params, headers=headers, timeout=20)
+            response = await self._request_async("POST", self.TAPI_PATH, data=params, headers=headers, timeout=20)
             response.raise_for_status()
             data = response.json()
             return data.get('success') == 1
         except Exception as e:
             logger.error(f"❌ Gagal transfer: {e}")
-            return False
\ No newline at end of file
+            return False
+
+    # API sync: wrapper tipis di atas versi async
+
+    def fetch_markets(self):
+        return self._run_sync(self.fetch_markets_async())
+
+    def fetch_tickers_24h(self):
+        return self._run_sync(self.fetch_tickers_24h_async())
+
+    def fetch_ticker(self, symbol):
+        return self._run_sync(self.fetch_ticker_async(symbol))
+
+    def fetch_tickers(self, symbols):
+        return self._run_sync(self.fetch_tickers_async(symbols))
+
+    def fetch_order_book(self, symbol, depth=20):
+        return self._run_sync(self.fetch_order_book_async(symbol, depth))
+
+    def create_order(self, symbol, side, amount, price=None, order_type="limit", time_in_force=None,
+                     client_order_id=None):
+        return self._run_sync(self.create_order_async(symbol, side, amount, price, order_type, time_in_force,
+                                                      client_order_id))
+
+    def create_orders(self, orders):
+        return self._run_sync(self.create_orders_async(orders))
+
+    def cancel_order(self, symbol, order_id=None, client_order_id=None):
+        return self._run_sync(self.cancel_order_async(symbol, order_id, client_order_id))
+
+    def fetch_order(self, symbol, order_id=None, client_order_id=None):
+        return self._run_sync(self.fetch_order_async(symbol, order_id, client_order_id))
+
+    def fetch_balance(self):
+        return self._run_sync(self.fetch_balance_async())
+
+    def transfer_coin(self, symbol, amount, address, tag=None, network=None):
+        return self._run_sync(self.transfer_coin_async(symbol, amount, address, tag, network))
@@ -2,16 +2,18 @@ import os
 import hmac
 import base64
 import hashlib
-import time
-import requests
 import json
+import uuid
+import asyncio
 import logging
-from .exchange_interface import Exchange
+from .exchange_interface import Exchange, ORDER_OPEN, ORDER_FILLED, ORDER_CANCELED
+from .markets import Market, format_decimal
+from config.settings import KUCOIN_REST_URL
 
 logger = logging.getLogger(__name__)
 
 class KuCoin(Exchange):
-    BASE_URL = "https://api.kucoin.com"
+    BASE_URL = KUCOIN_REST_URL
     
     def __init__(self):
         self.api_key = os.getenv("KUCOIN_API_KEY")
@@ -19,14 +21,21 @@ class KuCoin(Exchange):
         self.api_passphrase = os.getenv("KUCOIN_API_PASSPHRASE")
         if not all([self.api_key, self.api_secret, self.api_passphrase]):
             raise ValueError("KuCoin API key, secret, dan passphrase wajib di-set")
-        self.session = requests.Session()
+        # Material tanda tangan dihitung sekali: HMAC berkunci dan passphrase API key v2
+        self._hmac = hmac.new(self.api_secret.encode('utf-8'), digestmod=hashlib.sha256)
+        self._passphrase = self._sign(self.api_passphrase)
         logger.info("✅ KuCoin client initialized successfully")
 
     def get_base_currency(self):
         return "USDT"
 
+    def _sign(self, message):
+        signature = self._hmac.copy()
+        signature.update(message.encode('utf-8'))
+        return base64.b64encode(signature.digest()).decode()
+
     def _generate_signature(self, endpoint, method, params=None, body=None):
-        now = str(int(time.time() * 1000))
+        now = str(self._timestamp_ms())
         str_to_sign = now + method.upper() + endpoint
         
         # Handle query parameters
@@ -39,46 +48,58 @@ class KuCoin(Exchange):
         if body:
             str_to_sign += json.dumps(body, separators=(',', ':'), ensure_ascii=False)
         
-        logger.debug(f"String to sign: {str_to_sign}")
-        
-        # Create signature
-        signature = base64.b64encode(
-            hmac.new(
-                self.api_secret.encode('utf-8'),
-                str_to_sign.encode('utf-8'),
-                hashlib.sha256
-            ).digest()
-        ).decode()
-        
-        # Passphrase should be base64 encoded
-        passphrase = base64.b64encode(self.api_passphrase.encode('utf-8')).decode()
-        
         return {
             "KC-API-KEY": self.api_key,
-            "KC-API-SIGN": signature,
+            "KC-API-SIGN": self._sign(str_to_sign),
             "KC-API-TIMESTAMP": now,
-            "KC-API-PASSPHRASE": passphrase,
+            "KC-API-PASSPHRASE": self._passphrase,
             "KC-API-KEY-VERSION": "2",
             "Content-Type": "application/json"
         }
 
-    def fetch_ticker(self, symbol):
+    async def fetch_server_time_async(self):
+        try:
+            response = await self._request_async("GET", "/api/v1/timestamp", timeout=5)
+            response.raise_for_status()
+            return int(response.json()["data"])
+        except Exception as e:
+            logger.error(f"❌ Gagal ambil waktu server KuCoin: {e}")
+            return None
+
+    async def fetch_markets_async(self):
+        try:
+            response = await self._request_async("GET", "/api/v2/symbols", timeout=15)
+            response.raise_for_status()
+            data = response.json()
+            if data.get("code") != "200000":
+                logger.error(f"❌ Format respons symbols tidak valid dari KuCoin: {data.get('msg')}")
+                return []
+            return [
+                Market(
+                    item['symbol'], item['baseCurrency'], item['quoteCurrency'],
+                    tick_size=item.get('priceIncrement'),
+                    lot_size=item.get('baseIncrement'),
+                    min_qty=item.get('baseMinSize'),
+                    min_notional=item.get('minFunds') or item.get('quoteMinSize'),
+                    active=item.get('enableTrading', True),
+                )
+                for item in data['data']
+            ]
+        except Exception as e:
+            logger.error(f"❌ Gagal fetch symbols KuCoin: {e}")
+            return []
+
+    async def fetch_ticker_async(self, symbol):
         endpoint = "/api/v1/market/orderbook/level1"
         params = {"symbol": f"{symbol.upper().replace('_', '-')}"}
-        headers = self._generate_signature(endpoint, "GET", params=params)
 
         try:
-            response = self.session.get(
-                f"{self.BASE_URL}{endpoint}", 
+            response = await self._request_async(
+                "GET",
+                endpoint,
                 params=params,
-                headers=headers,
                 timeout=10
             )
-            logger.debug(f"KuCoin response: {response.status_code} {response.text}")
-
-            if response.status_code == 401:
-                logger.error("❌ Autentikasi KuCoin gagal. Periksa API Key, Secret, dan Passphrase")
-                return 0.0
 
             response.raise_for_status()
             data = response.json()
@@ -99,20 +120,228 @@ class KuCoin(Exchange):
             logger.error(f"❌ Gagal fetch ticker KuCoin {symbol}: {e}")
             return 0.0
 
-    def fetch_balance(self):
+    async def fetch_tickers_async(self, symbols):
+        # allTickers adalah endpoint publik, satu request untuk semua market
+        pairs = {}
+        for symbol in symbols:
+            pair = symbol.upper().replace('_', '-').replace('/', '-')
+            if '-' not in pair:
+                pair += "-USDT"
+            pairs[symbol] = pair
+
+        try:
+            response = await self._request_async("GET", "/api/v1/market/allTickers", timeout=10)
+            response.raise_for_status()
+            data = response.json()
+
+            if data.get("code") != "200000":
+                logger.error(f"❌ Format respons allTickers tidak valid dari KuCoin: {data.get('msg')}")
+                return {symbol: 0.0 for symbol in symbols}
+
+            all_prices = {
+                item["symbol"]: float(item["last"])
+                for item in data["data"]["ticker"]
+                if item.get("last") is not None
+            }
+            return {symbol: all_prices.get(pair, 0.0) for symbol, pair in pairs.items()}
+
+        except Exception as e:
+            logger.error(f"❌ Gagal fetch tickers KuCoin: {e}")
+            return {symbol: 0.0 for symbol in symbols}
+
+    async def fetch_tickers_24h_async(self):
+        # allTickers sudah memuat volume 24 jam (volValue dalam mata uang quote)
+        try:
+            response = await self._request_async("GET", "/api/v1/market/allTickers", timeout=10)
+            response.raise_for_status()
+            data = response.json()
+            if data.get("code") != "200000":
+                logger.error(f"❌ Format respons allTickers tidak valid dari KuCoin: {data.get('msg')}")
+                return {}
+            return {
+                item["symbol"]: (float(item["last"]), float(item.get("volValue") or 0.0))
+                for item in data["data"]["ticker"]
+                if item.get("last") is not None
+            }
+        except Exception as e:
+            logger.error(f"❌ Gagal fetch ticker 24 jam KuCoin: {e}")
+            return {}
+
+    async def fetch_order_book_async(self, symbol, depth=20):
+        pair = symbol.upper().replace('_', '-')
+        if '-' not in pair:
+            pair += "-USDT"
+        # Endpoint publik hanya tersedia untuk kedalaman 20 dan 100
+        endpoint = "/api/v1/market/orderbook/level2_20" if depth <= 20 else "/api/v1/market/orderbook/level2_100"
+
+        try:
+            response = await self._request_async("GET", endpoint, params={"symbol": pair}, timeout=10)
+            response.raise_for_status()
+            data = response.json()
+
+            if data.get("code") != "200000" or not data.get("data"):
+                logger.error(f"❌ Format order book tidak valid dari KuCoin: {data.get('msg')}")
+                return {'bids': [], 'asks': [], 'sequence': None}
+
+            book = data["data"]
+            return {
+                'bids': [(float(p), float(q)) for p, q in book['bids'][:depth]],
+                'asks': [(float(p), float(q)) for p, q in book['asks'][:depth]],
+                'sequence': int(book['sequence']) if book.get('sequence') else None,
+            }
+        except Exception as e:
+            logger.error(f"❌ Gagal fetch order book KuCoin {pair}: {e}")
+            return {'bids': [], 'asks': [], 'sequence': None}
+
+    def _pair(self, symbol):
+        pair = symbol.upper().replace('_', '-').replace('/', '-')
+        return pair if '-' in pair else pair + "-USDT"
+
+    async def _private_async(self, method, endpoint, body=None):
+        """Request bertanda tangan; body diserialisasi sekali sehingga byte yang ditandatangani sama dengan yang dikirim"""
+        headers = self._generate_signature(endpoint, method, body=body)
+        content = json.dumps(body, separators=(',', ':'), ensure_ascii=False) if body is not None else None
+        response = await self._request_async(method, endpoint, content=content, headers=headers, timeout=10)
+        response.raise_for_status()
+        data = response.json()
+        if data.get("code") != "200000":
+            raise ValueError(data.get("msg"))
+        return data.get("data")
+
+    def _order_body(self, symbol, side, amount, price=None, order_type="limit", time_in_force=None,
+                    client_order_id=None):
+        if order_type == "limit" and price is None:
+            raise ValueError("limit order butuh price")
+        body = {
+            "clientOid": client_order_id or uuid.uuid4().hex,
+            "side": side.lower(),
+            "symbol": self._pair(symbol),
+            "type": order_type,
+            "size": format_decimal(amount),
+        }
+        if order_type == "limit":
+            body["price"] = format_decimal(price)
+            body["timeInForce"] = (time_in_force or "GTC").upper()
+        return body
+
+    def _checked_body(self, order):
+        """Body order, atau None (dengan log) bila parameternya tidak valid agar tidak menggagalkan satu batch"""
+        try:
+            return self._order_body(**order)
+        except ValueError as e:
+            logger.error(f"❌ Order KuCoin {order.get('symbol')} tidak dikirim: {e}")
+            return None
+
+    def _parse_order(self, data):
+        filled = float(data.get("dealSize") or 0)
+        funds = float(data.get("dealFunds") or 0)
+        if data.get("isActive"):
+            status = ORDER_OPEN
+        elif filled and filled >= float(data.get("size") or 0):
+            status = ORDER_FILLED
+        else:
+            status = ORDER_CANCELED
+        return {
+            'id': data["id"],
+            'client_order_id': data.get("clientOid"),
+            'status': status,
+            'filled': filled,
+            'price': funds / filled if filled else float(data.get("price") or 0),
+        }
+
+    async def _settle(self, symbol, order_id, body):
+        """Ack KuCoin hanya berisi id: order IOC/FOK langsung dicek statusnya, GTC dianggap masih terbuka"""
+        if body.get("timeInForce") in ("IOC", "FOK") or body["type"] == "market":
+            order = await self.fetch_order_async(symbol, order_id=order_id)
+            if order is not None:
+                return order
+        return {'id': order_id, 'client_order_id': body["clientOid"], 'status': ORDER_OPEN, 'filled': 0.0,
+                'price': float(body.get("price") or 0)}
+
+    async def create_order_async(self, symbol, side, amount, price=None, order_type="limit",
+                                 time_in_force=None, client_order_id=None):
+        body = self._checked_body({'symbol': symbol, 'side': side, 'amount': amount, 'price': price,
+                                   'order_type': order_type, 'time_in_force': time_in_force,
+                                   'client_order_id': client_order_id})
+        if body is None:
+            return None
+        try:
+            data = await self._private_async("POST", "/api/v1/orders", body)
+        except Exception as e:
+            logger.error(f"❌ Gagal pasang order KuCoin {body['symbol']}: {e}")
+            return await self._recover_order_async(symbol, body["clientOid"])
+        return await self._settle(symbol, data["orderId"], body)
+
+    async def create_orders_async(self, orders):
+        """Order limit dengan simbol sama dikirim lewat /orders/multi (maks 5 per request), sisanya satu per satu"""
+        bodies = [self._checked_body(order) for order in orders]
+        results = [None] * len(orders)
+        groups = {}
+        for position, body in enumerate(bodies):
+            if body is not None and body["type"] == "limit":
+                groups.setdefault(body["symbol"], []).append(position)
+
+        async def send_batch(pair, positions):
+            order_list = [{k: v for k, v in bodies[i].items() if k != "symbol"} for i in positions]
+            try:
+                data = await self._private_async("POST", "/api/v1/orders/multi", {"symbol": pair, "orderList": order_list})
+            except Exception as e:
+                logger.error(f"❌ Gagal pasang batch order KuCoin {pair}: {e}")
+                # Batch mungkin sudah diterima sebagian: cek tiap order lewat clientOid
+                recovered = await asyncio.gather(
+                    *(self._recover_order_async(pair, bodies[i]["clientOid"]) for i in positions))
+                for position, order in zip(positions, recovered):
+                    results[position] = order
+                return
+            for position, item in zip(positions, data.get("data", [])):
+                if item.get("status") == "success":
+                    results[position] = await self._settle(pair, item["id"], bodies[position])
+                else:
+                    logger.warning(f"⚠️ Order KuCoin {pair} ditolak: {item.get('failMsg')}")
+
+        async def send_single(position):
+            order = {**orders[position], "client_order_id": bodies[position]["clientOid"]}
+            results[position] = await self.create_order_async(**order)
+
+        batches = [
+            send_batch(pair, positions[start:start + 5])
+            for pair, positions in groups.items()
+            for start in range(0, len(positions), 5)
+        ]
+        singles = [send_single(i) for i, body in enumerate(bodies) if body is not None and body["type"] != "limit"]
+        await asyncio.gather(*batches, *singles)
+        return results
+
+    async def cancel_order_async(self, symbol, order_id=None, client_order_id=None):
+        endpoint = f"/api/v1/orders/{order_id}" if order_id is not None else f"/api/v1/order/client-order/{client_order_id}"
+        try:
+            await self._private_async("DELETE", endpoint)
+            return True
+        except Exception as e:
+            logger.error(f"❌ Gagal batalkan order KuCoin {order_id or client_order_id}: {e}")
+            return False
+
+    async def fetch_order_async(self, symbol, order_id=None, client_order_id=None):
+        endpoint = f"/api/v1/orders/{order_id}" if order_id is not None else f"/api/v1/order/client-order/{client_order_id}"
+        try:
+            data = await self._private_async("GET", endpoint)
+            return self._parse_order(data) if data else None
+        except Exception as e:
+            logger.error(f"❌ Gagal ambil order KuCoin {order_id or client_order_id}: {e}")
+            return None
+
+    async def fetch_balance_async(self):
         endpoint = "/api/v1/accounts"
         headers = self._generate_signature(endpoint, "GET")
         
         try:
-            response = self.session.get(
-                f"{self.BASE_URL}{endpoint}",
+            response = await self._request_async(
+                "GET",
+                endpoint,
                 headers=headers,
                 timeout=10
             )
             
-            # Debug logging
-            logger.debug(f"KuCoin balance response: {response.status_code} {response.text}")
-            
             if response.status_code == 401:
                 logger.error("❌ Autentikasi KuCoin gagal. Periksa API Key, Secret, dan Passphrase")
                 return {}
@@ -135,7 +364,7 @@ class KuCoin(Exchange):
             logger.error(f"❌ Error fetch balance KuCoin: {e}")
             return {}
 
-    def transfer_coin(self, symbol, amount, address, tag=None, network=None):
+    async def transfer_coin_async(self, symbol, amount, address, tag=None, network=None):
         endpoint = "/api/v2/withdrawals"
         body = {
             "currency": symbol.upper(),
@@ -148,16 +377,14 @@ class KuCoin(Exchange):
             
         headers = self._generate_signature(endpoint, "POST", body=body)
         try:
-            response = self.session.post(
-                f"{self.BASE_URL}{endpoint}", 
-                json=body, 
-                headers=headers, 
+            response = await self._request_async(
+                "POST",
+                endpoint,
+                json=body,
+                headers=headers,
                 timeout=20
             )
             
-            # Debug logging
-            logger.debug(f"KuCoin withdrawal response: {response.status_code} {response.text}")
-            
             response.raise_for_status()
             data = response.json()
             if data.get("code") == "200000":
@@ -170,6 +397,43 @@ class KuCoin(Exchange):
             logger.error(f"❌ Withdrawal KuCoin error: {e}")
             return False
 
+    # API sync: wrapper tipis di atas versi async
+
+    def fetch_markets(self):
+        return self._run_sync(self.fetch_markets_async())
+
+    def fetch_tickers_24h(self):
+        return self._run_sync(self.fetch_tickers_24h_async())
+
+    def fetch_ticker(self, symbol):
+        return self._run_sync(self.fetch_ticker_async(symbol))
+
+    def fetch_tickers(self, symbols):
+        return self._run_sync(self.fetch_tickers_async(symbols))
+
+    def fetch_order_book(self, symbol, depth=20):
+        return self._run_sync(self.fetch_order_book_async(symbol, depth))
+
+    def create_order(self, symbol, side, amount, price=None, order_type="limit", time_in_force=None,
+                     client_order_id=None):
+        return self._run_sync(self.create_order_async(symbol, side, amount, price, order_type, time_in_force,
+                                                      client_order_id))
+
+    def create_orders(self, orders):
+        return self._run_sync(self.create_orders_async(orders))
+
+    def cancel_order(self, symbol, order_id=None, client_order_id=None):
+        return self._run_sync(self.cancel_order_async(symbol, order_id, client_order_id))
+
+    def fetch_order(self, symbol, order_id=None, client_order_id=None):
+        return self._run_sync(self.fetch_order_async(symbol, order_id, client_order_id))
+
+    def fetch_balance(self):
+        return self._run_sync(self.fetch_balance_async())
+
+    def transfer_coin(self, symbol, amount, address, tag=None, network=None):
+        return self._run_sync(self.transfer_coin_async(symbol, amount, address, tag, network))
+
     def _get_network(self, symbol):
         networks = {
             "BTC": "BTC",
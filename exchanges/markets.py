@@ -0,0 +1,189 @@
+import os
+import json
+import math
+import time
+import asyncio
+import threading
+from utils.logger import logger
+from config.settings import MARKET_CACHE_DIR, MARKET_CACHE_TTL
+
+
+def format_decimal(value):
+    """Angka untuk parameter order tanpa notasi eksponen (0.00001, bukan 1e-05)"""
+    return f"{float(value):.12f}".rstrip("0").rstrip(".") or "0"
+
+
+class Market:
+    """
+    Satu instrumen spot di satu exchange. Simbol kanonik "BASE/QUOTE" (huruf besar),
+    venue_symbol format asli exchange (BTCUSDT, BTC-USDT, btcidr, BTC_USDT).
+    Filter harga/jumlah 0 berarti tidak diketahui (tidak dibulatkan/dibatasi).
+    """
+    __slots__ = ("canonical", "venue_symbol", "base", "quote", "tick_size", "lot_size",
+                 "min_qty", "min_notional", "active")
+
+    def __init__(self, venue_symbol, base, quote, tick_size=0.0, lot_size=0.0, min_qty=0.0,
+                 min_notional=0.0, active=True):
+        self.base = base.upper()
+        self.quote = quote.upper()
+        self.canonical = f"{self.base}/{self.quote}"
+        self.venue_symbol = venue_symbol
+        self.tick_size = float(tick_size or 0.0)
+        self.lot_size = float(lot_size or 0.0)
+        self.min_qty = float(min_qty or 0.0)
+        self.min_notional = float(min_notional or 0.0)
+        self.active = bool(active)
+
+    def round_price(self, price):
+        if self.tick_size <= 0:
+            return price
+        return round(round(price / self.tick_size) * self.tick_size, 12)
+
+    def round_qty(self, qty):
+        """Bulatkan ke bawah ke kelipatan lot (order tidak boleh melebihi saldo)"""
+        if self.lot_size <= 0:
+            return qty
+        return round(math.floor(qty / self.lot_size + 1e-9) * self.lot_size, 12)
+
+    def min_amount(self, price=None):
+        """Jumlah koin minimum untuk satu order pada harga (mata uang quote) tertentu"""
+        if price and self.min_notional:
+            return max(self.min_qty, self.min_notional / price)
+        return self.min_qty
+
+    def to_dict(self):
+        return {name: getattr(self, name) for name in self.__slots__ if name != "canonical"}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+
+class MarketIndex:
+    """
+    Kamus O(1) dua arah untuk satu exchange, dibangun sekali saat metadata dimuat:
+    kanonik -> Market, venue_symbol -> Market, dan aset -> Market untuk pair dengan
+    mata uang dasar exchange (USDT/IDR) yang dipakai strategi.
+    """
+
+    def __init__(self, exchange_name, markets, quote):
+        self.exchange_name = exchange_name
+        self.quote = quote.upper()
+        self.markets = [market for market in markets if market.active]
+        self.by_canonical = {market.canonical: market for market in self.markets}
+        self.by_venue = {market.venue_symbol: market for market in self.markets}
+        self.by_asset = {market.base: market for market in self.markets if market.quote == self.quote}
+
+    def __len__(self):
+        return len(self.markets)
+
+    def get(self, symbol):
+        """Market untuk aset ("BTC") atau simbol kanonik ("XRP/BTC"), None jika tidak ada"""
+        return self.by_asset.get(symbol) or self.by_canonical.get(symbol)
+
+    def venue_symbol(self, symbol):
+        market = self.get(symbol)
+        return market.venue_symbol if market else None
+
+    def canonical(self, venue_symbol):
+        market = self.by_venue.get(venue_symbol)
+        return market.canonical if market else None
+
+    def assets(self):
+        """Aset yang bisa diperdagangkan terhadap mata uang dasar exchange"""
+        return sorted(self.by_asset)
+
+
+class MarketMetadata:
+    """
+    Daftar instrumen tiap exchange, diambil sekali lalu disimpan di disk dengan TTL
+    ({directory}/{exchange}.json). Jika fetch gagal, cache lama tetap dipakai walau kedaluwarsa.
+    Pembacaan (index/get) hanya dari memori.
+    """
+
+    def __init__(self, directory=MARKET_CACHE_DIR, ttl=MARKET_CACHE_TTL):
+        self.directory = directory
+        self.ttl = ttl
+        self._indexes = {}
+        self._loaded_at = {}
+        self._lock = threading.Lock()
+
+    def _path(self, exchange_name):
+        return os.path.join(self.directory, f"{exchange_name}.json")
+
+    def _read_cache(self, exchange_name):
+        """(fetched_at, [Market]) dari disk atau None"""
+        try:
+            with open(self._path(exchange_name)) as f:
+                data = json.load(f)
+            return data["fetched_at"], [Market.from_dict(item) for item in data["markets"]]
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"⚠️ Cache market {exchange_name} rusak, diabaikan: {e}")
+            return None
+
+    def _write_cache(self, exchange_name, markets, fetched_at):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(exchange_name)
+            with open(path + ".tmp", "w") as f:
+                json.dump({"fetched_at": fetched_at, "markets": [m.to_dict() for m in markets]}, f)
+            os.replace(path + ".tmp", path)
+        except Exception as e:
+            logger.warning(f"⚠️ Gagal simpan cache market {exchange_name}: {e}")
+
+    def _store(self, exchange_name, markets, quote, loaded_at):
+        index = MarketIndex(exchange_name, markets, quote)
+        with self._lock:
+            self._indexes[exchange_name] = index
+            self._loaded_at[exchange_name] = loaded_at
+        return index
+
+    async def load(self, exchange, refresh=False):
+        """Muat metadata satu exchange: memori, lalu cache disk yang masih segar, lalu API exchange"""
+        name = exchange.__class__.__name__.lower()
+        quote = exchange.get_base_currency()
+        now = time.time()
+
+        if not refresh and name in self._indexes and now - self._loaded_at[name] < self.ttl:
+            return self._indexes[name]
+
+        cached = self._read_cache(name)
+        if not refresh and cached and now - cached[0] < self.ttl:
+            return self._store(name, cached[1], quote, cached[0])
+
+        try:
+            markets = await exchange.fetch_markets_async()
+        except Exception as e:
+            logger.error(f"❌ Gagal ambil daftar market {name}: {e}")
+            markets = []
+
+        if markets:
+            self._write_cache(name, markets, now)
+            index = self._store(name, markets, quote, now)
+            logger.info(f"📋 Metadata {name}: {len(index)} market aktif, {len(index.by_asset)} pair {quote}")
+            return index
+        if cached:
+            logger.warning(f"⚠️ Metadata {name} tidak bisa diperbarui, pakai cache lama")
+            return self._store(name, cached[1], quote, cached[0])
+        return None
+
+    async def load_all(self, exchanges, refresh=False):
+        await asyncio.gather(*(self.load(exchange, refresh) for exchange in exchanges))
+
+    def index(self, exchange_name):
+        """MarketIndex yang sudah dimuat, None jika belum ada"""
+        return self._indexes.get(exchange_name)
+
+    def market(self, exchange_name, symbol):
+        index = self._indexes.get(exchange_name)
+        return index.get(symbol) if index else None
+
+    def min_amount(self, exchange_name, symbol, price=None, default=None):
+        """Jumlah minimum order dari filter exchange, `default` jika market belum diketahui"""
+        market = self.market(exchange_name, symbol)
+        return market.min_amount(price) if market else default
+
+
+market_metadata = MarketMetadata()
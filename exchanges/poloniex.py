@@ -1,14 +1,21 @@
 import os
-import time
+import asyncio
 import hmac
 import hashlib
+import json
 import base64
-import requests
 from utils.logger import logger
-from .exchange_interface import Exchange
+from .exchange_interface import Exchange, ORDER_OPEN, ORDER_FILLED, ORDER_CANCELED, ORDER_REJECTED
+from .markets import Market, format_decimal
+from config.settings import POLONIEX_REST_URL
 
 class Poloniex(Exchange):
-    BASE_URL = "https://api.poloniex.com"
+    BASE_URL = POLONIEX_REST_URL
+    ORDER_STATUS = {
+        "NEW": ORDER_OPEN, "PARTIALLY_FILLED": ORDER_OPEN, "FILLED": ORDER_FILLED,
+        "PENDING_CANCEL": ORDER_CANCELED, "PARTIALLY_CANCELED": ORDER_CANCELED, "CANCELED": ORDER_CANCELED,
+        "FAILED": ORDER_REJECTED,
+    }
 
     def __init__(self):
         self.api_key = os.getenv("POLONIEX_API_KEY")
@@ -17,17 +24,51 @@ class Poloniex(Exchange):
         if not self.api_key or not self.api_secret:
             raise ValueError("POLONIEX_API_KEY dan POLONIEX_API_SECRET wajib diatur di .env")
 
-        self.session = requests.Session()
+        self._hmac = hmac.new(self.api_secret.encode("utf-8"), digestmod=hashlib.sha512)
+
         logger.info("✅ Poloniex client initialized successfully")
 
     def get_base_currency(self) -> str:
         return "USDT"
 
-    def fetch_ticker(self, symbol: str, usd_to_idr: float = 1.0) -> float:
+    def _pair(self, symbol: str) -> str:
+        # Terima aset ("BTC") maupun simbol venue dari metadata ("BTC_USDT")
+        pair = symbol.upper()
+        return pair if "_" in pair else f"{pair}_USDT"
+
+    async def fetch_markets_async(self) -> list:
         try:
-            pair = f"{symbol.upper()}_USDT"
-            url = f"{self.BASE_URL}/markets/{symbol.upper()}_USDT/price"
-            response = self.session.get(url, timeout=10)
+            response = await self._request_async("GET", "/markets", timeout=15)
+            response.raise_for_status()
+            markets = []
+            for item in response.json():
+                limits = item.get('symbolTradeLimit', {})
+                markets.append(Market(
+                    item['symbol'], item['baseCurrencyName'], item['quoteCurrencyName'],
+                    tick_size=10 ** -int(limits['priceScale']) if 'priceScale' in limits else 0.0,
+                    lot_size=10 ** -int(limits['quantityScale']) if 'quantityScale' in limits else 0.0,
+                    min_qty=limits.get('minQuantity'),
+                    min_notional=limits.get('minAmount'),
+                    active=item.get('state') == "NORMAL",
+                ))
+            return markets
+        except Exception as e:
+            logger.error(f"🚨 Gagal fetch daftar market Poloniex: {e}")
+            return []
+
+    async def fetch_server_time_async(self) -> int:
+        try:
+            response = await self._request_async("GET", "/timestamp", timeout=5)
+            response.raise_for_status()
+            return int(response.json()["serverTime"])
+        except Exception as e:
+            logger.error(f"🚨 Gagal ambil waktu server Poloniex: {e}")
+            return None
+
+    async def fetch_ticker_async(self, symbol: str) -> float:
+        try:
+            pair = self._pair(symbol)
+            response = await self._request_async("GET", f"/markets/{pair}/price", timeout=10)
             response.raise_for_status()
             data = response.json()
             return float(data['price'])
@@ -35,9 +76,53 @@ class Poloniex(Exchange):
             logger.error(f"🚨 Gagal fetch ticker Poloniex {symbol}: {e}")
             return 0.0
 
-    def fetch_balance(self) -> dict:
+    async def fetch_tickers_async(self, symbols: list) -> dict:
+        try:
+            response = await self._request_async("GET", "/markets/price", timeout=10)
+            response.raise_for_status()
+            all_prices = {item['symbol']: float(item['price']) for item in response.json()}
+            return {symbol: all_prices.get(self._pair(symbol), 0.0) for symbol in symbols}
+        except Exception as e:
+            logger.error(f"🚨 Gagal fetch tickers Poloniex: {e}")
+            return {symbol: 0.0 for symbol in symbols}
+
+    async def fetch_tickers_24h_async(self) -> dict:
         try:
-            timestamp = str(int(time.time() * 1000))
+            response = await self._request_async("GET", "/markets/ticker24h", timeout=10)
+            response.raise_for_status()
+            # amount = volume 24 jam dalam mata uang quote
+            return {item['symbol']: (float(item['close']), float(item.get('amount') or 0.0)) for item in response.json()}
+        except Exception as e:
+            logger.error(f"🚨 Gagal fetch ticker 24 jam Poloniex: {e}")
+            return {}
+
+    async def fetch_order_book_async(self, symbol: str, depth: int = 20) -> dict:
+        pair = self._pair(symbol)
+        # Limit yang diterima Poloniex: 5, 10, 20, 50, 100, 150
+        limit = next((n for n in (5, 10, 20, 50, 100, 150) if n >= depth), 150)
+
+        try:
+            response = await self._request_async("GET", f"/markets/{pair}/orderBook", params={"limit": limit}, timeout=10)
+            response.raise_for_status()
+            data = response.json()
+            return {
+                'bids': self._parse_levels(data.get('bids', []))[:depth],
+                'asks': self._parse_levels(data.get('asks', []))[:depth],
+                'sequence': None,
+            }
+        except Exception as e:
+            logger.error(f"🚨 Gagal fetch order book Poloniex {symbol}: {e}")
+            return {'bids': [], 'asks': [], 'sequence': None}
+
+    def _parse_levels(self, levels):
+        # Poloniex mengirim level sebagai list datar [harga, qty, harga, qty, ...]
+        if levels and not isinstance(levels[0], (list, tuple)):
+            levels = list(zip(levels[0::2], levels[1::2]))
+        return [(float(p), float(q)) for p, q in levels]
+
+    async def fetch_balance_async(self) -> dict:
+        try:
+            timestamp = str(self._timestamp_ms())
             method = "GET"
             endpoint = "/wallets/balances"
 
@@ -49,7 +134,7 @@ class Poloniex(Exchange):
                 "Poloniex-Signature": signature,
             }
 
-            response = self.session.get(f"{self.BASE_URL}{endpoint}", headers=headers, timeout=10)
+            response = await self._request_async("GET", endpoint, headers=headers, timeout=10)
             response.raise_for_status()
             data = response.json()
 
@@ -65,9 +150,128 @@ class Poloniex(Exchange):
             logger.error(f"🚨 Error fetch balance Poloniex: {e}")
             return {}
 
-    def transfer_coin(self, symbol: str, amount: float, address: str, tag: str = None, network: str = None) -> bool:
+    async def _private_async(self, method: str, endpoint: str, body=None):
+        """Request bertanda tangan; body diserialisasi sekali sehingga byte yang ditandatangani sama dengan yang dikirim"""
+        timestamp = str(self._timestamp_ms())
+        headers = {
+            "Poloniex-Key": self.api_key,
+            "Poloniex-Timestamp": timestamp,
+            "Poloniex-Signature": self._sign_request(method, endpoint, timestamp, body),
+        }
+        content = None
+        if body is not None:
+            content = json.dumps(body, separators=(",", ":"))
+            headers["Content-Type"] = "application/json"
+        response = await self._request_async(method, endpoint, content=content, headers=headers, timeout=10)
+        response.raise_for_status()
+        return response.json()
+
+    def _order_body(self, symbol, side, amount, price=None, order_type="limit", time_in_force=None,
+                    client_order_id=None):
+        if order_type == "limit" and price is None:
+            raise ValueError("limit order butuh price")
+        body = {"symbol": self._pair(symbol), "side": side.upper(), "type": order_type.upper()}
+        if order_type == "limit":
+            body["price"] = format_decimal(price)
+            body["quantity"] = format_decimal(amount)
+            body["timeInForce"] = (time_in_force or "GTC").upper()
+        elif side.lower() == "buy" and price:
+            # Market buy Poloniex dalam mata uang quote
+            body["amount"] = format_decimal(amount * price)
+        else:
+            body["quantity"] = format_decimal(amount)
+        if client_order_id:
+            body["clientOrderId"] = client_order_id
+        return body
+
+    def _checked_body(self, order):
+        """Body order, atau None (dengan log) bila parameternya tidak valid agar tidak menggagalkan satu batch"""
         try:
-            timestamp = str(int(time.time() * 1000))
+            return self._order_body(**order)
+        except ValueError as e:
+            logger.error(f"🚨 Order Poloniex {order.get('symbol')} tidak dikirim: {e}")
+            return None
+
+    def _parse_order(self, data):
+        filled = float(data.get("filledQuantity") or 0)
+        average = float(data.get("avgPrice") or 0)
+        return {
+            'id': str(data["id"]),
+            'client_order_id': data.get("clientOrderId") or None,
+            'status': self.ORDER_STATUS.get(data.get("state"), ORDER_OPEN),
+            'filled': filled,
+            'price': average if filled and average else float(data.get("price") or 0),
+        }
+
+    async def _settle(self, symbol, ack, body):
+        """Ack Poloniex hanya berisi id: order IOC/FOK/market langsung dicek statusnya"""
+        if body.get("timeInForce") in ("IOC", "FOK") or body["type"] == "MARKET":
+            order = await self.fetch_order_async(symbol, order_id=ack["id"])
+            if order is not None:
+                return order
+        return {'id': str(ack["id"]), 'client_order_id': ack.get("clientOrderId") or None, 'status': ORDER_OPEN,
+                'filled': 0.0, 'price': float(body.get("price") or 0)}
+
+    async def create_order_async(self, symbol: str, side: str, amount: float, price: float = None,
+                                 order_type: str = "limit", time_in_force: str = None, client_order_id: str = None):
+        body = self._checked_body({'symbol': symbol, 'side': side, 'amount': amount, 'price': price,
+                                   'order_type': order_type, 'time_in_force': time_in_force,
+                                   'client_order_id': client_order_id})
+        if body is None:
+            return None
+        try:
+            ack = await self._private_async("POST", "/orders", body)
+        except Exception as e:
+            logger.error(f"🚨 Gagal pasang order Poloniex {body['symbol']}: {e}")
+            return await self._recover_order_async(symbol, client_order_id)
+        return await self._settle(symbol, ack, body)
+
+    async def create_orders_async(self, orders: list) -> list:
+        """Maksimal 20 order per request /orders/batch"""
+        bodies = [self._checked_body(order) for order in orders]
+        valid = [position for position, body in enumerate(bodies) if body is not None]
+        results = [None] * len(orders)
+        for start in range(0, len(valid), 20):
+            positions = valid[start:start + 20]
+            chunk = [bodies[i] for i in positions]
+            try:
+                acks = await self._private_async("POST", "/orders/batch", chunk)
+            except Exception as e:
+                logger.error(f"🚨 Gagal pasang batch order Poloniex: {e}")
+                # Batch mungkin sudah diterima sebagian: cek tiap order lewat clientOrderId
+                recovered = await asyncio.gather(
+                    *(self._recover_order_async(body["symbol"], body.get("clientOrderId")) for body in chunk))
+                for position, order in zip(positions, recovered):
+                    results[position] = order
+                continue
+            for position, body, ack in zip(positions, chunk, acks):
+                if ack.get("id"):
+                    results[position] = await self._settle(body["symbol"], ack, body)
+                else:
+                    logger.warning(f"⚠️ Order Poloniex {body['symbol']} ditolak: {ack.get('message')}")
+        return results
+
+    def _order_path(self, order_id=None, client_order_id=None):
+        return f"/orders/{order_id}" if order_id is not None else f"/orders/cid:{client_order_id}"
+
+    async def cancel_order_async(self, symbol: str, order_id: str = None, client_order_id: str = None) -> bool:
+        try:
+            await self._private_async("DELETE", self._order_path(order_id, client_order_id))
+            return True
+        except Exception as e:
+            logger.error(f"🚨 Gagal batalkan order Poloniex {order_id or client_order_id}: {e}")
+            return False
+
+    async def fetch_order_async(self, symbol: str, order_id: str = None, client_order_id: str = None):
+        try:
+            return self._parse_order(await self._private_async("GET", self._order_path(order_id, client_order_id)))
+        except Exception as e:
+            logger.error(f"🚨 Gagal ambil order Poloniex {order_id or client_order_id}: {e}")
+            return None
+
+    async def transfer_coin_async(self, symbol: str, amount: float, address: str, tag: str = None, network: str = None) -> bool:
+        try:
+            timestamp = str(self._timestamp_ms())
             method = "POST"
             endpoint = "/wallets/withdraw"
 
@@ -89,7 +293,7 @@ class Poloniex(Exchange):
                 "Content-Type": "application/json"
             }
 
-            response = self.session.post(f"{self.BASE_URL}{endpoint}", json=body, headers=headers, timeout=20)
+            response = await self._request_async("POST", endpoint, json=body, headers=headers, timeout=20)
             response.raise_for_status()
             data = response.json()
 
@@ -104,6 +308,43 @@ class Poloniex(Exchange):
             logger.error(f"🚨 Error withdraw Poloniex: {e}")
             return False
 
+    # API sync: wrapper tipis di atas versi async
+
+    def fetch_markets(self) -> list:
+        return self._run_sync(self.fetch_markets_async())
+
+    def fetch_tickers_24h(self) -> dict:
+        return self._run_sync(self.fetch_tickers_24h_async())
+
+    def fetch_ticker(self, symbol: str, usd_to_idr: float = 1.0) -> float:
+        return self._run_sync(self.fetch_ticker_async(symbol))
+
+    def fetch_tickers(self, symbols: list) -> dict:
+        return self._run_sync(self.fetch_tickers_async(symbols))
+
+    def fetch_order_book(self, symbol: str, depth: int = 20) -> dict:
+        return self._run_sync(self.fetch_order_book_async(symbol, depth))
+
+    def create_order(self, symbol: str, side: str, amount: float, price: float = None, order_type: str = "limit",
+                     time_in_force: str = None, client_order_id: str = None):
+        return self._run_sync(self.create_order_async(symbol, side, amount, price, order_type, time_in_force,
+                                                      client_order_id))
+
+    def create_orders(self, orders: list) -> list:
+        return self._run_sync(self.create_orders_async(orders))
+
+    def cancel_order(self, symbol: str, order_id: str = None, client_order_id: str = None) -> bool:
+        return self._run_sync(self.cancel_order_async(symbol, order_id, client_order_id))
+
+    def fetch_order(self, symbol: str, order_id: str = None, client_order_id: str = None):
+        return self._run_sync(self.fetch_order_async(symbol, order_id, client_order_id))
+
+    def fetch_balance(self) -> dict:
+        return self._run_sync(self.fetch_balance_async())
+
+    def transfer_coin(self, symbol: str, amount: float, address: str, tag: str = None, network: str = None) -> bool:
+        return self._run_sync(self.transfer_coin_async(symbol, amount, address, tag, network))
+
     def _sign_request(self, method, endpoint, timestamp, body=None):
         path = endpoint
         body_str = ""
@@ -113,13 +354,9 @@ class Poloniex(Exchange):
             body_str = json.dumps(body, separators=(",", ":"))
 
         prehash = f"{timestamp}{method.upper()}{path}{body_str}"
-        signature = hmac.new(
-            self.api_secret.encode("utf-8"),
-            prehash.encode("utf-8"),
-            hashlib.sha512
-        ).hexdigest()
-
-        return signature
+        signature = self._hmac.copy()
+        signature.update(prehash.encode("utf-8"))
+        return signature.hexdigest()
 
     def get_min_trade_amount(self, symbol: str) -> float:
         # Placeholder, bisa dihubungkan ke endpoint market info jika ada
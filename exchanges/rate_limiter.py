@@ -0,0 +1,247 @@
+import time
+import asyncio
+import threading
+from email.utils import parsedate_to_datetime
+from utils.logger import logger
+from config.settings import RATE_LIMIT_ENABLED, RATE_LIMIT_RESERVE, RATE_LIMIT_SAFETY
+
+# Prioritas request: angka kecil didahulukan
+PRIORITY_TRADE = 0     # order dan withdrawal
+PRIORITY_ACCOUNT = 1   # saldo, status order
+PRIORITY_MARKET = 2    # ticker, order book
+
+
+def _binance_cost(method, path, params, data):
+    if path == "/api/v3/ticker/price":
+        return (2 if params and "symbol" in params else 4), PRIORITY_MARKET
+    if path == "/api/v3/depth":
+        limit = int((params or {}).get("limit", 100))
+        weight = 5 if limit <= 100 else 25 if limit <= 500 else 50 if limit <= 1000 else 250
+        return weight, PRIORITY_MARKET
+    if path == "/api/v3/account":
+        return 20, PRIORITY_ACCOUNT
+    if path == "/api/v3/ticker/24hr":
+        return (2 if params and "symbol" in params else 80), PRIORITY_MARKET
+    if path == "/api/v3/exchangeInfo":
+        return 20, PRIORITY_MARKET
+    if path == "/api/v3/order" and method == "GET":
+        return 4, PRIORITY_ACCOUNT
+    if path.startswith("/api/v3/order") or path.startswith("/sapi/v1/capital/withdraw"):
+        return 1, PRIORITY_TRADE
+    return 1, PRIORITY_MARKET
+
+
+def _kucoin_cost(method, path, params, data):
+    if path == "/api/v1/market/allTickers":
+        return 15, PRIORITY_MARKET
+    if path.startswith("/api/v1/market/orderbook/level2_100"):
+        return 4, PRIORITY_MARKET
+    if path.startswith("/api/v1/market/"):
+        return 2, PRIORITY_MARKET
+    if path == "/api/v2/symbols":
+        return 4, PRIORITY_MARKET
+    if path == "/api/v1/accounts":
+        return 5, PRIORITY_ACCOUNT
+    if method == "GET" and ("/orders/" in path or "/client-order/" in path):
+        return 2, PRIORITY_ACCOUNT
+    if "withdrawals" in path or "orders" in path or "/client-order/" in path:
+        return 5 if "withdrawals" in path else 2, PRIORITY_TRADE
+    return 2, PRIORITY_MARKET
+
+
+def _indodax_cost(method, path, params, data):
+    if path == "/tapi":
+        tapi_method = (data or {}).get("method")
+        if tapi_method in ("trade", "cancelOrder", "cancelByClientOrderId", "withdrawCoin"):
+            return 1, PRIORITY_TRADE
+        return 1, PRIORITY_ACCOUNT
+    return 1, PRIORITY_MARKET
+
+
+def _poloniex_cost(method, path, params, data):
+    if path.startswith("/orders") and method == "GET":
+        return 1, PRIORITY_ACCOUNT
+    if path.startswith("/wallets/withdraw") or path.startswith("/orders"):
+        return 1, PRIORITY_TRADE
+    if path.startswith("/wallets") or path.startswith("/accounts"):
+        return 1, PRIORITY_ACCOUNT
+    return 1, PRIORITY_MARKET
+
+
+# Batas publik per exchange: (kapasitas bobot, jendela detik, fungsi biaya endpoint)
+EXCHANGE_LIMITS = {
+    "binance": (6000, 60, _binance_cost),
+    "kucoin": (2000, 30, _kucoin_cost),
+    "indodax": (180, 60, _indodax_cost),
+    "poloniex": (200, 1, _poloniex_cost),
+}
+
+
+class TokenBucket:
+    """
+    Bucket bobot per exchange. Sebagian kapasitas (RATE_LIMIT_RESERVE) hanya boleh dipakai
+    order/withdrawal, setengahnya untuk request akun, sisanya untuk polling market data.
+    """
+
+    def __init__(self, name, capacity, window, reserve=RATE_LIMIT_RESERVE):
+        self.name = name
+        self.capacity = capacity * RATE_LIMIT_SAFETY
+        self.window = window
+        self.reserve = reserve
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self.used_since_mark = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self):
+        return self.capacity / self.window
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def _floor(self, priority):
+        """Token minimum yang harus tersisa setelah request dengan prioritas ini"""
+        if priority <= PRIORITY_TRADE:
+            return 0.0
+        if priority == PRIORITY_ACCOUNT:
+            return self.capacity * self.reserve / 2
+        return self.capacity * self.reserve
+
+    def try_acquire(self, weight, priority):
+        """Ambil token jika cukup. Return 0 jika berhasil, atau detik yang perlu ditunggu."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self.blocked_until:
+                return self.blocked_until - now
+            self._refill(now)
+            available = self.tokens - self._floor(priority)
+            if available >= weight:
+                self.tokens -= weight
+                self.used_since_mark += weight
+                return 0.0
+            return (weight - available) / self.rate
+
+    def sync_used(self, used, capacity=None):
+        """Kalibrasi dari header server: pakai estimasi yang paling konservatif"""
+        with self._lock:
+            if capacity:
+                self.capacity = capacity * RATE_LIMIT_SAFETY
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, self.capacity - used)
+
+    def block(self, seconds):
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+    def remaining(self):
+        """Fraksi kapasitas yang masih tersedia untuk polling market data (0..1)"""
+        with self._lock:
+            self._refill(time.monotonic())
+            return max(0.0, (self.tokens - self._floor(PRIORITY_MARKET)) / self.capacity)
+
+    def mark_cycle(self):
+        """Bobot yang dipakai sejak panggilan terakhir, lalu reset penghitung"""
+        with self._lock:
+            used, self.used_since_mark = self.used_since_mark, 0.0
+            return used
+
+
+class RateLimitScheduler:
+    """
+    Penjadwal request terpusat untuk semua adapter: satu TokenBucket per exchange,
+    bobot sesuai biaya endpoint, kalibrasi dari header respons, dan backoff saat 429/418.
+    """
+
+    def __init__(self, limits=EXCHANGE_LIMITS):
+        self._limits = limits
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, exchange_name):
+        with self._lock:
+            bucket = self._buckets.get(exchange_name)
+            if bucket is None:
+                capacity, window, _ = self._limits.get(exchange_name, (600, 60, None))
+                bucket = self._buckets[exchange_name] = TokenBucket(exchange_name, capacity, window)
+            return bucket
+
+    def cost(self, exchange_name, method, path, params=None, data=None):
+        """(bobot, prioritas) untuk satu request"""
+        cost_fn = self._limits.get(exchange_name, (None, None, None))[2]
+        if cost_fn is None:
+            return 1, PRIORITY_MARKET
+        return cost_fn(method, path, params, data)
+
+    async def acquire(self, exchange_name, weight, priority):
+        if not RATE_LIMIT_ENABLED:
+            return
+        bucket = self.bucket(exchange_name)
+        waited = 0.0
+        while True:
+            wait = bucket.try_acquire(weight, priority)
+            if wait <= 0:
+                break
+            # Prioritas rendah menunggu sedikit lebih lama agar order/withdrawal mendapat token lebih dulu
+            wait = min(wait + 0.01 * priority, bucket.window)
+            waited += wait
+            await asyncio.sleep(wait)
+        if waited > 1:
+            logger.debug(f"⏳ Rate limit {exchange_name}: request tertahan {waited:.1f}s")
+
+    def observe(self, exchange_name, response):
+        """Kalibrasi bucket dari header respons dan tangani 429/418"""
+        bucket = self.bucket(exchange_name)
+        headers = response.headers
+
+        used = headers.get("X-MBX-USED-WEIGHT-1M")
+        if used is not None:
+            bucket.sync_used(float(used))
+
+        remaining = headers.get("gw-ratelimit-remaining")
+        limit = headers.get("gw-ratelimit-limit")
+        if remaining is not None and limit is not None:
+            bucket.sync_used(float(limit) - float(remaining), capacity=float(limit))
+
+        if response.status_code in (418, 429):
+            delay = self._retry_after(headers.get("Retry-After"), bucket.window)
+            bucket.block(delay)
+            logger.warning(f"🚦 {exchange_name} membalas {response.status_code}, semua request ditahan {delay:.0f}s")
+
+    def _retry_after(self, value, default):
+        if not value:
+            return default
+        try:
+            return float(value)
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except Exception:
+                return default
+
+    def remaining(self, exchange_name=None):
+        """Fraksi budget polling yang tersisa, per exchange atau dict semua exchange"""
+        if exchange_name is not None:
+            return self.bucket(exchange_name).remaining()
+        with self._lock:
+            names = list(self._buckets)
+        return {name: self.bucket(name).remaining() for name in names}
+
+    def suggested_interval(self):
+        """
+        Jeda siklus minimum agar bobot yang dipakai satu siklus bisa terisi ulang
+        tanpa menyentuh cadangan order/withdrawal.
+        """
+        with self._lock:
+            buckets = list(self._buckets.values())
+        interval = 0.0
+        for bucket in buckets:
+            used = bucket.mark_cycle()
+            interval = max(interval, used / (bucket.rate * (1 - bucket.reserve)))
+        return interval
+
+
+rate_limiter = RateLimitScheduler()
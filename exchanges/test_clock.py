@@ -0,0 +1,42 @@
+import time
+import hmac
+import base64
+import asyncio
+import hashlib
+from exchanges.clock import ServerClock
+from exchanges.kucoin import KuCoin
+
+
+class Binance:
+    """Server fiktif dengan jam 2 detik lebih cepat"""
+
+    async def fetch_server_time_async(self):
+        await asyncio.sleep(0.001)
+        return int(time.time() * 1000) + 2000
+
+
+def test_calibrated_offset_is_applied():
+    clock = ServerClock()
+    asyncio.run(clock.calibrate(Binance(), samples=3))
+
+    offset, rtt = clock.offset("binance")
+    assert 1900 < offset < 2100
+    assert rtt >= 0
+    assert abs(clock.now_ms("binance") - (time.time() * 1000 + 2000)) < 100
+    assert abs(clock.now_ms("kucoin") - time.time() * 1000) < 100
+
+
+def test_kucoin_signing_material_is_cached(monkeypatch):
+    monkeypatch.setenv("KUCOIN_API_KEY", "key")
+    monkeypatch.setenv("KUCOIN_API_SECRET", "secret")
+    monkeypatch.setenv("KUCOIN_API_PASSPHRASE", "pass")
+    kucoin = KuCoin()
+
+    headers = kucoin._generate_signature("/api/v1/accounts", "GET")
+    expected_sign = base64.b64encode(
+        hmac.new(b"secret", (headers["KC-API-TIMESTAMP"] + "GET/api/v1/accounts").encode(), hashlib.sha256).digest()
+    ).decode()
+    expected_passphrase = base64.b64encode(hmac.new(b"secret", b"pass", hashlib.sha256).digest()).decode()
+
+    assert headers["KC-API-SIGN"] == expected_sign
+    assert headers["KC-API-PASSPHRASE"] == expected_passphrase
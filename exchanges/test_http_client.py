@@ -0,0 +1,44 @@
+import json
+import asyncio
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from exchanges.binance import Binance
+
+
+class TickerHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    client_ports = set()
+
+    def do_GET(self):
+        TickerHandler.client_ports.add(self.client_address[1])
+        body = json.dumps({"symbol": "BTCUSDT", "price": "30000.5"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_sync_wrapper_and_async_share_keep_alive_pool(monkeypatch):
+    monkeypatch.setenv("BINANCE_API_KEY", "key")
+    monkeypatch.setenv("BINANCE_SECRET_KEY", "secret")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), TickerHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    try:
+        binance = Binance()
+        binance.BASE_URL = f"http://127.0.0.1:{server.server_port}"
+
+        # Tiga panggilan sync berurutan memakai satu koneksi keep-alive
+        assert [binance.fetch_ticker("BTC") for _ in range(3)] == [30000.5] * 3
+        assert len(TickerHandler.client_ports) == 1
+
+        async def fetch_async():
+            return await asyncio.gather(*(binance.fetch_ticker_async("BTC") for _ in range(3)))
+
+        assert asyncio.run(fetch_async()) == [30000.5] * 3
+    finally:
+        server.shutdown()
@@ -0,0 +1,67 @@
+import asyncio
+from exchanges.binance import Binance
+from exchanges.kucoin import KuCoin
+from exchanges.indodax import Indodax
+from exchanges.poloniex import Poloniex
+from exchanges.markets import Market, MarketMetadata
+from simulator.test_simulator import SYMBOLS, start_simulator, make_adapter
+
+
+class Fake:
+    def __init__(self, markets):
+        self.markets = markets
+        self.calls = 0
+
+    def get_base_currency(self):
+        return "USDT"
+
+    async def fetch_markets_async(self):
+        self.calls += 1
+        return self.markets
+
+
+def test_metadata_from_every_venue_maps_symbols_both_ways(tmp_path, monkeypatch):
+    async def scenario():
+        simulator = await start_simulator()
+        try:
+            adapters = [make_adapter(cls, simulator, monkeypatch) for cls in (Binance, KuCoin, Indodax, Poloniex)]
+            metadata = MarketMetadata(directory=str(tmp_path))
+            await metadata.load_all(adapters)
+            return metadata
+        finally:
+            await simulator.stop()
+
+    metadata = asyncio.run(scenario())
+    expected = {"binance": "XRPUSDT", "kucoin": "XRP-USDT", "indodax": "xrpidr", "poloniex": "XRP_USDT"}
+    for name, venue_symbol in expected.items():
+        index = metadata.index(name)
+        assert index.assets() == sorted(SYMBOLS)
+        assert index.venue_symbol("XRP") == venue_symbol
+        assert index.canonical(venue_symbol) == f"XRP/{index.quote}"
+        assert index.get("XRP").min_amount() > 0
+    binance_xrp = metadata.market("binance", "XRP")
+    assert binance_xrp.tick_size > 0 and binance_xrp.min_notional == 5.0
+    assert binance_xrp.round_qty(binance_xrp.lot_size * 3.7) == binance_xrp.round_qty(binance_xrp.lot_size * 3)
+
+
+def test_disk_cache_respects_ttl_and_survives_failed_refresh(tmp_path):
+    markets = [Market("BTCUSDT", "BTC", "USDT", tick_size=0.01, lot_size=0.001, min_qty=0.001, min_notional=5),
+               Market("ETHBTC", "ETH", "BTC"), Market("OLDUSDT", "OLD", "USDT", active=False)]
+    exchange = Fake(markets)
+
+    asyncio.run(MarketMetadata(directory=str(tmp_path)).load(exchange))
+    # Proses baru dalam TTL membaca disk tanpa request ke exchange
+    metadata = MarketMetadata(directory=str(tmp_path))
+    index = asyncio.run(metadata.load(exchange))
+    assert exchange.calls == 1
+    assert index.assets() == ["BTC"]
+    assert index.get("ETH/BTC").venue_symbol == "ETHBTC"
+    assert metadata.min_amount("fake", "BTC", price=1000.0) == 0.005
+    assert metadata.min_amount("fake", "DOGE", default=1.0) == 1.0
+    assert index.get("BTC").round_price(100.004) == 100.0
+
+    # Kedaluwarsa dan fetch gagal: cache lama tetap dipakai
+    exchange.markets = []
+    index = asyncio.run(MarketMetadata(directory=str(tmp_path), ttl=0).load(exchange))
+    assert exchange.calls == 2
+    assert index.venue_symbol("BTC") == "BTCUSDT"
@@ -0,0 +1,105 @@
+import asyncio
+from exchanges.binance import Binance
+from exchanges.kucoin import KuCoin
+from exchanges.indodax import Indodax
+from exchanges.poloniex import Poloniex
+from simulator.test_simulator import start_simulator, make_adapter
+
+
+def test_orders_place_fetch_cancel_on_every_venue(monkeypatch):
+    async def scenario():
+        simulator = await start_simulator()
+        try:
+            for cls in (Binance, KuCoin, Indodax, Poloniex):
+                adapter = make_adapter(cls, simulator, monkeypatch)
+                venue = simulator.venues[cls.__name__.lower()]
+                _, bid, ask = venue.market.quote(venue.name, "XRP")
+                prefix = cls.__name__.lower()
+
+                # IOC yang menyeberang terisi penuh, yang tidak menyeberang langsung batal
+                filled = await adapter.create_order_async("XRP", "buy", 10, ask * 1.01, "limit", "IOC", f"{prefix}-ioc-1")
+                assert (filled['status'], filled['filled']) == ("filled", 10)
+                missed = await adapter.create_order_async("XRP", "sell", 10, ask * 1.5, "limit", "IOC", f"{prefix}-ioc-2")
+                assert (missed['status'], missed['filled']) == ("canceled", 0)
+
+                # GTC tetap terbuka, bisa dicek lalu dibatalkan
+                resting = await adapter.create_order_async("XRP", "buy", 10, bid * 0.5, "limit", "GTC", f"{prefix}-gtc")
+                assert resting['status'] == "open"
+                fetched = await adapter.fetch_order_async("XRP", client_order_id=f"{prefix}-gtc")
+                assert (fetched['id'], fetched['status']) == (resting['id'], "open")
+                assert await adapter.cancel_order_async("XRP", order_id=resting['id'])
+                assert (await adapter.fetch_order_async("XRP", order_id=resting['id']))['status'] == "canceled"
+
+                # Retry dengan client id sama tidak membuat order kedua
+                retried = await adapter.create_order_async("XRP", "buy", 10, ask * 1.01, "limit", "IOC", f"{prefix}-ioc-1")
+                assert retried['id'] == filled['id']
+                assert venue.stats["orders"] == 3 and venue.stats["bad_signatures"] == 0
+
+            kucoin = make_adapter(KuCoin, simulator, monkeypatch)
+            _, bid, ask = simulator.venues["kucoin"].market.quote("kucoin", "BTC")
+            batch = await kucoin.create_orders_async([
+                {'symbol': "BTC", 'side': "buy", 'amount': 0.01, 'price': ask * 1.01, 'time_in_force': "IOC"},
+                {'symbol': "BTC", 'side': "sell", 'amount': 0.01, 'price': bid * 0.99, 'time_in_force': "IOC"},
+                {'symbol': "BTC", 'side': "buy", 'amount': 1e6, 'price': ask},
+            ])
+            assert [order and order['status'] for order in batch] == ["filled", "filled", None]
+        finally:
+            await simulator.stop()
+
+    asyncio.run(scenario())
+
+
+def test_lost_batch_response_and_priceless_market_buy_recover(monkeypatch):
+    async def scenario():
+        simulator = await start_simulator()
+        try:
+            # Exchange menerima batch tapi respons hilang: order ditemukan lewat client id
+            for cls, endpoint in ((KuCoin, "/api/v1/orders/multi"), (Poloniex, "/orders/batch")):
+                adapter = make_adapter(cls, simulator, monkeypatch)
+                _, bid, ask = simulator.venues[cls.__name__.lower()].market.quote(cls.__name__.lower(), "XRP")
+                private = adapter._private_async
+
+                async def drop_response(method, path, body=None, private=private, endpoint=endpoint):
+                    result = await private(method, path, body)
+                    if path == endpoint:
+                        raise TimeoutError("respons hilang")
+                    return result
+
+                monkeypatch.setattr(adapter, "_private_async", drop_response)
+                batch = await adapter.create_orders_async([
+                    {'symbol': "XRP", 'side': "buy", 'amount': 10, 'price': ask * 1.01, 'time_in_force': "IOC",
+                     'client_order_id': f"{adapter.__class__.__name__}-lost-1"},
+                    {'symbol': "XRP", 'side': "buy", 'amount': 10, 'price': bid * 0.5, 'client_order_id': f"{adapter.__class__.__name__}-lost-2"},
+                ])
+                assert [order and order['status'] for order in batch] == ["filled", "open"]
+
+            # Market buy Indodax tanpa harga memakai harga terakhir untuk jumlah IDR
+            indodax = make_adapter(Indodax, simulator, monkeypatch)
+            order = await indodax.create_order_async("XRP", "buy", 10, None, "market", None, "indodax-market")
+            assert order is not None and order['filled'] > 0
+        finally:
+            await simulator.stop()
+
+    asyncio.run(scenario())
+
+
+def test_limit_order_without_price_is_rejected_without_breaking_the_batch(monkeypatch):
+    async def scenario():
+        simulator = await start_simulator()
+        try:
+            for cls in (Binance, KuCoin, Indodax, Poloniex):
+                adapter = make_adapter(cls, simulator, monkeypatch)
+                venue = simulator.venues[cls.__name__.lower()]
+                _, bid, ask = venue.market.quote(venue.name, "XRP")
+
+                assert await adapter.create_order_async("XRP", "buy", 10, None, "limit") is None
+                batch = await adapter.create_orders_async([
+                    {'symbol': "XRP", 'side': "buy", 'amount': 10, 'price': None},
+                    {'symbol': "XRP", 'side': "buy", 'amount': 10, 'price': ask * 1.01, 'time_in_force': "IOC"},
+                ])
+                assert [order and order['status'] for order in batch] == [None, "filled"]
+                assert venue.stats["orders"] == 1
+        finally:
+            await simulator.stop()
+
+    asyncio.run(scenario())
@@ -0,0 +1,26 @@
+from types import SimpleNamespace
+from exchanges.rate_limiter import TokenBucket, RateLimitScheduler, PRIORITY_TRADE, PRIORITY_MARKET
+
+
+def test_market_data_cannot_spend_order_reserve():
+    bucket = TokenBucket("test", capacity=100, window=60, reserve=0.2)
+    capacity = bucket.capacity
+
+    # Polling habis di batas cadangan, order masih lolos
+    while bucket.try_acquire(1, PRIORITY_MARKET) == 0:
+        pass
+    assert bucket.tokens < capacity * 0.2 + 1
+    assert bucket.remaining() < 0.01
+    assert bucket.try_acquire(5, PRIORITY_TRADE) == 0
+
+
+def test_headers_calibrate_and_429_blocks():
+    scheduler = RateLimitScheduler()
+    bucket = scheduler.bucket("binance")
+
+    scheduler.observe("binance", SimpleNamespace(status_code=200, headers={"X-MBX-USED-WEIGHT-1M": "5000"}))
+    assert bucket.tokens <= bucket.capacity - 5000
+
+    scheduler.observe("binance", SimpleNamespace(status_code=429, headers={"Retry-After": "30"}))
+    assert 29 < bucket.try_acquire(1, PRIORITY_TRADE) <= 30
+    assert scheduler.cost("binance", "GET", "/api/v3/depth", {"limit": 500}) == (25, PRIORITY_MARKET)
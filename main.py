@@ -1,85 +1,177 @@
 import asyncio
 import os
-import logging
 import time
-import ntplib
 from dotenv import load_dotenv
 
 load_dotenv()
 
 from utils.helpers import get_active_exchanges
-from utils.logger import setup_logger
+from utils.logger import logger, setup_logger
 from core.price_collector import PriceCollector
 from core.arbitrage_engine import ArbitrageEngine
 from core.transfer_manager import TransferManager
+from core.capital_allocator import CapitalAllocator
 from strategies.balance_rotator import BalanceRotator
+from core.price_board import PriceBoard
+from core.market_stream import StreamHub, OrderBookHub
+from core.order_book import OrderBookStore
+from core.event_detector import EventDrivenDetector
+from core.tick_recorder import get_tick_recorder
+from strategies.graph_arbitrage import GraphArbitrageStrategy
+from config.settings import (
+    PRICE_SOURCE, DETECTION_MODE, POLL_INTERVAL, ORDER_BOOK_SOURCE, TICK_RECORDER_ENABLED, GRAPH_ARBITRAGE,
+    HTTP_WARMUP_INTERVAL, CAPITAL_ALLOCATION
+)
+from utils.balance_cache import balance_cache
+from utils.fx_rate import fx_rate_service
+from exchanges.rate_limiter import rate_limiter
+from exchanges.clock import server_clock
+from exchanges.markets import market_metadata
+from exchanges.http_client import http_pool
+from utils.metrics import start_metrics_server, CYCLE_SECONDS, OPPORTUNITIES, RATE_LIMIT_REMAINING
 
-# Setup logger
-logger = setup_logger()
-logger.setLevel(logging.DEBUG)
+async def execute_opportunities(transfer_manager, opportunities, allocator=None):
+    """Eksekusi semua peluang yang ditemukan; peluang dengan saldo berbeda berjalan bersamaan"""
+    logger.info(f"✅ Ditemukan {len(opportunities)} peluang arbitrase")
 
-def check_time_sync():
-    """Cek sinkronisasi waktu dengan server NTP"""
-    try:
-        client = ntplib.NTPClient()
-        response = client.request('pool.ntp.org')
-        current_time = time.time()
-        ntp_time = response.tx_time
-        time_diff = abs(ntp_time - current_time)
-        
-        if time_diff > 5:
-            logger.warning(f"⚠️ Waktu sistem tidak sinkron! Selisih: {time_diff:.2f} detik")
-            logger.warning("Harap sinkronkan waktu sistem Anda dengan internet")
+    # Saldo dibagi sekali untuk semua peluang, bukan tiap peluang memakai saldo penuh
+    if allocator is not None:
+        opportunities = await allocator.allocate_async(opportunities)
+        if not opportunities:
+            logger.info("💰 Tidak ada peluang yang mendapat alokasi modal")
+            return
+    OPPORTUNITIES.labels("executable").inc(len(opportunities))
+
+    # Latensi leg dihitung dari keputusan; mode polling belum punya decided_at dari detektor event
+    decided_at = time.time()
+    for opportunity in opportunities:
+        opportunity.setdefault('decided_at', decided_at)
+        logger.info(f"🚀 Mengeksekusi peluang: {opportunity['symbol']}")
+
+    results = await transfer_manager.execute_many(opportunities)
+    for opportunity, success in zip(opportunities, results):
+        if success:
+            logger.info(f"✅ Arbitrase berhasil: {opportunity['symbol']}")
         else:
-            logger.info(f"✅ Waktu sistem sinkron (selisih: {time_diff:.2f} detik)")
-    except Exception as e:
-        logger.error(f"❌ Gagal cek sinkronisasi waktu: {e}")
+            logger.warning(f"⚠️ Gagal eksekusi arbitrase: {opportunity['symbol']}")
 
 async def run_bot():
     logger.info("🚀 Memulai bot arbitrase crypto...")
     os.makedirs("data/logs", exist_ok=True)
     
-    # Cek sinkronisasi waktu
-    check_time_sync()
-    
     try:
         # Muat exchange aktif
         exchanges = get_active_exchanges()
         exchange_names = [ex.__class__.__name__ for ex in exchanges]
         logger.info(f"💱 Exchange aktif: {', '.join(exchange_names)}")
+
+        # Endpoint /metrics lokal; nilai rate limit dihitung saat di-scrape
+        for ex in exchanges:
+            name = ex.__class__.__name__.lower()
+            RATE_LIMIT_REMAINING.labels(name).set_function(lambda name=name: rate_limiter.remaining(name))
+        start_metrics_server()
+
+        # Kalibrasi offset jam tiap exchange sebelum request bertanda tangan pertama
+        await server_clock.calibrate_all(exchanges)
+        server_clock.start(exchanges)
+
+        # Koneksi ke semua exchange dibuka sekarang dan dijaga hidup untuk jalur order
+        if HTTP_WARMUP_INTERVAL > 0:
+            http_pool.keep_warm(exchanges)
+
+        # Daftar instrumen tiap exchange (cache disk dengan TTL) untuk pemetaan simbol dan filter order
+        await market_metadata.load_all(exchanges)
+
+        # Kurs USD/IDR diperbarui di background, dibaca dari memori setiap siklus
+        indodax = next((ex for ex in exchanges if ex.__class__.__name__.lower() == "indodax"), None)
+        fx_rate_service.start(indodax=indodax)
         
         # Inisialisasi komponen
-        price_collector = PriceCollector(exchanges)
-        arbitrage_engine = ArbitrageEngine(price_collector, exchanges)
+        price_board = PriceBoard() if PRICE_SOURCE == "stream" else None
+        order_books = OrderBookStore() if ORDER_BOOK_SOURCE == "stream" else None
+        # Semua tick (REST dan stream) direkam ke disk untuk backtest, ditulis di thread terpisah
+        tick_recorder = None
+        if TICK_RECORDER_ENABLED:
+            tick_recorder = get_tick_recorder()
+            tick_recorder.start()
+        price_collector = PriceCollector(exchanges, price_board=price_board, recorder=tick_recorder)
+        # Siklus multi-leg: tick stream langsung memperbarui edge graf, pencarian saat evaluasi
+        graph_strategy = GraphArbitrageStrategy() if GRAPH_ARBITRAGE else None
+        if graph_strategy is not None and price_board is not None:
+            price_board.add_listener(graph_strategy.on_tick)
+        arbitrage_engine = ArbitrageEngine(price_collector, exchanges, order_books=order_books,
+                                           graph_strategy=graph_strategy)
         transfer_manager = TransferManager(exchanges)
+        allocator = CapitalAllocator(exchanges) if CAPITAL_ALLOCATION else None
         balance_rotator = BalanceRotator(exchanges)
+
+        # Stream market data (opsional), REST tetap jadi fallback
+        stream_hub = None
+        if price_board is not None:
+            stream_hub = StreamHub(exchange_names, price_collector.symbols, price_board)
+            stream_hub.start()
+            logger.info(f"📡 Stream market data aktif untuk: {', '.join(stream_hub.managers)}")
+
+        # Order book lokal dari diff-depth stream, dibaca sizing tanpa request REST
+        order_book_hub = None
+        if order_books is not None:
+            order_book_hub = OrderBookHub(exchanges, price_collector.symbols, order_books)
+            order_book_hub.start()
+            logger.info(f"📚 Order book lokal aktif untuk: {', '.join(order_book_hub.managers)}")
+
+        # Mode event-driven: setiap tick memicu evaluasi simbol terkait, loop utama hanya pemeliharaan
+        event_detector = None
+        if DETECTION_MODE == "event":
+            event_detector = EventDrivenDetector(
+                price_collector,
+                arbitrage_engine,
+                lambda opportunities: execute_opportunities(transfer_manager, opportunities, allocator)
+            )
+            if event_detector.start() is None:
+                event_detector = None
         
         while True:
             try:
+                cycle_start = time.perf_counter()
+
+                # Sinkronkan simbol yang dikumpulkan dan dievaluasi (dan langganan stream) jika SUPPORTED_SYMBOLS di .env berubah
+                load_dotenv(override=True)
+                symbols = price_collector.get_supported_symbols()
+                if symbols != price_collector.symbols:
+                    logger.info(f"🔄 SUPPORTED_SYMBOLS berubah: {', '.join(symbols)}")
+                    price_collector.symbols = symbols
+                    for hub in (stream_hub, order_book_hub):
+                        if hub:
+                            await hub.set_symbols(symbols)
+
+                # Snapshot saldo baru untuk siklus ini
+                balance_cache.new_cycle()
+
                 # 1. Putar saldo ke posisi optimal
                 await balance_rotator.rotate_balances()
                 
-                # 2. Jalankan deteksi arbitrase
-                logger.debug("🔄 Mengumpulkan harga...")
-                opportunities = arbitrage_engine.run()
-                
-                if opportunities:
-                    logger.info(f"✅ Ditemukan {len(opportunities)} peluang arbitrase")
-                    
-                    # 3. Eksekusi peluang
-                    for opportunity in opportunities:
-                        logger.info(f"🚀 Mengeksekusi peluang: {opportunity['symbol']}")
-                        success = await transfer_manager.execute_arbitrage(opportunity)
-                        
-                        if success:
-                            logger.info(f"✅ Arbitrase berhasil: {opportunity['symbol']}")
-                        else:
-                            logger.warning(f"⚠️ Gagal eksekusi arbitrase: {opportunity['symbol']}")
+                if event_detector:
+                    # Isi ulang harga REST untuk simbol yang belum dikirim stream
+                    await asyncio.to_thread(price_collector.collect_prices)
+                    logger.info(f"⏱️ Latensi tick→keputusan: {event_detector.latency.summary()}")
                 else:
-                    logger.info("🔍 Tidak ada peluang arbitrase saat ini")
+                    # 2. Jalankan deteksi arbitrase
+                    logger.debug("🔄 Mengumpulkan harga...")
+                    opportunities = await asyncio.to_thread(arbitrage_engine.run)
+                    
+                    if opportunities:
+                        # 3. Eksekusi peluang
+                        await execute_opportunities(transfer_manager, opportunities, allocator)
+                    else:
+                        logger.info("🔍 Tidak ada peluang arbitrase saat ini")
                 
-                # 4. Tunggu sebelum iterasi berikutnya
-                await asyncio.sleep(60)
+                CYCLE_SECONDS.observe(time.perf_counter() - cycle_start)
+
+                # 4. Tunggu sebelum iterasi berikutnya, diperpanjang jika budget rate limit menipis
+                interval = max(POLL_INTERVAL, rate_limiter.suggested_interval())
+                if interval > POLL_INTERVAL:
+                    logger.info(f"🚦 Budget rate limit menipis, jeda siklus diperpanjang ke {interval:.0f}s")
+                await asyncio.sleep(interval)
                     
             except Exception as e:
                 logger.error(f"🚨 Kesalahan dalam siklus utama: {e}")
@@ -89,4 +181,5 @@ async def run_bot():
         logger.critical(f"🛑 Bot gagal diinisialisasi: {e}")
 
 if __name__ == "__main__":
+    setup_logger()
     asyncio.run(run_bot())
\ No newline at end of file
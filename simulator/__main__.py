@@ -0,0 +1,107 @@
+"""
+Simulator exchange lokal untuk uji beban dan latensi tanpa jaringan.
+
+    python -m simulator --num-symbols 300 --latency-ms 40 --jitter-ms 20 --error-rate 0.01
+    python -m simulator --symbols BTC,XRP,SHIB,BNB --run-bot
+
+Tanpa --run-bot simulator mencetak variabel lingkungan (URL, API key tiruan, alamat wallet)
+yang bisa disalin ke .env; dengan --run-bot main.py dijalankan sebagai proses terpisah
+yang sudah diarahkan ke simulator.
+"""
+import os
+import sys
+import argparse
+import tempfile
+import asyncio
+
+from simulator.market import SimulatedMarket, DEFAULT_PRICES, PROCESSES
+from simulator.faults import FaultInjector
+from simulator.server import Simulator
+from simulator.venues import VENUES
+from utils.logger import logger, setup_logger
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m simulator", description="Exchange tiruan lokal untuk bot arbitrase")
+    parser.add_argument("--venues", default=",".join(VENUES), help="daftar venue, contoh binance,kucoin,indodax")
+    parser.add_argument("--symbols", help="daftar simbol, contoh BTC,XRP,SHIB,BNB")
+    parser.add_argument("--num-symbols", type=int, default=0, help="tambahkan simbol sintetis hingga jumlah ini")
+    parser.add_argument("--process", choices=sorted(PROCESSES), default="gbm", help="proses harga referensi")
+    parser.add_argument("--volatility", type=float, default=0.03, help="standar deviasi return harian")
+    parser.add_argument("--dislocation", type=float, default=0.002, help="simpangan harga antar venue")
+    parser.add_argument("--spread", type=float, default=0.0005, help="spread bid/ask relatif")
+    parser.add_argument("--usd-to-idr", type=float, default=16000.0)
+    parser.add_argument("--tick-interval", type=float, default=0.1, help="detik antar update harga dan stream")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="peluang respons 5xx per request")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="peluang 429 acak per request")
+    parser.add_argument("--clock-offset-ms", type=int, default=0, help="geser jam server semua venue")
+    parser.add_argument("--no-rate-limit", action="store_true", help="matikan batas bobot per venue")
+    parser.add_argument("--transfer-delay", type=float, default=5.0, help="detik sampai withdrawal tiba di venue tujuan")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8800, help="REST di port+1.., WebSocket di port+11..; 0 = acak")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--run-bot", action="store_true", help="jalankan main.py terhadap simulator")
+    return parser.parse_args(argv)
+
+
+def build_symbols(args):
+    symbols = [s.strip().upper() for s in (args.symbols or ",".join(DEFAULT_PRICES)).split(",") if s.strip()]
+    for i in range(len(symbols), args.num_symbols):
+        symbols.append(f"SIM{i:04d}")
+    return symbols
+
+
+async def run(args):
+    venues = [v.strip().lower() for v in args.venues.split(",") if v.strip()]
+    symbols = build_symbols(args)
+    market = SimulatedMarket(
+        symbols, venues, process=args.process, volatility=args.volatility, dislocation=args.dislocation,
+        spread=args.spread, usd_to_idr=args.usd_to_idr, seed=args.seed
+    )
+    faults = {
+        venue: FaultInjector(args.latency_ms, args.jitter_ms, args.error_rate, args.throttle_rate,
+                             args.clock_offset_ms, seed=None if args.seed is None else args.seed + i)
+        for i, venue in enumerate(venues)
+    }
+    simulator = await Simulator(
+        market, venues, args.host, args.port, faults, rate_limits=not args.no_rate_limit,
+        tick_interval=args.tick_interval, transfer_delay=args.transfer_delay
+    ).start()
+    logger.info(f"🧪 Simulator aktif: {len(symbols)} simbol di {', '.join(venues)}")
+
+    env = simulator.env()
+    bot = None
+    if args.run_bot:
+        # Log, kurs dan cache bot tiruan di direktori sementara agar data produksi tidak tertimpa
+        scratch = tempfile.mkdtemp(prefix="bitbot-sim-")
+        env.update({
+            "LOG_FILE": os.path.join(scratch, "logs", "bot.jsonl"),
+            "FX_CACHE_FILE": os.path.join(scratch, "last_rate.json"),
+            "MARKET_CACHE_DIR": os.path.join(scratch, "markets"),
+            "TICK_DIR": os.path.join(scratch, "ticks"),
+        })
+        logger.info(f"🧪 Data bot tiruan di {scratch}")
+        bot = await asyncio.create_subprocess_exec(sys.executable, "main.py", env={**os.environ, **env})
+    else:
+        print("\n".join(f"{name}={value}" for name, value in env.items()), flush=True)
+
+    try:
+        while bot is None or bot.returncode is None:
+            await asyncio.sleep(30)
+            logger.info(f"🧪 Statistik simulator: {simulator.stats()}")
+    finally:
+        if bot is not None and bot.returncode is None:
+            bot.terminate()
+            await bot.wait()
+        await simulator.stop()
+
+
+if __name__ == "__main__":
+    # Log simulator dipisah dari log bot
+    setup_logger(os.getenv("LOG_FILE", "data/logs/simulator.jsonl"))
+    try:
+        asyncio.run(run(parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,73 @@
+import time
+import random
+import asyncio
+from exchanges.rate_limiter import EXCHANGE_LIMITS
+
+
+class FaultInjector:
+    """
+    Gangguan yang disuntikkan ke setiap request REST: latensi (rata-rata + jitter),
+    respons 5xx acak, 429 acak di luar batas bobot, dan jam server yang meleset.
+    """
+
+    SERVER_ERRORS = (500, 502, 503)
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, throttle_rate=0.0,
+                 clock_offset_ms=0, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.clock_offset_ms = clock_offset_ms
+        self.random = random.Random(seed)
+
+    async def delay(self):
+        latency = self.latency_ms + (self.random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0)
+        if latency > 0:
+            await asyncio.sleep(latency / 1000)
+
+    def fault(self):
+        """Status HTTP gangguan untuk request ini, atau None jika request diproses normal"""
+        roll = self.random.random()
+        if roll < self.throttle_rate:
+            return 429
+        if roll < self.throttle_rate + self.error_rate:
+            return self.random.choice(self.SERVER_ERRORS)
+        return None
+
+    def now_ms(self):
+        """Jam server venue (bisa sengaja digeser untuk menguji kalibrasi offset)"""
+        return int(time.time() * 1000) + self.clock_offset_ms
+
+
+class WeightLimiter:
+    """
+    Batas bobot per jendela tetap seperti di server exchange, dengan bobot endpoint yang sama
+    dengan tabel di exchanges.rate_limiter. Request di atas batas dibalas 429 + Retry-After.
+    """
+
+    def __init__(self, venue, enabled=True):
+        capacity, window, cost = EXCHANGE_LIMITS[venue]
+        self.capacity = capacity
+        self.window = window
+        self.cost = cost
+        self.enabled = enabled
+        self.used = 0
+        self.window_start = time.monotonic()
+
+    def consume(self, method, path, params, data):
+        """Kembalikan (diterima, sisa detik jendela saat ini)"""
+        now = time.monotonic()
+        if now - self.window_start >= self.window:
+            self.window_start = now
+            self.used = 0
+        weight, _ = self.cost(method, path, params, data)
+        reset_in = self.window - (now - self.window_start)
+        if self.enabled and self.used + weight > self.capacity:
+            return False, reset_in
+        self.used += weight
+        return True, reset_in
+
+    @property
+    def remaining(self):
+        return max(0, self.capacity - self.used)
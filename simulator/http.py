@@ -0,0 +1,100 @@
+import json
+import asyncio
+from urllib.parse import parse_qsl, unquote
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    401: "Unauthorized",
+    404: "Not Found",
+    418: "I'm a teapot",
+    429: "Too Many Requests",
+    500: "Internal Server Error",
+    502: "Bad Gateway",
+    503: "Service Unavailable",
+}
+
+
+class Request:
+    def __init__(self, method, target, headers, body):
+        self.method = method.upper()
+        path, _, query = target.partition("?")
+        self.path = unquote(path)
+        self.query = query
+        self.headers = headers
+        self.body = body
+
+    @property
+    def params(self):
+        return dict(parse_qsl(self.query, keep_blank_values=True))
+
+    def form(self):
+        return dict(parse_qsl(self.body.decode("utf-8"), keep_blank_values=True))
+
+    def json(self):
+        return json.loads(self.body or b"null")
+
+    def header(self, name, default=None):
+        return self.headers.get(name.lower(), default)
+
+
+class Response:
+    def __init__(self, status=200, data=None, headers=None):
+        self.status = status
+        self.data = data
+        self.headers = headers or {}
+
+    def encode(self, keep_alive):
+        body = json.dumps(self.data, separators=(",", ":")).encode("utf-8")
+        lines = [f"HTTP/1.1 {self.status} {REASONS.get(self.status, 'Unknown')}"]
+        headers = {
+            "Content-Type": "application/json",
+            "Content-Length": str(len(body)),
+            "Connection": "keep-alive" if keep_alive else "close",
+            **self.headers,
+        }
+        lines.extend(f"{name}: {value}" for name, value in headers.items())
+        return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body
+
+
+async def serve_http(handler, host, port):
+    """
+    Server HTTP/1.1 minimal (keep-alive, Content-Length) di event loop yang sedang berjalan.
+    handler: coroutine Request -> Response. Cukup untuk httpx; tidak mendukung chunked upload.
+    """
+
+    async def on_connection(reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, version = request_line.decode("latin-1").rstrip("\r\n").split(" ", 2)
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length", 0))
+                body = await reader.readexactly(length) if length else b""
+
+                try:
+                    response = await handler(Request(method, target, headers, body))
+                except Exception as e:
+                    response = Response(500, {"error": str(e)})
+
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                writer.write(response.encode(keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(on_connection, host, port)
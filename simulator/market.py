@@ -0,0 +1,203 @@
+import math
+import time
+import numpy as np
+
+# Harga awal untuk simbol yang dikenal, simbol lain diberi harga acak log-uniform
+DEFAULT_PRICES = {
+    "BTC": 60000.0,
+    "ETH": 3000.0,
+    "BNB": 600.0,
+    "XRP": 0.5,
+    "SHIB": 0.00002,
+    "SOL": 150.0,
+    "DOGE": 0.15,
+}
+
+SECONDS_PER_DAY = 86400.0
+
+
+class PriceProcess:
+    """Proses harga referensi untuk semua simbol sekaligus (vektor numpy log-harga)"""
+
+    def __init__(self, volatility):
+        # volatility: standar deviasi return harian, dikonversi ke per detik
+        self.sigma = volatility / math.sqrt(SECONDS_PER_DAY)
+
+    def step(self, log_prices, anchors, dt, rng):
+        raise NotImplementedError
+
+
+class GeometricBrownian(PriceProcess):
+    def step(self, log_prices, anchors, dt, rng):
+        shocks = rng.standard_normal(log_prices.shape)
+        return log_prices - 0.5 * self.sigma ** 2 * dt + self.sigma * math.sqrt(dt) * shocks
+
+
+class MeanReverting(PriceProcess):
+    """Ornstein-Uhlenbeck di log-harga, kembali ke harga awal dengan half-life tertentu"""
+
+    def __init__(self, volatility, half_life=600.0):
+        super().__init__(volatility)
+        self.theta = math.log(2) / half_life
+
+    def step(self, log_prices, anchors, dt, rng):
+        shocks = rng.standard_normal(log_prices.shape)
+        return log_prices + self.theta * (anchors - log_prices) * dt + self.sigma * math.sqrt(dt) * shocks
+
+
+class JumpDiffusion(GeometricBrownian):
+    """GBM ditambah lompatan harga acak (rata-rata jumps_per_hour per simbol)"""
+
+    def __init__(self, volatility, jumps_per_hour=2.0, jump_size=0.01):
+        super().__init__(volatility)
+        self.jump_rate = jumps_per_hour / 3600.0
+        self.jump_size = jump_size
+
+    def step(self, log_prices, anchors, dt, rng):
+        log_prices = super().step(log_prices, anchors, dt, rng)
+        jumps = rng.random(log_prices.shape) < self.jump_rate * dt
+        if jumps.any():
+            log_prices = log_prices + jumps * rng.normal(0.0, self.jump_size, log_prices.shape)
+        return log_prices
+
+
+PROCESSES = {
+    "gbm": GeometricBrownian,
+    "ou": MeanReverting,
+    "jump": JumpDiffusion,
+}
+
+
+def _round_price(price):
+    """Bulatkan ke 6 angka penting agar level order book punya tick yang stabil"""
+    if price <= 0:
+        return 0.0
+    return round(price, 5 - int(math.floor(math.log10(price))))
+
+
+def format_number(value):
+    return f"{value:.10g}"
+
+
+class SimulatedBook:
+    """
+    Order book satu venue/simbol yang dibangun ulang di sekitar mid setiap tick.
+    refresh() mengembalikan selisih level terhadap book sebelumnya dengan nomor urut baru,
+    sehingga bisa dikirim sebagai diff-depth stream.
+    """
+
+    def __init__(self, levels, spread, rng):
+        self.levels = levels
+        self.spread = spread
+        self.rng = rng
+        self.bids = {}
+        self.asks = {}
+        self.sequence = 0
+
+    def refresh(self, mid):
+        step = max(self.spread / 2, 0.0001)
+        quantities = self.rng.exponential(1.0, 2 * self.levels) * (1000.0 / mid)
+        bids, asks = {}, {}
+        for i in range(self.levels):
+            bids[_round_price(mid * (1 - self.spread / 2 - i * step))] = quantities[i]
+            asks[_round_price(mid * (1 + self.spread / 2 + i * step))] = quantities[self.levels + i]
+
+        bid_changes = self._diff(self.bids, bids)
+        ask_changes = self._diff(self.asks, asks)
+        self.bids, self.asks = bids, asks
+        self.sequence += 1
+        return self.sequence, bid_changes, ask_changes
+
+    @staticmethod
+    def _diff(old, new):
+        changes = [(price, qty) for price, qty in new.items() if old.get(price) != qty]
+        changes.extend((price, 0.0) for price in old if price not in new)
+        return changes
+
+    def snapshot(self, depth):
+        bids = sorted(self.bids.items(), reverse=True)[:depth]
+        asks = sorted(self.asks.items())[:depth]
+        return self.sequence, bids, asks
+
+
+class SimulatedMarket:
+    """
+    Harga referensi per simbol dari PriceProcess, ditambah deviasi per venue (OU kecil)
+    sehingga selisih antar exchange muncul dan hilang seperti di pasar sungguhan.
+    Harga venue IDR dikalikan usd_to_idr.
+    """
+
+    def __init__(self, symbols, venues, process="gbm", volatility=0.03, dislocation=0.002,
+                 spread=0.0005, depth_levels=50, usd_to_idr=16000.0, idr_venues=("indodax",), seed=None):
+        self.rng = np.random.default_rng(seed)
+        self.symbols = [s.strip().upper() for s in symbols if s.strip()]
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.venues = list(venues)
+        self.venue_index = {venue: i for i, venue in enumerate(self.venues)}
+        self.usd_to_idr = usd_to_idr
+        self.idr_venues = set(idr_venues)
+        self.spread = spread
+        self.depth_levels = depth_levels
+
+        initial = np.array([
+            DEFAULT_PRICES.get(symbol, float(np.exp(self.rng.uniform(math.log(0.01), math.log(500)))))
+            for symbol in self.symbols
+        ])
+        self.anchors = np.log(initial)
+        self.log_prices = self.anchors.copy()
+        self.process = PROCESSES[process](volatility)
+
+        # Deviasi venue: OU dengan half-life 30 detik dan simpangan stasioner `dislocation`
+        self.dislocation = dislocation
+        self.deviation_theta = math.log(2) / 30.0
+        self.deviations = self.rng.normal(0.0, dislocation, (len(self.venues), len(self.symbols)))
+        self.venue_prices = np.exp(self.log_prices + self.deviations)
+
+        self.books = {}
+        self.updated_at = time.time()
+
+    def step(self, dt):
+        """Majukan semua harga dt detik, kembalikan diff order book yang aktif"""
+        self.log_prices = self.process.step(self.log_prices, self.anchors, dt, self.rng)
+        noise = self.rng.standard_normal(self.deviations.shape)
+        stationary = self.dislocation * math.sqrt(2 * self.deviation_theta)
+        self.deviations += -self.deviation_theta * self.deviations * dt + stationary * math.sqrt(dt) * noise
+        self.venue_prices = np.exp(self.log_prices + self.deviations)
+        self.updated_at = time.time()
+
+        diffs = {}
+        for (venue, symbol), book in self.books.items():
+            diffs[(venue, symbol)] = book.refresh(self.mid(venue, symbol))
+        return diffs
+
+    def has_symbol(self, symbol):
+        return symbol.upper() in self.index
+
+    def usd_price(self, venue, symbol):
+        return float(self.venue_prices[self.venue_index[venue], self.index[symbol.upper()]])
+
+    def mid(self, venue, symbol):
+        """Harga mid dalam mata uang quote venue (IDR untuk venue IDR)"""
+        price = self.usd_price(venue, symbol)
+        return price * self.usd_to_idr if venue in self.idr_venues else price
+
+    def quote(self, venue, symbol):
+        """(last, bid, ask) dalam mata uang quote venue"""
+        mid = self.mid(venue, symbol)
+        return mid, mid * (1 - self.spread / 2), mid * (1 + self.spread / 2)
+
+    def prices(self, venue):
+        """{simbol: harga mid} semua simbol, dalam mata uang quote venue"""
+        row = self.venue_prices[self.venue_index[venue]]
+        scale = self.usd_to_idr if venue in self.idr_venues else 1.0
+        return dict(zip(self.symbols, (row * scale).tolist()))
+
+    def book(self, venue, symbol):
+        """Order book venue/simbol; dibuat saat pertama diminta lalu ikut diperbarui setiap tick"""
+        key = (venue, symbol.upper())
+        book = self.books.get(key)
+        if book is None:
+            book = SimulatedBook(self.depth_levels, self.spread, self.rng)
+            book.refresh(self.mid(venue, symbol))
+            self.books[key] = book
+        return book
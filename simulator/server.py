@@ -0,0 +1,128 @@
+import time
+import asyncio
+import logging
+from websockets.asyncio.server import serve as serve_websocket
+from .http import serve_http
+from .venues import VENUES
+
+logger = logging.getLogger(__name__)
+
+# Per venue: (variabel URL REST, variabel URL WebSocket, path WebSocket, API key, secret, passphrase).
+# KuCoin tidak punya URL WebSocket tetap, endpoint-nya diberikan oleh bullet-public.
+ENV_NAMES = {
+    "binance": ("BINANCE_REST_URL", "BINANCE_WS_URL", "stream", "BINANCE_API_KEY", "BINANCE_SECRET_KEY", None),
+    "kucoin": ("KUCOIN_REST_URL", None, "", "KUCOIN_API_KEY", "KUCOIN_API_SECRET", "KUCOIN_API_PASSPHRASE"),
+    "indodax": ("INDODAX_REST_URL", "INDODAX_WS_URL", "", "INDODAX_API_KEY", "INDODAX_SECRET_KEY", None),
+    "poloniex": ("POLONIEX_REST_URL", "POLONIEX_WS_URL", "", "POLONIEX_API_KEY", "POLONIEX_API_SECRET", None),
+}
+
+
+def default_credentials(venue):
+    return {"key": f"sim-{venue}-key", "secret": f"sim-{venue}-secret", "passphrase": f"sim-{venue}-passphrase"}
+
+
+def wallet_address(venue, asset):
+    """Alamat deposit tiruan; withdrawal ke alamat ini dikreditkan ke venue tujuan"""
+    return f"sim-{venue}-{asset.lower()}"
+
+
+class Simulator:
+    """
+    Menjalankan semua venue tiruan di event loop yang sedang berjalan: satu server REST dan
+    satu server WebSocket per venue, plus task yang memajukan harga setiap tick_interval detik
+    dan mendorong update ke semua langganan stream.
+    """
+
+    def __init__(self, market, venues=tuple(VENUES), host="127.0.0.1", port=0, faults=None,
+                 rate_limits=True, tick_interval=0.1, transfer_delay=5.0):
+        self.market = market
+        self.host = host
+        self.port = port
+        self.tick_interval = tick_interval
+        self.transfer_delay = transfer_delay
+        faults = faults or {}
+        self.venues = {
+            name: VENUES[name](market, default_credentials(name), faults.get(name), rate_limits)
+            for name in venues
+        }
+        for venue in self.venues.values():
+            venue.on_withdraw = self._route_withdrawal
+        self.rest_urls = {}
+        self.ws_urls = {}
+        self._servers = []
+        self._ticker = None
+        self._loop = None
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        for offset, (name, venue) in enumerate(self.venues.items()):
+            # Port tetap: REST di port+1.., WebSocket di port+11..; port 0 berarti port acak
+            rest_port = self.port + 1 + offset if self.port else 0
+            ws_port = self.port + 11 + offset if self.port else 0
+
+            rest = await serve_http(venue.handle, self.host, rest_port)
+            ws = await serve_websocket(venue.ws_handler, self.host, ws_port, ping_interval=None)
+            self._servers.extend([rest, ws])
+
+            rest_port = rest.sockets[0].getsockname()[1]
+            ws_port = next(iter(ws.sockets)).getsockname()[1]
+            self.rest_urls[name] = f"http://{self.host}:{rest_port}"
+            venue.ws_url = self.ws_urls[name] = f"ws://{self.host}:{ws_port}/"
+
+        self._ticker = asyncio.create_task(self._run_market(), name="simulator-market")
+        return self
+
+    async def stop(self):
+        if self._ticker:
+            self._ticker.cancel()
+            await asyncio.gather(self._ticker, return_exceptions=True)
+        for server in self._servers:
+            server.close()
+        for server in self._servers:
+            await server.wait_closed()
+        self._servers = []
+
+    async def _run_market(self):
+        last = time.monotonic()
+        while True:
+            await asyncio.sleep(self.tick_interval)
+            now = time.monotonic()
+            diffs = self.market.step(now - last)
+            last = now
+            await asyncio.gather(*(venue.publish(diffs) for venue in self.venues.values()))
+
+    def _route_withdrawal(self, source, asset, amount, address):
+        for name, venue in self.venues.items():
+            if address == wallet_address(name, asset):
+                self._loop.call_later(self.transfer_delay, venue.deposit, asset, amount)
+                logger.info(f"🧪 Withdrawal {amount} {asset} {source} -> {name}, tiba dalam {self.transfer_delay:.0f}s")
+                return
+        logger.info(f"🧪 Withdrawal {amount} {asset} dari {source} ke alamat luar {address}")
+
+    def env(self, symbols=None):
+        """Variabel lingkungan agar bot memakai simulator ini (URL, kredensial, kurs, alamat wallet)"""
+        env = {
+            "ACTIVE_EXCHANGES": ",".join(self.venues),
+            "SUPPORTED_SYMBOLS": ",".join(self.market.symbols if symbols is None else symbols),
+            "USD_TO_IDR_RATE": str(self.market.usd_to_idr),
+        }
+        for name in self.venues:
+            rest_variable, ws_variable, ws_path, key, secret, passphrase = ENV_NAMES[name]
+            env[rest_variable] = self.rest_urls[name]
+            if ws_variable:
+                env[ws_variable] = self.ws_urls[name] + ws_path
+
+            credentials = default_credentials(name)
+            env[key] = credentials["key"]
+            env[secret] = credentials["secret"]
+            if passphrase:
+                env[passphrase] = credentials["passphrase"]
+            if name == "indodax":
+                env["INDODAX_WS_TOKEN"] = "sim-indodax-token"
+
+            for asset in self.market.symbols if symbols is None else symbols:
+                env[f"{name.upper()}_{asset.upper()}_WALLET"] = wallet_address(name, asset)
+        return env
+
+    def stats(self):
+        return {name: dict(venue.stats) for name, venue in self.venues.items()}
@@ -0,0 +1,113 @@
+import asyncio
+from core.price_board import PriceBoard
+from core.market_stream import PoloniexStream
+from exchanges.binance import Binance
+from exchanges.kucoin import KuCoin
+from exchanges.indodax import Indodax
+from simulator.market import SimulatedMarket
+from simulator.server import Simulator
+
+SYMBOLS = ["BTC", "XRP", "SIM0001"]
+
+
+async def start_simulator():
+    market = SimulatedMarket(SYMBOLS, ["binance", "kucoin", "indodax", "poloniex"], seed=1)
+    return await Simulator(market, tick_interval=0.02).start()
+
+
+def make_adapter(cls, simulator, monkeypatch):
+    for name, value in simulator.env().items():
+        monkeypatch.setenv(name, value)
+    adapter = cls()
+    adapter.BASE_URL = simulator.rest_urls[cls.__name__.lower()]
+    return adapter
+
+
+def test_adapters_round_trip_with_signature_checks(monkeypatch):
+    async def scenario():
+        simulator = await start_simulator()
+        try:
+            binance = make_adapter(Binance, simulator, monkeypatch)
+            kucoin = make_adapter(KuCoin, simulator, monkeypatch)
+            indodax = make_adapter(Indodax, simulator, monkeypatch)
+
+            tickers = await binance.fetch_tickers_async(SYMBOLS)
+            assert all(price > 0 for price in tickers.values())
+            assert (await kucoin.fetch_order_book_async("BTC"))['sequence'] is not None
+
+            assert (await binance.fetch_balance_async())["USDT"]["free"] > 0
+            assert (await kucoin.fetch_balance_async())["BTC"]["free"] > 0
+            assert (await indodax.fetch_balance_async())["IDR"]["free"] > 0
+            assert simulator.stats()["binance"]["bad_signatures"] == 0
+
+            # Secret salah ditolak seperti di exchange sungguhan
+            monkeypatch.setenv("BINANCE_SECRET_KEY", "wrong")
+            forged = Binance()
+            forged.BASE_URL = binance.BASE_URL
+            assert await forged.fetch_balance_async() == {}
+            assert simulator.stats()["binance"]["bad_signatures"] == 1
+        finally:
+            await simulator.stop()
+
+    asyncio.run(scenario())
+
+
+def test_stream_pushes_ticks_to_price_board(monkeypatch):
+    async def scenario():
+        simulator = await start_simulator()
+        board = PriceBoard()
+        stream = PoloniexStream(board, ["BTC"])
+        stream.URL = simulator.ws_urls["poloniex"]
+        task = asyncio.create_task(stream.run())
+        try:
+            for _ in range(100):
+                await asyncio.sleep(0.02)
+                if board.get("poloniex", "BTC") is not None:
+                    break
+            assert board.get("poloniex", "BTC") > 0
+        finally:
+            await stream.stop()
+            task.cancel()
+            await simulator.stop()
+
+    asyncio.run(scenario())
+
+
+def test_failed_heartbeat_closes_socket_and_reconnects(monkeypatch):
+    monkeypatch.setattr("core.market_stream.STREAM_RECONNECT_DELAY", 0.01)
+
+    async def scenario():
+        simulator = await start_simulator()
+        errors = []
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: errors.append(context))
+        stream = PoloniexStream(PriceBoard(), ["BTC"])
+        stream.URL = simulator.ws_urls["poloniex"]
+        stream.heartbeat_interval = 0.01
+        connects = []
+        connect = stream._connect
+
+        async def counting_connect():
+            connects.append(1)
+            return await connect()
+
+        def broken_ping():
+            raise RuntimeError("ping gagal")
+
+        stream._connect = counting_connect
+        stream._heartbeat_message = broken_ping
+        task = asyncio.create_task(stream.run())
+        try:
+            for _ in range(100):
+                await asyncio.sleep(0.02)
+                if len(connects) >= 2:
+                    break
+            # Tanpa menunggu STREAM_STALE_TIMEOUT, dan exception heartbeat tidak dibiarkan tak terambil
+            assert len(connects) >= 2
+        finally:
+            await stream.stop()
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            await simulator.stop()
+        assert errors == []
+
+    asyncio.run(scenario())
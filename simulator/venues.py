@@ -0,0 +1,1012 @@
+import re
+import hmac
+import json
+import math
+import uuid
+import base64
+import asyncio
+import itertools
+import hashlib
+from urllib.parse import parse_qsl
+from websockets.exceptions import ConnectionClosed
+from .http import Response
+from .faults import FaultInjector, WeightLimiter
+from .market import format_number
+
+# Saldo awal setiap venue dalam USD: quote currency dan nilai per koin
+INITIAL_QUOTE_USD = 100000.0
+INITIAL_COIN_USD = 10000.0
+# Volume 24 jam tiap pair (USD) untuk endpoint ticker 24 jam
+DAILY_VOLUME_USD = 1000000.0
+
+
+def _hmac_hex(secret, message, digest):
+    return hmac.new(secret.encode("utf-8"), message, digest).hexdigest()
+
+
+def _hmac_b64(secret, message):
+    return base64.b64encode(hmac.new(secret.encode("utf-8"), message, hashlib.sha256).digest()).decode()
+
+
+class Venue:
+    """
+    Satu exchange tiruan: route REST, tanda tangan, batas bobot, gangguan, saldo,
+    dan protokol WebSocket publik. Subclass mengisi ROUTES, pemeriksa tanda tangan
+    dan format pesan stream.
+    """
+    name = None
+    quote = "USDT"
+
+    def __init__(self, market, credentials, faults=None, rate_limits=True):
+        self.market = market
+        self.api_key = credentials["key"]
+        self.api_secret = credentials["secret"]
+        self.passphrase = credentials.get("passphrase")
+        self.faults = faults or FaultInjector()
+        self.limiter = WeightLimiter(self.name, rate_limits)
+        self.ws_url = None
+        self.on_withdraw = None
+        self.subscribers = {}
+        self.stats = {"requests": 0, "throttled": 0, "errors": 0, "bad_signatures": 0, "withdrawals": 0, "orders": 0}
+        self.orders = {}
+        self.client_orders = {}
+        self._order_ids = itertools.count(1)
+
+        self.balances = {self.quote: INITIAL_QUOTE_USD * self._quote_rate()}
+        for symbol in market.symbols:
+            self.balances[symbol] = INITIAL_COIN_USD / market.usd_price(self.name, symbol)
+
+        self._routes = [
+            (method, re.compile("^" + re.sub(r"\{(\w+)\}", r"(?P<\1>[^/]+)", pattern) + "$"), handler)
+            for method, pattern, handler in self.routes()
+        ]
+
+    def routes(self):
+        """[(method, pola path dengan {param}, handler)]"""
+        raise NotImplementedError
+
+    def _quote_rate(self):
+        return self.market.usd_to_idr if self.quote == "IDR" else 1.0
+
+    # REST
+
+    async def handle(self, request):
+        self.stats["requests"] += 1
+        await self.faults.delay()
+
+        data = request.form() if "form-urlencoded" in request.header("content-type", "") else None
+        accepted, reset_in = self.limiter.consume(request.method, request.path, request.params, data)
+        fault = self.faults.fault()
+        if not accepted or fault == 429:
+            self.stats["throttled"] += 1
+            return self._throttled(reset_in)
+        if fault:
+            self.stats["errors"] += 1
+            return Response(fault, {"msg": "simulated server error"})
+
+        for method, pattern, handler in self._routes:
+            match = pattern.match(request.path)
+            if method == request.method and match:
+                response = handler(request, **match.groupdict())
+                response.headers.update(self._limit_headers(reset_in))
+                return response
+        return Response(404, {"msg": f"endpoint {request.method} {request.path} tidak disimulasikan"})
+
+    def _throttled(self, reset_in):
+        headers = {"Retry-After": str(max(1, math.ceil(reset_in)))}
+        headers.update(self._limit_headers(reset_in))
+        return Response(429, {"msg": "Too many requests"}, headers)
+
+    def _limit_headers(self, reset_in):
+        return {}
+
+    def _bad_signature(self, response):
+        self.stats["bad_signatures"] += 1
+        return response
+
+    def _symbol(self, raw):
+        """Simbol kanonik dari format pair venue, None jika tidak dikenal"""
+        raise NotImplementedError
+
+    def _filters(self, symbol):
+        """(tick harga, lot, min notional) dalam mata uang venue, konsisten dengan presisi order book"""
+        mid = self.market.mid(self.name, symbol)
+        tick = 10.0 ** (math.floor(math.log10(mid)) - 5)
+        lot = 10.0 ** math.floor(math.log10(0.01 / self.market.usd_price(self.name, symbol)))
+        return format_number(tick), format_number(lot), format_number(5.0 * self._quote_rate())
+
+    def _volume(self):
+        return format_number(DAILY_VOLUME_USD * self._quote_rate())
+
+    def _withdraw(self, asset, amount, address):
+        """Kurangi saldo dan teruskan ke venue tujuan; kembalikan id withdrawal atau None"""
+        asset = asset.upper()
+        amount = float(amount)
+        if amount <= 0 or self.balances.get(asset, 0.0) < amount:
+            return None
+        self.balances[asset] -= amount
+        self.stats["withdrawals"] += 1
+        if self.on_withdraw is not None:
+            self.on_withdraw(self.name, asset, amount, address)
+        return uuid.uuid4().hex
+
+    def _place_order(self, symbol, side, amount, price=None, order_type="limit", time_in_force="GTC", client_id=None):
+        """
+        Order baru yang langsung dicocokkan dengan bid/ask saat ini: market atau limit yang
+        menyeberang terisi penuh, sisanya tetap open (GTC) atau dibatalkan (IOC/FOK).
+        Order terbuka tidak pernah terisi belakangan. None jika saldo tidak cukup.
+        """
+        side, order_type = side.lower(), order_type.lower()
+        amount = float(amount)
+        price = float(price) if price else None
+        _, bid, ask = self.market.quote(self.name, symbol)
+        if side == "buy":
+            crosses = order_type == "market" or price >= ask
+            fill_price = ask
+        else:
+            crosses = order_type == "market" or price <= bid
+            fill_price = bid
+
+        needed = amount * (fill_price if crosses else price) if side == "buy" else amount
+        asset = self.quote if side == "buy" else symbol
+        if amount <= 0 or self.balances.get(asset, 0.0) < needed:
+            return None
+
+        order = {"id": next(self._order_ids), "client_id": client_id, "symbol": symbol, "side": side,
+                 "type": order_type, "time_in_force": (time_in_force or "GTC").upper(), "amount": amount,
+                 "price": price if price else fill_price, "filled": 0.0, "funds": 0.0, "status": "open"}
+        if crosses:
+            order.update(filled=amount, funds=amount * fill_price, status="filled")
+            sign = 1 if side == "buy" else -1
+            self.balances[symbol] = self.balances.get(symbol, 0.0) + sign * amount
+            self.balances[self.quote] -= sign * amount * fill_price
+        elif order["time_in_force"] != "GTC":
+            order["status"] = "canceled"
+
+        self.orders[order["id"]] = order
+        if client_id:
+            self.client_orders[client_id] = order
+        self.stats["orders"] += 1
+        return order
+
+    def _find_order(self, order_id=None, client_id=None):
+        if order_id is not None:
+            try:
+                return self.orders.get(int(order_id))
+            except ValueError:
+                return None
+        return self.client_orders.get(client_id)
+
+    def _cancel_order(self, order):
+        """True jika order masih terbuka lalu dibatalkan"""
+        if order is None or order["status"] != "open":
+            return False
+        order["status"] = "canceled"
+        return True
+
+    def deposit(self, asset, amount):
+        self.balances[asset] = self.balances.get(asset, 0.0) + amount
+
+    # WebSocket
+
+    async def ws_handler(self, connection):
+        self.subscribers[connection] = set()
+        try:
+            await self._on_open(connection)
+            async for raw in connection:
+                reply = self._on_message(connection, json.loads(raw))
+                if reply is not None:
+                    await connection.send(json.dumps(reply))
+        except ConnectionClosed:
+            pass
+        finally:
+            self.subscribers.pop(connection, None)
+
+    async def publish(self, diffs):
+        """Kirim update tick terbaru ke semua koneksi sesuai langganannya"""
+        sends = []
+        for connection, topics in list(self.subscribers.items()):
+            for message in self._stream_messages(topics, diffs):
+                sends.append(connection.send(json.dumps(message, separators=(",", ":"))))
+        if sends:
+            await asyncio.gather(*sends, return_exceptions=True)
+
+    async def _on_open(self, connection):
+        pass
+
+    def _on_message(self, connection, message):
+        raise NotImplementedError
+
+    def _stream_messages(self, topics, diffs):
+        raise NotImplementedError
+
+    def _levels(self, levels):
+        return [[format_number(price), format_number(qty)] for price, qty in levels]
+
+
+class BinanceVenue(Venue):
+    name = "binance"
+
+    def routes(self):
+        return [
+            ("GET", "/api/v3/time", lambda request: Response(200, {"serverTime": self.faults.now_ms()})),
+            ("GET", "/api/v3/ticker/price", self.ticker_price),
+            ("GET", "/api/v3/exchangeInfo", self.exchange_info),
+            ("GET", "/api/v3/ticker/24hr", self.ticker_24hr),
+            ("GET", "/api/v3/depth", self.depth),
+            ("GET", "/api/v3/account", self.account),
+            ("POST", "/api/v3/order", self.new_order),
+            ("GET", "/api/v3/order", self.query_order),
+            ("DELETE", "/api/v3/order", self.cancel_order),
+            ("POST", "/sapi/v1/capital/withdraw/apply", self.withdraw),
+        ]
+
+    def _limit_headers(self, reset_in):
+        return {"X-MBX-USED-WEIGHT-1M": str(self.limiter.used)}
+
+    def _throttled(self, reset_in):
+        response = super()._throttled(reset_in)
+        response.data = {"code": -1003, "msg": "Too many requests; please use the websocket for live updates."}
+        return response
+
+    def _symbol(self, raw):
+        raw = raw.upper()
+        if raw.endswith("USDT") and self.market.has_symbol(raw[:-4]):
+            return raw[:-4]
+        return None
+
+    def _invalid_symbol(self):
+        return Response(400, {"code": -1121, "msg": "Invalid symbol."})
+
+    def exchange_info(self, request):
+        symbols = []
+        for symbol in self.market.symbols:
+            tick, lot, notional = self._filters(symbol)
+            symbols.append({"symbol": f"{symbol}USDT", "status": "TRADING", "baseAsset": symbol, "quoteAsset": "USDT",
+                            "filters": [
+                                {"filterType": "PRICE_FILTER", "tickSize": tick},
+                                {"filterType": "LOT_SIZE", "minQty": lot, "stepSize": lot},
+                                {"filterType": "NOTIONAL", "minNotional": notional},
+                            ]})
+        return Response(200, {"serverTime": self.faults.now_ms(), "symbols": symbols})
+
+    def ticker_24hr(self, request):
+        return Response(200, [
+            {"symbol": f"{symbol}USDT", "lastPrice": format_number(price), "quoteVolume": self._volume()}
+            for symbol, price in self.market.prices(self.name).items()
+        ])
+
+    def ticker_price(self, request):
+        pair = request.params.get("symbol")
+        if pair is None:
+            return Response(200, [
+                {"symbol": f"{symbol}USDT", "price": format_number(price)}
+                for symbol, price in self.market.prices(self.name).items()
+            ])
+        symbol = self._symbol(pair)
+        if symbol is None:
+            return self._invalid_symbol()
+        return Response(200, {"symbol": pair.upper(), "price": format_number(self.market.mid(self.name, symbol))})
+
+    def depth(self, request):
+        symbol = self._symbol(request.params.get("symbol", ""))
+        if symbol is None:
+            return self._invalid_symbol()
+        sequence, bids, asks = self.market.book(self.name, symbol).snapshot(int(request.params.get("limit", 100)))
+        return Response(200, {"lastUpdateId": sequence, "bids": self._levels(bids), "asks": self._levels(asks)})
+
+    def _verify(self, request):
+        """Validasi X-MBX-APIKEY, HMAC-SHA256 query/body dan recvWindow seperti Binance"""
+        if request.header("X-MBX-APIKEY") != self.api_key:
+            return None, self._bad_signature(Response(401, {"code": -2015, "msg": "Invalid API-key, IP, or permissions for action."}))
+        raw = request.query if request.method in ("GET", "DELETE") else request.body.decode("utf-8")
+        payload, separator, signature = raw.rpartition("&signature=")
+        expected = _hmac_hex(self.api_secret, payload.encode("utf-8"), hashlib.sha256)
+        if not separator or not hmac.compare_digest(signature, expected):
+            return None, self._bad_signature(Response(400, {"code": -1022, "msg": "Signature for this request is not valid."}))
+
+        params = dict(parse_qsl(payload))
+        now = self.faults.now_ms()
+        timestamp = int(params.get("timestamp", 0))
+        if timestamp >= now + 1000 or now - timestamp > int(params.get("recvWindow", 5000)):
+            return None, self._bad_signature(Response(400, {"code": -1021, "msg": "Timestamp for this request is outside of the recvWindow."}))
+        return params, None
+
+    def account(self, request):
+        params, error = self._verify(request)
+        if error:
+            return error
+        return Response(200, {"balances": [
+            {"asset": asset, "free": format_number(amount), "locked": "0"}
+            for asset, amount in self.balances.items()
+        ]})
+
+    def withdraw(self, request):
+        params, error = self._verify(request)
+        if error:
+            return error
+        withdrawal_id = self._withdraw(params.get("asset", ""), params.get("amount", 0), params.get("address"))
+        if withdrawal_id is None:
+            return Response(400, {"code": -4026, "msg": "User has insufficient balance"})
+        return Response(200, {"id": withdrawal_id})
+
+    def _order_data(self, order):
+        status = {"open": "NEW", "filled": "FILLED", "canceled": "CANCELED"}[order["status"]]
+        if order["status"] == "canceled" and order["time_in_force"] != "GTC":
+            status = "EXPIRED"
+        return {"symbol": f"{order['symbol']}USDT", "orderId": order["id"], "clientOrderId": order["client_id"] or "",
+                "price": format_number(order["price"]), "origQty": format_number(order["amount"]),
+                "executedQty": format_number(order["filled"]), "cummulativeQuoteQty": format_number(order["funds"]),
+                "status": status, "timeInForce": order["time_in_force"], "type": order["type"].upper(),
+                "side": order["side"].upper()}
+
+    def new_order(self, request):
+        params, error = self._verify(request)
+        if error:
+            return error
+        symbol = self._symbol(params.get("symbol", ""))
+        if symbol is None:
+            return self._invalid_symbol()
+        client_id = params.get("newClientOrderId")
+        if client_id and client_id in self.client_orders:
+            return Response(400, {"code": -2010, "msg": "Duplicate order sent."})
+        order = self._place_order(symbol, params.get("side", ""), params.get("quantity", 0), params.get("price"),
+                                  params.get("type", "LIMIT"), params.get("timeInForce"), client_id)
+        if order is None:
+            return Response(400, {"code": -2010, "msg": "Account has insufficient balance for requested action."})
+        return Response(200, self._order_data(order))
+
+    def _lookup(self, request):
+        params, error = self._verify(request)
+        if error:
+            return None, error
+        order = self._find_order(params.get("orderId"), params.get("origClientOrderId"))
+        if order is None:
+            return None, Response(400, {"code": -2013, "msg": "Order does not exist."})
+        return order, None
+
+    def query_order(self, request):
+        order, error = self._lookup(request)
+        return error or Response(200, self._order_data(order))
+
+    def cancel_order(self, request):
+        order, error = self._lookup(request)
+        if error:
+            return error
+        if not self._cancel_order(order):
+            return Response(400, {"code": -2011, "msg": "Unknown order sent."})
+        return Response(200, self._order_data(order))
+
+    # Stream: /stream dengan SUBSCRIBE/UNSUBSCRIBE stream <pair>@trade dan <pair>@depth@100ms
+
+    def _on_message(self, connection, message):
+        streams = set(message.get("params", []))
+        if message.get("method") == "SUBSCRIBE":
+            self.subscribers[connection] |= streams
+            for stream in streams:
+                symbol = self._symbol(stream.split("@")[0])
+                if symbol and "@depth" in stream:
+                    self.market.book(self.name, symbol)
+        elif message.get("method") == "UNSUBSCRIBE":
+            self.subscribers[connection] -= streams
+        return {"result": None, "id": message.get("id")}
+
+    def _stream_messages(self, topics, diffs):
+        now = self.faults.now_ms()
+        for stream in topics:
+            pair, _, kind = stream.partition("@")
+            symbol = self._symbol(pair)
+            if symbol is None:
+                continue
+            if kind == "trade":
+                yield {"stream": stream, "data": {
+                    "e": "trade", "E": now, "s": pair.upper(), "p": format_number(self.market.mid(self.name, symbol)),
+                    "q": "1", "T": now,
+                }}
+            elif kind.startswith("depth") and (self.name, symbol) in diffs:
+                sequence, bids, asks = diffs[(self.name, symbol)]
+                yield {"stream": stream, "data": {
+                    "e": "depthUpdate", "E": now, "s": pair.upper(), "U": sequence, "u": sequence,
+                    "b": self._levels(bids), "a": self._levels(asks),
+                }}
+
+
+class KuCoinVenue(Venue):
+    name = "kucoin"
+    OK = "200000"
+
+    def routes(self):
+        return [
+            ("GET", "/api/v1/timestamp", lambda request: Response(200, {"code": self.OK, "data": self.faults.now_ms()})),
+            ("GET", "/api/v1/market/orderbook/level1", self.level1),
+            ("GET", "/api/v1/market/allTickers", self.all_tickers),
+            ("GET", "/api/v2/symbols", self.symbols),
+            ("GET", "/api/v1/market/orderbook/{book}", self.level2),
+            ("GET", "/api/v1/accounts", self.accounts),
+            ("POST", "/api/v1/orders", self.new_order),
+            ("POST", "/api/v1/orders/multi", self.new_orders),
+            ("GET", "/api/v1/orders/{order_id}", self.order_detail),
+            ("DELETE", "/api/v1/orders/{order_id}", self.cancel_order),
+            ("GET", "/api/v1/order/client-order/{client_id}", self.order_detail),
+            ("DELETE", "/api/v1/order/client-order/{client_id}", self.cancel_order),
+            ("POST", "/api/v2/withdrawals", self.withdraw),
+            ("POST", "/api/v1/bullet-public", self.bullet),
+        ]
+
+    def _limit_headers(self, reset_in):
+        return {
+            "gw-ratelimit-limit": str(self.limiter.capacity),
+            "gw-ratelimit-remaining": str(self.limiter.remaining),
+            "gw-ratelimit-reset": str(int(reset_in * 1000)),
+        }
+
+    def _throttled(self, reset_in):
+        response = super()._throttled(reset_in)
+        response.data = {"code": "429000", "msg": "Too Many Requests"}
+        return response
+
+    def _symbol(self, raw):
+        base, _, quote = raw.upper().partition("-")
+        if quote == "USDT" and self.market.has_symbol(base):
+            return base
+        return None
+
+    def level1(self, request):
+        symbol = self._symbol(request.params.get("symbol", ""))
+        if symbol is None:
+            return Response(200, {"code": "400100", "msg": "symbol not exists"})
+        last, bid, ask = self.market.quote(self.name, symbol)
+        return Response(200, {"code": self.OK, "data": {
+            "time": self.faults.now_ms(), "sequence": str(self.market.book(self.name, symbol).sequence),
+            "price": format_number(last), "bestBid": format_number(bid), "bestAsk": format_number(ask),
+        }})
+
+    def all_tickers(self, request):
+        return Response(200, {"code": self.OK, "data": {"time": self.faults.now_ms(), "ticker": [
+            {"symbol": f"{symbol}-USDT", "last": format_number(price), "volValue": self._volume()}
+            for symbol, price in self.market.prices(self.name).items()
+        ]}})
+
+    def symbols(self, request):
+        data = []
+        for symbol in self.market.symbols:
+            tick, lot, notional = self._filters(symbol)
+            data.append({"symbol": f"{symbol}-USDT", "baseCurrency": symbol, "quoteCurrency": "USDT",
+                         "baseMinSize": lot, "baseIncrement": lot, "priceIncrement": tick,
+                         "minFunds": notional, "enableTrading": True})
+        return Response(200, {"code": self.OK, "data": data})
+
+    def level2(self, request, book):
+        depth = {"level2_20": 20, "level2_100": 100}.get(book)
+        symbol = self._symbol(request.params.get("symbol", ""))
+        if depth is None or symbol is None:
+            return Response(200, {"code": "400100", "msg": "symbol not exists"})
+        sequence, bids, asks = self.market.book(self.name, symbol).snapshot(depth)
+        return Response(200, {"code": self.OK, "data": {
+            "time": self.faults.now_ms(), "sequence": str(sequence),
+            "bids": self._levels(bids), "asks": self._levels(asks),
+        }})
+
+    def _verify(self, request):
+        """Validasi header KC-API-* (API key v2: passphrase juga di-HMAC)"""
+        if request.header("KC-API-KEY") != self.api_key:
+            return self._bad_signature(Response(401, {"code": "400003", "msg": "KC-API-KEY not exists"}))
+        if request.header("KC-API-PASSPHRASE") != _hmac_b64(self.api_secret, self.passphrase.encode("utf-8")):
+            return self._bad_signature(Response(401, {"code": "400004", "msg": "Invalid KC-API-PASSPHRASE"}))
+        timestamp = request.header("KC-API-TIMESTAMP", "0")
+        if abs(self.faults.now_ms() - int(timestamp)) > 5000:
+            return self._bad_signature(Response(401, {"code": "400002", "msg": "KC-API-TIMESTAMP Invalid"}))
+        target = request.path + (f"?{request.query}" if request.query else "")
+        prehash = (timestamp + request.method + target).encode("utf-8") + request.body
+        if not hmac.compare_digest(request.header("KC-API-SIGN", ""), _hmac_b64(self.api_secret, prehash)):
+            return self._bad_signature(Response(401, {"code": "400005", "msg": "Invalid KC-API-SIGN"}))
+        return None
+
+    def accounts(self, request):
+        error = self._verify(request)
+        if error:
+            return error
+        return Response(200, {"code": self.OK, "data": [
+            {"id": asset, "currency": asset, "type": "trade", "balance": format_number(amount),
+             "available": format_number(amount), "holds": "0"}
+            for asset, amount in self.balances.items()
+        ]})
+
+    def withdraw(self, request):
+        error = self._verify(request)
+        if error:
+            return error
+        body = request.json()
+        withdrawal_id = self._withdraw(body.get("currency", ""), body.get("amount", 0), body.get("address"))
+        if withdrawal_id is None:
+            return Response(200, {"code": "260100", "msg": "account.noBalance"})
+        return Response(200, {"code": self.OK, "data": {"withdrawalId": withdrawal_id}})
+
+    def _submit(self, symbol, body):
+        """(order, pesan error) untuk satu body order KuCoin"""
+        client_id = body.get("clientOid")
+        if client_id and client_id in self.client_orders:
+            return None, "clientOid already exists"
+        order = self._place_order(symbol, body.get("side", ""), body.get("size", 0), body.get("price"),
+                                  body.get("type", "limit"), body.get("timeInForce"), client_id)
+        return order, None if order else "Balance insufficient!"
+
+    def new_order(self, request):
+        error = self._verify(request)
+        if error:
+            return error
+        body = request.json()
+        symbol = self._symbol(body.get("symbol", ""))
+        if symbol is None:
+            return Response(200, {"code": "400100", "msg": "symbol not exists"})
+        order, message = self._submit(symbol, body)
+        if order is None:
+            return Response(200, {"code": "200004" if "Balance" in message else "400100", "msg": message})
+        return Response(200, {"code": self.OK, "data": {"orderId": str(order["id"])}})
+
+    def new_orders(self, request):
+        error = self._verify(request)
+        if error:
+            return error
+        body = request.json()
+        symbol = self._symbol(body.get("symbol", ""))
+        if symbol is None or len(body.get("orderList", [])) > 5:
+            return Response(200, {"code": "400100", "msg": "symbol not exists or too many orders"})
+        results = []
+        for item in body["orderList"]:
+            order, message = self._submit(symbol, item)
+            results.append({"id": str(order["id"]) if order else "", "clientOid": item.get("clientOid"),
+                            "status": "success" if order else "fail", "failMsg": message})
+        return Response(200, {"code": self.OK, "data": {"data": results}})
+
+    def _order_data(self, order):
+        return {"id": str(order["id"]), "clientOid": order["client_id"], "symbol": f"{order['symbol']}-USDT",
+                "side": order["side"], "type": order["type"], "price": format_number(order["price"]),
+                "size": format_number(order["amount"]), "dealSize": format_number(order["filled"]),
+                "dealFunds": format_number(order["funds"]), "timeInForce": order["time_in_force"],
+                "isActive": order["status"] == "open", "cancelExist": order["status"] == "canceled"}
+
+    def order_detail(self, request, order_id=None, client_id=None):
+        error = self._verify(request)
+        if error:
+            return error
+        order = self._find_order(order_id, client_id)
+        if order is None:
+            return Response(404, {"code": "400100", "msg": "order not exist"})
+        return Response(200, {"code": self.OK, "data": self._order_data(order)})
+
+    def cancel_order(self, request, order_id=None, client_id=None):
+        error = self._verify(request)
+        if error:
+            return error
+        order = self._find_order(order_id, client_id)
+        if not self._cancel_order(order):
+            return Response(200, {"code": "400100", "msg": "order cannot be canceled"})
+        return Response(200, {"code": self.OK, "data": {"cancelledOrderIds": [str(order["id"])]}})
+
+    def bullet(self, request):
+        return Response(200, {"code": self.OK, "data": {
+            "token": uuid.uuid4().hex,
+            "instanceServers": [{
+                "endpoint": self.ws_url, "encrypt": False, "protocol": "websocket",
+                "pingInterval": 18000, "pingTimeout": 10000,
+            }],
+        }})
+
+    # Stream: welcome saat connect, topic /market/ticker:<pairs> dan /market/level2:<pairs>
+
+    async def _on_open(self, connection):
+        await connection.send(json.dumps({"id": uuid.uuid4().hex, "type": "welcome"}))
+
+    def _topics(self, topic):
+        prefix, _, pairs = topic.partition(":")
+        return {f"{prefix}:{pair}" for pair in pairs.split(",") if pair}
+
+    def _on_message(self, connection, message):
+        kind = message.get("type")
+        if kind == "ping":
+            return {"id": message.get("id"), "type": "pong"}
+        topics = self._topics(message.get("topic", ""))
+        if kind == "subscribe":
+            self.subscribers[connection] |= topics
+            for topic in topics:
+                symbol = self._symbol(topic.split(":", 1)[1])
+                if symbol and topic.startswith("/market/level2:"):
+                    self.market.book(self.name, symbol)
+        elif kind == "unsubscribe":
+            self.subscribers[connection] -= topics
+        if message.get("response"):
+            return {"id": message.get("id"), "type": "ack"}
+        return None
+
+    def _stream_messages(self, topics, diffs):
+        now = self.faults.now_ms()
+        for topic in topics:
+            channel, _, pair = topic.partition(":")
+            symbol = self._symbol(pair)
+            if symbol is None:
+                continue
+            if channel == "/market/ticker":
+                last, bid, ask = self.market.quote(self.name, symbol)
+                yield {"type": "message", "topic": topic, "subject": "trade.ticker", "data": {
+                    "price": format_number(last), "bestBid": format_number(bid), "bestAsk": format_number(ask), "time": now,
+                }}
+            elif channel == "/market/level2" and (self.name, symbol) in diffs:
+                sequence, bids, asks = diffs[(self.name, symbol)]
+                yield {"type": "message", "topic": topic, "subject": "trade.l2update", "data": {
+                    "symbol": pair, "sequenceStart": sequence, "sequenceEnd": sequence, "changes": {
+                        "bids": [level + [str(sequence)] for level in self._levels(bids)],
+                        "asks": [level + [str(sequence)] for level in self._levels(asks)],
+                    },
+                }}
+
+
+class IndodaxVenue(Venue):
+    name = "indodax"
+    quote = "IDR"
+    CHANNEL = "market:summary-24h"
+
+    def routes(self):
+        return [
+            ("GET", "/api/server_time", lambda request: Response(200, {"timezone": "UTC", "server_time": self.faults.now_ms()})),
+            ("GET", "/api/ticker/{pair}", self.ticker),
+            ("GET", "/api/summaries", self.summaries),
+            ("GET", "/api/pairs", self.pairs),
+            ("GET", "/api/depth/{pair}", self.depth),
+            ("POST", "/tapi", self.tapi),
+        ]
+
+    def _symbol(self, raw):
+        raw = raw.lower().replace("_", "")
+        if not raw.endswith("idr"):
+            return None
+        base = raw[:-3].upper()
+        if base == "USDT" or self.market.has_symbol(base):
+            return base
+        return None
+
+    def _price(self, symbol):
+        # USDT/IDR dipakai FX service sebagai kurs implisit
+        if symbol == "USDT":
+            return self.market.usd_to_idr
+        return self.market.mid(self.name, symbol)
+
+    def _ticker(self, symbol):
+        last = self._price(symbol)
+        spread = self.market.spread / 2
+        return {
+            "high": format_number(last * 1.02), "low": format_number(last * 0.98), "last": format_number(last),
+            "buy": format_number(last * (1 - spread)), "sell": format_number(last * (1 + spread)),
+            "vol_idr": self._volume(), "server_time": self.faults.now_ms() // 1000,
+        }
+
+    def ticker(self, request, pair):
+        symbol = self._symbol(pair)
+        if symbol is None:
+            return Response(200, {"error": "invalid_pair", "error_description": "Invalid Pair"})
+        return Response(200, {"ticker": self._ticker(symbol)})
+
+    def summaries(self, request):
+        symbols = ["USDT"] + self.market.symbols
+        return Response(200, {"tickers": {f"{symbol.lower()}_idr": self._ticker(symbol) for symbol in symbols}})
+
+    def pairs(self, request):
+        data = []
+        for symbol in self.market.symbols:
+            _, lot, notional = self._filters(symbol)
+            data.append({"id": f"{symbol.lower()}idr", "symbol": f"{symbol}IDR", "base_currency": "idr",
+                         "traded_currency": symbol.lower(), "ticker_id": f"{symbol.lower()}_idr",
+                         "trade_min_base_currency": float(notional), "trade_min_traded_currency": float(lot),
+                         "is_maintenance": 0})
+        return Response(200, data)
+
+    def depth(self, request, pair):
+        symbol = self._symbol(pair)
+        if symbol is None or symbol == "USDT":
+            return Response(200, {"error": "invalid_pair", "error_description": "Invalid Pair"})
+        _, bids, asks = self.market.book(self.name, symbol).snapshot(150)
+        return Response(200, {"buy": self._levels(bids), "sell": self._levels(asks)})
+
+    def tapi(self, request):
+        """Private API: HMAC-SHA512 atas body POST mentah, header Key dan Sign"""
+        if request.header("Key") != self.api_key or not hmac.compare_digest(
+            request.header("Sign", ""), _hmac_hex(self.api_secret, request.body, hashlib.sha512)
+        ):
+            return self._bad_signature(Response(200, {
+                "success": 0, "error": "Invalid credentials. Bad sign.", "error_code": "invalid_credentials",
+            }))
+
+        params = request.form()
+        if abs(self.faults.now_ms() - int(params.get("timestamp", 0))) > 5000:
+            return self._bad_signature(Response(200, {
+                "success": 0, "error": "Bad request timestamp.", "error_code": "invalid_timestamp",
+            }))
+
+        method = params.get("method")
+        if method == "getInfo":
+            return Response(200, {"success": 1, "return": {
+                "server_time": self.faults.now_ms() // 1000,
+                "balance": {asset.lower(): format_number(amount) for asset, amount in self.balances.items()},
+            }})
+        if method == "withdrawCoin":
+            withdrawal_id = self._withdraw(params.get("currency", ""), params.get("withdraw_amount", 0),
+                                           params.get("withdraw_address"))
+            if withdrawal_id is None:
+                return Response(200, {"success": 0, "error": "Insufficient balance.", "error_code": "insufficient_balance"})
+            return Response(200, {"success": 1, "status": "approved", "withdraw_id": withdrawal_id})
+        if method == "trade":
+            return self._trade(params)
+        if method in ("getOrder", "getOrderByClientOrderId", "cancelOrder", "cancelByClientOrderId"):
+            order = self._find_order(params.get("order_id"), params.get("client_order_id"))
+            if order is None:
+                return self._tapi_error("Order not found.", "order_not_found")
+            if method.startswith("get"):
+                return Response(200, {"success": 1, "return": {"order": self._order_data(order)}})
+            if not self._cancel_order(order):
+                return self._tapi_error("Order cannot be cancelled.", "order_not_open")
+            return Response(200, {"success": 1, "return": {
+                "order_id": order["id"], "client_order_id": order["client_id"], "type": order["side"],
+                "pair": f"{order['symbol'].lower()}_idr", "balance": {},
+            }})
+        return Response(200, {"success": 0, "error": "Invalid method", "error_code": "invalid_method"})
+
+    def _tapi_error(self, message, code):
+        return Response(200, {"success": 0, "error": message, "error_code": code})
+
+    def _trade(self, params):
+        symbol = self._symbol(params.get("pair", ""))
+        if symbol is None or symbol == "USDT":
+            return self._tapi_error("Invalid pair.", "invalid_pair")
+        client_id = params.get("client_order_id")
+        if client_id and client_id in self.client_orders:
+            return self._tapi_error("Duplicate client order id.", "duplicate_client_order_id")
+        coin, side = symbol.lower(), params.get("type", "")
+        price = params.get("price")
+        amount = float(params.get(coin) or 0)
+        if not amount and params.get("idr"):
+            # Market buy dalam IDR dibelanjakan di harga ask saat ini
+            amount = float(params["idr"]) / float(price or self.market.quote(self.name, symbol)[2])
+        order = self._place_order(symbol, side, amount, price, params.get("order_type", "limit"), "GTC", client_id)
+        if order is None:
+            return self._tapi_error("Insufficient balance.", "insufficient_balance")
+        result = {"order_id": order["id"], "client_order_id": client_id or "",
+                  f"remain_{coin}": format_number(order["amount"] - order["filled"]), "balance": {}}
+        if side == "buy":
+            result[f"receive_{coin}"] = format_number(order["filled"])
+            result["spend_rp"] = format_number(order["funds"])
+        else:
+            result[f"sold_{coin}"] = format_number(order["filled"])
+            result["receive_rp"] = format_number(order["funds"])
+        return Response(200, {"success": 1, "return": result})
+
+    def _order_data(self, order):
+        coin = order["symbol"].lower()
+        return {"order_id": str(order["id"]), "client_order_id": order["client_id"] or "", "type": order["side"],
+                "price": format_number(order["price"]), f"order_{coin}": format_number(order["amount"]),
+                f"remain_{coin}": format_number(order["amount"] - order["filled"]),
+                "status": {"open": "open", "filled": "filled", "canceled": "cancelled"}[order["status"]]}
+
+    # Stream Centrifugo: connect dengan token, subscribe channel (method 1), ping (method 7)
+
+    def _on_message(self, connection, message):
+        method = message.get("method")
+        if method is None and "params" in message:
+            return {"id": message.get("id"), "result": {"client": uuid.uuid4().hex, "version": "2.8.6"}}
+        if method == 1:
+            self.subscribers[connection].add(message.get("params", {}).get("channel"))
+            return {"id": message.get("id"), "result": {}}
+        if method == 7:
+            return {"id": message.get("id")}
+        return None
+
+    def _stream_messages(self, topics, diffs):
+        if self.CHANNEL not in topics:
+            return
+        now = self.faults.now_ms() // 1000
+        rows = []
+        for symbol, last in self.market.prices(self.name).items():
+            rows.append([f"{symbol.lower()}idr", now, last, last * 0.98, last * 1.02, last, 0, 0])
+        yield {"result": {"channel": self.CHANNEL, "data": {"data": rows}}}
+
+
+class PoloniexVenue(Venue):
+    """
+    Route privat mengikuti path dan skema tanda tangan yang dipakai adapter
+    (hex HMAC-SHA512 atas timestamp + method + path + body).
+    """
+    name = "poloniex"
+
+    def routes(self):
+        return [
+            ("GET", "/timestamp", lambda request: Response(200, {"serverTime": self.faults.now_ms()})),
+            ("GET", "/markets", self.markets),
+            ("GET", "/markets/price", self.all_prices),
+            ("GET", "/markets/ticker24h", self.ticker_24h),
+            ("GET", "/markets/{pair}/price", self.price),
+            ("GET", "/markets/{pair}/orderBook", self.order_book),
+            ("GET", "/wallets/balances", self.balances_handler),
+            ("POST", "/orders", self.new_order),
+            ("POST", "/orders/batch", self.new_orders),
+            ("GET", "/orders/{order_id}", self.order_detail),
+            ("DELETE", "/orders/{order_id}", self.cancel_order),
+            ("POST", "/wallets/withdraw", self.withdraw),
+        ]
+
+    def _symbol(self, raw):
+        base, _, quote = raw.upper().partition("_")
+        if quote == "USDT" and self.market.has_symbol(base):
+            return base
+        return None
+
+    def _unknown(self):
+        return Response(400, {"code": 21601, "message": "Invalid symbol!"})
+
+    def markets(self, request):
+        data = []
+        for symbol in self.market.symbols:
+            tick, lot, notional = self._filters(symbol)
+            data.append({"symbol": f"{symbol}_USDT", "baseCurrencyName": symbol, "quoteCurrencyName": "USDT",
+                         "state": "NORMAL", "symbolTradeLimit": {
+                             "symbol": f"{symbol}_USDT", "priceScale": round(-math.log10(float(tick))),
+                             "quantityScale": max(0, round(-math.log10(float(lot)))),
+                             "minQuantity": lot, "minAmount": notional}})
+        return Response(200, data)
+
+    def all_prices(self, request):
+        now = self.faults.now_ms()
+        return Response(200, [
+            {"symbol": f"{symbol}_USDT", "price": format_number(price), "time": now, "ts": now}
+            for symbol, price in self.market.prices(self.name).items()
+        ])
+
+    def ticker_24h(self, request):
+        return Response(200, [
+            {"symbol": f"{symbol}_USDT", "close": format_number(price), "amount": self._volume()}
+            for symbol, price in self.market.prices(self.name).items()
+        ])
+
+    def price(self, request, pair):
+        symbol = self._symbol(pair)
+        if symbol is None:
+            return self._unknown()
+        now = self.faults.now_ms()
+        return Response(200, {"symbol": pair.upper(), "price": format_number(self.market.mid(self.name, symbol)),
+                              "time": now, "ts": now})
+
+    def order_book(self, request, pair):
+        symbol = self._symbol(pair)
+        if symbol is None:
+            return self._unknown()
+        _, bids, asks = self.market.book(self.name, symbol).snapshot(int(request.params.get("limit", 10)))
+        flatten = lambda levels: [value for level in self._levels(levels) for value in level]
+        now = self.faults.now_ms()
+        return Response(200, {"time": now, "scale": "0.01", "bids": flatten(bids), "asks": flatten(asks), "ts": now})
+
+    def _verify(self, request):
+        if request.header("Poloniex-Key") != self.api_key:
+            return self._bad_signature(Response(401, {"code": 401, "message": "Invalid Apikey"}))
+        timestamp = request.header("Poloniex-Timestamp", "0")
+        if abs(self.faults.now_ms() - int(timestamp)) > 5000:
+            return self._bad_signature(Response(401, {"code": 401, "message": "Invalid timestamp"}))
+        prehash = (timestamp + request.method + request.path).encode("utf-8") + request.body
+        if not hmac.compare_digest(request.header("Poloniex-Signature", ""),
+                                   _hmac_hex(self.api_secret, prehash, hashlib.sha512)):
+            return self._bad_signature(Response(401, {"code": 401, "message": "Invalid signature"}))
+        return None
+
+    def balances_handler(self, request):
+        error = self._verify(request)
+        if error:
+            return error
+        return Response(200, [
+            {"currency": asset, "available": format_number(amount), "hold": "0"}
+            for asset, amount in self.balances.items()
+        ])
+
+    def withdraw(self, request):
+        error = self._verify(request)
+        if error:
+            return error
+        body = request.json()
+        withdrawal_id = self._withdraw(body.get("currency", ""), body.get("amount", 0), body.get("address"))
+        if withdrawal_id is None:
+            return Response(400, {"code": 21721, "message": "Insufficient balance"})
+        return Response(200, {"withdrawalId": withdrawal_id})
+
+    def _submit(self, body):
+        """(ack, status HTTP) untuk satu body order Poloniex"""
+        symbol = self._symbol(body.get("symbol", ""))
+        if symbol is None:
+            return {"code": 21601, "message": "Invalid symbol!"}, 400
+        client_id = body.get("clientOrderId")
+        if client_id and client_id in self.client_orders:
+            return {"code": 21350, "message": "Duplicate clientOrderId"}, 400
+        amount = float(body.get("quantity") or 0)
+        if not amount and body.get("amount"):
+            amount = float(body["amount"]) / self.market.quote(self.name, symbol)[2]
+        order = self._place_order(symbol, body.get("side", ""), amount, body.get("price"),
+                                  body.get("type", "LIMIT"), body.get("timeInForce"), client_id)
+        if order is None:
+            return {"code": 21721, "message": "Insufficient balance"}, 400
+        return {"id": str(order["id"]), "clientOrderId": client_id or ""}, 200
+
+    def new_order(self, request):
+        error = self._verify(request)
+        if error:
+            return error
+        ack, status = self._submit(request.json())
+        return Response(status, ack)
+
+    def new_orders(self, request):
+        error = self._verify(request)
+        if error:
+            return error
+        bodies = request.json()
+        if len(bodies) > 20:
+            return Response(400, {"code": 21605, "message": "Too many orders"})
+        return Response(200, [self._submit(body)[0] for body in bodies])
+
+    def _lookup(self, order_id):
+        if order_id.startswith("cid:"):
+            return self._find_order(client_id=order_id[4:])
+        return self._find_order(order_id)
+
+    def order_detail(self, request, order_id):
+        error = self._verify(request)
+        if error:
+            return error
+        order = self._lookup(order_id)
+        if order is None:
+            return Response(404, {"code": 21603, "message": "Order not found"})
+        state = {"open": "NEW", "filled": "FILLED", "canceled": "CANCELED"}[order["status"]]
+        return Response(200, {
+            "id": str(order["id"]), "clientOrderId": order["client_id"] or "", "symbol": f"{order['symbol']}_USDT",
+            "state": state, "side": order["side"].upper(), "type": order["type"].upper(),
+            "timeInForce": order["time_in_force"], "price": format_number(order["price"]),
+            "quantity": format_number(order["amount"]), "filledQuantity": format_number(order["filled"]),
+            "filledAmount": format_number(order["funds"]),
+            "avgPrice": format_number(order["funds"] / order["filled"] if order["filled"] else 0),
+        })
+
+    def cancel_order(self, request, order_id):
+        error = self._verify(request)
+        if error:
+            return error
+        order = self._lookup(order_id)
+        if not self._cancel_order(order):
+            return Response(400, {"code": 21604, "message": "Order cannot be canceled"})
+        return Response(200, {"orderId": str(order["id"]), "clientOrderId": order["client_id"] or "",
+                              "state": "PENDING_CANCEL", "code": 200, "message": ""})
+
+    # Stream: subscribe/unsubscribe channel ticker per simbol, ping -> pong
+
+    def _on_message(self, connection, message):
+        event = message.get("event")
+        if event == "ping":
+            return {"event": "pong"}
+        symbols = {symbol.upper() for symbol in message.get("symbols", [])}
+        if event == "subscribe":
+            self.subscribers[connection] |= symbols
+        elif event == "unsubscribe":
+            self.subscribers[connection] -= symbols
+        else:
+            return None
+        return {"event": event, "channel": "ticker", "symbols": sorted(symbols)}
+
+    def _stream_messages(self, topics, diffs):
+        now = self.faults.now_ms()
+        data = []
+        for pair in topics:
+            symbol = self._symbol(pair)
+            if symbol is not None:
+                data.append({"symbol": pair, "close": format_number(self.market.mid(self.name, symbol)), "ts": now})
+        if data:
+            yield {"channel": "ticker", "data": data}
+
+
+VENUES = {
+    "binance": BinanceVenue,
+    "kucoin": KuCoinVenue,
+    "indodax": IndodaxVenue,
+    "poloniex": PoloniexVenue,
+}
@@ -1,76 +1,156 @@
 # strategies/auto_scanner.py
+"""
+Scanner seluruh universe: satu request ticker 24 jam per exchange aktif, simbol venue
+dipetakan lewat metadata market, pair sepi dibuang berdasarkan volume 24 jam, lalu
+selisih harga terbesar disimpan dalam heap top-k. Dipakai untuk memilih SUPPORTED_SYMBOLS.
+
+    python -m strategies.auto_scanner --top 20 --min-volume 250000 --interval 5
+"""
+import os
+import sys
+import time
+import heapq
+import asyncio
+import argparse
+from exchanges.http_client import http_pool
+from exchanges.markets import market_metadata
 from utils.helpers import get_usd_to_idr_rate
-from utils.logger import logger
+from utils.logger import logger, setup_logger
+from config.settings import SCANNER_MIN_VOLUME_USD, SCANNER_TOP_K, SCANNER_INTERVAL
 
 
-def get_common_symbols(binance, indodax):
-    """
-    Cari koin yang tersedia di kedua exchange
-    """
-    try:
-        binance_symbols = set(binance.get_supported_symbols())
-        indodax_symbols = set(indodax.get_supported_symbols())
-        common = binance_symbols.intersection(indodax_symbols)
-        logger.info(f"🔍 Ditemukan {len(common)} simbol yang tersedia di kedua exchange")
-        return sorted(common)
-    except Exception as e:
-        logger.error(f"🚨 Gagal mengambil simbol dari exchange: {e}")
-        return []
+async def fetch_universe(exchanges):
+    """{exchange: {simbol venue: (harga, volume quote 24 jam)}}, satu request bulk per exchange"""
+    results = await asyncio.gather(
+        *(exchange.fetch_tickers_24h_async() for exchange in exchanges), return_exceptions=True
+    )
+    universe = {}
+    for exchange, result in zip(exchanges, results):
+        name = exchange.__class__.__name__.lower()
+        if isinstance(result, Exception):
+            logger.error(f"🚨 Gagal mengambil ticker 24 jam dari {name}: {result}")
+            continue
+        universe[name] = result
+    return universe
 
 
-def scan_spread_opportunities(binance, indodax, symbols):
+def universe_prices(tickers, usd_to_idr, min_volume_usd=SCANNER_MIN_VOLUME_USD):
     """
-    Scan selisih harga terbesar antar exchange dari simbol yang sama
+    {aset: {exchange: (harga USD, volume USD)}} untuk pair mata uang dasar yang terdaftar
+    di metadata dan volumenya minimal min_volume_usd
     """
-    usd_to_idr = get_usd_to_idr_rate()
-    opportunities = []
+    prices = {}
+    for exchange_name, raw in tickers.items():
+        index = market_metadata.index(exchange_name)
+        if index is None or not raw:
+            continue
+        rate = usd_to_idr if index.quote == "IDR" else 1.0
+        by_venue, quote = index.by_venue, index.quote
+        for venue_symbol, (last, volume) in raw.items():
+            market = by_venue.get(venue_symbol)
+            if market is None or market.quote != quote or last <= 0:
+                continue
+            volume_usd = volume / rate
+            if volume_usd < min_volume_usd:
+                continue
+            prices.setdefault(market.base, {})[exchange_name] = (last / rate, volume_usd)
+    return prices
 
-    for symbol in symbols:
-        try:
-            ticker_binance = binance.fetch_ticker(symbol)
-            ticker_indodax = indodax.fetch_ticker(symbol)
 
-            binance_price = ticker_binance.get("last")
-            indodax_price_idr = ticker_indodax.get("last")
+def top_spreads(prices, top_k=SCANNER_TOP_K):
+    """Selisih harga terbesar per aset (beli termurah, jual termahal), heap berukuran top_k"""
+    heap = []
+    for symbol, venues in prices.items():
+        if len(venues) < 2:
+            continue
+        buy = min(venues, key=lambda name: venues[name][0])
+        sell = max(venues, key=lambda name: venues[name][0])
+        spread_percent = (venues[sell][0] - venues[buy][0]) / venues[buy][0] * 100
+        entry = (spread_percent, symbol, buy, sell)
+        if len(heap) < top_k:
+            heapq.heappush(heap, entry)
+        elif entry > heap[0]:
+            heapq.heapreplace(heap, entry)
 
-            if not binance_price or not indodax_price_idr:
-                continue
+    opportunities = []
+    for spread_percent, symbol, buy, sell in sorted(heap, reverse=True):
+        venues = prices[symbol]
+        opportunities.append({
+            "symbol": symbol,
+            "buy_exchange": buy,
+            "sell_exchange": sell,
+            "buy_price": venues[buy][0],
+            "sell_price": venues[sell][0],
+            "spread": venues[sell][0] - venues[buy][0],
+            "spread_percent": spread_percent,
+            "volume_usd": min(venues[buy][1], venues[sell][1]),
+        })
+    return opportunities
 
-            indodax_price_usd = indodax_price_idr / usd_to_idr
-            spread = abs(binance_price - indodax_price_usd)
-            spread_percent = (spread / binance_price) * 100 if binance_price else 0
-
-            opportunities.append({
-                "symbol": symbol,
-                "binance_price": round(binance_price, 6),
-                "indodax_price_idr": round(indodax_price_idr, 2),
-                "indodax_price_usd": round(indodax_price_usd, 6),
-                "spread": round(spread, 6),
-                "spread_percent": round(spread_percent, 2),
-            })
-        except Exception as e:
-            logger.warning(f"⚠️ Gagal ambil harga {symbol}: {e}")
-            continue
 
-    # Urutkan berdasarkan spread persentase terbesar
-    opportunities.sort(key=lambda x: x['spread_percent'], reverse=True)
+async def scan_universe(exchanges, top_k=SCANNER_TOP_K, min_volume_usd=SCANNER_MIN_VOLUME_USD):
+    """Satu putaran scan semua exchange; kembalikan top_k peluang spread terurut menurun"""
+    start = time.perf_counter()
+    tickers = await fetch_universe(exchanges)
+    prices = universe_prices(tickers, get_usd_to_idr_rate(), min_volume_usd)
+    opportunities = top_spreads(prices, top_k)
+    pairs = sum(len(raw) for raw in tickers.values())
+    logger.info(f"🔍 Scan {pairs} pair di {len(tickers)} exchange, {len(prices)} aset likuid, "
+                f"{(time.perf_counter() - start) * 1000:.0f}ms")
     return opportunities
 
 
-def check_spread_opportunity(binance, indodax):
+def check_spread_opportunity(exchanges, top_k=SCANNER_TOP_K, min_volume_usd=SCANNER_MIN_VOLUME_USD):
     """
-    Fungsi utama strategi auto scanner untuk mendeteksi peluang spread besar
+    Fungsi utama strategi auto scanner untuk mendeteksi peluang spread besar (API sync)
     """
-    symbols = get_common_symbols(binance, indodax)
-    if not symbols:
-        logger.warning("⚠️ Tidak ada simbol yang sama di kedua exchange")
+    opportunities = http_pool.run_sync(scan_universe(exchanges, top_k, min_volume_usd))
+    if not opportunities:
+        logger.warning("⚠️ Tidak ada simbol likuid yang sama di lebih dari satu exchange")
         return []
 
-    opportunities = scan_spread_opportunities(binance, indodax, symbols)
-
-    top_opps = opportunities[:5]  # Top 5 saja
     logger.info("\n📊 Top Spread Opportunities:")
-    for opp in top_opps:
-        logger.info(f"{opp['symbol']} | Spread {opp['spread_percent']}% | Binance ${opp['binance_price']} vs Indodax ${opp['indodax_price_usd']}")
+    for opp in opportunities[:5]:
+        logger.info(f"{opp['symbol']} | Spread {opp['spread_percent']:.2f}% | "
+                    f"{opp['buy_exchange']} ${opp['buy_price']:.6f} → {opp['sell_exchange']} ${opp['sell_price']:.6f}")
+    return opportunities
+
+
+def format_table(opportunities):
+    header = ("#", "simbol", "spread %", "beli", "jual", "volume $")
+    rows = [
+        (str(position), opp['symbol'], f"{opp['spread_percent']:.3f}",
+         f"{opp['buy_exchange']} {opp['buy_price']:.6g}", f"{opp['sell_exchange']} {opp['sell_price']:.6g}",
+         f"{opp['volume_usd']:,.0f}")
+        for position, opp in enumerate(opportunities, 1)
+    ]
+    widths = [max(len(row[i]) for row in [header] + rows) for i in range(len(header))]
+    lines = ["  ".join(cell.rjust(width) for cell, width in zip(row, widths)) for row in [header] + rows]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    from utils.helpers import get_active_exchanges
+
+    parser = argparse.ArgumentParser(prog="python -m strategies.auto_scanner",
+                                     description="Scan spread seluruh universe exchange aktif")
+    parser.add_argument("--top", type=int, default=SCANNER_TOP_K)
+    parser.add_argument("--min-volume", type=float, default=SCANNER_MIN_VOLUME_USD, help="volume 24 jam minimum (USD)")
+    parser.add_argument("--interval", type=float, default=SCANNER_INTERVAL, help="detik antar scan, 0 untuk sekali saja")
+    args = parser.parse_args(argv)
+    setup_logger(os.getenv("LOG_FILE", "data/logs/scanner.jsonl"))
+
+    exchanges = get_active_exchanges()
+    http_pool.run_sync(market_metadata.load_all(exchanges))
+    while True:
+        opportunities = http_pool.run_sync(scan_universe(exchanges, args.top, args.min_volume))
+        print(format_table(opportunities))
+        print(f"SUPPORTED_SYMBOLS={','.join(opp['symbol'] for opp in opportunities)}\n")
+        if args.interval <= 0:
+            return 0
+        time.sleep(args.interval)
+
 
-    return opportunities
\ No newline at end of file
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,6 @@
 from utils.logger import logger
+from utils.helpers import get_wallet_address
+from utils.balance_cache import balance_cache
 
 class BalanceRotator:
     def __init__(self, exchanges):
@@ -19,7 +21,7 @@ class BalanceRotator:
         
         # Periksa saldo di exchange penjual
         sell_ex = self.exchanges[sell_ex_name]
-        sell_balance = sell_ex.fetch_balance().get(symbol, {}).get('free', 0)
+        sell_balance = await balance_cache.get_free_async(sell_ex, symbol)
         
         if sell_balance < amount:
             logger.warning(f"⚠️ Saldo {symbol} tidak cukup di {sell_ex_name}")
@@ -34,11 +36,11 @@ class BalanceRotator:
             if ex_name == target_exchange:
                 continue
                 
-            balance = exchange.fetch_balance().get(symbol, {}).get('free', 0)
+            balance = await balance_cache.get_free_async(exchange, symbol)
             if balance >= amount:
                 # 2. Transfer ke exchange target
                 wallet_info = get_wallet_address(self.exchanges[target_exchange], symbol)
-                success = exchange.transfer_coin(
+                success = await exchange.transfer_coin_async(
                     symbol,
                     amount,
                     wallet_info['address'],
@@ -47,6 +49,8 @@ class BalanceRotator:
                 )
                 
                 if success:
+                    balance_cache.invalidate(exchange)
+                    balance_cache.invalidate(target_exchange)
                     logger.info(f"✅ Berhasil transfer {amount} {symbol} dari {ex_name} ke {target_exchange}")
                     return True
         
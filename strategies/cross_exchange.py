@@ -1,21 +1,32 @@
 from utils.helpers import (
     calculate_net_profit,
     calculate_trade_amount,
-    get_min_profit_threshold
+    get_min_profit_threshold,
+    get_usd_to_idr_rate
 )
-from utils.logger import logger
-from config.settings import SUPPORTED_SYMBOLS
+import logging
+from utils.logger import logger, log_event
+from utils.balance_cache import balance_cache
 from colorama import init, Fore, Style
 
 init(autoreset=True)
 
-def find_arbitrage_opportunities(prices, exchanges):
+def price_symbols(prices):
+    """Simbol yang ada di dict harga {exchange: {simbol: harga}}, urut kemunculan pertama"""
+    return list(dict.fromkeys(symbol for symbol_prices in prices.values() for symbol in symbol_prices))
+
+def find_arbitrage_opportunities(prices, exchanges, symbols=None, usd_to_idr=None):
+    """
+    symbols: simbol yang dievaluasi (biasanya PriceCollector.symbols), default semua simbol di prices.
+    usd_to_idr: kurs untuk seluruh siklus, diambil sekali di sini jika tidak diberikan.
+    """
     opportunities = []
     min_profit_usd, min_profit_percent = get_min_profit_threshold()
+    usd_to_idr = usd_to_idr or get_usd_to_idr_rate()
     
-    logger.info(f"🧪 Threshold profit: ${min_profit_usd} atau {min_profit_percent*100:.2f}%")
+    logger.info("🧪 Threshold profit: $%s atau %.2f%%", min_profit_usd, min_profit_percent * 100)
 
-    for symbol in SUPPORTED_SYMBOLS:
+    for symbol in (price_symbols(prices) if symbols is None else symbols):
         # Cari exchange dengan harga terendah dan tertinggi
         buy_exchange = None
         sell_exchange = None
@@ -34,84 +45,106 @@ def find_arbitrage_opportunities(prices, exchanges):
         
         # Periksa apakah ada peluang arbitrase
         if buy_exchange and sell_exchange and buy_exchange != sell_exchange:
-            spread = highest_price - lowest_price
-            profit_data = calculate_net_profit(
-                symbol,
-                lowest_price,
-                highest_price,
-                buy_exchange,
-                sell_exchange
-            )
+            opportunity = build_opportunity(symbol, buy_exchange, sell_exchange, lowest_price, highest_price, exchanges,
+                                            usd_to_idr=usd_to_idr)
+            log_opportunity(opportunity)
+            opportunities.append(opportunity)
 
-            # Dapatkan instance exchange
-            buy_ex = next(ex for ex in exchanges if ex.__class__.__name__.lower() == buy_exchange)
-            sell_ex = next(ex for ex in exchanges if ex.__class__.__name__.lower() == sell_exchange)
+    return opportunities
 
-            # Hitung jumlah yang bisa ditradingkan
-            trade_details = calculate_trade_amount(
-                symbol,
-                buy_ex,
-                sell_ex,
-                lowest_price,
-                highest_price
-            )
+def build_opportunity(symbol, buy_exchange, sell_exchange, buy_price, sell_price, exchanges, profit_data=None,
+                      usd_to_idr=None):
+    """Lengkapi pasangan beli/jual dengan profit, ukuran trade dan saldo"""
+    if profit_data is None:
+        profit_data = calculate_net_profit(
+            symbol,
+            buy_price,
+            sell_price,
+            buy_exchange,
+            sell_exchange,
+            usd_to_idr
+        )
 
-            # Ambil saldo untuk log
-            buy_bal = buy_ex.fetch_balance()
-            sell_bal = sell_ex.fetch_balance()
-            buy_symbol_balance = buy_bal.get(symbol, {}).get('free', 0)
-            buy_usdt_balance = buy_bal.get(buy_ex.get_base_currency(), {}).get('free', 0)
-            sell_symbol_balance = sell_bal.get(symbol, {}).get('free', 0)
-            sell_usdt_balance = sell_bal.get(sell_ex.get_base_currency(), {}).get('free', 0)
+    # Dapatkan instance exchange
+    buy_ex = next(ex for ex in exchanges if ex.__class__.__name__.lower() == buy_exchange)
+    sell_ex = next(ex for ex in exchanges if ex.__class__.__name__.lower() == sell_exchange)
 
-            # Simpan semua info peluang
-            opportunity = {
-                'symbol': symbol,
-                'buy_exchange': buy_exchange,
-                'sell_exchange': sell_exchange,
-                'buy_price': lowest_price,
-                'sell_price': highest_price,
-                'spread': spread,
-                'net_profit': profit_data['net_profit'],
-                'net_profit_percent': profit_data['net_profit_percent'],
-                'required_amount': trade_details['required_amount'],
-                'executable': trade_details['executable'],
-                'min_balance_required': trade_details['min_balance_required'],
-                'buy_symbol_balance': buy_symbol_balance,
-                'buy_usdt_balance': buy_usdt_balance,
-                'sell_symbol_balance': sell_symbol_balance,
-                'sell_usdt_balance': sell_usdt_balance,
-            }
+    # Hitung jumlah yang bisa ditradingkan
+    trade_details = calculate_trade_amount(
+        symbol,
+        buy_ex,
+        sell_ex,
+        buy_price,
+        sell_price
+    )
 
-            log_opportunity(opportunity)
-            opportunities.append(opportunity)
+    # Ambil saldo untuk log
+    buy_bal = balance_cache.get(buy_ex)
+    sell_bal = balance_cache.get(sell_ex)
+    balances = (
+        buy_bal.get(symbol, {}).get('free', 0),
+        buy_bal.get(buy_ex.get_base_currency(), {}).get('free', 0),
+        sell_bal.get(symbol, {}).get('free', 0),
+        sell_bal.get(sell_ex.get_base_currency(), {}).get('free', 0),
+    )
+    return opportunity_record(symbol, buy_exchange, sell_exchange, buy_price, sell_price,
+                              profit_data['net_profit'], profit_data['net_profit_percent'], trade_details, balances)
 
-    return opportunities
+def opportunity_record(symbol, buy_exchange, sell_exchange, buy_price, sell_price, net_profit, net_profit_percent,
+                       trade_details, balances):
+    """Dict peluang; balances = (koin di exchange beli, dasar di exchange beli, koin di exchange jual, dasar di exchange jual)"""
+    buy_symbol_balance, buy_usdt_balance, sell_symbol_balance, sell_usdt_balance = balances
+    return {
+        'symbol': symbol,
+        'buy_exchange': buy_exchange,
+        'sell_exchange': sell_exchange,
+        'buy_price': buy_price,
+        'sell_price': sell_price,
+        'spread': sell_price - buy_price,
+        'net_profit': net_profit,
+        'net_profit_percent': net_profit_percent,
+        'required_amount': trade_details['required_amount'],
+        'executable': trade_details['executable'],
+        'min_balance_required': trade_details['min_balance_required'],
+        'buy_symbol_balance': buy_symbol_balance,
+        'buy_usdt_balance': buy_usdt_balance,
+        'sell_symbol_balance': sell_symbol_balance,
+        'sell_usdt_balance': sell_usdt_balance,
+    }
 
 def log_opportunity(opp):
+    """Satu baris ringkas per peluang; detail saldo ikut sebagai field terstruktur di file log"""
+    # Dipanggil per simbol per siklus: field tidak dibangun sama sekali jika INFO tidak aktif
+    if not logger.isEnabledFor(logging.INFO):
+        return
     status_color = Fore.GREEN if opp['executable'] else Fore.YELLOW
     status_text = "✅ LAYAK" if opp['executable'] else "⚠️ TIDAK LAYAK"
     reset = Style.RESET_ALL
-
-    buy_ex = opp['buy_exchange'].upper()
-    sell_ex = opp['sell_exchange'].upper()
     symbol = opp['symbol']
 
-    logger.info(f"{Fore.CYAN}{'='*60}{reset}")
-    logger.info(f"{Fore.MAGENTA}💹 ARBITRASE: {symbol}{reset}")
-    logger.info(f"{Fore.BLUE}➤ BELI: {buy_ex} @ ${opp['buy_price']:.6f}{reset}")
-    logger.info(f"{Fore.RED}➤ JUAL: {sell_ex} @ ${opp['sell_price']:.6f}{reset}")
-    logger.info(f"{Fore.WHITE}➤ SPREAD: ${opp['spread']:.6f}{reset}")
-    logger.info(f"{Fore.WHITE}➤ PROFIT: ${opp['net_profit']:.2f} ({opp['net_profit_percent']:.2f}%){reset}")
-    logger.info(f"{Fore.YELLOW}➤ JUMLAH: {opp['required_amount']:.6f} {symbol} | MIN SALDO: ${opp['min_balance_required']:.2f}{reset}")
-    logger.info(f"{status_color}➤ STATUS: {status_text} (min profit: ${opp['min_balance_required']:.2f}){reset}")
-    logger.info(
-        f"{Fore.LIGHTWHITE_EX}➤ Saldo {symbol} {buy_ex}: {opp['buy_symbol_balance']:.6f} | {buy_ex} {buy_ex_BASE(opp)}: {opp['buy_usdt_balance']:.2f}{reset}"
-    )
-    logger.info(
-        f"{Fore.LIGHTWHITE_EX}➤ Saldo {symbol} {sell_ex}: {opp['sell_symbol_balance']:.6f} | {sell_ex} {sell_ex_BASE(opp)}: {opp['sell_usdt_balance']:.2f}{reset}"
+    log_event(
+        logger, logging.INFO, "opportunity",
+        "%s💹 %s %s $%.6f → %s $%.6f | net $%.2f (%.2f%%) | jumlah %.6f | %s%s",
+        status_color, symbol, opp['buy_exchange'].upper(), opp['buy_price'], opp['sell_exchange'].upper(),
+        opp['sell_price'], opp['net_profit'], opp['net_profit_percent'], opp['required_amount'], status_text, reset,
+        symbol=symbol,
+        buy_exchange=opp['buy_exchange'],
+        sell_exchange=opp['sell_exchange'],
+        buy_price=opp['buy_price'],
+        sell_price=opp['sell_price'],
+        spread=opp['spread'],
+        net_profit=opp['net_profit'],
+        net_profit_percent=opp['net_profit_percent'],
+        required_amount=opp['required_amount'],
+        min_balance_required=opp['min_balance_required'],
+        executable=opp['executable'],
+        buy_symbol_balance=opp['buy_symbol_balance'],
+        buy_base_balance=opp['buy_usdt_balance'],
+        buy_base_currency=buy_ex_BASE(opp),
+        sell_symbol_balance=opp['sell_symbol_balance'],
+        sell_base_balance=opp['sell_usdt_balance'],
+        sell_base_currency=sell_ex_BASE(opp),
     )
-    logger.info(f"{Fore.CYAN}{'='*60}{reset}")
 
 def buy_ex_BASE(opp):
     return "USDT" if opp['buy_exchange'] != "indodax" else "IDR"
@@ -0,0 +1,149 @@
+from config.settings import TRADING_FEE, MIN_TRADE_AMOUNTS, ORDER_BOOK_MAX_AGE
+from utils.logger import logger
+from utils.helpers import transfer_fee_usd
+
+
+def book_to_usd(book, exchange_name, usd_to_idr):
+    """Konversi harga order book ke USD (hanya Indodax yang berbasis IDR)"""
+    rate = usd_to_idr if exchange_name == 'indodax' and usd_to_idr else 1.0
+    return {
+        'bids': [(price / rate, qty) for price, qty in book.get('bids', []) if price > 0 and qty > 0],
+        'asks': [(price / rate, qty) for price, qty in book.get('asks', []) if price > 0 and qty > 0],
+    }
+
+
+def profit_curve(asks, bids, fixed_fee=0.0, max_amount=None):
+    """
+    Telusuri ask exchange beli dan bid exchange jual secara bersamaan.
+
+    Setiap titik patah (habisnya satu level di salah satu sisi) menghasilkan satu titik kurva.
+    Margin per unit hanya bisa menurun, jadi penelusuran berhenti saat margin <= 0.
+
+    Returns:
+        list: [(amount, cost, revenue, net_profit)] kumulatif, diawali titik nol.
+    """
+    curve = [(0.0, 0.0, 0.0, -fixed_fee)]
+    amount = cost = revenue = 0.0
+    i = j = 0
+    ask_left = asks[0][1] if asks else 0.0
+    bid_left = bids[0][1] if bids else 0.0
+
+    while i < len(asks) and j < len(bids):
+        ask_price = asks[i][0]
+        bid_price = bids[j][0]
+        margin = bid_price * (1 - TRADING_FEE) - ask_price * (1 + TRADING_FEE)
+        if margin <= 0:
+            break
+
+        step = min(ask_left, bid_left)
+        if max_amount is not None:
+            step = min(step, max_amount - amount)
+        if step <= 0:
+            break
+
+        amount += step
+        cost += step * ask_price
+        revenue += step * bid_price
+        net = revenue - cost - TRADING_FEE * (revenue + cost) - fixed_fee
+        curve.append((amount, cost, revenue, net))
+
+        ask_left -= step
+        bid_left -= step
+        if ask_left <= 0:
+            i += 1
+            ask_left = asks[i][1] if i < len(asks) else 0.0
+        if bid_left <= 0:
+            j += 1
+            bid_left = bids[j][1] if j < len(bids) else 0.0
+
+    return curve
+
+
+def size_from_books(symbol, buy_book, sell_book, buy_exchange, sell_exchange, usd_to_idr, max_amount=None):
+    """
+    Hitung ukuran trade yang memaksimalkan net profit berdasarkan kedalaman kedua order book.
+
+    Args:
+        buy_book / sell_book: output fetch_order_book dalam mata uang dasar masing-masing exchange
+        max_amount: batas atas dari saldo (mis. required_amount dari calculate_trade_amount)
+
+    Returns:
+        dict: amount, buy_vwap, sell_vwap, gross_profit, net_profit, net_profit_percent, curve
+    """
+    buy_usd = book_to_usd(buy_book, buy_exchange, usd_to_idr)
+    sell_usd = book_to_usd(sell_book, sell_exchange, usd_to_idr)
+    asks, bids = buy_usd['asks'], sell_usd['bids']
+
+    empty = {
+        'amount': 0.0, 'buy_vwap': 0.0, 'sell_vwap': 0.0, 'gross_profit': 0.0,
+        'net_profit': 0.0, 'net_profit_percent': 0.0, 'curve': []
+    }
+    if not asks or not bids:
+        return empty
+
+    fixed_fee = transfer_fee_usd(symbol, asks[0][0], buy_exchange, sell_exchange, usd_to_idr)
+    curve = profit_curve(asks, bids, fixed_fee, max_amount)
+
+    # Margin menurun sehingga titik terakhir adalah net maksimum, kecuali dibatasi minimum trade
+    min_amount = MIN_TRADE_AMOUNTS.get(symbol, 0.001)
+    candidates = [point for point in curve if point[0] >= min_amount]
+    if not candidates:
+        return dict(empty, curve=[(a, n) for a, _, _, n in curve])
+
+    amount, cost, revenue, net = max(candidates, key=lambda point: point[3])
+    return {
+        'amount': amount,
+        'buy_vwap': cost / amount,
+        'sell_vwap': revenue / amount,
+        'gross_profit': revenue - cost,
+        'net_profit': net,
+        'net_profit_percent': net / cost * 100 if cost > 0 else 0.0,
+        'curve': [(a, n) for a, _, _, n in curve],
+    }
+
+
+def _order_book(exchange, exchange_name, symbol, depth, order_books):
+    """Pakai order book lokal jika tersinkron, jika tidak ambil snapshot REST"""
+    if order_books is not None:
+        book = order_books.get(exchange_name, symbol, depth, max_age=ORDER_BOOK_MAX_AGE)
+        if book is not None:
+            return book
+    return exchange.fetch_order_book(symbol, depth)
+
+
+def apply_depth_sizing(opportunity, exchanges, usd_to_idr, depth=20, order_books=None):
+    """
+    Ambil order book kedua sisi dan ganti ukuran/profit peluang dengan nilai yang executable.
+    Ukuran dibatasi oleh required_amount hasil perhitungan saldo.
+    """
+    symbol = opportunity['symbol']
+    buy_name = opportunity['buy_exchange']
+    sell_name = opportunity['sell_exchange']
+
+    try:
+        buy_ex = next(ex for ex in exchanges if ex.__class__.__name__.lower() == buy_name)
+        sell_ex = next(ex for ex in exchanges if ex.__class__.__name__.lower() == sell_name)
+
+        sizing = size_from_books(
+            symbol,
+            _order_book(buy_ex, buy_name, symbol, depth, order_books),
+            _order_book(sell_ex, sell_name, symbol, depth, order_books),
+            buy_name,
+            sell_name,
+            usd_to_idr,
+            max_amount=opportunity.get('required_amount')
+        )
+    except Exception as e:
+        logger.error(f"🚨 Gagal sizing order book {symbol} {buy_name}->{sell_name}: {e}")
+        return opportunity
+
+    opportunity['depth'] = sizing
+    opportunity['required_amount'] = sizing['amount']
+    opportunity['executable_net_profit'] = sizing['net_profit']
+    opportunity['executable'] = opportunity['executable'] and sizing['amount'] > 0 and sizing['net_profit'] > 0
+
+    logger.info(
+        f"📚 {symbol} {buy_name.upper()}->{sell_name.upper()} | ukuran {sizing['amount']:.6f} | "
+        f"VWAP ${sizing['buy_vwap']:.4f}/${sizing['sell_vwap']:.4f} | net ${sizing['net_profit']:.2f}"
+    )
+    return opportunity
@@ -0,0 +1,325 @@
+import math
+import time
+import logging
+import threading
+from exchanges.exchange_interface import Exchange
+from strategies.strategy_interface import ArbitrageStrategy
+from utils.logger import logger, log_event
+from utils.helpers import get_usd_to_idr_rate
+from config.settings import (
+    TRADING_FEE,
+    TRANSFER_FEE,
+    TRANSFER_FEE_IDR_TO_USDT,
+    GRAPH_MAX_LEGS,
+    GRAPH_MIN_PROFIT_PERCENT,
+    GRAPH_REFERENCE_USD,
+    GRAPH_CROSS_PAIRS,
+    PRICE_BOARD_MAX_AGE
+)
+
+STABLE = ('USDT', 'USD')
+
+
+class ArbitrageGraph:
+    """
+    Graf berarah semua market: node (exchange, aset), bobot edge -log(kurs bersih biaya).
+    Siklus dengan total bobot negatif adalah peluang: hasil perkaliannya > 1.
+
+    Edge market: jual base -> quote di harga bid, beli quote -> base di harga ask, keduanya dikurangi fee trading.
+    Edge transfer: aset yang sama antar exchange, biaya withdrawal tetap (unit koin) diubah menjadi
+    fraksi dari ukuran acuan reference_usd. Edge fiat: IDR Indodax <-> USDT exchange lain lewat kurs USD/IDR
+    dengan biaya TRANSFER_FEE_IDR_TO_USDT (IDR).
+
+    Pencarian inkremental: siklus negatif baru pasti melewati edge yang bobotnya turun sejak pencarian
+    terakhir. Jadi hanya edge itu yang diperiksa, masing-masing dengan DFS terbatas max_legs dari ujung
+    edge kembali ke pangkalnya; siklus aktif yang edge-nya berubah dihitung ulang bobotnya.
+
+    Edge market yang tidak diperbarui lebih dari max_age detik dibuang sebelum pencarian, sehingga
+    siklus dari market yang stream-nya terputus ikut gugur; edge muncul lagi saat harganya datang.
+    """
+
+    def __init__(self, trading_fee=TRADING_FEE, transfer_fee=TRANSFER_FEE, fiat_transfer_fee=TRANSFER_FEE_IDR_TO_USDT,
+                 max_legs=GRAPH_MAX_LEGS, min_profit_percent=GRAPH_MIN_PROFIT_PERCENT, reference_usd=GRAPH_REFERENCE_USD,
+                 max_age=PRICE_BOARD_MAX_AGE):
+        self.trading_fee = trading_fee
+        self.transfer_fee = transfer_fee
+        self.fiat_transfer_fee = fiat_transfer_fee
+        self.max_legs = max_legs
+        self.min_profit_percent = min_profit_percent
+        self.reference_usd = reference_usd
+        self.max_age = max_age
+        self.threshold = -math.log1p(min_profit_percent / 100)
+
+        self.outgoing = {}  # node -> {node: (bobot, kurs, jenis)}
+        self.incoming = {}  # node -> {node: bobot}
+        self.exchanges_by_asset = {}
+        self.usd_prices = {asset: 1.0 for asset in STABLE}
+        self._transfer_basis = {}  # aset -> harga USD yang dipakai edge transfernya
+        self.usd_to_idr = None
+        self.market_updated = {}  # (exchange, base, quote) -> waktu harga terakhir, urut dari yang tertua
+        self.touched = {}  # edge -> bobotnya sempat turun sejak pencarian terakhir
+        self.cycles = {}  # kunci siklus -> (node, bobot)
+        self._cycles_by_edge = {}
+        self._lock = threading.Lock()
+
+    # Pembaruan edge
+
+    def set_edge(self, src, dst, rate, kind):
+        if rate <= 0:
+            self.remove_edge(src, dst)
+            return
+        weight = -math.log(rate)
+        current = self.outgoing.get(src, {}).get(dst)
+        if current is not None and abs(current[0] - weight) < 1e-12:
+            return
+        self.outgoing.setdefault(src, {})[dst] = (weight, rate, kind)
+        self.incoming.setdefault(dst, {})[src] = weight
+        self.outgoing.setdefault(dst, {})
+        self.incoming.setdefault(src, {})
+        # Hanya edge yang bobotnya turun yang bisa membentuk siklus negatif baru
+        decreased = current is None or weight < current[0]
+        self.touched[(src, dst)] = self.touched.get((src, dst), False) or decreased
+
+    def remove_edge(self, src, dst):
+        if self.outgoing.get(src, {}).pop(dst, None) is not None:
+            self.incoming[dst].pop(src, None)
+            self.touched.setdefault((src, dst), False)
+
+    def update_market(self, exchange, base, quote, bid, ask=None, timestamp=None):
+        """Harga market base/quote di satu exchange (ask = bid jika hanya harga last yang ada)"""
+        with self._lock:
+            ask = bid if ask is None else ask
+            # Pindah ke ujung dict: market_updated tetap urut dari harga tertua
+            self.market_updated.pop((exchange, base, quote), None)
+            self.market_updated[(exchange, base, quote)] = time.time() if timestamp is None else timestamp
+            self.set_edge((exchange, base), (exchange, quote), bid * (1 - self.trading_fee), "market")
+            self.set_edge((exchange, quote), (exchange, base), (1 - self.trading_fee) / ask if ask > 0 else 0, "market")
+
+            for asset in (base, quote):
+                known = self.exchanges_by_asset.setdefault(asset, set())
+                if exchange not in known:
+                    known.add(exchange)
+                    self._transfer_basis.pop(asset, None)
+                    if asset in STABLE or asset == 'IDR':
+                        self._refresh_fiat_edges()
+
+            # Harga USD aset dipakai untuk mengubah biaya transfer tetap menjadi fraksi
+            usd = None
+            if quote in STABLE:
+                usd = bid
+            elif quote == 'IDR' and self.usd_to_idr:
+                usd = bid / self.usd_to_idr
+            if usd:
+                self.usd_prices[base] = usd
+            for asset in (base, quote):
+                basis = self._transfer_basis.get(asset)
+                price = self.usd_prices.get(asset)
+                if price and (basis is None or abs(price / basis - 1) > 0.01):
+                    self._refresh_transfer_edges(asset)
+
+    def set_fx_rate(self, usd_to_idr):
+        with self._lock:
+            if usd_to_idr and usd_to_idr != self.usd_to_idr:
+                self.usd_to_idr = usd_to_idr
+                self._refresh_fiat_edges()
+
+    def _refresh_transfer_edges(self, asset):
+        price = self.usd_prices[asset]
+        self._transfer_basis[asset] = price
+        fee_fraction = self.transfer_fee.get(asset, 0) * price / self.reference_usd
+        exchanges = self.exchanges_by_asset.get(asset, ())
+        for src in exchanges:
+            for dst in exchanges:
+                if src != dst:
+                    self.set_edge((src, asset), (dst, asset), 1 - fee_fraction, "transfer")
+
+    def _refresh_fiat_edges(self):
+        if not self.usd_to_idr:
+            return
+        fee_fraction = self.fiat_transfer_fee / (self.reference_usd * self.usd_to_idr)
+        for idr_exchange in self.exchanges_by_asset.get('IDR', ()):
+            for exchange in self.exchanges_by_asset.get('USDT', ()):
+                if exchange == idr_exchange:
+                    continue
+                self.set_edge((idr_exchange, 'IDR'), (exchange, 'USDT'), (1 - fee_fraction) / self.usd_to_idr, "fiat")
+                self.set_edge((exchange, 'USDT'), (idr_exchange, 'IDR'), (1 - fee_fraction) * self.usd_to_idr, "fiat")
+
+    def _expire_markets(self, now):
+        """Buang kedua edge market yang harganya lebih tua dari max_age; siklusnya diperiksa ulang lewat touched"""
+        cutoff = now - self.max_age
+        for key, updated_at in list(self.market_updated.items()):
+            if updated_at >= cutoff:
+                break
+            del self.market_updated[key]
+            exchange, base, quote = key
+            self.remove_edge((exchange, base), (exchange, quote))
+            self.remove_edge((exchange, quote), (exchange, base))
+
+    # Pencarian siklus
+
+    def find_cycles(self, now=None):
+        """
+        Buang edge market basi, periksa ulang siklus aktif yang edge-nya berubah,
+        lalu cari siklus baru lewat edge yang disentuh.
+        Returns:
+            list: [(node, total bobot)] siklus aktif, paling menguntungkan dulu.
+        """
+        with self._lock:
+            self._expire_markets(time.time() if now is None else now)
+            touched, self.touched = self.touched, {}
+
+            for edge in touched:
+                for key in list(self._cycles_by_edge.get(edge, ())):
+                    nodes = self.cycles[key][0]
+                    weight = self._cycle_weight(nodes)
+                    if weight is None or weight >= self.threshold:
+                        self._drop_cycle(key)
+                    else:
+                        self.cycles[key] = (nodes, weight)
+
+            for (src, dst), decreased in touched.items():
+                edge = self.outgoing.get(src, {}).get(dst)
+                if edge is None or not decreased:
+                    continue
+                for path, weight in self._paths(dst, src, self.max_legs - 1):
+                    total = edge[0] + weight
+                    if total < self.threshold:
+                        self._add_cycle([src] + path, total)
+
+            return sorted(self.cycles.values(), key=lambda item: item[1])
+
+    def _paths(self, start, target, max_hops):
+        """Semua jalur sederhana start -> target dengan <= max_hops edge: [(node tanpa target, bobot)]"""
+        found = []
+        into_target = self.incoming.get(target, {})
+        stack = [(start, [start], 0.0)]
+        while stack:
+            node, path, weight = stack.pop()
+            # Hop terakhir lewat indeks incoming target: tidak perlu menelusuri semua edge keluar
+            last = into_target.get(node)
+            if last is not None:
+                found.append((path, weight + last))
+            if len(path) >= max_hops:
+                continue
+            for nxt, (edge_weight, _, _) in self.outgoing.get(node, {}).items():
+                if nxt != target and nxt not in path:
+                    stack.append((nxt, path + [nxt], weight + edge_weight))
+        return found
+
+    def _cycle_weight(self, nodes):
+        total = 0.0
+        for src, dst in zip(nodes, nodes[1:] + nodes[:1]):
+            edge = self.outgoing.get(src, {}).get(dst)
+            if edge is None:
+                return None
+            total += edge[0]
+        return total
+
+    def _add_cycle(self, nodes, weight):
+        # Rotasi kanonik agar siklus yang sama dari titik awal lain tidak tercatat dua kali
+        start = nodes.index(min(nodes))
+        nodes = nodes[start:] + nodes[:start]
+        key = tuple(nodes)
+        if key not in self.cycles:
+            for edge in zip(nodes, nodes[1:] + nodes[:1]):
+                self._cycles_by_edge.setdefault(edge, set()).add(key)
+        self.cycles[key] = (nodes, weight)
+
+    def _drop_cycle(self, key):
+        nodes, _ = self.cycles.pop(key)
+        for edge in zip(nodes, nodes[1:] + nodes[:1]):
+            self._cycles_by_edge.get(edge, set()).discard(key)
+
+    def legs(self, nodes):
+        return [
+            {'from': f"{src[0]}:{src[1]}", 'to': f"{dst[0]}:{dst[1]}",
+             'rate': self.outgoing[src][dst][1], 'kind': self.outgoing[src][dst][2]}
+            for src, dst in zip(nodes, nodes[1:] + nodes[:1])
+        ]
+
+
+class GraphArbitrageStrategy(ArbitrageStrategy):
+    """
+    Deteksi siklus multi-leg (triangular di satu exchange dan lintas exchange termasuk leg IDR)
+    di atas ArbitrageGraph. Harga masuk dari PriceCollector (find_opportunities), listener
+    PriceBoard (on_tick) dan pair silang GRAPH_CROSS_PAIRS (refresh_cross_pairs).
+    """
+
+    def __init__(self, graph=None, cross_pairs=GRAPH_CROSS_PAIRS):
+        self.graph = graph or ArbitrageGraph()
+        self.cross_pairs = cross_pairs
+
+    @staticmethod
+    def quote_currency(exchange_name):
+        return 'IDR' if exchange_name == 'indodax' else 'USDT'
+
+    def on_tick(self, exchange_name, symbol, price, received_at, bid=None, ask=None, size=None):
+        """Listener PriceBoard: harga dalam mata uang dasar exchange, cukup memperbarui dua edge"""
+        self.graph.update_market(exchange_name, symbol, self.quote_currency(exchange_name), price, timestamp=received_at)
+
+    def refresh_cross_pairs(self, exchanges):
+        """Ambil harga pair silang (mis. binance:XRP/BTC) lewat fetch_tickers adapter"""
+        wanted = {}
+        for entry in self.cross_pairs:
+            exchange_name, _, pair = entry.strip().partition(':')
+            wanted.setdefault(exchange_name.lower(), []).append(pair.upper())
+
+        for ex in exchanges:
+            name = ex.__class__.__name__.lower()
+            if name not in wanted:
+                continue
+            # Exchange.fetch_tickers bawaan mengulang fetch_ticker, yang menganggap simbol sebagai aset/USDT
+            fetch_tickers = getattr(type(ex), 'fetch_tickers', None)
+            if fetch_tickers is None or fetch_tickers is Exchange.fetch_tickers:
+                logger.warning(f"⚠️ {name} tidak punya fetch_tickers untuk pair silang, dilewati")
+                continue
+            try:
+                for pair, price in ex.fetch_tickers(wanted[name]).items():
+                    base, quote = pair.split('/')
+                    if price and price > 0:
+                        self.graph.update_market(name, base, quote, price)
+            except Exception as e:
+                logger.error(f"❌ Gagal ambil pair silang {name}: {e}")
+
+    def find_opportunities(self, prices):
+        """
+        prices: {exchange: {simbol: harga USD}} seperti keluaran PriceCollector.
+        Returns:
+            list: peluang siklus, paling menguntungkan dulu.
+        """
+        usd_to_idr = get_usd_to_idr_rate()
+        self.graph.set_fx_rate(usd_to_idr)
+        for exchange_name, symbol_prices in prices.items():
+            quote = self.quote_currency(exchange_name)
+            for symbol, price in symbol_prices.items():
+                if price and price > 0:
+                    self.graph.update_market(exchange_name, symbol, quote,
+                                             price * usd_to_idr if quote == 'IDR' else price)
+
+        opportunities = []
+        for nodes, weight in self.graph.find_cycles():
+            profit_percent = math.expm1(-weight) * 100
+            opportunity = {
+                'type': 'cycle',
+                'symbol': "/".join(asset for _, asset in nodes),
+                'path': [f"{exchange}:{asset}" for exchange, asset in nodes],
+                'legs': self.graph.legs(nodes),
+                'net_profit_percent': profit_percent,
+                'net_profit': self.graph.reference_usd * profit_percent / 100,
+                'executable': False,
+            }
+            log_cycle(opportunity)
+            opportunities.append(opportunity)
+        return opportunities
+
+
+def log_cycle(opportunity):
+    log_event(
+        logger, logging.INFO, "cycle",
+        "🔺 Siklus %s | %.3f%% ($%.2f per $%.0f)", ' → '.join(opportunity['path']),
+        opportunity['net_profit_percent'], opportunity['net_profit'], GRAPH_REFERENCE_USD,
+        path=opportunity['path'],
+        legs=opportunity['legs'],
+        net_profit_percent=opportunity['net_profit_percent'],
+        net_profit=opportunity['net_profit'],
+    )
@@ -0,0 +1,272 @@
+import numpy as np
+from utils.logger import logger
+from utils.balance_cache import balance_cache
+from utils.helpers import get_min_profit_threshold, get_usd_to_idr_rate, fiat_fee_usd
+from exchanges.markets import market_metadata
+from strategies.cross_exchange import opportunity_record, log_opportunity, price_symbols
+from config.settings import TRANSFER_FEE, TRANSFER_FEE_IDR_TO_USDT, TRADING_FEE, MIN_TRADE_AMOUNTS
+
+
+def fee_vectors(exchange_names, symbols, usd_to_idr, transfer_fee=TRANSFER_FEE,
+                fiat_transfer_fee=TRANSFER_FEE_IDR_TO_USDT):
+    """
+    Komponen transfer_fee_usd sebagai array: fee transfer koin per simbol dalam unit koin (S,)
+    dan fee transfer fiat dalam USD per pasangan exchange (E, E)
+    """
+    coin_fee = np.array([transfer_fee.get(symbol, 0) for symbol in symbols], dtype=float)
+    fiat_fee = np.array([[fiat_fee_usd(buy, sell, usd_to_idr, fiat_transfer_fee) for sell in exchange_names]
+                         for buy in exchange_names], dtype=float).reshape(len(exchange_names), len(exchange_names))
+    return coin_fee, fiat_fee
+
+
+def spread_economics(prices, coin_fee, fiat_fee, trading_fee=TRADING_FEE):
+    """
+    Ekonomi calculate_net_profit untuk semua pasangan berarah sekaligus.
+    prices berbentuk (..., exchange, simbol) dalam USD; dimensi depan (mis. waktu) ikut di-broadcast.
+
+    Returns:
+        tuple: (gross, net, net_percent) berbentuk (..., beli, jual, simbol).
+        Pasangan tidak valid (harga 0 atau exchange sama) bernilai -inf di net.
+    """
+    buy = prices[..., :, None, :]
+    sell = prices[..., None, :, :]
+
+    gross = sell - buy
+    # Fee koin dinilai dengan harga beli, seperti transfer_fee_usd
+    fees = trading_fee * (buy + sell) + coin_fee * buy + fiat_fee[:, :, None]
+    net = gross - fees
+
+    valid = prices > 0
+    same_exchange = np.eye(prices.shape[-2], dtype=bool)
+    mask = valid[..., :, None, :] & valid[..., None, :, :] & ~same_exchange[:, :, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        net_percent = np.where(mask, net / buy * 100, 0.0)
+    net = np.where(mask, net, -np.inf)
+    return gross, net, net_percent
+
+
+def trade_arrays(exchanges, exchange_names, symbols):
+    """
+    Input calculate_trade_amount untuk semua exchange x simbol sekaligus, dari balance cache dan
+    metadata market: saldo dasar (E,), saldo koin (E, S), min qty (E, S), min notional (E, S)
+    dan MIN_TRADE_AMOUNTS (S,). Notional Indodax dalam IDR sehingga tidak dipakai (0).
+    """
+    by_name = {ex.__class__.__name__.lower(): ex for ex in exchanges}
+    default_min = np.array([MIN_TRADE_AMOUNTS.get(symbol, 0.001) for symbol in symbols], dtype=float)
+    quote_free = np.zeros(len(exchange_names))
+    coin_free = np.zeros((len(exchange_names), len(symbols)))
+    min_qty = np.tile(default_min, (len(exchange_names), 1))
+    min_notional = np.zeros((len(exchange_names), len(symbols)))
+
+    for row, name in enumerate(exchange_names):
+        exchange = by_name.get(name)
+        if exchange is None:
+            continue
+        base = exchange.get_base_currency()
+        balance = balance_cache.get(exchange)
+        quote_free[row] = balance.get(base, {}).get('free', 0)
+        coin_free[row] = [balance.get(symbol, {}).get('free', 0) for symbol in symbols]
+
+        index = market_metadata.index(name)
+        if index is None:
+            continue
+        for col, symbol in enumerate(symbols):
+            market = index.get(symbol)
+            if market is not None:
+                min_qty[row, col] = market.min_qty
+                min_notional[row, col] = market.min_notional if base != "IDR" else 0.0
+    return quote_free, coin_free, min_qty, min_notional, default_min
+
+
+def _min_amount(min_qty, min_notional, price, default):
+    """_exchange_min_amount untuk array: notional dikonversi ke jumlah koin, `default` jika filter bernilai 0"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        by_notional = np.where((min_notional > 0) & (price > 0), min_notional / price, 0.0)
+    amount = np.maximum(min_qty, by_notional)
+    return np.where(amount > 0, amount, default)
+
+
+class SpreadMatrix:
+    """
+    Harga disimpan sebagai array (exchange x simbol) dalam USD.
+    Semua pasangan berarah beli di i / jual di j dihitung sekaligus dengan ekonomi
+    yang sama seperti calculate_net_profit.
+    """
+
+    def __init__(self, exchange_names, symbols, usd_to_idr=None):
+        self.exchange_names = list(exchange_names)
+        self.symbols = list(symbols)
+        self.exchange_index = {name: i for i, name in enumerate(self.exchange_names)}
+        self.symbol_index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.prices = np.zeros((len(self.exchange_names), len(self.symbols)))
+
+        # Vektor biaya: transfer koin per simbol, transfer fiat per pasangan exchange
+        self.coin_fee, self.fiat_fee = fee_vectors(self.exchange_names, self.symbols,
+                                                   usd_to_idr or get_usd_to_idr_rate())
+
+    @classmethod
+    def from_prices(cls, prices, symbols=None, usd_to_idr=None):
+        matrix = cls(prices.keys(), price_symbols(prices) if symbols is None else symbols, usd_to_idr)
+        matrix.update(prices)
+        return matrix
+
+    def update(self, prices):
+        """Isi array dari dict {exchange: {symbol: harga}}"""
+        for exchange_name, symbol_prices in prices.items():
+            row = self.exchange_index.get(exchange_name)
+            if row is None:
+                continue
+            for symbol, price in symbol_prices.items():
+                col = self.symbol_index.get(symbol)
+                if col is not None:
+                    self.prices[row, col] = price or 0.0
+
+    def set_price(self, exchange_name, symbol, price):
+        self.prices[self.exchange_index[exchange_name], self.symbol_index[symbol]] = price or 0.0
+
+    def compute(self):
+        """
+        Returns:
+            tuple: (gross, net, net_percent) berbentuk (beli, jual, simbol).
+            Pasangan tidak valid (harga 0 atau exchange sama) bernilai -inf di net.
+        """
+        return spread_economics(self.prices, self.coin_fee, self.fiat_fee)
+
+    def top_k(self, k=5, min_profit_usd=None, min_profit_percent=None):
+        """k pasangan dengan net profit terbesar dari semua simbol, opsional difilter threshold"""
+        gross, net, net_percent = self.compute()
+        candidates = np.isfinite(net)
+        if min_profit_usd is not None:
+            candidates &= net >= min_profit_usd
+        if min_profit_percent is not None:
+            candidates &= net_percent >= min_profit_percent
+
+        flat = np.flatnonzero(candidates)
+        if flat.size == 0:
+            return []
+        if flat.size > k:
+            values = net.ravel()[flat]
+            flat = flat[np.argpartition(-values, k - 1)[:k]]
+        flat = flat[np.argsort(-net.ravel()[flat])]
+
+        return [
+            self._pair(gross, net, net_percent, buy_i, sell_j, sym_s)
+            for buy_i, sell_j, sym_s in zip(*np.unravel_index(flat, net.shape))
+        ]
+
+    def ranked_per_symbol(self, net, k=5):
+        """
+        Indeks datar (beli * E + jual) k pasangan terbaik tiap simbol, urut menurun, berbentuk (k, S),
+        beserta mask (k, S) pasangan yang valid. None jika tidak ada pasangan.
+        """
+        n_exchanges = len(self.exchange_names)
+        by_symbol = net.reshape(n_exchanges * n_exchanges, len(self.symbols))
+
+        k = min(k, by_symbol.shape[0])
+        if k == 0:
+            return None
+        best = np.argpartition(-by_symbol, k - 1, axis=0)[:k]
+        best_net = np.take_along_axis(by_symbol, best, axis=0)
+        order = np.argsort(-best_net, axis=0)
+        return np.take_along_axis(best, order, axis=0), np.isfinite(np.take_along_axis(best_net, order, axis=0))
+
+    def executable(self, best, valid, exchanges):
+        """
+        calculate_trade_amount untuk pasangan (k, S) dari ranked_per_symbol sekaligus.
+        Returns: (required_amount, executable, min_balance_required, buy_i, sell_j, saldo) berbentuk (k, S).
+        """
+        quote_free, coin_free, min_qty, min_notional, default_min = trade_arrays(
+            exchanges, self.exchange_names, self.symbols)
+        buy_i, sell_j = np.divmod(best, len(self.exchange_names))
+        cols = np.arange(len(self.symbols))[None, :]
+        buy_price, sell_price = self.prices[buy_i, cols], self.prices[sell_j, cols]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            max_from_buy = np.where(buy_price > 0, quote_free[buy_i] / buy_price, 0.0)
+            spread = sell_price - buy_price
+            min_for_profit = np.where(
+                spread > 0, np.maximum(get_min_profit_threshold()[0] / spread, default_min), np.inf)
+        amount = np.minimum(coin_free[sell_j, cols], max_from_buy)
+        min_amount = np.maximum(_min_amount(min_qty[buy_i, cols], min_notional[buy_i, cols], buy_price, default_min),
+                                _min_amount(min_qty[sell_j, cols], min_notional[sell_j, cols], sell_price, default_min))
+        executable = valid & (amount >= min_amount) & (amount >= min_for_profit)
+        balances = (coin_free[buy_i, cols], quote_free[buy_i], coin_free[sell_j, cols], quote_free[sell_j])
+        return amount, executable, np.maximum(min_amount, min_for_profit), buy_i, sell_j, balances
+
+    def top_k_per_symbol(self, k=5):
+        """k pasangan terbaik untuk setiap simbol dalam satu kali perhitungan: {symbol: [pair]}"""
+        gross, net, net_percent = self.compute()
+        n_exchanges = len(self.exchange_names)
+        ranked_pairs = self.ranked_per_symbol(net, k)
+        if ranked_pairs is None:
+            return {}
+        best = ranked_pairs[0]
+
+        ranked = {}
+        for sym_s, symbol in enumerate(self.symbols):
+            pairs = []
+            for flat in best[:, sym_s]:
+                buy_i, sell_j = divmod(int(flat), n_exchanges)
+                if not np.isfinite(net[buy_i, sell_j, sym_s]):
+                    break
+                pairs.append(self._pair(gross, net, net_percent, buy_i, sell_j, sym_s))
+            ranked[symbol] = pairs
+        return ranked
+
+    def _pair(self, gross, net, net_percent, buy_i, sell_j, sym_s):
+        return {
+            'symbol': self.symbols[sym_s],
+            'buy_exchange': self.exchange_names[buy_i],
+            'sell_exchange': self.exchange_names[sell_j],
+            'buy_price': float(self.prices[buy_i, sym_s]),
+            'sell_price': float(self.prices[sell_j, sym_s]),
+            'gross_profit': float(gross[buy_i, sell_j, sym_s]),
+            'total_fee': float(gross[buy_i, sell_j, sym_s] - net[buy_i, sell_j, sym_s]),
+            'net_profit': float(net[buy_i, sell_j, sym_s]),
+            'net_profit_percent': float(net_percent[buy_i, sell_j, sym_s]),
+        }
+
+
+def find_arbitrage_opportunities_matrix(prices, exchanges, symbols=None, top_k=5, usd_to_idr=None):
+    """
+    Versi vektorisasi find_arbitrage_opportunities: per simbol ambil pasangan dengan
+    net profit terbaik yang executable, dengan hingga top_k alternatif jika saldo tidak cukup.
+    Cek saldo dan threshold dihitung sebagai array untuk semua kandidat; dict hanya dibuat
+    untuk satu pasangan terpilih per simbol.
+    """
+    matrix = SpreadMatrix.from_prices(prices, symbols, usd_to_idr)
+    gross, net, net_percent = matrix.compute()
+    ranked_pairs = matrix.ranked_per_symbol(net, top_k)
+    if ranked_pairs is None:
+        return []
+    best, valid = ranked_pairs
+    amount, executable, min_required, buy_i, sell_j, balances = matrix.executable(best, valid, exchanges)
+
+    # Kandidat executable pertama per simbol, atau peringkat teratas jika tidak ada yang executable
+    rank = np.where(executable.any(axis=0), executable.argmax(axis=0), 0)
+    cols = np.flatnonzero(valid[0])
+    rank = rank[cols]
+    buy_i, sell_j = buy_i[rank, cols], sell_j[rank, cols]
+    rows = zip(
+        cols.tolist(), rank.tolist(), buy_i.tolist(), sell_j.tolist(),
+        matrix.prices[buy_i, cols].tolist(), matrix.prices[sell_j, cols].tolist(),
+        net[buy_i, sell_j, cols].tolist(), net_percent[buy_i, sell_j, cols].tolist(),
+        amount[rank, cols].tolist(), executable[rank, cols].tolist(), min_required[rank, cols].tolist(),
+        *(balance[rank, cols].tolist() for balance in balances),
+    )
+
+    opportunities = []
+    for col, chosen_rank, buy, sell, buy_price, sell_price, net_profit, net_profit_percent, \
+            required_amount, is_executable, min_balance, *balance in rows:
+        symbol = matrix.symbols[col]
+        trade_details = {'required_amount': required_amount, 'executable': is_executable,
+                         'min_balance_required': min_balance}
+        opportunity = opportunity_record(symbol, matrix.exchange_names[buy], matrix.exchange_names[sell],
+                                         buy_price, sell_price, net_profit, net_profit_percent, trade_details, balance)
+        opportunity['rank'] = chosen_rank
+        if chosen_rank > 0:
+            logger.info("🔀 %s: pasangan terbaik tidak executable, pakai alternatif #%d", symbol, chosen_rank + 1)
+        log_opportunity(opportunity)
+        opportunities.append(opportunity)
+
+    return opportunities
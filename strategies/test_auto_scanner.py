@@ -0,0 +1,48 @@
+import random
+import asyncio
+from exchanges.binance import Binance
+from exchanges.kucoin import KuCoin
+from exchanges.indodax import Indodax
+from exchanges.poloniex import Poloniex
+from exchanges.markets import market_metadata
+from strategies.auto_scanner import scan_universe, top_spreads
+from simulator.test_simulator import SYMBOLS, start_simulator, make_adapter
+
+
+def test_top_spreads_heap_matches_full_sort():
+    rng = random.Random(5)
+    prices = {
+        f"C{i}": {name: (rng.uniform(0.9, 1.1), 1e6) for name in ("binance", "kucoin", "poloniex")[:rng.randint(1, 3)]}
+        for i in range(500)
+    }
+    top = top_spreads(prices, top_k=10)
+
+    expected = sorted(
+        ((max(p for p, _ in v.values()) / min(p for p, _ in v.values()) - 1) * 100, symbol)
+        for symbol, v in prices.items() if len(v) > 1
+    )[::-1][:10]
+    assert [opp['symbol'] for opp in top] == [symbol for _, symbol in expected]
+    assert all(opp['buy_price'] <= opp['sell_price'] for opp in top)
+
+
+def test_scan_universe_over_simulated_venues(tmp_path, monkeypatch):
+    monkeypatch.setattr(market_metadata, "directory", str(tmp_path))
+    monkeypatch.setattr(market_metadata, "_indexes", {})
+    monkeypatch.setattr(market_metadata, "_loaded_at", {})
+    monkeypatch.setenv("USD_TO_IDR_RATE", "16000")
+
+    async def scenario():
+        simulator = await start_simulator()
+        try:
+            exchanges = [make_adapter(cls, simulator, monkeypatch) for cls in (Binance, KuCoin, Indodax, Poloniex)]
+            await market_metadata.load_all(exchanges)
+            liquid = await scan_universe(exchanges, top_k=2, min_volume_usd=500000)
+            illiquid = await scan_universe(exchanges, top_k=2, min_volume_usd=5000000)
+            return liquid, illiquid
+        finally:
+            await simulator.stop()
+
+    liquid, illiquid = asyncio.run(scenario())
+    assert len(liquid) == 2 and illiquid == []
+    assert {opp['symbol'] for opp in liquid} <= set(SYMBOLS)
+    assert liquid[0]['spread_percent'] >= liquid[1]['spread_percent'] > 0
@@ -1,6 +1,11 @@
 import logging
+import utils.helpers
+import strategies.cross_exchange
 from strategies.cross_exchange import find_arbitrage_opportunities
-from config.settings import MIN_PROFIT_THRESHOLD_USD, MIN_PROFIT_THRESHOLD_PERCENT
+from utils.balance_cache import balance_cache
+from config.settings import (
+    MIN_PROFIT_THRESHOLD_USD, MIN_PROFIT_THRESHOLD_PERCENT, TRADING_FEE, TRANSFER_FEE, TRANSFER_FEE_IDR_TO_USDT
+)
 
 logging.basicConfig(level=logging.INFO)
 
@@ -46,5 +51,64 @@ def test_arbitrage():
     else:
         print(f"✅ Ditemukan {len(opportunities)} peluang arbitrase")
 
+class Venue:
+    def get_base_currency(self):
+        return "USDT"
+
+    def fetch_balance(self):
+        return {"USDT": {"free": 1000.0}, "BTC": {"free": 1.0}, "XRP": {"free": 1000.0}}
+
+
+class Binance(Venue):
+    pass
+
+
+class Indodax(Venue):
+    pass
+
+
+class Kucoin(Venue):
+    pass
+
+
+def test_usd_to_idr_rate_is_read_once_per_pass(monkeypatch):
+    calls = []
+
+    def rate():
+        calls.append(1)
+        return 16000.0
+
+    monkeypatch.setattr(utils.helpers, "get_usd_to_idr_rate", rate)
+    monkeypatch.setattr(strategies.cross_exchange, "get_usd_to_idr_rate", rate)
+    prices = {
+        'binance': {'BTC': 30000.0, 'XRP': 0.90},
+        'indodax': {'BTC': 29900.0, 'XRP': 0.85},
+        'kucoin': {'BTC': 30010.0, 'XRP': 0.92},
+    }
+    balance_cache.invalidate()
+    try:
+        opportunities = find_arbitrage_opportunities(prices, [Binance(), Indodax(), Kucoin()], ["BTC", "XRP"])
+        # Dua pasangan Indodax, satu pembacaan kurs; kurs yang diberikan pemanggil tidak dibaca ulang
+        assert [opp['buy_exchange'] for opp in opportunities] == ["indodax", "indodax"] and calls == [1]
+        find_arbitrage_opportunities(prices, [Binance(), Indodax(), Kucoin()], ["BTC", "XRP"], usd_to_idr=16000.0)
+        assert calls == [1]
+    finally:
+        balance_cache.invalidate()
+
+
+def test_live_detection_charges_the_indodax_fiat_fee_in_usd(monkeypatch):
+    monkeypatch.setenv("USD_TO_IDR_RATE", "16000")
+    prices = {'binance': {'XRP': 0.90}, 'indodax': {'XRP': 0.85}}
+    balance_cache.invalidate()
+    try:
+        opp, = find_arbitrage_opportunities(prices, [Binance(), Indodax()], ["XRP"])
+    finally:
+        balance_cache.invalidate()
+    # Fee fiat Rp10.000 menjadi $0,625, bukan dikurangkan sebagai $10.000
+    fiat_usd = TRANSFER_FEE_IDR_TO_USDT / 16000
+    expected = 0.05 - (0.85 + 0.90) * TRADING_FEE - TRANSFER_FEE.get('XRP', 0) * 0.85 - fiat_usd
+    assert abs(opp['net_profit'] - expected) < 1e-12
+
+
 if __name__ == "__main__":
     test_arbitrage()
@@ -0,0 +1,33 @@
+from strategies.depth_sizing import size_from_books, profit_curve
+from config.settings import TRADING_FEE
+
+
+def test_size_stops_where_margin_turns_negative():
+    buy_book = {'asks': [(100.0, 1.0), (101.0, 2.0), (105.0, 5.0)], 'bids': []}
+    sell_book = {'bids': [(104.0, 1.5), (102.0, 2.0), (99.0, 5.0)], 'asks': []}
+
+    sizing = size_from_books('ETH', buy_book, sell_book, 'binance', 'kucoin', 16000)
+
+    # Level 105 ask vs 102 bid sudah rugi, jadi ukuran berhenti di 3 ETH
+    assert sizing['amount'] == 3.0
+    cost = 100.0 + 2 * 101.0
+    revenue = 1.5 * 104.0 + 1.5 * 102.0
+    assert abs(sizing['buy_vwap'] - cost / 3) < 1e-9
+    assert abs(sizing['sell_vwap'] - revenue / 3) < 1e-9
+    assert sizing['net_profit'] < revenue - cost - TRADING_FEE * (revenue + cost) + 1e-9
+
+
+def test_size_respects_balance_cap_and_idr_book():
+    usd_to_idr = 16000
+    buy_book = {'asks': [(100.0 * usd_to_idr, 10.0)], 'bids': []}
+    sell_book = {'bids': [(110.0, 10.0)], 'asks': []}
+
+    sizing = size_from_books('ETH', buy_book, sell_book, 'indodax', 'binance', usd_to_idr, max_amount=2.0)
+
+    assert sizing['amount'] == 2.0
+    assert abs(sizing['buy_vwap'] - 100.0) < 1e-9
+
+
+def test_no_overlap_gives_empty_curve():
+    curve = profit_curve([(101.0, 1.0)], [(100.0, 1.0)])
+    assert curve == [(0.0, 0.0, 0.0, 0.0)]
@@ -0,0 +1,94 @@
+import math
+from exchanges.exchange_interface import Exchange
+from strategies.graph_arbitrage import ArbitrageGraph, GraphArbitrageStrategy
+
+
+def test_triangular_cycle_found_and_dropped_incrementally():
+    graph = ArbitrageGraph(trading_fee=0.001, transfer_fee={}, max_legs=3, min_profit_percent=0.1)
+    graph.update_market("binance", "XRP", "USDT", 0.5)
+    graph.update_market("binance", "BTC", "USDT", 30000.0)
+    graph.update_market("binance", "XRP", "BTC", 0.5 / 30000.0)
+    assert graph.find_cycles() == []
+
+    # XRP/BTC 2% di atas harga implisit: USDT -> XRP -> BTC -> USDT
+    graph.update_market("binance", "XRP", "BTC", 1.02 * 0.5 / 30000.0)
+    assert set(graph.touched) == {(("binance", "XRP"), ("binance", "BTC")), (("binance", "BTC"), ("binance", "XRP"))}
+    cycles = graph.find_cycles()
+    assert len(cycles) == 1
+    nodes, weight = cycles[0]
+    assert [asset for _, asset in nodes] == ["BTC", "USDT", "XRP"]
+    assert math.isclose(math.expm1(-weight), 1.02 * 0.999 ** 3 - 1)
+
+    # Harga kembali normal: hanya siklus aktif yang edge-nya berubah yang dihitung ulang
+    graph.update_market("binance", "XRP", "BTC", 0.5 / 30000.0)
+    assert graph.find_cycles() == []
+    assert graph.cycles == {}
+
+
+def test_cross_exchange_cycle_through_indodax_idr_leg(monkeypatch):
+    monkeypatch.setenv("USD_TO_IDR_RATE", "16000")
+    strategy = GraphArbitrageStrategy(ArbitrageGraph(trading_fee=0.001, transfer_fee={'XRP': 0.1},
+                                                     fiat_transfer_fee=10000, reference_usd=1000))
+    opportunities = strategy.find_opportunities({
+        'binance': {'XRP': 0.50},
+        'indodax': {'XRP': 0.48},
+    })
+
+    assert len(opportunities) == 1
+    cycle = opportunities[0]
+    assert set(cycle['path']) == {"indodax:IDR", "indodax:XRP", "binance:XRP", "binance:USDT"}
+    assert [leg['kind'] for leg in cycle['legs']].count("fiat") == 1
+    expected = 0.50 / 0.48 * 0.999 ** 2 * (1 - 0.1 * 0.48 / 1000) * (1 - 10000 / (1000 * 16000)) - 1
+    assert math.isclose(cycle['net_profit_percent'], expected * 100, rel_tol=1e-3)
+
+
+def test_stale_market_edges_are_dropped_from_cycles():
+    graph = ArbitrageGraph(trading_fee=0.001, transfer_fee={}, max_legs=3, min_profit_percent=0.1, max_age=30)
+    graph.update_market("binance", "XRP", "USDT", 0.5, timestamp=1000.0)
+    graph.update_market("binance", "BTC", "USDT", 30000.0, timestamp=1000.0)
+    graph.update_market("binance", "XRP", "BTC", 1.02 * 0.5 / 30000.0, timestamp=1010.0)
+    assert len(graph.find_cycles(now=1020.0)) == 1
+
+    # Harga XRP/USDT berhenti datang: siklusnya gugur walaupun harga lain masih segar
+    graph.update_market("binance", "BTC", "USDT", 30000.0, timestamp=1035.0)
+    graph.update_market("binance", "XRP", "BTC", 1.02 * 0.5 / 30000.0, timestamp=1035.0)
+    assert graph.find_cycles(now=1040.0) == []
+    assert ("binance", "USDT") not in graph.outgoing[("binance", "XRP")]
+    assert list(graph.market_updated) == [("binance", "BTC", "USDT"), ("binance", "XRP", "BTC")]
+
+    # Tick baru mengembalikan edge dan siklusnya
+    graph.update_market("binance", "XRP", "USDT", 0.5, timestamp=1041.0)
+    assert len(graph.find_cycles(now=1041.0)) == 1
+
+
+def test_cross_pairs_skip_venues_without_bulk_tickers():
+    class Poloniex(Exchange):
+        requested = []
+
+        def get_base_currency(self):
+            return "USDT"
+
+        def fetch_ticker(self, symbol):
+            # Jalur simbol tunggal menambahkan USDT: "XRP/BTC" akan menjadi pair yang salah
+            self.requested.append(symbol)
+            return 1.0
+
+        def fetch_order_book(self, symbol, depth=20):
+            return {'bids': [], 'asks': [], 'sequence': None}
+
+        def fetch_balance(self):
+            return {}
+
+        def transfer_coin(self, symbol, amount, address, tag=None, network=None):
+            return False
+
+    class Binance(Poloniex):
+        def fetch_tickers(self, symbols):
+            return {symbol: 0.5 / 30000.0 for symbol in symbols}
+
+    strategy = GraphArbitrageStrategy(ArbitrageGraph(trading_fee=0.001, transfer_fee={}),
+                                      cross_pairs=["binance:XRP/BTC", "poloniex:XRP/BTC"])
+    strategy.refresh_cross_pairs([Binance(), Poloniex()])
+
+    assert Poloniex.requested == []
+    assert list(strategy.graph.market_updated) == [("binance", "XRP", "BTC")]
@@ -0,0 +1,124 @@
+import itertools
+import numpy as np
+from strategies.spread_matrix import SpreadMatrix, find_arbitrage_opportunities_matrix, trade_arrays, _min_amount
+from strategies.cross_exchange import build_opportunity
+from exchanges.markets import Market, MarketIndex, market_metadata
+from utils.helpers import calculate_net_profit, _exchange_min_amount
+from utils.balance_cache import balance_cache
+from config.settings import MIN_TRADE_AMOUNTS
+
+PRICES = {
+    'binance': {'BTC': 30000.0, 'XRP': 0.90, 'BNB': 400.0},
+    'indodax': {'BTC': 29900.0, 'XRP': 0.85, 'BNB': 0.0},
+    'kucoin': {'BTC': 30010.0, 'XRP': 0.92, 'BNB': 405.0},
+}
+
+
+def test_matrix_matches_calculate_net_profit():
+    matrix = SpreadMatrix.from_prices(PRICES, ['BTC', 'XRP', 'BNB'])
+    _, net, net_percent = matrix.compute()
+
+    for (buy_i, buy_ex), (sell_j, sell_ex) in itertools.permutations(enumerate(matrix.exchange_names), 2):
+        for sym_s, symbol in enumerate(matrix.symbols):
+            buy_price = PRICES[buy_ex][symbol]
+            sell_price = PRICES[sell_ex][symbol]
+            if buy_price <= 0 or sell_price <= 0:
+                assert net[buy_i, sell_j, sym_s] == -np.inf
+                continue
+            expected = calculate_net_profit(symbol, buy_price, sell_price, buy_ex, sell_ex)
+            assert np.isclose(net[buy_i, sell_j, sym_s], expected['net_profit'])
+            assert np.isclose(net_percent[buy_i, sell_j, sym_s], expected['net_profit_percent'])
+
+
+def test_transfer_fees_are_charged_in_usd():
+    # 0.1 XRP dinilai di harga beli dan 10000 IDR pada kurs 16000
+    expected = calculate_net_profit('XRP', 0.85, 0.92, 'indodax', 'kucoin', usd_to_idr=16000)
+    trading = 0.001 * (0.85 + 0.92)
+    assert np.isclose(expected['total_fee'], trading + 0.1 * 0.85 + 10000 / 16000)
+
+    matrix = SpreadMatrix(['indodax', 'kucoin'], ['XRP'], usd_to_idr=16000)
+    matrix.update({'indodax': {'XRP': 0.85}, 'kucoin': {'XRP': 0.92}})
+    _, net, _ = matrix.compute()
+    assert np.isclose(net[0, 1, 0], expected['net_profit'])
+
+
+def test_top_k_is_sorted_and_filtered():
+    matrix = SpreadMatrix.from_prices(PRICES, ['BTC', 'XRP', 'BNB'])
+    pairs = matrix.top_k(3)
+
+    assert len(pairs) == 3
+    assert [p['net_profit'] for p in pairs] == sorted((p['net_profit'] for p in pairs), reverse=True)
+    # Fee fiat Indodax 10000 IDR (~$0.6) tidak menghapus spread BTC $110
+    assert pairs[0]['symbol'] == 'BTC'
+    assert (pairs[0]['buy_exchange'], pairs[0]['sell_exchange']) == ('indodax', 'kucoin')
+    assert all(p['buy_exchange'] != p['sell_exchange'] for p in pairs)
+    assert matrix.top_k(10, min_profit_usd=1e9) == []
+
+
+def test_top_k_per_symbol_ranks_each_symbol():
+    matrix = SpreadMatrix.from_prices(PRICES, ['BTC', 'XRP', 'BNB'])
+    ranked = matrix.top_k_per_symbol(2)
+
+    assert set(ranked) == {'BTC', 'XRP', 'BNB'}
+    assert len(ranked['BNB']) == 2
+    assert ranked['BNB'][0]['net_profit'] >= ranked['BNB'][1]['net_profit']
+    assert all(p['symbol'] == 'XRP' for p in ranked['XRP'])
+
+
+def test_zero_exchange_filter_falls_back_to_default_minimum(monkeypatch):
+    # Market BTC tanpa filter minimum (0), XRP dengan min qty 5
+    markets = [Market("BTCUSDT", "BTC", "USDT"), Market("XRPUSDT", "XRP", "USDT", min_qty=5.0)]
+    monkeypatch.setattr(market_metadata, "_indexes", {"binance": MarketIndex("binance", markets, "USDT")})
+    default = MIN_TRADE_AMOUNTS.get("BTC", 0.001)
+    assert _exchange_min_amount(Binance(), "BTC", 30000.0) == default
+    assert _exchange_min_amount(Binance(), "XRP", 0.9) == 5.0
+
+    balance_cache.invalidate()
+    try:
+        _, _, min_qty, min_notional, default_min = trade_arrays([Binance()], ['binance'], ['BTC', 'XRP'])
+    finally:
+        balance_cache.invalidate()
+    assert _min_amount(min_qty[0], min_notional[0], np.array([30000.0, 0.9]), default_min).tolist() == [default, 5.0]
+
+
+class Venue:
+    BALANCE = {}
+
+    def get_base_currency(self):
+        return "USDT"
+
+    def fetch_balance(self):
+        return self.BALANCE
+
+
+class Binance(Venue):
+    BALANCE = {"USDT": {"free": 1e6}, "BTC": {"free": 0.0}, "XRP": {"free": 1e5}, "BNB": {"free": 100.0}}
+
+
+class Indodax(Venue):
+    BALANCE = {"USDT": {"free": 1e6}, "BTC": {"free": 10.0}, "XRP": {"free": 1e5}}
+
+
+class Kucoin(Venue):
+    BALANCE = {"USDT": {"free": 1e6}, "BTC": {"free": 10.0}, "XRP": {"free": 0.0}, "BNB": {"free": 100.0}}
+
+
+def test_matrix_opportunities_match_build_opportunity():
+    exchanges = [Binance(), Indodax(), Kucoin()]
+    balance_cache.invalidate()
+    try:
+        opportunities = find_arbitrage_opportunities_matrix(PRICES, exchanges, ['BTC', 'XRP', 'BNB'])
+        assert [opp['symbol'] for opp in opportunities] == ['BTC', 'XRP', 'BNB']
+        for opp in opportunities:
+            expected = build_opportunity(opp['symbol'], opp['buy_exchange'], opp['sell_exchange'],
+                                         opp['buy_price'], opp['sell_price'], exchanges)
+            for key, value in expected.items():
+                assert opp[key] == value if isinstance(value, (str, bool)) else np.isclose(opp[key], value), \
+                    (opp['symbol'], key)
+
+        # Tidak ada XRP di kucoin: pasangan yang menjual di kucoin dilewati, begitu juga spread negatif
+        xrp = opportunities[1]
+        assert (xrp['buy_exchange'], xrp['sell_exchange'], xrp['rank'], xrp['executable']) == \
+            ('indodax', 'binance', 3, True)
+    finally:
+        balance_cache.invalidate()
@@ -0,0 +1,112 @@
+import time
+import asyncio
+import logging
+import threading
+from config.settings import BALANCE_CACHE_TTL
+from utils.metrics import BALANCE_FETCH_EMPTY
+
+logger = logging.getLogger(__name__)
+
+
+class BalanceCache:
+    """
+    Snapshot saldo per exchange yang dipakai bersama oleh helper dan strategi.
+    Satu fetch_balance per exchange per siklus; snapshot kadaluarsa setelah TTL
+    dan harus di-invalidate setelah withdrawal atau order terisi.
+    """
+
+    def __init__(self, ttl=BALANCE_CACHE_TTL):
+        self.ttl = ttl
+        self._snapshots = {}
+        self._lock = threading.Lock()
+        self._fetch_locks = {}
+        self._pending = {}
+
+    def get(self, exchange):
+        """Ambil saldo {asset: {'free': float}} dari cache, fetch ulang jika belum ada atau kadaluarsa"""
+        name = self._name(exchange)
+        balances = self._fresh(name)
+        if balances is not None:
+            return balances
+
+        # Satu fetch per exchange walau dipanggil dari banyak thread sekaligus
+        with self._lock:
+            fetch_lock = self._fetch_locks.setdefault(name, threading.Lock())
+        with fetch_lock:
+            balances = self._fresh(name)
+            if balances is not None:
+                return balances
+
+            balances = exchange.fetch_balance()
+            # Respons kosong biasanya berarti error, jangan disimpan agar dicoba lagi
+            if balances:
+                with self._lock:
+                    self._snapshots[name] = (balances, time.time())
+            else:
+                BALANCE_FETCH_EMPTY.labels(name).inc()
+            return balances
+
+    def get_free(self, exchange, asset):
+        return self.get(exchange).get(asset, {}).get('free', 0)
+
+    async def get_async(self, exchange):
+        """Versi async dari get() untuk dipanggil dari event loop tanpa memblokirnya"""
+        name = self._name(exchange)
+        balances = self._fresh(name)
+        if balances is not None:
+            return balances
+
+        # Coroutine yang meminta exchange yang sama bersamaan menunggu satu fetch
+        loop = asyncio.get_running_loop()
+        pending = self._pending.get(name)
+        if pending is None or pending.get_loop() is not loop:
+            pending = loop.create_task(self._fetch_async(exchange, name))
+            self._pending[name] = pending
+            pending.add_done_callback(lambda task: self._forget(name, task))
+        return await asyncio.shield(pending)
+
+    async def _fetch_async(self, exchange, name):
+        balances = await exchange.fetch_balance_async()
+        if balances:
+            with self._lock:
+                self._snapshots[name] = (balances, time.time())
+        else:
+            BALANCE_FETCH_EMPTY.labels(name).inc()
+        return balances
+
+    async def get_free_async(self, exchange, asset):
+        return (await self.get_async(exchange)).get(asset, {}).get('free', 0)
+
+    def invalidate(self, exchange=None):
+        """Hapus snapshot satu exchange (instance atau nama), atau semua jika None"""
+        with self._lock:
+            if exchange is None:
+                self._snapshots.clear()
+            else:
+                self._snapshots.pop(self._name(exchange), None)
+
+    def new_cycle(self):
+        """Mulai siklus baru: snapshot berikutnya diambil ulang dari exchange"""
+        self.invalidate()
+
+    def _forget(self, name, task):
+        if self._pending.get(name) is task:
+            del self._pending[name]
+
+    def _fresh(self, name):
+        with self._lock:
+            entry = self._snapshots.get(name)
+        if entry is None:
+            return None
+        balances, fetched_at = entry
+        if time.time() - fetched_at > self.ttl:
+            return None
+        return balances
+
+    def _name(self, exchange):
+        if isinstance(exchange, str):
+            return exchange.lower()
+        return exchange.__class__.__name__.lower()
+
+
+balance_cache = BalanceCache()
@@ -0,0 +1,148 @@
+import os
+import time
+import logging
+import threading
+from config.settings import FX_RATE_SOURCE, FX_REFRESH_INTERVAL, FX_MAX_JUMP_PERCENT, FX_MAX_AGE
+from utils.helpers import (
+    fetch_usd_to_idr_rate,
+    save_last_usd_to_idr_rate,
+    load_last_usd_to_idr_rate,
+    LAST_RATE_FILE
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USD_TO_IDR_RATE = 16000
+
+
+class FxRateService:
+    """
+    Kurs USD/IDR yang disajikan dari memori dan diperbarui oleh background thread.
+    Sumber: kurs implisit pasar USDT/IDR Indodax (jika tersedia) lalu fixing ECB dari frankfurter.app.
+    Kurs terakhir disimpan ke disk untuk warm start. Kurs yang lebih tua dari max_age
+    (mis. cache disk lama, atau start() tidak pernah dipanggil) di-refresh langsung saat dibaca.
+    """
+
+    def __init__(self, source=FX_RATE_SOURCE, refresh_interval=FX_REFRESH_INTERVAL, max_age=FX_MAX_AGE):
+        self.source = source
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+        self.rate = None
+        self.rate_source = None
+        self.updated_at = 0.0
+        self._stale_checked_at = 0.0
+        self._indodax = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def get_rate(self):
+        """Kurs saat ini tanpa request jaringan, kecuali belum pernah ada kurs sama sekali"""
+        env_rate = os.getenv("USD_TO_IDR_RATE")
+        if env_rate:
+            try:
+                return float(env_rate)
+            except ValueError:
+                logger.warning("⚠️ Format USD_TO_IDR_RATE tidak valid")
+
+        if self.rate is None:
+            self._warm_start()
+        if self.age() > self.max_age:
+            self._refresh_stale()
+        return self.rate
+
+    def start(self, indodax=None):
+        """Mulai refresh di background; indodax dipakai untuk kurs implisit USDT/IDR"""
+        self._indodax = indodax
+        if self._thread is not None and self._thread.is_alive():
+            return
+        if self.rate is None:
+            self._warm_start()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="fx-rate", daemon=True)
+        self._thread.start()
+        logger.info(f"💱 FX service aktif (sumber: {self.source}, refresh {self.refresh_interval:.0f}s)")
+
+    def stop(self):
+        self._stop.set()
+
+    def refresh(self):
+        """Ambil kurs baru dari sumber yang tersedia, simpan ke memori dan disk"""
+        rate, source = None, None
+        if self.source == "indodax" and self._indodax is not None:
+            rate, source = self._implied_indodax_rate(), "indodax"
+        if rate is None:
+            rate, source = fetch_usd_to_idr_rate(), "ecb"
+
+        if rate is None:
+            logger.warning("⚠️ Kurs USD/IDR tidak bisa diperbarui, memakai kurs terakhir")
+            return self.rate
+
+        self._set_rate(rate, source)
+        save_last_usd_to_idr_rate(rate)
+        return rate
+
+    def age(self):
+        """Umur kurs dalam detik"""
+        return time.time() - self.updated_at if self.updated_at else float('inf')
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"🚨 Gagal refresh kurs USD/IDR: {e}")
+            self._stop.wait(self.refresh_interval)
+
+    def _refresh_stale(self):
+        """Kurs melewati max_age: refresh langsung jika tidak ada thread background, paling sering sekali per interval"""
+        now = time.time()
+        if now - self._stale_checked_at < self.refresh_interval:
+            return
+        self._stale_checked_at = now
+        if self._thread is not None and self._thread.is_alive():
+            logger.warning(f"⚠️ Kurs USD/IDR berumur {self.age():.0f}s (batas {self.max_age:.0f}s), sumber belum pulih")
+            return
+        logger.warning(f"⚠️ Kurs USD/IDR berumur {self.age():.0f}s (batas {self.max_age:.0f}s) dan FX service "
+                       f"tidak berjalan, refresh langsung")
+        self.refresh()
+
+    def _warm_start(self):
+        with self._lock:
+            if self.rate is not None:
+                return
+            if os.path.exists(LAST_RATE_FILE):
+                self.rate = load_last_usd_to_idr_rate()
+                self.rate_source = "disk"
+                self.updated_at = os.path.getmtime(LAST_RATE_FILE)
+                logger.info(f"💱 Kurs USD/IDR dari cache disk: {self.rate}")
+                return
+
+        # Belum ada kurs tersimpan: satu request blocking sekali saja
+        if self.refresh() is None:
+            self._set_rate(DEFAULT_USD_TO_IDR_RATE, "default")
+
+    def _implied_indodax_rate(self):
+        try:
+            rate = self._indodax.fetch_ticker("usdt")
+        except Exception as e:
+            logger.warning(f"⚠️ Gagal ambil kurs USDT/IDR Indodax: {e}")
+            return None
+        if not rate or rate <= 0:
+            return None
+
+        # Tolak lonjakan tidak wajar dibanding kurs terakhir
+        if self.rate and abs(rate - self.rate) / self.rate * 100 > FX_MAX_JUMP_PERCENT:
+            logger.warning(f"⚠️ Kurs implisit Indodax {rate} menyimpang dari {self.rate}, diabaikan")
+            return None
+        return rate
+
+    def _set_rate(self, rate, source):
+        with self._lock:
+            self.rate = float(rate)
+            self.rate_source = source
+            self.updated_at = time.time()
+        logger.debug(f"💱 Kurs USD/IDR {self.rate} ({source})")
+
+
+fx_rate_service = FxRateService()
@@ -8,21 +8,24 @@ from config.settings import (
     MIN_PROFIT_THRESHOLD_PERCENT,
     TRANSFER_FEE,
     TRANSFER_FEE_IDR_TO_USDT,
-    MIN_TRADE_AMOUNTS
+    MIN_TRADE_AMOUNTS,
+    TRADING_FEE,
+    FX_CACHE_FILE
 )
+from utils.balance_cache import balance_cache
+from exchanges.markets import market_metadata
 
 logger = logging.getLogger(__name__)
 
+LAST_RATE_FILE = FX_CACHE_FILE
+
 def get_usd_to_idr_rate():
-    # 1. Coba dari environment variable
-    env_rate = os.getenv("USD_TO_IDR_RATE")
-    if env_rate:
-        try:
-            return float(env_rate)
-        except ValueError:
-            logger.warning("⚠️ Format USD_TO_IDR_RATE tidak valid")
-    
-    # 2. Coba dari API
+    """Kurs USD/IDR dari FX service (dibaca dari memori, tanpa request per panggilan)"""
+    from utils.fx_rate import fx_rate_service
+    return fx_rate_service.get_rate()
+
+def fetch_usd_to_idr_rate():
+    """Ambil fixing ECB USD/IDR dari frankfurter.app, None jika gagal"""
     try:
         response = requests.get(
             "https://api.frankfurter.app/latest?from=USD&to=IDR", 
@@ -33,15 +36,13 @@ def get_usd_to_idr_rate():
         return data["rates"]["IDR"]
     except Exception as e:
         logger.warning(f"⚠️ Gagal ambil kurs dari API: {e}")
-    
-    # 3. Fallback ke nilai default
-    return 16000
+        return None
 
 def save_last_usd_to_idr_rate(rate):
     """Simpan kurs terakhir ke file"""
     try:
-        os.makedirs("data", exist_ok=True)
-        with open("data/last_rate.json", "w") as f:
+        os.makedirs(os.path.dirname(LAST_RATE_FILE), exist_ok=True)
+        with open(LAST_RATE_FILE, "w") as f:
             json.dump({
                 "usd_to_idr": rate,
                 "timestamp": datetime.now().isoformat()
@@ -52,8 +53,8 @@ def save_last_usd_to_idr_rate(rate):
 def load_last_usd_to_idr_rate():
     """Muat kurs dari file lokal"""
     try:
-        if os.path.exists("data/last_rate.json"):
-            with open("data/last_rate.json", "r") as f:
+        if os.path.exists(LAST_RATE_FILE):
+            with open(LAST_RATE_FILE, "r") as f:
                 data = json.load(f)
                 return float(data["usd_to_idr"])
     except Exception as e:
@@ -72,12 +73,30 @@ def get_min_profit_threshold():
     )
 
 
-def calculate_net_profit(symbol, buy_price, sell_price, buy_exchange, sell_exchange):
-    coin_transfer_fee = TRANSFER_FEE.get(symbol, 0)
-    fiat_transfer_fee = TRANSFER_FEE_IDR_TO_USDT if "indodax" in [buy_exchange, sell_exchange] else 0
-    trade_fee = (buy_price * 0.001) + (sell_price * 0.001)
-    
-    total_fee = coin_transfer_fee + fiat_transfer_fee + trade_fee
+def fiat_fee_usd(buy_exchange, sell_exchange, usd_to_idr, fiat_transfer_fee=TRANSFER_FEE_IDR_TO_USDT):
+    """Fee transfer fiat (IDR) dalam USD jika Indodax terlibat, selain itu 0"""
+    if 'indodax' in (buy_exchange, sell_exchange) and usd_to_idr:
+        return fiat_transfer_fee / usd_to_idr
+    return 0.0
+
+def transfer_fee_usd(symbol, buy_price, buy_exchange, sell_exchange, usd_to_idr,
+                     transfer_fee=TRANSFER_FEE, fiat_transfer_fee=TRANSFER_FEE_IDR_TO_USDT):
+    """
+    Biaya transfer per eksekusi dalam USD: fee transfer koin (dalam unit koin, dinilai
+    dengan harga beli) ditambah fee transfer fiat IDR jika Indodax terlibat.
+    """
+    coin_fee = transfer_fee.get(symbol, 0) * buy_price
+    return coin_fee + fiat_fee_usd(buy_exchange, sell_exchange, usd_to_idr, fiat_transfer_fee)
+
+def calculate_net_profit(symbol, buy_price, sell_price, buy_exchange, sell_exchange, usd_to_idr=None):
+    """
+    usd_to_idr sebaiknya diambil sekali per siklus deteksi oleh pemanggil; hanya dibaca sendiri jika Indodax terlibat.
+    Biaya transfer sama dengan transfer_fee_usd, ditulis langsung karena fungsi ini dipanggil untuk setiap pasangan.
+    """
+    trade_fee = (buy_price * TRADING_FEE) + (sell_price * TRADING_FEE)
+    total_fee = TRANSFER_FEE.get(symbol, 0) * buy_price + trade_fee
+    if 'indodax' in (buy_exchange, sell_exchange):
+        total_fee += TRANSFER_FEE_IDR_TO_USDT / (usd_to_idr or get_usd_to_idr_rate())
     gross_profit = sell_price - buy_price
     net_profit = gross_profit - total_fee
     net_profit_percent = (net_profit / buy_price) * 100 if buy_price > 0 else 0
@@ -93,12 +112,15 @@ def calculate_trade_amount(symbol, buy_ex, sell_ex, buy_price, sell_price):
     buy_currency = buy_ex.get_base_currency()
     sell_currency = sell_ex.get_base_currency()
     
-    buy_balance = buy_ex.fetch_balance().get(buy_currency, {}).get('free', 0)
-    sell_balance = sell_ex.fetch_balance().get(symbol, {}).get('free', 0)
+    buy_balance = balance_cache.get_free(buy_ex, buy_currency)
+    sell_balance = balance_cache.get_free(sell_ex, symbol)
     
     max_from_buy = buy_balance / buy_price if buy_price > 0 else 0
     trade_amount = min(sell_balance, max_from_buy)
-    min_amount = MIN_TRADE_AMOUNTS.get(symbol, 0.001)
+    min_amount = max(
+        _exchange_min_amount(buy_ex, symbol, buy_price),
+        _exchange_min_amount(sell_ex, symbol, sell_price)
+    )
     
     min_for_profit = get_required_amount_for_profit(symbol, buy_price, sell_price)
     
@@ -108,6 +130,17 @@ def calculate_trade_amount(symbol, buy_ex, sell_ex, buy_price, sell_price):
         'min_balance_required': max(min_amount, min_for_profit)
     }
 
+def _exchange_min_amount(exchange, symbol, price):
+    """
+    Minimum order dari filter lot/notional exchange. MIN_TRADE_AMOUNTS jika metadata belum ada
+    atau filternya 0 (exchange tidak mengirim minimum untuk market tersebut).
+    """
+    default = MIN_TRADE_AMOUNTS.get(symbol, 0.001)
+    # Harga dalam USD; min notional Indodax dalam IDR sehingga hanya min qty yang dipakai
+    if exchange.get_base_currency() == "IDR":
+        price = None
+    return market_metadata.min_amount(exchange.__class__.__name__.lower(), symbol, price, default) or default
+
 def get_required_amount_for_profit(symbol, buy_price, sell_price):
     min_profit_usd, _ = get_min_profit_threshold()
     spread = sell_price - buy_price
@@ -1,45 +1,255 @@
+import atexit
+import gzip
+import json
 import logging
 import os
+import queue
+import re
+import shutil
 import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from colorama import Fore, Style, init
+from config.settings import (
+    LOG_LEVEL,
+    LOG_FILE,
+    LOG_MAX_BYTES,
+    LOG_ROTATE_SECONDS,
+    LOG_BACKUP_COUNT,
+    LOG_QUEUE_SIZE,
+    LOG_DEDUP_WINDOW,
+    LOG_DEDUP_BURST
+)
 init(autoreset=True)
 
-def setup_logger():
-    logger = logging.getLogger("bitbot")
-    logger.setLevel(logging.DEBUG)  # Set default ke DEBUG
-    
+ANSI_PATTERN = re.compile(r"\x1b\[[0-9;]*m")
+# Angka di pesan yang sudah jadi (f-string) diabaikan saat mencari baris yang sama
+NUMBER_PATTERN = re.compile(r"\d+(?:[.,]\d+)*")
+
+# Penghitung untuk metrik logging
+_stats = {'dropped': 0, 'suppressed': 0}
+_stats_lock = threading.Lock()
+
+
+def _count(key, amount=1):
+    with _stats_lock:
+        _stats[key] += amount
+
+
+def get_log_stats():
+    """Jumlah baris log yang dibuang (antrian penuh) dan yang disaring dedup, plus isi antrian saat ini"""
+    with _stats_lock:
+        stats = dict(_stats)
+    stats['queued'] = _queue.qsize() if _queue is not None else 0
+    return stats
+
+
+def log_event(logger, level, event, message, *args, **fields):
+    """
+    Log satu baris ringkas dengan field terstruktur yang ikut ditulis ke file JSON-lines.
+    message berformat %-style dengan args, dirender oleh thread listener (bukan thread pemanggil).
+    """
+    if logger.isEnabledFor(level):
+        logger.log(level, message, *args, extra={'event': event, 'fields': fields})
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    Hanya menaruh record ke antrian terbatas; format dan I/O dikerjakan thread listener.
+    Jika antrian penuh record di bawah WARNING dibuang dan dihitung sehingga thread trading
+    tidak menunggu; WARNING ke atas tetap menunggu tempat di antrian dan tidak pernah hilang.
+    """
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            if record.levelno >= logging.WARNING:
+                self.queue.put(record)
+            else:
+                _count('dropped')
+
+    def prepare(self, record):
+        # Format pesan ditunda ke listener; hanya traceback yang harus dirender di thread asal
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        return record
+
+
+class DedupFilter(logging.Filter):
+    """
+    Batasi warning/error yang berulang: per pesan yang sama hanya LOG_DEDUP_BURST baris
+    per LOG_DEDUP_WINDOW detik. Jumlah yang disaring dilaporkan di baris berikutnya yang lolos.
+    Kuncinya lokasi pemanggil plus template %-style; untuk pesan f-string yang sudah jadi,
+    angkanya dinormalisasi: "timeout 1203ms" dan "timeout 998ms" dari baris yang sama dianggap sama.
+    Dipasang di DedupQueueListener sehingga dijalankan di thread listener.
+    """
+
+    def __init__(self, window=LOG_DEDUP_WINDOW, burst=LOG_DEDUP_BURST):
+        super().__init__()
+        self.window = window
+        self.burst = burst
+        self._seen = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno < logging.WARNING:
+            return True
+        message = record.msg if record.args else NUMBER_PATTERN.sub("#", record.getMessage())
+        key = (record.levelno, record.pathname, record.lineno, message)
+        now = time.monotonic()
+        with self._lock:
+            started, count, suppressed = self._seen.get(key, (now, 0, 0))
+            if now - started > self.window:
+                started, count = now, 0
+            count += 1
+            if count > self.burst:
+                self._seen[key] = (started, count, suppressed + 1)
+                _count('suppressed')
+                return False
+            self._seen[key] = (started, count, 0)
+            if len(self._seen) > 10000:
+                self._seen.clear()
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class DedupQueueListener(QueueListener):
+    """QueueListener yang menyaring warning berulang sekali per record, sebelum dibagikan ke semua handler"""
+
+    def __init__(self, queue, *handlers, dedup=None, respect_handler_level=False):
+        super().__init__(queue, *handlers, respect_handler_level=respect_handler_level)
+        self.dedup = dedup or DedupFilter()
+
+    def handle(self, record):
+        if self.dedup.filter(record):
+            super().handle(record)
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """Satu objek JSON per baris: ts, level, logger, msg, event dan field tambahan"""
+
+    def format(self, record):
+        entry = {
+            'ts': round(record.created, 3),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': ANSI_PATTERN.sub('', record.getMessage()).strip(),
+        }
+        event = getattr(record, 'event', None)
+        if event:
+            entry['event'] = event
+            entry.update(getattr(record, 'fields', {}))
+        if getattr(record, 'suppressed', 0):
+            entry['suppressed'] = record.suppressed
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class ColoredFormatter(logging.Formatter):
+    COLORS = {
+        logging.DEBUG: Fore.CYAN,
+        logging.INFO: Fore.GREEN,
+        logging.WARNING: Fore.YELLOW,
+        logging.ERROR: Fore.RED,
+        logging.CRITICAL: Fore.MAGENTA
+    }
+
+    def format(self, record):
+        color = self.COLORS.get(record.levelno, Style.RESET_ALL)
+        message = super().format(record)
+        if getattr(record, 'suppressed', 0):
+            message += f" (+{record.suppressed} baris serupa disaring)"
+        return f"{color}{message}{Style.RESET_ALL}"
+
+
+class CompressedRotatingFileHandler(RotatingFileHandler):
+    """Rotasi berdasarkan ukuran atau umur file, file lama dikompresi gzip"""
+
+    def __init__(self, filename, max_bytes, rotate_seconds, backup_count):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+        self.rotate_seconds = rotate_seconds
+        self.opened_at = time.time()
+        self.namer = lambda name: name + ".gz"
+        self.rotator = self._compress
+
+    def shouldRollover(self, record):
+        if self.rotate_seconds and time.time() - self.opened_at >= self.rotate_seconds:
+            return True
+        return super().shouldRollover(record)
+
+    def doRollover(self):
+        super().doRollover()
+        self.opened_at = time.time()
+
+    @staticmethod
+    def _compress(source, dest):
+        with open(source, 'rb') as f_in, gzip.open(dest, 'wb') as f_out:
+            shutil.copyfileobj(f_in, f_out)
+        os.remove(source)
+
+
+_queue = None
+_listener = None
+_queue_handler = None
+
+# Modul memakai logger ini langsung; handler baru dipasang oleh entry point lewat setup_logger()
+logger = logging.getLogger("bitbot")
+
+
+def setup_logger(log_file=None):
+    """
+    Pasang pipeline logging sekali untuk seluruh proses: semua logger (termasuk modul yang
+    memakai logging.getLogger(__name__)) masuk antrian, lalu thread listener menulis ke
+    console berwarna dan file JSON-lines yang dirotasi. Hanya dipanggil dari entry point
+    (main.py, simulator, benchmark, backtest), bukan saat modul diimpor.
+    """
+    global _queue, _listener, _queue_handler
+    level = getattr(logging, LOG_LEVEL.upper(), logging.INFO)
+    logger.setLevel(level)
+    if _listener is not None:
+        return logger
+
     # File handler
-    log_dir = "data/logs"
-    os.makedirs(log_dir, exist_ok=True)
-    file_handler = logging.FileHandler(f"{log_dir}/bot.log", encoding='utf-8')
-    file_formatter = logging.Formatter(
-        "%(asctime)s [%(levelname)s] %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S"
-    )
-    file_handler.setFormatter(file_formatter)
-    logger.addHandler(file_handler)
-    
+    log_file = log_file or LOG_FILE
+    os.makedirs(os.path.dirname(log_file) or ".", exist_ok=True)
+    file_handler = CompressedRotatingFileHandler(log_file, LOG_MAX_BYTES, LOG_ROTATE_SECONDS, LOG_BACKUP_COUNT)
+    file_handler.setFormatter(JsonLinesFormatter())
+
     # Console handler dengan warna
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(logging.INFO)  # Console hanya tampilkan INFO ke atas
-    
-    class ColoredFormatter(logging.Formatter):
-        COLORS = {
-            logging.DEBUG: Fore.CYAN,
-            logging.INFO: Fore.GREEN,
-            logging.WARNING: Fore.YELLOW,
-            logging.ERROR: Fore.RED,
-            logging.CRITICAL: Fore.MAGENTA
-        }
-        def format(self, record):
-            color = self.COLORS.get(record.levelno, Style.RESET_ALL)
-            message = super().format(record)
-            return f"{color}{message}{Style.RESET_ALL}"
-    
-    console_formatter = ColoredFormatter("[%(levelname)s] %(message)s")
-    console_handler.setFormatter(console_formatter)
-    logger.addHandler(console_handler)
-    
+    console_handler.setFormatter(ColoredFormatter("[%(levelname)s] %(message)s"))
+
+    _queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    _queue_handler = NonBlockingQueueHandler(_queue)
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(_queue_handler)
+    # Library HTTP/WebSocket mencatat setiap request di INFO/DEBUG
+    for noisy in ("httpx", "httpcore", "hpack", "websockets", "asyncio"):
+        logging.getLogger(noisy).setLevel(logging.WARNING)
+
+    _listener = DedupQueueListener(_queue, file_handler, console_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logger)
     return logger
-    
-logger = setup_logger()
\ No newline at end of file
+
+
+def shutdown_logger():
+    """Lepas handler antrian, tunggu listener menulis semua record tersisa, lalu tutup file"""
+    global _queue, _listener, _queue_handler
+    if _listener is None:
+        return
+    logging.getLogger().removeHandler(_queue_handler)
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.flush()
+        if isinstance(handler, logging.FileHandler):
+            handler.close()
+    _queue, _listener, _queue_handler = None, None, None
@@ -0,0 +1,260 @@
+import math
+import threading
+from bisect import bisect_left
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from utils.logger import logger
+from config.settings import METRICS_ENABLED, METRICS_HOST, METRICS_PORT
+
+# Bucket latensi dalam detik: 1ms .. 30s
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values):
+        """Child untuk kombinasi label; disimpan agar pemanggilan berikutnya cukup satu lookup dict"""
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for values, child in sorted(self._children.items()):
+            lines.extend(child.render(self.name, self.labelnames, values))
+        return lines
+
+
+class _CounterChild:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1.0):
+        with self._lock:
+            self.value += amount
+
+    def render(self, name, labelnames, values):
+        return [f"{name}{_format_labels(labelnames, values)} {_format_value(self.value)}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1.0):
+        self.labels().inc(amount)
+
+
+class _GaugeChild(_CounterChild):
+    def __init__(self):
+        super().__init__()
+        self.function = None
+
+    def set(self, value):
+        self.value = value
+
+    def set_function(self, function):
+        """Nilai dihitung saat scrape, tanpa biaya di hot path"""
+        self.function = function
+
+    def render(self, name, labelnames, values):
+        value = self.value
+        if self.function is not None:
+            try:
+                value = self.function()
+            except Exception:
+                value = math.nan
+        return [f"{name}{_format_labels(labelnames, values)} {_format_value(value)}"]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value):
+        self.labels().set(value)
+
+
+class _HistogramChild:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+    def render(self, name, labelnames, values):
+        with self._lock:
+            counts = list(self.counts)
+            total = self.sum
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + (math.inf,), counts):
+            cumulative += count
+            labels = _format_labels(labelnames, values, ("le", _format_value(bound)))
+            lines.append(f"{name}_bucket{labels} {cumulative}")
+        labels = _format_labels(labelnames, values)
+        lines.append(f"{name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{name}_count{labels} {cumulative}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        """Semua metrik dalam format teks Prometheus"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+# Adapter exchange
+EXCHANGE_REQUEST_SECONDS = registry.histogram(
+    "bot_exchange_request_seconds", "Latensi request HTTP ke exchange", ("exchange", "endpoint"))
+EXCHANGE_REQUEST_ERRORS = registry.counter(
+    "bot_exchange_request_errors_total", "Request exchange yang gagal", ("exchange", "endpoint", "kind"))
+BALANCE_FETCH_EMPTY = registry.counter(
+    "bot_balance_fetch_empty_total", "fetch_balance yang mengembalikan {} (biasanya error)", ("exchange",))
+
+# PriceCollector
+PRICE_COLLECTION_SECONDS = registry.histogram(
+    "bot_price_collection_seconds", "Durasi satu putaran pengumpulan harga", ("mode",))
+PRICE_MISSING = registry.counter(
+    "bot_price_missing_total", "Harga yang tidak valid atau terlambat melewati deadline", ("exchange", "reason"))
+
+# Tick recorder
+TICKS_RECORDED = registry.counter("bot_ticks_recorded_total", "Tick harga yang ditulis ke disk")
+TICKS_DROPPED = registry.counter("bot_ticks_dropped_total", "Tick yang dibuang karena antrian recorder penuh")
+
+# ArbitrageEngine dan eksekusi
+DETECTION_SECONDS = registry.histogram("bot_detection_seconds", "Durasi evaluasi peluang", ("engine",))
+OPPORTUNITIES = registry.counter(
+    "bot_opportunities_total", "Funnel peluang: found, profitable, executable, executed, failed", ("stage",))
+EXECUTION_SECONDS = registry.histogram("bot_execution_seconds", "Durasi eksekusi satu peluang", ("result",))
+ORDER_LEG_SECONDS = registry.histogram(
+    "bot_order_leg_seconds", "Latensi keputusan sampai ack order per leg", ("exchange", "side"))
+
+# Siklus bot dan latensi keputusan
+CYCLE_SECONDS = registry.histogram(
+    "bot_cycle_seconds", "Durasi satu siklus run_bot (tanpa sleep)",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0))
+TICK_TO_DECISION_SECONDS = registry.histogram("bot_tick_to_decision_seconds", "Latensi tick harga sampai keputusan")
+
+RATE_LIMIT_REMAINING = registry.gauge(
+    "bot_rate_limit_remaining_ratio", "Fraksi budget polling rate limit yang tersisa", ("exchange",))
+LOG_LINES = registry.gauge("bot_log_lines", "Baris log yang dibuang atau disaring dedup", ("state",))
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = registry
+
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = self.registry.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+_server = None
+
+
+def start_metrics_server(host=METRICS_HOST, port=METRICS_PORT):
+    """Jalankan endpoint /metrics di thread daemon (hanya sekali per proses)"""
+    global _server
+    if not METRICS_ENABLED or _server is not None:
+        return _server
+
+    from utils.logger import get_log_stats
+    for state in ("dropped", "suppressed", "queued"):
+        LOG_LINES.labels(state).set_function(lambda state=state: get_log_stats()[state])
+
+    try:
+        _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as e:
+        logger.error(f"❌ Gagal membuka endpoint metrics di {host}:{port}: {e}")
+        return None
+    _server.daemon_threads = True
+    threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+    logger.info(f"📈 Endpoint metrics aktif di http://{host}:{_server.server_port}/metrics")
+    return _server
@@ -0,0 +1,90 @@
+import asyncio
+import threading
+import types
+import utils.balance_cache
+from utils.balance_cache import BalanceCache
+from utils.metrics import BALANCE_FETCH_EMPTY
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def time(self):
+        return self.now
+
+
+class Venue:
+    def __init__(self, responses=None, release=None):
+        self.responses = responses or [{"USDT": {"free": 100.0}}]
+        self.release = release
+        self.fetches = 0
+
+    def _next(self):
+        self.fetches += 1
+        return self.responses[min(self.fetches, len(self.responses)) - 1]
+
+    def fetch_balance(self):
+        if self.release is not None:
+            self.release.wait(5)
+        return self._next()
+
+    async def fetch_balance_async(self):
+        await asyncio.sleep(0)
+        return self._next()
+
+
+def test_snapshot_expires_after_ttl_and_on_invalidate(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(utils.balance_cache, "time", types.SimpleNamespace(time=clock.time))
+    cache, venue = BalanceCache(ttl=10), Venue()
+
+    assert cache.get_free(venue, "USDT") == 100.0
+    clock.now += 9
+    assert cache.get_free(venue, "BTC") == 0 and venue.fetches == 1
+    clock.now += 2
+    cache.get(venue)
+    assert venue.fetches == 2
+
+    # Invalidate lewat nama, instance, atau semua sekaligus
+    cache.invalidate("VENUE")
+    cache.get(venue)
+    cache.invalidate(venue)
+    cache.get(venue)
+    cache.new_cycle()
+    asyncio.run(cache.get_async(venue))
+    assert venue.fetches == 5
+    assert asyncio.run(cache.get_free_async(venue, "USDT")) == 100.0 and venue.fetches == 5
+
+
+def test_concurrent_callers_share_one_fetch():
+    release = threading.Event()
+    cache, venue = BalanceCache(ttl=60), Venue(release=release)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get(venue))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert venue.fetches == 1 and len(results) == 8
+
+    async def gather():
+        cache.invalidate()
+        return await asyncio.gather(*(cache.get_async(venue) for _ in range(8)))
+
+    assert all(balances["USDT"]["free"] == 100.0 for balances in asyncio.run(gather()))
+    assert venue.fetches == 2
+
+
+def test_empty_response_is_not_cached():
+    cache = BalanceCache(ttl=60)
+    venue = Venue(responses=[{}, {}, {"USDT": {"free": 5.0}}])
+    empty = BALANCE_FETCH_EMPTY.labels("venue")
+    before = empty.value
+
+    assert cache.get(venue) == {}
+    assert asyncio.run(cache.get_async(venue)) == {}
+    assert cache.get_free(venue, "USDT") == 5.0
+    assert cache.get_free(venue, "USDT") == 5.0
+    assert venue.fetches == 3 and empty.value == before + 2
@@ -0,0 +1,82 @@
+import os
+import time
+import logging
+import pytest
+import utils.helpers
+import utils.fx_rate
+from utils.fx_rate import FxRateService
+
+
+@pytest.fixture
+def rate_file(tmp_path, monkeypatch):
+    path = str(tmp_path / "last_rate.json")
+    monkeypatch.setattr(utils.helpers, "LAST_RATE_FILE", path)
+    monkeypatch.setattr(utils.fx_rate, "LAST_RATE_FILE", path)
+    monkeypatch.delenv("USD_TO_IDR_RATE", raising=False)
+    return path
+
+
+def fake_source(monkeypatch, rates):
+    """Sumber ECB tiruan: mengembalikan nilai dari `rates` berurutan (None = gagal), mencatat jumlah panggilan"""
+    calls = []
+
+    def fetch():
+        calls.append(time.time())
+        return rates[min(len(calls), len(rates)) - 1]
+
+    monkeypatch.setattr(utils.fx_rate, "fetch_usd_to_idr_rate", fetch)
+    return calls
+
+
+class Indodax:
+    def __init__(self, rate):
+        self.rate = rate
+
+    def fetch_ticker(self, symbol):
+        return self.rate
+
+
+def test_refresh_persists_and_warm_starts_from_disk(rate_file, monkeypatch):
+    fake_source(monkeypatch, [16250.0])
+    service = FxRateService(source="ecb")
+    assert service.refresh() == 16250.0
+    assert (service.rate_source, os.path.exists(rate_file)) == ("ecb", True)
+
+    # Proses baru membaca kurs dari disk tanpa request
+    calls = fake_source(monkeypatch, [None])
+    restarted = FxRateService(source="ecb")
+    assert restarted.get_rate() == 16250.0
+    assert restarted.rate_source == "disk" and calls == []
+
+
+def test_source_failure_keeps_last_rate(rate_file, monkeypatch):
+    fake_source(monkeypatch, [16100.0, None])
+    service = FxRateService(source="indodax")
+    assert service.refresh() == 16100.0 and service.rate_source == "ecb"
+
+    # Lonjakan 20% dari Indodax ditolak dan ECB gagal: kurs terakhir tetap dipakai
+    service._indodax = Indodax(16100.0 * 1.2)
+    assert service.refresh() == 16100.0 and service.rate_source == "ecb"
+
+    service._indodax = Indodax(16120.0)
+    assert service.refresh() == 16120.0 and service.rate_source == "indodax"
+
+
+def test_stale_rate_without_service_is_refreshed(rate_file, monkeypatch, caplog):
+    fake_source(monkeypatch, [15900.0])
+    FxRateService(source="ecb").refresh()
+    old = time.time() - 7200
+    os.utime(rate_file, (old, old))
+
+    # Cache disk berumur 2 jam, start() tidak pernah dipanggil: refresh langsung dengan peringatan
+    calls = fake_source(monkeypatch, [None, 16300.0])
+    service = FxRateService(source="ecb", refresh_interval=60, max_age=3600)
+    with caplog.at_level(logging.WARNING, logger="utils.fx_rate"):
+        assert service.get_rate() == 15900.0
+    assert len(calls) == 1 and "tidak berjalan" in caplog.text
+
+    # Sumber gagal: percobaan berikutnya menunggu refresh_interval, bukan setiap get_rate
+    assert service.get_rate() == 15900.0 and len(calls) == 1
+    service._stale_checked_at -= 60
+    assert service.get_rate() == 16300.0 and len(calls) == 2
+    assert service.age() < 1
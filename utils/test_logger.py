@@ -0,0 +1,94 @@
+import json
+import queue
+import logging
+import threading
+import utils.logger
+from config.settings import LOG_DEDUP_BURST
+from utils.logger import (
+    DedupFilter, NonBlockingQueueHandler, JsonLinesFormatter, get_log_stats, setup_logger, shutdown_logger, logger
+)
+
+
+def make_record(level, msg, lineno=1, args=None, **extra):
+    record = logging.LogRecord("bitbot", level, __file__, lineno, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_dedup_filter_limits_repeated_warnings():
+    dedup = DedupFilter(window=60, burst=2)
+    passed = [dedup.filter(make_record(logging.WARNING, "⚠️ sama")) for _ in range(5)]
+    assert passed == [True, True, False, False, False]
+    assert dedup.filter(make_record(logging.INFO, "⚠️ sama"))
+
+
+def test_dedup_filter_groups_f_strings_that_differ_only_in_numbers():
+    dedup = DedupFilter(window=60, burst=1)
+    assert dedup.filter(make_record(logging.ERROR, "❌ binance timeout 1203ms", lineno=7))
+    assert not dedup.filter(make_record(logging.ERROR, "❌ binance timeout 998ms", lineno=7))
+    assert dedup.filter(make_record(logging.ERROR, "❌ kucoin timeout 998ms", lineno=7))
+    assert dedup.filter(make_record(logging.ERROR, "❌ binance timeout 998ms", lineno=8))
+
+
+def test_dedup_filter_keys_lazy_messages_by_template():
+    dedup = DedupFilter(window=60, burst=1)
+    assert dedup.filter(make_record(logging.WARNING, "⚠️ Harga %s di %s tidak valid", args=("BTC", "binance")))
+    assert not dedup.filter(make_record(logging.WARNING, "⚠️ Harga %s di %s tidak valid", args=("XRP", "kucoin")))
+
+
+def test_full_queue_drops_without_blocking_and_counts():
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    before = get_log_stats()['dropped']
+    handler.emit(make_record(logging.INFO, "satu"))
+    handler.emit(make_record(logging.INFO, "dua"))
+    assert get_log_stats()['dropped'] == before + 1
+
+
+def test_full_queue_keeps_warnings():
+    records = queue.Queue(maxsize=1)
+    handler = NonBlockingQueueHandler(records)
+    handler.emit(make_record(logging.INFO, "satu"))
+    before = get_log_stats()['dropped']
+    drain = threading.Timer(0.05, records.get)
+    drain.start()
+    handler.emit(make_record(logging.WARNING, "⚠️ penting"))
+    drain.join()
+    assert records.get_nowait().getMessage() == "⚠️ penting"
+    assert get_log_stats()['dropped'] == before
+
+
+def test_pipeline_only_from_setup_and_drained_on_shutdown(tmp_path):
+    root = logging.getLogger()
+    assert not any(isinstance(h, NonBlockingQueueHandler) for h in root.handlers)
+    path = tmp_path / "bot.jsonl"
+    setup_logger(str(path))
+    try:
+        for i in range(200):
+            logger.info(f"baris {i}")
+    finally:
+        shutdown_logger()
+    assert not any(isinstance(h, NonBlockingQueueHandler) for h in root.handlers)
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [entry['msg'] for entry in lines][-1] == "baris 199" and len(lines) == 200
+
+
+def test_dedup_runs_on_the_listener_thread(tmp_path):
+    path = tmp_path / "bot.jsonl"
+    setup_logger(str(path))
+    try:
+        # Thread pemanggil hanya menaruh record ke antrian, tanpa filter atau format
+        assert utils.logger._queue_handler.filters == []
+        for i in range(20):
+            logger.warning("⚠️ Harga %s tidak valid: %s", "BTC", i)
+    finally:
+        shutdown_logger()
+    lines = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [entry['msg'] for entry in lines] == [f"⚠️ Harga BTC tidak valid: {i}" for i in range(LOG_DEDUP_BURST)]
+
+
+def test_json_lines_include_event_fields():
+    line = JsonLinesFormatter().format(
+        make_record(logging.INFO, "\x1b[32m💹 BTC\x1b[0m", event="opportunity", fields={"net_profit": 1.5})
+    )
+    assert '"msg": "💹 BTC"' in line
+    assert '"event": "opportunity"' in line and '"net_profit": 1.5' in line
@@ -0,0 +1,42 @@
+import urllib.request
+import utils.metrics
+from utils.metrics import MetricsRegistry, start_metrics_server
+
+
+def test_histogram_renders_cumulative_buckets():
+    metrics = MetricsRegistry()
+    latency = metrics.histogram("test_latency_seconds", "Latensi uji", ("exchange",), buckets=(0.1, 1.0))
+    errors = metrics.counter("test_errors_total", "Error uji", ("exchange", "kind"))
+    for value in (0.05, 0.5, 2.0):
+        latency.labels("binance").observe(value)
+    errors.labels("kucoin", "timeout").inc()
+
+    text = metrics.render()
+    assert 'test_latency_seconds_bucket{exchange="binance",le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{exchange="binance",le="1.0"} 2' in text
+    assert 'test_latency_seconds_bucket{exchange="binance",le="+Inf"} 3' in text
+    assert 'test_latency_seconds_count{exchange="binance"} 3' in text
+    assert 'test_errors_total{exchange="kucoin",kind="timeout"} 1.0' in text
+    assert "# TYPE test_latency_seconds histogram" in text
+
+
+def test_scrape_endpoint_serves_registry(monkeypatch):
+    # Tidak bergantung METRICS_ENABLED dari environment atau server yang sudah dibuka modul lain
+    metrics = MetricsRegistry()
+    monkeypatch.setattr(utils.metrics, "METRICS_ENABLED", True)
+    monkeypatch.setattr(utils.metrics, "_server", None)
+    monkeypatch.setattr(utils.metrics._MetricsHandler, "registry", metrics)
+    gauge = metrics.gauge("test_scrape_gauge", "Gauge uji")
+    gauge.labels().set_function(lambda: 42)
+
+    server = start_metrics_server(port=0)
+    assert server is not None
+    try:
+        url = f"http://127.0.0.1:{server.server_port}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            body = response.read().decode()
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert body == "# HELP test_scrape_gauge Gauge uji\n# TYPE test_scrape_gauge gauge\ntest_scrape_gauge 42.0\n"